@@ -98,7 +98,34 @@ export class OrchestrationStack extends cdk.Stack {
       resultPath: '$.error',
     });
     
-    strategistTaskAWS.next(coordinatorTaskAWS);
+    // 2c. Synthesizers - run beside each Coordinator and synthesize tool results as they land
+    const synthesizerTaskAWS = this.createAgentTask(
+      'SynthesizerTaskAWS',
+      props.agentTaskDefinitions.synthesizer,
+      props,
+      [{ name: 'SYNTHESIZER_INCREMENTAL', value: 'true' }]
+    );
+
+    const synthesizerTaskCode = this.createAgentTask(
+      'SynthesizerTaskCode',
+      props.agentTaskDefinitions.synthesizer,
+      props,
+      [{ name: 'SYNTHESIZER_INCREMENTAL', value: 'true' }]
+    );
+
+    const coordinateAWS = new sfn.Parallel(this, 'CoordinateAndSynthesizeAWS', {
+      resultPath: '$.coordination_results',
+    });
+    coordinateAWS.branch(coordinatorTaskAWS);
+    coordinateAWS.branch(synthesizerTaskAWS);
+
+    const coordinateCode = new sfn.Parallel(this, 'CoordinateAndSynthesizeCode', {
+      resultPath: '$.coordination_results',
+    });
+    coordinateCode.branch(coordinatorTaskCode);
+    coordinateCode.branch(synthesizerTaskCode);
+
+    strategistTaskAWS.next(coordinateAWS);
 
     // 3b. Code Scan Path - Deploy Context Agents (Parallel)
     const archaeologistTask = this.createAgentTask(
@@ -138,7 +165,7 @@ export class OrchestrationStack extends cdk.Stack {
       resultPath: '$.error',
     });
     
-    contextAgentsParallel.next(coordinatorTaskCode);
+    contextAgentsParallel.next(coordinateCode);
 
     // 3c. Scan Type Decision - Branch to appropriate path
     const scanTypeChoice = new sfn.Choice(this, 'ScanTypeDecision')
@@ -153,14 +180,9 @@ export class OrchestrationStack extends cdk.Stack {
       comment: 'Merge AWS and Code execution paths before synthesis',
     });
 
-    // 5. Synthesizer Task - Must run FIRST to write proposals to Redis
+    // 5. Synthesis runs beside the Coordinator (see 2c)
     // Note: Coordinator agent internally manages MCP tool invocation via MCPToolRegistry
     // MCP servers are spawned as child processes and communicate via stdio (JSON-RPC 2.0)
-    const synthesizerTask = this.createAgentTask(
-      'SynthesizerTask',
-      props.agentTaskDefinitions.synthesizer,
-      props
-    );
 
     // 6. Critic Task - Runs AFTER Synthesizer to read proposals from Redis
     // This ensures proposals exist before Critic attempts to review them
@@ -192,20 +214,41 @@ export class OrchestrationStack extends cdk.Stack {
       }),
     });
 
-    // Chain the states: unpack -> scan type choice -> (aws/code paths) -> coordinator -> synthesizer -> critic -> archivist
+    // 8b. Notify Memoized Completion - the archive was already analyzed by another mission
+    const notifyMemoizedCompletion = new tasks.SnsPublish(this, 'NotifyMemoizedCompletion', {
+      topic: this.completionTopic,
+      message: sfn.TaskInput.fromObject({
+        mission_id: sfn.JsonPath.stringAt('$.mission_id'),
+        status: 'COMPLETED',
+        memoized_from: sfn.JsonPath.stringAt('$.memoized_from'),
+        message: 'Archive already analyzed - results reused from an earlier mission',
+      }),
+    });
+
+    // 1b. Memo Decision - skip the pipeline when Unpack found a completed mission for the same archive
+    const memoChoice = new sfn.Choice(this, 'MemoDecision')
+      .when(
+        sfn.Condition.and(
+          sfn.Condition.isPresent('$.memo_hit'),
+          sfn.Condition.booleanEquals('$.memo_hit', true)
+        ),
+        notifyMemoizedCompletion
+      )
+      .otherwise(scanTypeChoice);
+
+    // Chain the states: unpack -> memo choice -> scan type choice -> (aws/code paths) -> coordinator -> synthesizer -> critic -> archivist
     const definition = unpackTask
-      .next(scanTypeChoice);
+      .next(memoChoice);
     
-    // After coordinator (which internally handles MCP tool execution), merge branches then continue with SEQUENTIAL synthesis
-    // Both coordinator paths (AWS and Code) need to flow through merge to synthesis
-    coordinatorTaskAWS.next(mergeBranches);
-    coordinatorTaskCode.next(mergeBranches);
+    // Each coordinator (which internally handles MCP tool execution) runs with its Synthesizer;
+    // both paths (AWS and Code) merge once the Synthesizer has proposed every tool's findings
+    coordinateAWS.next(mergeBranches);
+    coordinateCode.next(mergeBranches);
     
     // SEQUENTIAL execution to fix race condition:
     // Synthesizer MUST complete before Critic starts (Critic reads Synthesizer's Redis proposals)
     mergeBranches
-      .next(synthesizerTask)      // Run Synthesizer FIRST - writes proposals to Redis
-      .next(criticTask)            // THEN run Critic - reads proposals from Redis
+      .next(criticTask)            // Run Critic - reads proposals from Redis
       .next(waitForConsensus)      // Wait for negotiation to settle
       .next(archivistTask)         // Archive consensus findings
       .next(notifyCompletion);
@@ -216,23 +259,18 @@ export class OrchestrationStack extends cdk.Stack {
       resultPath: '$.error',
     });
     
-    // Add error handling to coordinator tasks
-    coordinatorTaskAWS.addCatch(handleFailure, {
+    // Add error handling to coordinator and synthesizer tasks (caught at their Parallel states)
+    coordinateAWS.addCatch(handleFailure, {
       errors: ['States.ALL'],
       resultPath: '$.error',
     });
     
-    coordinatorTaskCode.addCatch(handleFailure, {
-      errors: ['States.ALL'],
-      resultPath: '$.error',
-    });
-    
-    // Add error handling to synthesizer and critic tasks
-    synthesizerTask.addCatch(handleFailure, {
+    coordinateCode.addCatch(handleFailure, {
       errors: ['States.ALL'],
       resultPath: '$.error',
     });
     
+    // Add error handling to critic task
     criticTask.addCatch(handleFailure, {
       errors: ['States.ALL'],
       resultPath: '$.error',
@@ -413,7 +451,8 @@ export class OrchestrationStack extends cdk.Stack {
   private createAgentTask(
     id: string,
     taskDefinition: ecs.FargateTaskDefinition,
-    props: OrchestrationStackProps
+    props: OrchestrationStackProps,
+    environment: tasks.TaskEnvironmentVariable[] = []
   ): tasks.EcsRunTask {
     return new tasks.EcsRunTask(this, id, {
       integrationPattern: sfn.IntegrationPattern.RUN_JOB,
@@ -438,6 +477,22 @@ export class OrchestrationStack extends cdk.Stack {
               name: 'SCAN_TYPE',
               value: sfn.JsonPath.stringAt('$.scan_type'),
             },
+            {
+              // Epoch seconds set by Unpack; agents budget their work against it
+              name: 'MISSION_DEADLINE',
+              value: sfn.JsonPath.stringAt('$.deadline'),
+            },
+            {
+              // Tags the tool-result feed so a re-run ignores earlier attempts' events;
+              // a redrive keeps the execution id, so its count is part of the tag
+              name: 'MISSION_ATTEMPT',
+              value: sfn.JsonPath.format(
+                '{}#{}',
+                sfn.JsonPath.stringAt('$$.Execution.Id'),
+                sfn.JsonPath.stringAt('$$.Execution.RedriveCount'),
+              ),
+            },
+            ...environment,
           ],
         },
       ],
@@ -20,6 +20,8 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 from src.shared.cognitive_kernel.bedrock_client import CognitiveKernel
 from src.shared.code_research.deep_researcher import DeepCodeResearcher
+from src.shared.mission import MissionDeadline
+from src.shared.storage import materialize_workspace, release_workspace, workspace_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -97,6 +99,9 @@ class ArchaeologistAgent:
         
         self.agent_state_key = f"agent:{self.mission_id}:archaeologist"
         
+        # Mission deadline set by Unpack
+        self.deadline = MissionDeadline.from_env()
+        
         logger.info(f"ArchaeologistAgent initialized for mission: {self.mission_id}")
     
     def run(self) -> ContextManifest:
@@ -143,9 +148,7 @@ class ArchaeologistAgent:
             # Cleanup downloaded code
             if source_path and source_path.exists():
                 try:
-                    import shutil
-                    shutil.rmtree(source_path)
-                    logger.info(f"Cleaned up downloaded code at {source_path}")
+                    release_workspace(source_path)
                 except Exception as e:
                     logger.warning(f"Error cleaning up code directory: {e}")
     
@@ -185,31 +188,16 @@ class ArchaeologistAgent:
     
     def _download_source_code(self) -> Path:
         """Download and extract source code from S3."""
-        local_path = Path(f"/tmp/{self.mission_id}")
-        local_path.mkdir(parents=True, exist_ok=True)
-        
-        # List all files in unzipped directory
-        paginator = self.s3_client.get_paginator('list_objects_v2')
-        prefix = f"unzipped/{self.mission_id}/"
+        local_path = workspace_path(self.mission_id)
         
-        for page in paginator.paginate(Bucket=self.s3_artifacts_bucket, Prefix=prefix):
-            for obj in page.get('Contents', []):
-                key = obj['Key']
-                relative_path = key[len(prefix):]
-                
-                if not relative_path:
-                    continue
-                
-                file_path = local_path / relative_path
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                self.s3_client.download_file(
-                    self.s3_artifacts_bucket,
-                    key,
-                    str(file_path)
-                )
+        stats = materialize_workspace(
+            self.s3_client,
+            self.s3_artifacts_bucket,
+            self.mission_id,
+            local_path
+        )
         
-        logger.info(f"Downloaded source code to {local_path}")
+        logger.info(f"Downloaded source code to {local_path} ({stats['files']} files via {stats['mode']})")
         return local_path
     
     def _analyze_codebase(self, source_path: Path) -> Dict[str, Any]:
@@ -283,11 +271,15 @@ class ArchaeologistAgent:
             max_files=10
         )
         
-        # Query Kendra for similar past analyses
-        kendra_context = self.cognitive_kernel.retrieve_from_kendra(
-            query=f"code analysis context discovery service metadata {' '.join(catalog_stats['languages'].keys())}",
-            top_k=3
-        )
+        # Query Kendra for similar past analyses, unless the deadline is near
+        kendra_context = None
+        if self.deadline.degraded('context'):
+            logger.warning("Mission deadline near, analyzing without Kendra enrichment")
+        else:
+            kendra_context = self.cognitive_kernel.retrieve_from_kendra(
+                query=f"code analysis context discovery service metadata {' '.join(catalog_stats['languages'].keys())}",
+                top_k=3
+            )
         
         # Prepare comprehensive context for AI
         security_summary = self._format_security_patterns(security_patterns)
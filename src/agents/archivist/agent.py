@@ -18,6 +18,7 @@ import sys
 
 from src.shared.cognitive_kernel.bedrock_client import CognitiveKernel
 from src.shared.documentation.wiki_generator import SecurityWikiGenerator
+from src.shared.storage import UNMEMOIZED_SCAN_TYPES, MissionMemo, archive_sha256
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -98,6 +99,7 @@ class ArchivistAgent:
             self._trigger_memory_ingestor()
             
             self._update_mission_status(archived_count, wiki_s3_key)
+            self._complete_memo(archived_count, wiki_s3_key)
             self._cleanup_redis()
             
             self._update_state("COMPLETED", 1.0)
@@ -358,6 +360,21 @@ class ArchivistAgent:
         )
         logger.info("Mission status updated to COMPLETED")
     
+    def _complete_memo(self, findings_count, wiki_s3_key):
+        """Let later submissions of the same archive reuse this mission's results."""
+        if os.environ.get('MISSION_MEMO', 'true').lower() != 'true' or self.scan_type in UNMEMOIZED_SCAN_TYPES:
+            return
+        try:
+            sha256 = archive_sha256(self.s3_client, self.s3_artifacts_bucket, self.mission_id)
+            if not sha256:
+                return
+            memo = MissionMemo(self.s3_client, self.s3_artifacts_bucket, sha256, scan_type=self.scan_type)
+            if memo.mark_complete(self.mission_id, findings_count, wiki_s3_key):
+                logger.info(f"Memoized mission results for archive {sha256}")
+        except Exception as e:
+            # The memo is an optimization; never fail the mission over it
+            logger.warning(f"Could not memoize mission results: {e}")
+    
     def _cleanup_redis(self):
         """Clean up Redis keys for this mission."""
         keys_to_delete = [
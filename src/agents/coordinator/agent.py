@@ -10,11 +10,37 @@ import redis
 import logging
 import asyncio
 import time
-import shutil
-from pathlib import Path
-from typing import Dict, List, Any
+import uuid
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 
 from src.shared.cognitive_kernel.bedrock_client import CognitiveKernel
+from src.shared.mcp_client import (
+    CheckpointLedger,
+    RepoFeatures,
+    ToolCostModel,
+    ToolDAGScheduler,
+    ToolNode,
+    binding_for,
+    host_capacity,
+    invocation_digest,
+    read_verified
+)
+from src.shared.mcp_server import WIRE_CONTENT_TYPE, decode_tool_result
+from src.shared.mission import MissionDeadline, ToolResultFeed
+from src.shared.storage import (
+    MissionMemo,
+    UNMEMOIZED_SCAN_TYPES,
+    archive_sha256,
+    batch_write_items,
+    invocation_ruleset_digest,
+    materialize_workspace,
+    put_object,
+    release_workspace,
+    ruleset_digest,
+    workspace_path
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -74,6 +100,44 @@ class CoordinatorAgent:
             kendra_index_id=self.kendra_index_id
         )
         
+        # Per-tool timings of the last executed plan
+        self.schedule_timings: Dict[str, Any] = {}
+        
+        # Learned per-tool resource demand, shared through Redis
+        self.cost_model = ToolCostModel(self.redis_client)
+        self.repo_features = RepoFeatures()
+        
+        # Completed invocations of earlier attempts, skipped on retry
+        self.checkpoints = CheckpointLedger(
+            self.mission_id,
+            self.dynamodb_tool_results_table,
+            self.dynamodb_client,
+            self.s3_client
+        )
+        self.resume_enabled = os.environ.get('COORDINATOR_RESUME', 'true').lower() == 'true'
+        
+        # Results memoized for the same archive by earlier missions
+        self.scan_type = os.environ.get('SCAN_TYPE', 'code')
+        self.memo_enabled = (
+            os.environ.get('MISSION_MEMO', 'true').lower() == 'true'
+            and self.scan_type not in UNMEMOIZED_SCAN_TYPES
+        )
+        self.memo: Optional[MissionMemo] = None
+        self.server_health: Dict[str, Dict[str, Any]] = {}
+        self.unmemoized_servers: set = set()
+        self.memo_health_wait = float(os.environ.get('MISSION_MEMO_HEALTH_WAIT', '60'))
+        
+        # Announces each stored tool result to the incremental Synthesizer of this execution
+        self.tool_feed = ToolResultFeed(self.redis_client, self.mission_id, os.environ.get('MISSION_ATTEMPT'))
+        
+        # Mission deadline; tool timeouts are cut to the time left
+        self.deadline = MissionDeadline.from_env()
+        self.semgrep_degraded_config = os.environ.get('SEMGREP_DEGRADED_CONFIG', 'p/owasp-top-ten')
+        
+        # Parallel S3 uploads and DynamoDB batch retries when persisting results
+        self.persist_concurrency = max(1, int(os.environ.get('COORDINATOR_PERSIST_CONCURRENCY', '8')))
+        self.batch_write_retries = int(os.environ.get('COORDINATOR_BATCH_WRITE_RETRIES', '5'))
+        
         logger.info(f"CoordinatorAgent initialized for mission: {self.mission_id} with MCP support")
     
     def _download_code_from_s3(self) -> str:
@@ -83,48 +147,16 @@ class CoordinatorAgent:
         Returns:
             Local path where code was downloaded
         """
-        local_base = f"/tmp/{self.mission_id}"
-        s3_prefix = f"unzipped/{self.mission_id}/"
+        local_base = str(workspace_path(self.mission_id))
         
         try:
-            # Create local directory
-            Path(local_base).mkdir(parents=True, exist_ok=True)
-            
-            # List and download all objects with the prefix
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            page_iterator = paginator.paginate(
-                Bucket=self.s3_artifacts_bucket,
-                Prefix=s3_prefix
+            # Shared host workspace built from cached blobs; only new files are fetched
+            materialize_workspace(
+                self.s3_client,
+                self.s3_artifacts_bucket,
+                self.mission_id,
+                local_base
             )
-            
-            downloaded_count = 0
-            for page in page_iterator:
-                if 'Contents' not in page:
-                    continue
-                    
-                for obj in page['Contents']:
-                    s3_key = obj['Key']
-                    # Remove prefix to get relative path
-                    relative_path = s3_key[len(s3_prefix):]
-                    
-                    if not relative_path:  # Skip directory markers
-                        continue
-                    
-                    local_file = os.path.join(local_base, relative_path)
-                    
-                    # Create parent directories
-                    Path(local_file).parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Download file
-                    logger.info(f"Downloading {s3_key} to {local_file}")
-                    self.s3_client.download_file(
-                        self.s3_artifacts_bucket,
-                        s3_key,
-                        local_file
-                    )
-                    downloaded_count += 1
-            
-            logger.info(f"Downloaded {downloaded_count} files from S3 to {local_base}")
             return local_base
             
         except Exception as e:
@@ -142,8 +174,31 @@ class CoordinatorAgent:
         try:
             # SENSE: Download code from S3 and read strategy
             self._update_state("SENSING")
-            local_code_path = self._download_code_from_s3()
+            
+            # Start the MCP servers first so their warm-up overlaps the download
+            warmup = asyncio.ensure_future(self.cognitive_kernel.warm_mcp_servers())
+            loop = asyncio.get_event_loop()
+            try:
+                local_code_path = await loop.run_in_executor(None, self._download_code_from_s3)
+            except Exception:
+                warmup.cancel()
+                raise
             strategy = await self._read_execution_strategy()
+            if not self.deadline.bounded:
+                self.deadline = MissionDeadline.from_env(strategy.get('deadline'))
+            if self.deadline.bounded:
+                logger.info(f"Coordinator budget: {self.deadline.stage_budget('coordinator'):.0f}s")
+            self.repo_features = await loop.run_in_executor(None, RepoFeatures.from_path, local_code_path)
+            
+            try:
+                server_health = await warmup
+                self.server_health = server_health
+                not_ready = [name for name, report in server_health.items() if not report.get('ready')]
+                if not_ready:
+                    logger.warning(f"MCP servers not ready after warm-up: {not_ready}")
+            except Exception as e:
+                logger.warning(f"MCP server warm-up check failed: {e}")
+            
             available_tools = await self.cognitive_kernel.list_mcp_tools()
             
             logger.info(f"Code downloaded to: {local_code_path}")
@@ -159,15 +214,31 @@ class CoordinatorAgent:
             
             # ACT: Execute MCP tools in parallel
             self._update_state("ACTING")
+            if self.resume_enabled:
+                try:
+                    await loop.run_in_executor(None, self.checkpoints.load)
+                except Exception as e:
+                    logger.warning(f"Could not read checkpoint ledger, running every tool: {e}")
+            if self.memo_enabled:
+                sha256 = await loop.run_in_executor(
+                    None, archive_sha256, self.s3_client, self.s3_artifacts_bucket, self.mission_id
+                )
+                if sha256:
+                    self.memo = MissionMemo(self.s3_client, self.s3_artifacts_bucket, sha256, scan_type=self.scan_type)
+                    await self._await_server_versions()
             results = await self._act(tool_invocations, max_concurrency)
+            if self.memo:
+                await loop.run_in_executor(None, self._memoize_pipeline, results)
             
             # Process and store results
             processed_results = self._process_tool_results(results)
-            await self._store_results(processed_results)
+            persistence = await self._store_results(processed_results)
+            self._record_tool_costs(processed_results)
             
             # REFLECT: Evaluate execution quality
             self._update_state("REFLECTING")
             reflection = self._reflect_on_execution(processed_results)
+            reflection['persistence'] = persistence
             
             # COMPLETED
             success_rate = reflection['success_rate']
@@ -190,6 +261,9 @@ class CoordinatorAgent:
             raise
             
         finally:
+            # No more tool results, also after a failure
+            self.tool_feed.close()
+            
             # Always cleanup MCP connections
             try:
                 await self.cognitive_kernel.cleanup_mcp_connections()
@@ -200,8 +274,7 @@ class CoordinatorAgent:
             # Cleanup downloaded code
             if local_code_path and os.path.exists(local_code_path):
                 try:
-                    shutil.rmtree(local_code_path)
-                    logger.info(f"Cleaned up downloaded code at {local_code_path}")
+                    release_workspace(local_code_path)
                 except Exception as e:
                     logger.warning(f"Error cleaning up code directory: {e}")
     
@@ -273,27 +346,44 @@ class CoordinatorAgent:
                 logger.warning("Tool spec missing 'name' field. Skipping.")
                 continue
             
+            planned = len(invocations)
+            
             # Map tool name to MCP server and tool
             if tool_name == 'semgrep-mcp' or tool_name == 'semgrep':
+                # The full registry rule set when there is time for it
+                config = 'auto'
+                predicted = self.cost_model.predict('semgrep-mcp', self.repo_features).seconds
+                if self.deadline.degraded('coordinator', predicted):
+                    config = self.semgrep_degraded_config
+                    logger.warning(f"Mission deadline near, semgrep runs the smaller {config} rule set")
+                
                 invocations.append({
                     'server_name': 'semgrep-mcp',
                     'tool_name': 'semgrep_scan',
                     'arguments': {
                         'source_path': source_path,
-                        'config': 'auto',
+                        'config': config,
                         'timeout': 300
                     }
                 })
             
             elif tool_name == 'gitleaks-mcp' or tool_name == 'gitleaks':
+                arguments = {
+                    'source_path': source_path,
+                    'timeout': 180,
+                    'no_git': True
+                }
+                
+                # Re-scans of a known codebase only need to look at changed files
+                baseline_mission_id = tool_spec.get('baseline_mission_id') or strategy.get('baseline_mission_id')
+                if baseline_mission_id:
+                    arguments['mode'] = tool_spec.get('mode', 'diff')
+                    arguments['baseline_mission_id'] = baseline_mission_id
+                
                 invocations.append({
                     'server_name': 'gitleaks-mcp',
                     'tool_name': 'gitleaks_scan',
-                    'arguments': {
-                        'source_path': source_path,
-                        'timeout': 180,
-                        'no_git': True
-                    }
+                    'arguments': arguments
                 })
             
             elif tool_name == 'trivy-mcp' or tool_name == 'trivy':
@@ -314,19 +404,58 @@ class CoordinatorAgent:
                     'tool_name': 'scoutsuite_scan',
                     'arguments': {
                         'aws_profile': 'default',
-                        'services': [],
-                        'timeout': 1800
+                        'services': tool_spec.get('services', []),
+                        'regions': tool_spec.get('regions', []),
+                        'timeout': 1800,
+                        # Per-service runs so one slow service cannot hold up the report
+                        'fan_out': tool_spec.get('fan_out', True),
+                        'max_concurrency': 4
                     }
                 })
             
             elif tool_name == 'pacu-mcp' or tool_name == 'pacu':
-                # Use safe enumeration module
-                invocations.append({
-                    'server_name': 'pacu-mcp',
-                    'tool_name': 'pacu_enum_permissions',
-                    'arguments': {
-                        'aws_profile': 'default'
-                    }
+                # Modules the Strategist recommended, in priority order
+                context = tool_spec.get('context', {})
+                modules = list(dict.fromkeys(
+                    module
+                    for finding in context.get('priority_findings', [])
+                    for module in finding.get('recommended_modules', [])
+                ))
+                
+                if modules:
+                    # One Pacu session for all modules instead of a process each
+                    invocations.append({
+                        'server_name': 'pacu-mcp',
+                        'tool_name': 'pacu_run_modules',
+                        'arguments': {
+                            'modules': modules,
+                            'aws_profile': 'default',
+                            'dry_run': True,
+                            'timeout': 1200
+                        }
+                    })
+                else:
+                    # Use safe enumeration module
+                    invocations.append({
+                        'server_name': 'pacu-mcp',
+                        'tool_name': 'pacu_enum_permissions',
+                        'arguments': {
+                            'aws_profile': 'default'
+                        }
+                    })
+            
+            # Scheduling hints: the Strategist's priority and dependencies; the
+            # cost model estimates duration unless the Strategist gave one
+            if len(invocations) > planned:
+                invocation = invocations[-1]
+                invocation.update({
+                    'name': invocation['server_name'],
+                    'priority': tool_spec.get('priority', 99),
+                    'dependencies': [
+                        dependency if dependency.endswith('-mcp') else f"{dependency}-mcp"
+                        for dependency in tool_spec.get('dependencies', [])
+                    ],
+                    'estimated_seconds': tool_spec.get('estimated_seconds')
                 })
         
         logger.info(f"Created MCP invocation plan with {len(invocations)} tools")
@@ -363,22 +492,118 @@ class CoordinatorAgent:
         """
         Execute MCP tools based on invocation plan.
         
+        Tools run as a dependency DAG: each starts as soon as the tools it
+        depends on have finished, with their results bound into its
+        arguments, and ready tools are started longest critical path first.
+        Each tool's predicted CPU and memory demand is packed into the
+        task's capacity; max_concurrency remains an upper bound. Tools that
+        completed in an earlier attempt of the mission are resumed from
+        their stored results, and tools memoized for the same archive, tool
+        version and ruleset by another mission reuse that mission's results,
+        instead of being run again. Tool timeouts are cut to the mission
+        deadline, and tools that would start too late are not started.
+        
         Args:
             tool_invocations: List of tool invocation specifications
             max_concurrency: Maximum number of parallel tool executions
             
         Returns:
-            List of tool execution results
+            List of tool execution results, each with its 'timing'
         """
         logger.info(f"Executing {len(tool_invocations)} MCP tools with concurrency={max_concurrency}")
         
-        results = await self.cognitive_kernel.invoke_mcp_tools_parallel(
-            tool_invocations,
-            max_concurrency=max_concurrency
-        )
+        loop = asyncio.get_event_loop()
+        
+        async def invoke(invocation: Dict[str, Any]) -> Dict[str, Any]:
+            resumed = await loop.run_in_executor(None, self.checkpoints.resume, invocation)
+            if resumed:
+                self.tool_feed.publish(self.checkpoints.entries[resumed['arg_digest']])
+                return resumed
+            
+            memo_key = self._memo_key(invocation)
+            if memo_key:
+                reused = await loop.run_in_executor(None, self._reuse_memoized, invocation, memo_key)
+                if reused:
+                    return reused
+            
+            if self.deadline.exhausted('coordinator'):
+                logger.warning(f"Mission deadline reached, not starting {invocation['server_name']}")
+                return {
+                    'server': invocation['server_name'],
+                    'tool': invocation['tool_name'],
+                    'success': False,
+                    'error': 'Mission deadline reached before the tool could start',
+                    'arg_digest': invocation_digest(invocation)
+                }
+            invocation, cut = self._fit_to_deadline(invocation)
+            
+            result = await self.cognitive_kernel.invoke_mcp_tool(
+                server_name=invocation['server_name'],
+                tool_name=invocation['tool_name'],
+                arguments=invocation.get('arguments', {}),
+                additional_env=invocation.get('env')
+            )
+            result['arg_digest'] = invocation_digest(invocation)
+            
+            # Checkpoint as soon as the tool finishes so a retry can skip it
+            if (self.resume_enabled or memo_key) and result.get('success'):
+                processed = self._process_tool_results([result])[0]
+                if processed.get('success') and processed.get('raw_results'):
+                    stored = await self._store_tool_result(processed)
+                    if stored:
+                        result.update(stored)
+                        # A run cut short by the deadline may be partial
+                        if memo_key and not cut:
+                            await loop.run_in_executor(None, lambda: self.memo.put_tool(memo_key, {
+                                **stored,
+                                'server': processed['server'],
+                                'tool': processed['tool'],
+                                'findings_count': processed.get('findings_count', 0),
+                                'mission_id': self.mission_id
+                            }))
+            return result
+        
+        cpus, memory_mb = host_capacity()
+        scheduler = ToolDAGScheduler(invoke, max_concurrency=max_concurrency, cpus=cpus, memory_mb=memory_mb)
+        for invocation in tool_invocations:
+            name = invocation.get('name', invocation['server_name'])
+            cost = self.cost_model.predict(name, self.repo_features)
+            scheduler.add(ToolNode(
+                name=name,
+                invocation=invocation,
+                priority=invocation.get('priority', 99),
+                dependencies=invocation.get('dependencies', []),
+                estimated_seconds=invocation.get('estimated_seconds') or cost.seconds,
+                cpus=min(cost.cpus, cpus),
+                memory_mb=cost.memory_mb,
+                bind=binding_for(name)
+            ))
+        
+        logger.info(f"Packing tools into {cpus:g} CPUs and {memory_mb:.0f} MB")
+        
+        results = await scheduler.run()
+        self.schedule_timings = scheduler.timings()
         
         return results
     
+    def _fit_to_deadline(self, invocation: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Cut an invocation's timeout to the Coordinator's remaining budget.
+        
+        Returns:
+            The invocation to run and whether its timeout was cut
+        """
+        arguments = invocation.get('arguments', {})
+        if not self.deadline.bounded or 'timeout' not in arguments:
+            return invocation, False
+        
+        timeout = self.deadline.timeout('coordinator', arguments['timeout'])
+        if timeout >= arguments['timeout']:
+            return invocation, False
+        
+        logger.warning(f"Cutting {invocation['server_name']} timeout to {timeout}s for the mission deadline")
+        return {**invocation, 'arguments': {**arguments, 'timeout': timeout}}, True
+    
     def _process_tool_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process and format tool execution results."""
         processed = []
@@ -391,20 +616,34 @@ class CoordinatorAgent:
                 'success': result.get('success', False),
                 'mission_id': self.mission_id
             }
+            if result.get('timing'):
+                processed_result['timing'] = result['timing']
+            if result.get('arg_digest'):
+                processed_result['arg_digest'] = result['arg_digest']
+            if result.get('s3_uri'):
+                processed_result.update({'s3_uri': result['s3_uri'], 'digest': result['digest']})
+            if result.get('resumed'):
+                processed_result['resumed'] = True
+            if result.get('memoized_from'):
+                processed_result['memoized_from'] = result['memoized_from']
             
             if result.get('success'):
                 # Extract scan results from MCP response
                 content = result.get('content', [])
                 if content and isinstance(content, list) and len(content) > 0:
                     try:
-                        # Parse MCP JSON response
-                        data = content[0] if isinstance(content[0], dict) else json.loads(content[0].get('text', '{}'))
-                        
-                        # Extract the actual scan results (MCPs now return 'results' field)
-                        scan_results = data.get('results', {})
-                        processed_result['raw_results'] = scan_results
-                        processed_result['findings_count'] = data.get('findings_count', data.get('secrets_found', data.get('vulnerabilities_found', 0)))
-                        processed_result['summary'] = data.get('summary', {})
+                        # Servers answer in the normalized NDJSON finding format; the
+                        # client hands header-only documents (no findings) over parsed
+                        item = content[0]
+                        if item.get('success') is False:
+                            processed_result['success'] = False
+                            processed_result['error'] = item.get('error', 'Unknown error')
+                        else:
+                            wire = item['text'] if 'text' in item else json.dumps(item, separators=(',', ':')) + '\n'
+                            document = decode_tool_result(wire)
+                            processed_result['raw_results'] = wire
+                            processed_result['findings_count'] = document.get('findings_count', 0)
+                            processed_result['summary'] = document.get('summary', {})
                         
                     except Exception as e:
                         logger.warning(f"Could not parse result content: {e}")
@@ -416,97 +655,324 @@ class CoordinatorAgent:
         
         return processed
     
-    async def _store_results(self, results: List[Dict[str, Any]]):
-        """Store processed results to both S3 and DynamoDB."""
-        import hashlib
+    async def _store_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Store processed results to both S3 and DynamoDB.
+        
+        The summary and every tool's raw results are uploaded concurrently;
+        the DynamoDB rows of all tools, completed and failed, then go out in
+        batch writes.
+        
+        Returns:
+            Bytes written, objects and rows written, and persistence latency
+        """
+        started = time.monotonic()
+        loop = asyncio.get_event_loop()
         
         # Store coordinator summary to S3
         key = f"agent-outputs/coordinator/{self.mission_id}/execution-results.json"
         results_json = json.dumps(results, indent=2)
         
+        # Checkpointed when the tool finished, or resumed from the ledger
+        pending = [r for r in results if not r.get('s3_uri')]
+        to_upload = [r for r in pending if r.get('success') and r.get('raw_results')]
+        
+        with ThreadPoolExecutor(max_workers=self.persist_concurrency) as executor:
+            summary = loop.run_in_executor(
+                executor,
+                partial(
+                    self.s3_client.put_object,
+                    Bucket=self.s3_artifacts_bucket,
+                    Key=key,
+                    Body=results_json,
+                    ContentType='application/json'
+                )
+            )
+            uploads = [loop.run_in_executor(executor, self._upload_tool_result, r) for r in to_upload]
+            stored = await asyncio.gather(*uploads)
+            await summary
+        logger.info(f"Execution results stored to S3: s3://{self.s3_artifacts_bucket}/{key}")
+        
+        bytes_written = len(results_json.encode())
+        rows = []
+        for result, upload in zip(to_upload, stored):
+            if upload is None:
+                continue
+            bytes_written += upload['bytes']
+            rows.append(self._completed_row(
+                result['server'],
+                result['tool'],
+                upload['s3_uri'],
+                upload['digest'],
+                result.get('findings_count', 0),
+                result.get('arg_digest', ''),
+                upload['timestamp']
+            ))
+        
+        failure_timestamp = int(time.time())
+        for result in pending:
+            if not result.get('success'):
+                suffix = self._invocation_suffix(result.get('arg_digest', ''))
+                rows.append({
+                    'mission_id': {'S': self.mission_id},
+                    'tool_timestamp': {'S': f"{result['server']}:{result['tool']}:{failure_timestamp}:{suffix}"},
+                    'tool_name': {'S': f"{result['server']}:{result['tool']}"},
+                    's3_uri': {'S': ''},
+                    'digest': {'S': ''},
+                    'status': {'S': 'failed'},
+                    'timestamp': {'N': str(failure_timestamp)},
+                    'error': {'S': result.get('error', 'Unknown error')},
+                    'findings_count': {'N': '0'}
+                })
+        
+        rows_written = 0
+        if rows:
+            try:
+                rows_written = await loop.run_in_executor(None, self._write_rows, rows)
+            except Exception as e:
+                logger.error(f"Failed to store tool result rows: {e}")
+            else:
+                for row in rows:
+                    self.tool_feed.publish(row)
+        
+        persistence = {
+            'bytes_written': bytes_written,
+            'objects_written': 1 + sum(1 for upload in stored if upload),
+            'rows_written': rows_written,
+            'seconds': round(time.monotonic() - started, 3)
+        }
+        logger.info(
+            f"Persisted {persistence['objects_written']} objects ({bytes_written} bytes) and "
+            f"{rows_written} rows in {persistence['seconds']}s"
+        )
+        return persistence
+    
+    def _upload_tool_result(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Upload one tool's raw results to S3.
+        
+        Returns:
+            s3_uri, digest, uncompressed bytes and timestamp, or None if the upload failed
+        """
+        tool_server = result['server']
+        tool_name = result['tool']
+        timestamp = int(time.time())
+        suffix = self._invocation_suffix(result.get('arg_digest', ''))
+        results_key = f"tool-results/{tool_server}/{self.mission_id}/{timestamp}-{suffix}/results.ndjson"
+        results_data = result['raw_results']
+        
+        try:
+            # Stored compressed; the digest covers the uncompressed NDJSON
+            digest = put_object(
+                self.s3_client,
+                self.s3_artifacts_bucket,
+                results_key,
+                results_data,
+                content_type=WIRE_CONTENT_TYPE
+            )
+        except Exception as e:
+            logger.error(f"Failed to store {tool_name} results: {e}")
+            return None
+        
+        s3_uri = f"s3://{self.s3_artifacts_bucket}/{results_key}"
+        logger.info(f"Stored {tool_name} raw results to S3: {s3_uri}")
+        return {
+            's3_uri': s3_uri,
+            'digest': digest,
+            'bytes': len(results_data.encode() if isinstance(results_data, str) else results_data),
+            'timestamp': timestamp
+        }
+    
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Batch-write tool_results rows; returns the number written."""
+        # Keys only repeat for the same invocation, whose last row wins
+        return batch_write_items(
+            self.dynamodb_client,
+            self.dynamodb_tool_results_table,
+            rows,
+            ('mission_id', 'tool_timestamp'),
+            self.batch_write_retries
+        )
+    
+    async def _store_tool_result(self, result: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """
+        Store one tool's raw results to S3 and its ledger row to DynamoDB.
+        
+        Returns:
+            The stored artifact's s3_uri and digest, or None if storing failed
+        """
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=key,
-                Body=results_json,
-                ContentType='application/json'
+        upload = await loop.run_in_executor(None, self._upload_tool_result, result)
+        if upload is None:
+            return None
+        
+        # Store metadata to DynamoDB for Synthesizer; the invocation
+        # digest makes the row a checkpoint for retries
+        row = self._completed_row(
+            result['server'],
+            result['tool'],
+            upload['s3_uri'],
+            upload['digest'],
+            result.get('findings_count', 0),
+            result.get('arg_digest', ''),
+            upload['timestamp']
+        )
+        try:
+            await loop.run_in_executor(
+                None,
+                partial(self.dynamodb_client.put_item, TableName=self.dynamodb_tool_results_table, Item=row)
             )
+        except Exception as e:
+            logger.error(f"Failed to store {result['tool']} results: {e}")
+            return None
+        
+        logger.info(f"Stored {result['tool']} metadata to DynamoDB")
+        self.tool_feed.publish(row)
+        return {'s3_uri': upload['s3_uri'], 'digest': upload['digest']}
+    
+    def _completed_row(
+        self,
+        tool_server: str,
+        tool_name: str,
+        s3_uri: str,
+        digest: str,
+        findings_count: int,
+        arg_digest: str,
+        timestamp: int
+    ) -> Dict[str, Any]:
+        """A 'completed' tool_results row pointing at stored raw results."""
+        return {
+            'mission_id': {'S': self.mission_id},
+            'tool_timestamp': {'S': f"{tool_server}:{tool_name}:{timestamp}:{self._invocation_suffix(arg_digest)}"},
+            'tool_name': {'S': f"{tool_server}:{tool_name}"},
+            's3_uri': {'S': s3_uri},
+            'digest': {'S': digest},
+            'status': {'S': 'completed'},
+            'timestamp': {'N': str(timestamp)},
+            'findings_count': {'N': str(findings_count)},
+            'arg_digest': {'S': arg_digest}
+        }
+    
+    @staticmethod
+    def _invocation_suffix(arg_digest: str) -> str:
+        """
+        Key suffix telling apart invocations of one tool stored in the same second.
+        
+        Derived from the invocation digest, so the same invocation keeps its
+        key; random when the digest is unknown.
+        """
+        if arg_digest:
+            return arg_digest.split(':')[-1][:16]
+        return uuid.uuid4().hex[:16]
+    
+    async def _await_server_versions(self):
+        """
+        Probe servers still warming up again, waiting for their warm-up.
+        
+        The first probe right after spawn may come before a server knows its
+        tool version and ruleset digest, which memo keys need.
+        """
+        pending = [name for name, report in self.server_health.items() if not report.get('ready')]
+        if not pending or self.memo_health_wait <= 0:
+            return
+        try:
+            reports = await self.cognitive_kernel.warm_mcp_servers(self.memo_health_wait, pending)
+            self.server_health.update(reports)
+        except Exception as e:
+            logger.warning(f"Could not probe MCP servers again, memoizing only ready ones: {e}")
+    
+    def _memo_key(self, invocation: Dict[str, Any]) -> Optional[str]:
+        """
+        Memo key of an invocation, or None when it cannot be memoized.
+        
+        The server's version must be known and the rules it runs cached by
+        the server; the pipeline of a mission with an unmemoized tool is not
+        marked scanned.
+        """
+        if not self.memo:
+            return None
+        health = self.server_health.get(invocation['server_name']) or {}
+        rules = invocation_ruleset_digest(health.get('capabilities', {}), invocation.get('arguments', {}))
+        if health.get('version') in (None, '', 'unknown') or rules is None:
+            logger.info(f"Not memoizing {invocation['server_name']}: tool version or rules not pinned")
+            self.unmemoized_servers.add(invocation['server_name'])
+            return None
+        return self.memo.entry_key(invocation, health['version'], rules)
+    
+    def _reuse_memoized(self, invocation: Dict[str, Any], memo_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Result memoized for this invocation by another mission on the same archive.
+        
+        The memoized artifact must still verify against its digest. A ledger
+        row for this mission points at it, so the Synthesizer and later
+        retries see the tool as completed.
+        """
+        entry = self.memo.get_tool(memo_key)
+        if not entry:
+            return None
+        
+        data = read_verified(self.s3_client, entry.get('s3_uri', ''), entry.get('digest', ''))
+        if data is None:
+            logger.warning(f"Memoized {invocation['server_name']} result not usable, running the tool")
+            return None
+        
+        server = invocation['server_name']
+        tool = invocation['tool_name']
+        arg_digest = invocation_digest(invocation)
+        row = self._completed_row(
+            server,
+            tool,
+            entry['s3_uri'],
+            entry['digest'],
+            entry.get('findings_count', 0),
+            arg_digest,
+            int(time.time())
         )
-        logger.info(f"Execution results stored to S3: s3://{self.s3_artifacts_bucket}/{key}")
+        try:
+            self.dynamodb_client.put_item(TableName=self.dynamodb_tool_results_table, Item=row)
+        except Exception as e:
+            logger.warning(f"Could not record memoized {server} result, running the tool: {e}")
+            return None
+        self.tool_feed.publish(row)
         
-        # Store each tool's raw results to S3 and metadata to DynamoDB
+        logger.info(f"Reusing {server}:{tool} results of mission {entry.get('mission_id')}")
+        return {
+            'server': server,
+            'tool': tool,
+            'success': True,
+            'content': [{'type': 'text', 'text': data.decode()}],
+            'memoized_from': entry.get('mission_id', ''),
+            'arg_digest': arg_digest,
+            's3_uri': entry['s3_uri'],
+            'digest': entry['digest']
+        }
+    
+    def _memoize_pipeline(self, results: List[Dict[str, Any]]):
+        """Mark the archive scanned when every planned tool succeeded."""
+        if not results or not all(r.get('success') for r in results):
+            return
+        if self.unmemoized_servers:
+            logger.info(f"Not marking the pipeline scanned, unmemoized: {sorted(self.unmemoized_servers)}")
+            return
+        
+        tools = {}
         for result in results:
-            if result.get('success') and result.get('raw_results'):
-                tool_server = result['server']
-                tool_name = result['tool']
-                timestamp = int(time.time())
-                
-                # Store raw results to S3
-                results_key = f"tool-results/{tool_server}/{self.mission_id}/{timestamp}/results.json"
-                results_data = json.dumps(result['raw_results'], indent=2, sort_keys=True)
-                
-                try:
-                    await loop.run_in_executor(
-                        None,
-                        lambda: self.s3_client.put_object(
-                            Bucket=self.s3_artifacts_bucket,
-                            Key=results_key,
-                            Body=results_data,
-                            ContentType='application/json'
-                        )
-                    )
-                    
-                    s3_uri = f"s3://{self.s3_artifacts_bucket}/{results_key}"
-                    digest = f"sha256:{hashlib.sha256(results_data.encode()).hexdigest()}"
-                    
-                    logger.info(f"Stored {tool_name} raw results to S3: {s3_uri}")
-                    
-                    # Store metadata to DynamoDB for Synthesizer
-                    await loop.run_in_executor(
-                        None,
-                        lambda: self.dynamodb_client.put_item(
-                            TableName=self.dynamodb_tool_results_table,
-                            Item={
-                                'mission_id': {'S': self.mission_id},
-                                'tool_timestamp': {'S': f"{tool_server}:{tool_name}:{timestamp}"},
-                                'tool_name': {'S': f"{tool_server}:{tool_name}"},
-                                's3_uri': {'S': s3_uri},
-                                'digest': {'S': digest},
-                                'status': {'S': 'completed'},
-                                'timestamp': {'N': str(timestamp)},
-                                'findings_count': {'N': str(result.get('findings_count', 0))}
-                            }
-                        )
-                    )
-                    logger.info(f"Stored {tool_name} metadata to DynamoDB")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to store {tool_name} results: {e}")
-            elif not result.get('success'):
-                # Store failure to DynamoDB
-                try:
-                    failure_timestamp = int(time.time())
-                    await loop.run_in_executor(
-                        None,
-                        lambda r=result: self.dynamodb_client.put_item(
-                            TableName=self.dynamodb_tool_results_table,
-                            Item={
-                                'mission_id': {'S': self.mission_id},
-                                'tool_timestamp': {'S': f"{r['server']}:{r['tool']}:{failure_timestamp}"},
-                                'tool_name': {'S': f"{r['server']}:{r['tool']}"},
-                                's3_uri': {'S': ''},
-                                'digest': {'S': ''},
-                                'status': {'S': 'failed'},
-                                'timestamp': {'N': str(failure_timestamp)},
-                                'error': {'S': r.get('error', 'Unknown error')},
-                                'findings_count': {'N': '0'}
-                            }
-                        )
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to store failure for {result.get('tool')}: {e}")
+            health = self.server_health.get(result.get('server')) or {}
+            tools[result.get('server')] = {
+                'version': health.get('version', 'unknown'),
+                'ruleset': ruleset_digest(health.get('capabilities', {}))
+            }
+        try:
+            self.memo.mark_scanned(self.mission_id, tools)
+        except Exception as e:
+            logger.warning(f"Could not memoize pipeline for {self.memo.archive_sha256}: {e}")
+    
+    def _record_tool_costs(self, results: List[Dict[str, Any]]):
+        """Feed each successful tool's resource usage back into the cost model."""
+        for result in results:
+            usage = result.get('summary', {}).get('resource_usage')
+            if result.get('success') and usage and not (result.get('resumed') or result.get('memoized_from')):
+                self.cost_model.record(result['server'], self.repo_features, usage)
     
     def _reflect_on_execution(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Reflect on execution quality and outcomes."""
@@ -523,10 +989,13 @@ class CoordinatorAgent:
             'failed': failed,
             'success_rate': successful / total if total > 0 else 0,
             'total_findings': total_findings,
+            'resumed': sum(1 for r in results if r.get('resumed')),
             'tools_by_status': {
                 'succeeded': [r['tool'] for r in results if r.get('success')],
                 'failed': [r['tool'] for r in results if not r.get('success')]
-            }
+            },
+            'schedule': self.schedule_timings,
+            'deadline': self.deadline.to_dict()
         }
         
         # Log reflection
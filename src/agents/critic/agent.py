@@ -12,10 +12,15 @@ from typing import List, Dict
 import sys
 
 from src.shared.cognitive_kernel.bedrock_client import CognitiveKernel
+from src.shared.mcp_server import SEVERITIES
+from src.shared.mission import MissionDeadline
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rule-based review challenges findings below this confidence
+RULE_REVIEW_MIN_CONFIDENCE = 0.5
+
 class CriticAgent:
     def __init__(self, scan_id: str = None):
         self.mission_id = scan_id or os.environ.get('MISSION_ID', 'test-scan-123')
@@ -27,6 +32,9 @@ class CriticAgent:
         self.redis_client = self._connect_redis_with_retry()
         
         self.cognitive_kernel = CognitiveKernel(kendra_index_id=self.kendra_index_id)
+        
+        # Mission deadline set by Unpack
+        self.deadline = MissionDeadline.from_env()
         logger.info(f"CriticAgent initialized for mission: {self.mission_id}")
     
     def _connect_redis_with_retry(self, max_retries=3):
@@ -118,6 +126,11 @@ For each finding:
             finding_confidence = finding.get('confidence_score', 0.0)
             finding_id = finding.get('finding_id', 'unknown')
             
+            # Near the deadline the remaining findings get rule-based review
+            if self.deadline.degraded('critic'):
+                reviews.append(self._rule_based_review(finding))
+                continue
+            
             # Query Kendra for counter-evidence
             kendra_ctx = self.cognitive_kernel.retrieve_from_kendra(
                 query=f"{finding_title} false positive patterns",
@@ -165,6 +178,33 @@ Provide review in JSON:
         
         return reviews
     
+    def _rule_based_review(self, finding: Dict) -> Dict:
+        """
+        Review a finding without Kendra or the LLM.
+        
+        Confident findings are confirmed as drafted; low-confidence findings
+        above LOW are challenged one severity level down.
+        """
+        severity = finding.get('severity', 'MEDIUM')
+        confidence = finding.get('confidence_score', 0.0)
+        review = {
+            'finding_id': finding.get('finding_id', 'unknown'),
+            'action': 'CONFIRM',
+            'revised_severity': severity,
+            'rationale': 'Rule-based review under the mission deadline: confidence meets the threshold',
+            'confidence': confidence,
+            'rule_based': True
+        }
+        
+        if confidence < RULE_REVIEW_MIN_CONFIDENCE and severity in SEVERITIES[SEVERITIES.index('MEDIUM'):]:
+            review.update({
+                'action': 'CHALLENGE',
+                'revised_severity': SEVERITIES[SEVERITIES.index(severity) - 1],
+                'rationale': f'Rule-based review under the mission deadline: confidence {confidence} '
+                             f'below {RULE_REVIEW_MIN_CONFIDENCE}, severity lowered one level'
+            })
+        return review
+    
     def _write_counterproposals(self, reviews: List[Dict]):
         import time
         proposal_key = f"negotiation:{self.mission_id}:proposals"
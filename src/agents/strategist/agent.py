@@ -10,15 +10,18 @@ Responsibilities:
 
 import os
 import json
+import math
 import time
 import boto3
 import redis
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 import sys
 
 from src.shared.cognitive_kernel.bedrock_client import CognitiveKernel
+from src.shared.mcp_client import RepoFeatures, ToolCostModel, pacu_modules_for_finding
+from src.shared.mission import MissionDeadline
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,6 +35,8 @@ class ExecutionStrategy:
     estimated_duration_minutes: int
     reasoning: str
     confidence_score: float
+    deadline: Optional[float] = None  # Mission deadline (epoch seconds), carried to the Coordinator
+    baseline_mission_id: Optional[str] = None  # Previous mission of the same repo, for diff-mode scans
 
 class StrategistAgent:
     """Agent for planning and tool selection."""
@@ -43,6 +48,8 @@ class StrategistAgent:
         self.redis_endpoint = os.environ.get('REDIS_ENDPOINT', 'localhost')
         self.redis_port = int(os.environ.get('REDIS_PORT', '6379'))
         self.kendra_index_id = os.environ.get('KENDRA_INDEX_ID', 'test-kendra-index')
+        self.repo_name = os.environ.get('REPO_NAME', 'unknown')
+        self.dynamodb_findings_table = os.environ.get('DYNAMODB_FINDINGS_TABLE', 'HivemindFindingsArchive')
         
         region = os.environ.get('AWS_REGION', 'us-east-1')
         
@@ -55,10 +62,17 @@ class StrategistAgent:
         )
         
         self.s3_client = boto3.client('s3', config=boto_config)
+        self.dynamodb_client = boto3.client('dynamodb', config=boto_config)
         
         # Connect to Redis with retry logic
         self.redis_client = self._connect_redis_with_retry()
         
+        # Per-tool durations learned from the Coordinator's recorded usage
+        self.cost_model = ToolCostModel(self.redis_client)
+        
+        # Mission deadline set by Unpack
+        self.deadline = MissionDeadline.from_env()
+        
         self.cognitive_kernel = CognitiveKernel(kendra_index_id=self.kendra_index_id)
         self.agent_state_key = f"agent:{self.mission_id}:strategist"
         
@@ -165,9 +179,13 @@ class StrategistAgent:
                 # First run: just ScoutSuite discovery
                 return self._plan_initial_aws_scan(context)
         
-        # Query Kendra for similar missions (code scans)
-        query = f"security analysis {context.get('service_name', '')} {' '.join(context.get('primary_languages', []))}"
-        kendra_context = self.cognitive_kernel.retrieve_from_kendra(query, top_k=5)
+        # Query Kendra for similar missions (code scans), unless the deadline is near
+        kendra_context = None
+        if self.deadline.degraded('context'):
+            logger.warning("Mission deadline near, planning without Kendra enrichment")
+        else:
+            query = f"security analysis {context.get('service_name', '')} {' '.join(context.get('primary_languages', []))}"
+            kendra_context = self.cognitive_kernel.retrieve_from_kendra(query, top_k=5)
         
         system_prompt = """You are the StrategistAgent. Your role is to analyze the codebase context and select the appropriate security analysis tools.
 
@@ -253,15 +271,50 @@ For AWS scans, use scoutsuite-mcp (priority 1) and pacu-mcp (priority 2)."""
     
     def _decide_strategy(self, strategy: Dict, context: Dict) -> ExecutionStrategy:
         """Create final ExecutionStrategy."""
+        estimated_minutes = strategy.get('estimated_duration_minutes', 10)
+        tools = strategy.get('tools', [])
+        if tools:
+            # The plan's predicted critical path replaces the planner's guess
+            try:
+                seconds = self.cost_model.plan_seconds(tools, RepoFeatures.from_manifest(context))
+                estimated_minutes = max(1, math.ceil(seconds / 60))
+            except Exception as e:
+                logger.warning(f"Cost model estimate failed, keeping planner estimate: {e}")
+        
         return ExecutionStrategy(
             mission_id=self.mission_id,
-            tools=strategy.get('tools', []),
+            tools=tools,
             parallel_execution=strategy.get('parallel_execution', True),
-            estimated_duration_minutes=strategy.get('estimated_duration_minutes', 10),
+            estimated_duration_minutes=estimated_minutes,
             reasoning=strategy.get('reasoning', ''),
-            confidence_score=strategy.get('confidence', 0.8)
+            confidence_score=strategy.get('confidence', 0.8),
+            deadline=self.deadline.deadline,
+            baseline_mission_id=self._find_baseline_mission()
         )
     
+    def _find_baseline_mission(self) -> Optional[str]:
+        """Find the most recent earlier mission archived for this repo."""
+        if self.scan_type == 'aws' or self.repo_name == 'unknown':
+            return None
+        try:
+            response = self.dynamodb_client.query(
+                TableName=self.dynamodb_findings_table,
+                IndexName='repo_name-timestamp-index',
+                KeyConditionExpression='repo_name = :repo',
+                ExpressionAttributeValues={':repo': {'S': self.repo_name}},
+                ProjectionExpression='mission_id',
+                ScanIndexForward=False,
+                Limit=25
+            )
+            for item in response.get('Items', []):
+                mission_id = item.get('mission_id', {}).get('S')
+                if mission_id and mission_id != self.mission_id:
+                    logger.info(f"Diff baseline for {self.repo_name}: mission {mission_id}")
+                    return mission_id
+        except Exception as e:
+            logger.warning(f"Baseline mission lookup failed, scanning in full: {e}")
+        return None
+    
     def _write_output(self, strategy: ExecutionStrategy):
         """Write ExecutionStrategy to S3."""
         key = f"agent-outputs/strategist/{self.mission_id}/execution-strategy.json"
@@ -311,17 +364,26 @@ For AWS scans, use scoutsuite-mcp (priority 1) and pacu-mcp (priority 2)."""
             return []
     
     def _plan_initial_aws_scan(self, context: Dict) -> Dict:
-        """Plan initial AWS scan (just ScoutSuite)."""
+        """Plan initial AWS scan: ScoutSuite, then Pacu on its findings."""
         return {
-            'tools': [{
-                'name': 'scoutsuite-mcp',
-                'task_definition': 'hivemind-scoutsuite-mcp',
-                'priority': 1,
-                'dependencies': []
-            }],
+            'tools': [
+                {
+                    'name': 'scoutsuite-mcp',
+                    'task_definition': 'hivemind-scoutsuite-mcp',
+                    'priority': 1,
+                    'dependencies': []
+                },
+                {
+                    'name': 'pacu-mcp',
+                    'task_definition': 'hivemind-pacu-mcp',
+                    'priority': 2,
+                    # The Coordinator binds ScoutSuite's findings into Pacu's modules
+                    'dependencies': ['scoutsuite-mcp']
+                }
+            ],
             'parallel_execution': False,
-            'estimated_duration_minutes': 5,
-            'reasoning': 'Initial AWS discovery scan with ScoutSuite. After completion, Strategist will re-run to analyze findings and plan Pacu validation.',
+            'estimated_duration_minutes': 10,
+            'reasoning': 'AWS discovery scan with ScoutSuite; Pacu validates its high-severity findings as soon as the scan lands.',
             'confidence': 0.9
         }
     
@@ -498,24 +560,7 @@ Focus on:
     
     def _map_service_to_modules(self, service: str, title: str) -> List[str]:
         """Map AWS service to Pacu modules (fallback logic)."""
-        title_lower = title.lower()
-        
-        if service == 'iam':
-            if 'privilege' in title_lower or 'escalat' in title_lower:
-                return ['iam__privesc_scan', 'iam__enum_permissions']
-            return ['iam__enum_permissions']
-        elif service == 's3':
-            if 'public' in title_lower:
-                return ['s3__bucket_finder', 's3__download_bucket']
-            return ['s3__bucket_finder']
-        elif service == 'ec2':
-            return ['ec2__enum_lateral_movement']
-        elif service == 'lambda':
-            return ['lambda__enum']
-        elif service == 'rds':
-            return ['rds__enum', 'rds__explore_snapshots']
-        else:
-            return []
+        return pacu_modules_for_finding(service, title)
     
     def _format_kendra(self, context) -> str:
         """Format Kendra results."""
@@ -8,12 +8,24 @@ import json
 import boto3
 import redis
 import logging
+import time
 import hashlib
 import asyncio
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+from dataclasses import dataclass, asdict, field, replace
 
 from src.shared.cognitive_kernel.bedrock_client import CognitiveKernel
+from src.shared.mcp_server import SEVERITIES, decode_tool_result, is_wire_document, iter_findings
+from src.shared.mission import MissionDeadline, ToolResultFeed
+from src.shared.storage import read_body, read_body_digest
+from src.shared.synthesis import (
+    LocationIndex,
+    cluster_findings,
+    partition_tool_results,
+    translate_code_patterns,
+    translate_tool_results
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,6 +41,8 @@ class DraftFinding:
     evidence_digest: str
     tool_source: str
     confidence_score: float
+    merged_evidence: List[Dict] = field(default_factory=list)
+    correlated_evidence: List[Dict] = field(default_factory=list)
 
 class SynthesizerAgent:
     def __init__(self, scan_id: str = None):
@@ -57,6 +71,40 @@ class SynthesizerAgent:
         
         self.cognitive_kernel = CognitiveKernel(kendra_index_id=self.kendra_index_id)
         
+        # Mission deadline set by Unpack
+        self.deadline = MissionDeadline.from_env()
+        
+        # Incremental mode runs beside the Coordinator and follows its tool results
+        self.incremental = os.environ.get('SYNTHESIZER_INCREMENTAL', 'false').lower() == 'true'
+        self.poll_seconds = float(os.environ.get('SYNTHESIZER_POLL_SECONDS', '1'))
+        self.max_follow_seconds = float(os.environ.get('SYNTHESIZER_MAX_FOLLOW_SECONDS', '3600'))
+        self.follow_started = time.monotonic()
+        self.time_to_first_finding: Optional[float] = None
+        self.kendra_context = None
+        self.kendra_fetched = False
+        
+        # Map-reduce synthesis: token-bounded chunks synthesized concurrently
+        self.chunk_tokens = int(os.environ.get('SYNTHESIZER_CHUNK_TOKENS', '20000'))
+        self.map_concurrency = int(os.environ.get('SYNTHESIZER_MAP_CONCURRENCY', '4'))
+        self.partition_key = os.environ.get('SYNTHESIZER_PARTITION', 'path')
+        
+        # Mechanically mappable findings are translated by rule instead of synthesized
+        self.translate = os.environ.get('SYNTHESIZER_TRANSLATE', 'true').lower() == 'true'
+        self.translation_stats = {'translated': 0, 'to_model': 0}
+        
+        # Near-duplicate clustering, and the deep researcher's patterns as findings to merge
+        self.dedup_threshold = float(os.environ.get('SYNTHESIZER_DEDUP_THRESHOLD', '0.7'))
+        self.research_findings = os.environ.get('SYNTHESIZER_RESEARCH_FINDINGS', 'true').lower() == 'true'
+        
+        # Where every source's findings land, to boost findings other sources corroborate
+        self.location_index = LocationIndex()
+        self.correlation_boost = float(os.environ.get('SYNTHESIZER_CORRELATION_BOOST', '0.1'))
+        self.max_correlated_confidence = 0.99
+        
+        # Tool results are fetched and verified concurrently
+        self.read_concurrency = int(os.environ.get('SYNTHESIZER_READ_CONCURRENCY', '8'))
+        self.read_stats: List[Dict] = []
+        
         logger.info(f"SynthesizerAgent initialized for mission: {self.mission_id}")
     
     def _connect_redis_with_retry(self, max_retries=3):
@@ -86,14 +134,18 @@ class SynthesizerAgent:
     
     def run(self) -> List[DraftFinding]:
         try:
-            self._update_state("SENSING")
-            tool_results = self._read_tool_results()
-            
-            self._update_state("THINKING")
-            findings = self._synthesize_findings(tool_results)
-            
-            self._update_state("ACTING")
-            self._write_proposals(findings)
+            if self.incremental:
+                findings = self._run_incremental()
+            else:
+                self._update_state("SENSING")
+                tool_results = self._read_tool_results()
+                
+                self._update_state("THINKING")
+                findings = self._synthesize_findings(tool_results)
+                findings = self._rank_findings(self._correlate(self._deduplicate_findings(findings + self._research_findings())))
+                
+                self._update_state("ACTING")
+                self._write_proposals(findings)
             
             self._update_state("COMPLETED", sum(f.confidence_score for f in findings) / max(len(findings), 1))
             
@@ -105,9 +157,41 @@ class SynthesizerAgent:
             raise
     
     def _read_tool_results(self) -> List[Dict]:
-        """Read all MCP tool results from DynamoDB with evidence chain verification."""
+        """
+        Read all MCP tool results from DynamoDB with evidence chain verification.
+        
+        Objects are fetched and verified on a bounded pool while later pages
+        of rows are still queried, so a mission's results load in about the
+        time of the slowest object. Results keep the table's order.
+        """
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.read_concurrency) as executor:
+            futures = [executor.submit(self._read_tool_result, item) for item in self._query_tool_rows()]
+            results = [f.result() for f in futures]
+        results = [r for r in results if r is not None]
+        
+        self._record_read_stats(time.monotonic() - started)
+        logger.info(f"Read {len(results)} verified MCP tool results")
+        return results
+    
+    def _record_read_stats(self, seconds: float):
+        """Report bytes and verify times of the tool results read."""
+        total_bytes = sum(s['bytes'] for s in self.read_stats)
+        slowest = max((s['seconds'] for s in self.read_stats), default=0.0)
+        logger.info(f"Fetched {len(self.read_stats)} tool results, {total_bytes} bytes in {round(seconds, 3)}s (slowest {slowest}s)")
+        
+        state_key = f"agent:{self.mission_id}:synthesizer"
+        self.redis_client.hset(state_key, mapping={
+            'tool_results_read': str(len(self.read_stats)),
+            'tool_results_bytes': str(total_bytes),
+            'tool_results_read_seconds': str(round(seconds, 3)),
+            'tool_results_slowest_read_seconds': str(slowest)
+        })
+        self.redis_client.expire(state_key, 86400)
+    
+    def _query_tool_rows(self) -> Iterator[Dict]:
+        """The mission's tool_results rows, page by page."""
         # Query with pagination to handle large result sets
-        results = []
         last_evaluated_key = None
         
         try:
@@ -123,50 +207,10 @@ class SynthesizerAgent:
                 
                 response = self.dynamodb_client.query(**query_params)
                 
-                # Collect items from this page
+                # Process items immediately to avoid memory buildup
                 items = response.get('Items', [])
                 logger.info(f"Retrieved {len(items)} tool results (page)")
-                # Process items immediately to avoid memory buildup
-                for item in items:
-                    s3_uri = item['s3_uri']['S']
-                    stored_digest = item.get('digest', {}).get('S', '')
-                    tool_name = item.get('tool_name', {}).get('S', 'unknown')
-                    status = item.get('status', {}).get('S', 'unknown')
-                    
-                    # Skip failed tools (they have empty S3 URIs)
-                    if status == 'failed' or not s3_uri:
-                        logger.warning(f"Skipping failed tool result: {tool_name}")
-                        continue
-                    
-                    try:
-                        # Validate and parse S3 URI
-                        uri_parts = s3_uri.replace('s3://', '').split('/', 1)
-                        if len(uri_parts) != 2:
-                            logger.error(f"Invalid S3 URI format: {s3_uri}")
-                            continue
-                        bucket, key = uri_parts
-                        
-                        obj = self.s3_client.get_object(Bucket=bucket, Key=key)
-                        content = obj['Body'].read()
-                        
-                        # Verify evidence chain
-                        if stored_digest:
-                            computed_digest = f"sha256:{hashlib.sha256(content).hexdigest()}"
-                            if computed_digest != stored_digest:
-                                logger.error(f"Evidence chain verification FAILED for {tool_name}: {s3_uri}")
-                                logger.error(f"Expected: {stored_digest}, Got: {computed_digest}")
-                                continue  # Skip this result
-                            else:
-                                logger.info(f"Evidence chain verified for {tool_name}: {stored_digest}")
-                        
-                        result_data = json.loads(content)
-                        result_data['_verified'] = True
-                    except Exception as e:
-                        logger.error(f"Failed to read tool result {tool_name} from {s3_uri}: {e}")
-                        continue
-                    result_data['_digest'] = stored_digest
-                    result_data['_tool'] = tool_name
-                    results.append(result_data)
+                yield from items
                 
                 # Check for more pages
                 last_evaluated_key = response.get('LastEvaluatedKey')
@@ -176,28 +220,211 @@ class SynthesizerAgent:
         except Exception as e:
             logger.error(f"Failed to query tool results from DynamoDB: {e}")
             raise
+    
+    def _read_tool_result(self, item: Dict) -> Optional[Dict]:
+        """Read one tool_results row's stored result and verify its evidence chain."""
+        s3_uri = item['s3_uri']['S']
+        stored_digest = item.get('digest', {}).get('S', '')
+        tool_name = item.get('tool_name', {}).get('S', 'unknown')
+        status = item.get('status', {}).get('S', 'unknown')
         
-        logger.info(f"Read {len(results)} verified MCP tool results")
-        return results
+        # Skip failed tools (they have empty S3 URIs)
+        if status == 'failed' or not s3_uri:
+            logger.warning(f"Skipping failed tool result: {tool_name}")
+            return None
+        
+        try:
+            # Validate and parse S3 URI
+            uri_parts = s3_uri.replace('s3://', '').split('/', 1)
+            if len(uri_parts) != 2:
+                logger.error(f"Invalid S3 URI format: {s3_uri}")
+                return None
+            bucket, key = uri_parts
+            
+            started = time.monotonic()
+            obj = self.s3_client.get_object(Bucket=bucket, Key=key)
+            # Hashed while streaming; parsed only once verified
+            content, computed_digest, stored_bytes = read_body_digest(obj)
+            verify_seconds = round(time.monotonic() - started, 3)
+            self.read_stats.append({
+                'tool': tool_name,
+                'bytes': len(content),
+                'stored_bytes': stored_bytes,
+                'seconds': verify_seconds
+            })
+            
+            # Verify evidence chain
+            if stored_digest:
+                if computed_digest != stored_digest:
+                    logger.error(f"Evidence chain verification FAILED for {tool_name}: {s3_uri}")
+                    logger.error(f"Expected: {stored_digest}, Got: {computed_digest}")
+                    return None  # Skip this result
+                else:
+                    logger.info(f"Evidence chain verified for {tool_name}: {stored_digest} ({len(content)} bytes in {verify_seconds}s)")
+            
+            # Scanner results use the normalized NDJSON finding format
+            if is_wire_document(content):
+                result_data = decode_tool_result(content)
+            else:
+                result_data = json.loads(content)
+            result_data['_verified'] = True
+        except Exception as e:
+            logger.error(f"Failed to read tool result {tool_name} from {s3_uri}: {e}")
+            return None
+        result_data['_digest'] = stored_digest
+        result_data['_tool'] = tool_name
+        return result_data
+    
+    def _run_incremental(self) -> List[DraftFinding]:
+        """
+        Synthesize and propose findings per tool as the Coordinator stores them.
+        
+        Follows the Coordinator's tool-result feed; rows that were never
+        announced (an older Coordinator, a lost event) are picked up from
+        the table at the end. A final merge pass deduplicates and correlates
+        across tools and replaces the early proposals with its result, so the
+        Critic and Archivist only ever review the merged findings.
+        """
+        started = time.monotonic()
+        proposed: Dict[str, DraftFinding] = {}
+        seen = set()
+        
+        def synthesize(item: Dict):
+            s3_uri = item.get('s3_uri', {}).get('S')
+            if not s3_uri or s3_uri in seen:
+                return
+            seen.add(s3_uri)
+            
+            result_data = self._read_tool_result(item)
+            if result_data is None:
+                return
+            
+            new_findings = []
+            for finding in self._deduplicate_findings(self._synthesize_findings([result_data])):
+                key = f"{finding.file_path}:{finding.title}"
+                if key not in proposed:
+                    proposed[key] = finding
+                    new_findings.append(finding)
+            if new_findings:
+                if self.time_to_first_finding is None:
+                    self.time_to_first_finding = round(time.monotonic() - started, 3)
+                    logger.info(f"First findings proposed after {self.time_to_first_finding}s")
+                    self.redis_client.hset(
+                        f"agent:{self.mission_id}:synthesizer",
+                        'time_to_first_finding',
+                        str(self.time_to_first_finding)
+                    )
+                self._propose(new_findings)
+            logger.info(f"Proposed {len(new_findings)} findings from {result_data['_tool']}")
+        
+        self._update_state("THINKING - Following tool results")
+        feed = ToolResultFeed(self.redis_client, self.mission_id, os.environ.get('MISSION_ATTEMPT'))
+        for item in feed.follow(self.poll_seconds, self._stop_following):
+            synthesize(item)
+        
+        for item in self._query_tool_rows():
+            synthesize(item)
+        
+        # Merge pass: a later tool's duplicate may carry higher confidence
+        research = self._research_findings()
+        findings = self._rank_findings(self._correlate(self._deduplicate_findings(list(proposed.values()) + research)))
+        
+        self._replace_proposals(findings)
+        self._write_draft_findings(findings)
+        return findings
+    
+    def _stop_following(self) -> bool:
+        """Whether to stop waiting for the Coordinator's remaining tools."""
+        if self.deadline.bounded:
+            return self.deadline.stage_budget('coordinator') <= 0
+        return time.monotonic() - self.follow_started > self.max_follow_seconds
+    
+    def _enrichment(self):
+        """Kendra context for synthesis, fetched once per run, unless the deadline is near."""
+        if not self.kendra_fetched:
+            self.kendra_fetched = True
+            if self.deadline.degraded('synthesizer'):
+                logger.warning("Mission deadline near, synthesizing without Kendra enrichment")
+            else:
+                self.kendra_context = self.cognitive_kernel.retrieve_from_kendra(
+                    query="security vulnerabilities patterns best practices",
+                    top_k=5
+                )
+        return self.kendra_context
     
     def _synthesize_findings(self, tool_results: List[Dict]) -> List[DraftFinding]:
-        """Use AI to synthesize findings."""
-        # Query Kendra for enrichment
-        kendra_context = self.cognitive_kernel.retrieve_from_kendra(
-            query="security vulnerabilities patterns best practices",
-            top_k=5
-        )
+        """
+        Use AI to synthesize findings, map-reduce over chunks of the tool results.
         
+        Well-understood findings are first translated by rule and skip the
+        model. The rest are partitioned by file (or rule) into token-bounded
+        chunks, each chunk is synthesized on its own with bounded
+        parallelism, and all findings are merged and ranked.
+        """
+        # Correlate against every tool seen so far, not just this batch
+        self.location_index.add_tool_results(tool_results)
+        
+        translated = []
+        if self.translate:
+            drafts, tool_results, stats = translate_tool_results(tool_results, self.location_index)
+            translated = [self._draft_finding(d) for d in drafts]
+            self._record_translation(stats)
+        
+        chunks = partition_tool_results(tool_results, self.chunk_tokens, self.partition_key)
+        chunk_findings = []
+        if chunks:
+            # Query Kendra for enrichment once, before the map fans out
+            kendra_context = self._enrichment()
+            groups = self.location_index.correlated_groups()
+            if len(chunks) == 1:
+                chunk_findings = [self._synthesize_chunk(chunks[0], kendra_context, groups)]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.map_concurrency, len(chunks))) as executor:
+                    chunk_findings = list(executor.map(
+                        lambda chunk: self._synthesize_chunk(chunk, kendra_context, groups), chunks
+                    ))
+        
+        findings = self._rank_findings(self._deduplicate_findings(translated + [f for batch in chunk_findings for f in batch]))
+        logger.info(f"Synthesized {len(findings)} findings from {len(translated)} translated and {len(chunks)} chunks")
+        return findings
+    
+    def _record_translation(self, stats: Dict[str, int]):
+        """Track the share of findings that bypassed the model."""
+        for key in self.translation_stats:
+            self.translation_stats[key] += stats.get(key, 0)
+        total = sum(self.translation_stats.values())
+        
+        state_key = f"agent:{self.mission_id}:synthesizer"
+        self.redis_client.hset(state_key, mapping={
+            'findings_translated': str(self.translation_stats['translated']),
+            'findings_to_model': str(self.translation_stats['to_model']),
+            'model_bypass_share': str(round(self.translation_stats['translated'] / total, 3) if total else 0.0)
+        })
+        self.redis_client.expire(state_key, 86400)
+    
+    def _synthesize_chunk(self, tool_results: List[Dict], kendra_context, groups) -> List[DraftFinding]:
+        """Draft findings for one chunk of tool results, given the mission's correlated groups."""
         system_prompt = """You are the SynthesizerAgent. Analyze security tool outputs and draft findings.
 
 For each issue found:
 1. Assign severity: CRITICAL, HIGH, MEDIUM, or LOW
 2. Provide clear title and description
 3. Cite evidence (tool + digest + line numbers)
-4. Assign confidence score (0.0-1.0)"""
+4. Assign confidence score (0.0-1.0)
 
+Each tool result lists its findings with rule, severity, path, line_start, line_end, fingerprint, snippet and message.
+Correlated locations are lines several tools flag; report each as one finding citing every tool."""
+
+        # Only the groups touching this chunk, including tools synthesized earlier
+        index = LocationIndex()
+        index.add_tool_results(tool_results)
+        groups = [g for g in groups if any(index.overlapping(l.path, l.line_start, l.line_end) for l in g)]
+        
         user_prompt = f"""Tool Results:
-{json.dumps(tool_results, indent=2)}
+{json.dumps(self._prompt_results(tool_results), separators=(',', ':'))}
+
+Correlated Locations:
+{self._format_correlations(groups)}
 
 Historical Context:
 {self._format_kendra(kendra_context)}
@@ -215,12 +442,17 @@ Draft findings in JSON array:
   }}
 ]"""
 
-        response = self.cognitive_kernel.invoke_claude(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            max_tokens=4096,
-            temperature=0.3
-        )
+        try:
+            response = self.cognitive_kernel.invoke_claude(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                max_tokens=4096,
+                temperature=0.3
+            )
+        except Exception as e:
+            # One failed chunk must not lose the others' findings
+            logger.error(f"Failed to synthesize chunk of {len(tool_results)} tool results: {e}")
+            return []
         
         try:
             findings_data = json.loads(response.content)
@@ -229,42 +461,99 @@ Draft findings in JSON array:
             logger.error(f"Response content: {response.content[:500]}")
             return []  # Return empty findings on parse failure
         
-        findings = []
-        
-        for f in findings_data:
-            finding_id = hashlib.sha256(f"{self.mission_id}{f['title']}".encode()).hexdigest()[:16]
-            findings.append(DraftFinding(
-                finding_id=finding_id,
-                title=f.get('title', 'Unknown Issue'),
-                severity=f.get('severity', 'MEDIUM'),
-                description=f.get('description', 'No description provided'),
-                file_path=f.get('file_path', 'unknown'),
-                line_numbers=f.get('line_numbers', []),
-                evidence_digest=f.get('evidence_digest', 'unknown'),
-                tool_source=f.get('tool_source', 'unknown'),
-                confidence_score=f.get('confidence', 0.5)
-            ))
+        return [self._draft_finding(f) for f in findings_data]
+    
+    def _prompt_results(self, tool_results: List[Dict]) -> List[Dict]:
+        """
+        Tool results as the model reads them.
         
-        return findings
+        Wire documents keep their positional rows for stdio and S3; here each
+        row is expanded into named fields so the model need not resolve the
+        severity, path and string indexes itself.
+        """
+        prompt_results = []
+        for result in tool_results:
+            if is_wire_document(result):
+                header = {k: v for k, v in result.items() if k not in ('format', 'rows', 'paths', 'strings', 'findings')}
+                header['findings'] = [
+                    {k: v for k, v in asdict(finding).items() if k != 'tool'}
+                    for finding in iter_findings(result)
+                ]
+                result = header
+            prompt_results.append(result)
+        return prompt_results
+    
+    def _draft_finding(self, f: Dict) -> DraftFinding:
+        """Build a DraftFinding from synthesized or translated finding fields."""
+        finding_id = hashlib.sha256(f"{self.mission_id}{f['title']}".encode()).hexdigest()[:16]
+        return DraftFinding(
+            finding_id=finding_id,
+            title=f.get('title', 'Unknown Issue'),
+            severity=f.get('severity', 'MEDIUM'),
+            description=f.get('description', 'No description provided'),
+            file_path=f.get('file_path', 'unknown'),
+            line_numbers=f.get('line_numbers', []),
+            evidence_digest=f.get('evidence_digest', 'unknown'),
+            tool_source=f.get('tool_source', 'unknown'),
+            confidence_score=f.get('confidence', 0.5)
+        )
+    
+    def _research_findings(self) -> List[DraftFinding]:
+        """Draft findings from the security patterns the Archaeologist's deep research exported."""
+        if not self.research_findings:
+            return []
+        
+        key = f"research/{self.mission_id}/deep_research.json"
+        try:
+            content = read_body(self.s3_client.get_object(Bucket=self.s3_artifacts_bucket, Key=key))
+            research = json.loads(content)
+        except Exception as e:
+            # AWS missions have no code research
+            logger.info(f"No deep research patterns for mission {self.mission_id}: {e}")
+            return []
+        
+        digest = f"sha256:{hashlib.sha256(content).hexdigest()}"
+        self.location_index.add_code_patterns(research.get('security_patterns', []), digest)
+        drafts = translate_code_patterns(research.get('security_patterns', []), digest)
+        logger.info(f"Read {len(drafts)} deep research patterns")
+        return [self._draft_finding(d) for d in drafts]
     
     def _write_proposals(self, findings: List[DraftFinding]):
         """Write draft findings to Redis for negotiation."""
-        import time
+        self._propose(findings)
+        self._write_draft_findings(findings)
+    
+    def _propose(self, findings: List[DraftFinding]):
+        """Push draft findings to Redis as negotiation proposals."""
         proposal_key = f"negotiation:{self.mission_id}:proposals"
         for finding in findings:
-            self.redis_client.rpush(
-                proposal_key,
-                json.dumps({
-                    'agent': 'synthesizer',
-                    'action': 'PROPOSE',
-                    'payload': asdict(finding),
-                    'timestamp': int(time.time())
-                })
-            )
+            self.redis_client.rpush(proposal_key, self._proposal(finding))
         
         # Set 24-hour TTL on proposal key to prevent memory leak
         self.redis_client.expire(proposal_key, 86400)
-        
+        logger.info(f"Wrote {len(findings)} proposals to Redis")
+    
+    def _proposal(self, finding: DraftFinding) -> str:
+        return json.dumps({
+            'agent': 'synthesizer',
+            'action': 'PROPOSE',
+            'payload': asdict(finding),
+            'timestamp': int(time.time())
+        })
+    
+    def _replace_proposals(self, findings: List[DraftFinding]):
+        """Swap the proposals pushed per tool for the merged findings in one transaction."""
+        proposal_key = f"negotiation:{self.mission_id}:proposals"
+        pipe = self.redis_client.pipeline()
+        pipe.delete(proposal_key)
+        for finding in findings:
+            pipe.rpush(proposal_key, self._proposal(finding))
+        pipe.expire(proposal_key, 86400)
+        pipe.execute()
+        logger.info(f"Replaced proposals with {len(findings)} merged findings")
+    
+    def _write_draft_findings(self, findings: List[DraftFinding]):
+        """Write the mission's draft findings to S3."""
         key = f"agent-outputs/synthesizer/{self.mission_id}/draft-findings.json"
         self.s3_client.put_object(
             Bucket=self.s3_artifacts_bucket,
@@ -272,7 +561,7 @@ Draft findings in JSON array:
             Body=json.dumps([asdict(f) for f in findings], indent=2)
         )
         
-        logger.info(f"Wrote {len(findings)} proposals to Redis")
+        logger.info(f"Wrote {len(findings)} draft findings to S3")
     
     def _update_state(self, status: str, confidence: float = 0.0, error: str = None):
         import time
@@ -285,30 +574,100 @@ Draft findings in JSON array:
         # Set 24-hour TTL on agent state to prevent memory leak
         self.redis_client.expire(state_key, 86400)
     
+    def _format_correlations(self, groups) -> str:
+        if not groups:
+            return "None"
+        return "\n".join(
+            f"- {g[0].path}:{min(l.line_start for l in g)}-{max(l.line_end for l in g)} "
+            + ", ".join(sorted({f"{l.source} {l.rule}" for l in g}))
+            for g in groups
+        )
+    
     def _format_kendra(self, context) -> str:
         if not context or not context.documents:
             return "No context"
         return "\n".join([f"- {d['title']}: {d['excerpt'][:100]}..." for d in context.documents[:3]])
     
     def _deduplicate_findings(self, findings: List[DraftFinding]) -> List[DraftFinding]:
-        """Deduplicate findings based on file path and similarity."""
-        seen = {}
+        """
+        Merge exact and near-duplicate findings.
+        
+        Exact duplicates share file path and title; near-duplicates are the
+        same issue reported in the same file and lines under another title.
+        Each cluster keeps its most confident finding, with the line numbers
+        of all members and the others' evidence.
+        """
+        clusters = cluster_findings(
+            findings,
+            exact_key=lambda f: f"{f.file_path}:{f.title}",
+            text=lambda f: f"{f.title} {f.description}",
+            scope=lambda f: f.file_path,
+            lines=lambda f: [n for n in f.line_numbers if isinstance(n, int)],
+            threshold=self.dedup_threshold
+        )
+        
         unique_findings = []
+        for cluster in clusters:
+            members = [findings[i] for i in cluster]
+            best = max(members, key=lambda f: f.confidence_score)
+            if len(members) > 1:
+                evidence = {}
+                for f in members:
+                    if f is not best:
+                        for entry in [{
+                            'title': f.title,
+                            'tool_source': f.tool_source,
+                            'evidence_digest': f.evidence_digest,
+                            'line_numbers': f.line_numbers
+                        }] + f.merged_evidence:
+                            evidence.setdefault((entry['tool_source'], entry['evidence_digest'], entry['title']), entry)
+                best = replace(
+                    best,
+                    line_numbers=sorted({n for f in members for n in f.line_numbers if isinstance(n, int)}),
+                    merged_evidence=best.merged_evidence + list(evidence.values())
+                )
+            unique_findings.append(best)
         
+        return unique_findings
+    
+    def _correlate(self, findings: List[DraftFinding]) -> List[DraftFinding]:
+        """Boost the confidence of findings other sources report on the same lines."""
+        correlated = []
         for finding in findings:
-            # Create a key based on file_path and title
-            key = f"{finding.file_path}:{finding.title}"
-            if key not in seen:
-                seen[key] = finding
-                unique_findings.append(finding)
-            else:
-                # Keep the one with higher confidence
-                if finding.confidence_score > seen[key].confidence_score:
-                    seen[key] = finding
-                    # Replace in unique_findings
-                    unique_findings = [f if f.finding_id != seen[key].finding_id else finding for f in unique_findings]
+            lines = [n for n in finding.line_numbers if isinstance(n, int) and n > 0]
+            others = {}
+            if lines:
+                for location in self.location_index.overlapping(finding.file_path, min(lines), max(lines)):
+                    if location.source != finding.tool_source:
+                        others.setdefault((location.source, location.rule, location.line_start), location)
+            if not others:
+                correlated.append(finding)
+                continue
+            
+            sources = {location.source for location in others.values()}
+            correlated.append(replace(
+                finding,
+                confidence_score=min(
+                    self.max_correlated_confidence,
+                    max(finding.confidence_score, round(finding.confidence_score + self.correlation_boost * len(sources), 3))
+                ),
+                correlated_evidence=[{
+                    'tool_source': location.source,
+                    'rule': location.rule,
+                    'line_numbers': [location.line_start, location.line_end],
+                    'evidence_digest': location.evidence_digest
+                } for location in others.values()]
+            ))
         
-        return unique_findings
+        logger.info(f"{sum(1 for f in correlated if f.correlated_evidence)} of {len(findings)} findings corroborated by other sources")
+        return correlated
+    
+    def _rank_findings(self, findings: List[DraftFinding]) -> List[DraftFinding]:
+        """Order findings by severity, then confidence, highest first."""
+        def rank(finding: DraftFinding):
+            severity = str(finding.severity).upper()
+            return (SEVERITIES.index(severity) if severity in SEVERITIES else 0, finding.confidence_score)
+        return sorted(findings, key=rank, reverse=True)
     
     def _calculate_severity(self, finding_data: Dict) -> str:
         """Calculate severity based on finding characteristics."""
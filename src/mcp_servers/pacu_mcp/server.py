@@ -6,12 +6,10 @@ Implements JSON-RPC 2.0 protocol for AWS penetration testing.
 import os
 import json
 import asyncio
-import hashlib
 import boto3
 import logging
 from pathlib import Path
-from typing import Any, Sequence
-import time
+from typing import Any, Optional, Sequence
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -22,6 +20,8 @@ from mcp.types import (
     EmbeddedResource
 )
 
+from src.shared.mcp_server import Finding, ResourceGovernor, ServerWarmup, encode_tool_result
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -33,6 +33,27 @@ class PacuMCPServer:
         self.server = Server("pacu-mcp")
         self.mission_id = os.environ.get('MISSION_ID', 'test-scan-123')
         
+        self.s3_artifacts_bucket = os.environ.get('S3_ARTIFACTS_BUCKET', 'test-bucket')
+        
+        region = os.environ.get('AWS_REGION', 'us-east-1')
+        self.s3_client = boto3.client('s3', region_name=region)
+        
+        # Parsed `pacu --list-modules` output, loaded once at warm-up
+        self.module_catalog: Optional[list] = None
+        
+        # Modules already run in this mission's Pacu session, with their summaries
+        self.session_modules: dict = {}
+        
+        # First-use work done once at process start rather than on the first run
+        self.tool_version: Optional[str] = None
+        self.capabilities: dict = {}
+        self.warmup = ServerWarmup("pacu-mcp")
+        self.warmup.add_step('version', self._get_pacu_version)
+        self.warmup.add_step('module_catalog', self._warm_module_catalog)
+        
+        # CPU, memory and file limits applied to every Pacu process
+        self.governor = ResourceGovernor('pacu')
+        
         # Register MCP handlers
         self._register_handlers()
         
@@ -101,6 +122,52 @@ class PacuMCPServer:
                         "required": ["module_name"]
                     }
                 ),
+                Tool(
+                    name="pacu_run_modules",
+                    description="Run an ordered list of Pacu modules in a single Pacu session. Enumeration data gathered by earlier modules is reused by later ones, and modules already run in this mission's session are not repeated.",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "modules": {
+                                "type": "array",
+                                "description": "Pacu modules to run, in order (duplicates are run once)",
+                                "items": {"type": "string"}
+                            },
+                            "aws_profile": {
+                                "type": "string",
+                                "description": "AWS CLI profile to use",
+                                "default": "default"
+                            },
+                            "regions": {
+                                "type": "array",
+                                "description": "AWS regions to target",
+                                "items": {"type": "string"},
+                                "default": []
+                            },
+                            "module_args": {
+                                "type": "object",
+                                "description": "Module-specific arguments, keyed by module name",
+                                "default": {}
+                            },
+                            "dry_run": {
+                                "type": "boolean",
+                                "description": "Perform dry run without making changes (recommended)",
+                                "default": True
+                            },
+                            "rerun": {
+                                "type": "boolean",
+                                "description": "Run modules again even if they already completed in this session",
+                                "default": False
+                            },
+                            "timeout": {
+                                "type": "integer",
+                                "description": "Session timeout in seconds",
+                                "default": 1200
+                            }
+                        },
+                        "required": ["modules"]
+                    }
+                ),
                 Tool(
                     name="pacu_enum_permissions",
                     description="Enumerate IAM permissions for current AWS credentials - safe reconnaissance module",
@@ -115,6 +182,20 @@ class PacuMCPServer:
                         },
                         "required": []
                     }
+                ),
+                Tool(
+                    name="health",
+                    description="Report server readiness, cached tool version and capabilities, and warm-up timings",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "wait_seconds": {
+                                "type": "number",
+                                "description": "Wait up to this long for warm-up before reporting"
+                            }
+                        },
+                        "required": []
+                    }
                 )
             ]
         
@@ -122,25 +203,43 @@ class PacuMCPServer:
         async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
             """Execute tool - MCP protocol requirement."""
             try:
+                if name == "health":
+                    if arguments and arguments.get("wait_seconds"):
+                        await self.warmup.wait(float(arguments["wait_seconds"]))
+                    return [TextContent(
+                        type="text",
+                        text=json.dumps(self._health(), separators=(',', ':'))
+                    )]
+                
+                # Calls arriving during warm-up wait for it rather than redo its work
+                await self.warmup.wait()
+                
                 if name == "pacu_list_modules":
                     result = await self._list_pacu_modules(arguments)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=json.dumps(result, separators=(',', ':'))
                     )]
                 
                 elif name == "pacu_run_module":
                     result = await self._run_pacu_module(arguments)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=self._encode_result(result)
+                    )]
+                
+                elif name == "pacu_run_modules":
+                    result = await self._run_pacu_session(arguments)
+                    return [TextContent(
+                        type="text",
+                        text=self._encode_result(result)
                     )]
                 
                 elif name == "pacu_enum_permissions":
                     result = await self._enum_permissions(arguments)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=self._encode_result(result)
                     )]
                 else:
                     raise ValueError(f"Unknown tool: {name}")
@@ -156,6 +255,59 @@ class PacuMCPServer:
                     })
                 )]
     
+    async def warm(self) -> dict:
+        """Run the warm-up steps (once) and return readiness status."""
+        return await self.warmup.wait()
+    
+    def _health(self) -> dict:
+        """Readiness, warm-up timings and cached capabilities for the `health` tool."""
+        return {
+            'success': True,
+            'tool': 'health',
+            **self.warmup.status(),
+            'version': self.tool_version,
+            'capabilities': self.capabilities
+        }
+    
+    async def _warm_module_catalog(self) -> int:
+        """Load the module catalog before serving requests."""
+        self.module_catalog = await self._load_module_catalog()
+        self.capabilities['modules'] = len(self.module_catalog)
+        logger.info(f"Pacu module catalog cached: {len(self.module_catalog)} modules")
+        return len(self.module_catalog)
+    
+    async def _load_module_catalog(self) -> list:
+        """Run `pacu --list-modules` and parse the module catalog."""
+        process = await asyncio.create_subprocess_exec(
+            'pacu',
+            '--list-modules',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(),
+            timeout=30
+        )
+        
+        if process.returncode != 0:
+            raise Exception(f"Pacu list modules failed: {stderr.decode()}")
+        
+        # Parse module list
+        modules = []
+        for line in stdout.decode().split('\n'):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                # Simple parsing - production would be more sophisticated
+                if '__' in line:
+                    module_name = line.split()[0] if ' ' in line else line
+                    modules.append({
+                        'name': module_name,
+                        'category': self._categorize_module(module_name)
+                    })
+        
+        return modules
+    
     async def _list_pacu_modules(self, arguments: dict) -> dict:
         """List available Pacu modules."""
         category = arguments.get("category", "all")
@@ -163,48 +315,22 @@ class PacuMCPServer:
         logger.info(f"Listing Pacu modules: category={category}")
         
         try:
-            # Run pacu to list modules
-            process = await asyncio.create_subprocess_exec(
-                'pacu',
-                '--list-modules',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            if self.module_catalog is None:
+                self.module_catalog = await self._load_module_catalog()
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=30
-            )
+            modules = self.module_catalog
             
-            if process.returncode == 0:
-                # Parse module list
-                modules_text = stdout.decode()
-                modules = []
-                
-                for line in modules_text.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Simple parsing - production would be more sophisticated
-                        if '__' in line:
-                            module_name = line.split()[0] if ' ' in line else line
-                            modules.append({
-                                'name': module_name,
-                                'category': self._categorize_module(module_name)
-                            })
-                
-                # Filter by category if specified
-                if category != "all":
-                    modules = [m for m in modules if m['category'] == category]
-                
-                return {
-                    "success": True,
-                    "tool": "pacu",
-                    "category": category,
-                    "modules": modules,
-                    "count": len(modules)
-                }
-            else:
-                raise Exception(f"Pacu list modules failed: {stderr.decode()}")
+            # Filter by category if specified
+            if category != "all":
+                modules = [m for m in modules if m['category'] == category]
+            
+            return {
+                "success": True,
+                "tool": "pacu",
+                "category": category,
+                "modules": modules,
+                "count": len(modules)
+            }
                 
         except asyncio.TimeoutError:
             return {"success": False, "error": "timeout listing modules"}
@@ -262,7 +388,7 @@ class PacuMCPServer:
                 cmd.append('--dry-run')
             
             # Run Pacu
-            process = await asyncio.create_subprocess_exec(
+            process = await self.governor.spawn(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
@@ -270,10 +396,7 @@ class PacuMCPServer:
                 cwd=session_dir
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout
-            )
+            stdout, stderr, usage = await self.governor.communicate(process, timeout=timeout)
             
             if process.returncode in [0, 1]:  # 0 = success, 1 = module errors (non-fatal)
                 output = stdout.decode()
@@ -286,7 +409,7 @@ class PacuMCPServer:
                     'dry_run': dry_run,
                     'profile': aws_profile,
                     'output': output,
-                    'summary': self._parse_pacu_output(output)
+                    'summary': {**self._parse_pacu_output(output), 'resource_usage': usage}
                 }
                 
                 # Return MCP-compliant response with results
@@ -307,6 +430,153 @@ class PacuMCPServer:
             logger.error(f"Pacu module timeout after {timeout} seconds")
             return {"success": False, "error": "timeout", "module": module_name}
     
+    async def _run_pacu_session(self, arguments: dict) -> dict:
+        """
+        Run several Pacu modules in one Pacu process.
+        
+        The modules are fed to a single interactive session for this mission,
+        so data enumerated by earlier modules is already in the session when
+        later modules need it. Modules that completed earlier in the mission
+        are skipped unless rerun is set, and unknown modules are rejected
+        against the cached catalog without starting Pacu.
+        """
+        aws_profile = arguments.get("aws_profile", "default")
+        regions = arguments.get("regions", [])
+        module_args = arguments.get("module_args", {})
+        dry_run = arguments.get("dry_run", True)
+        rerun = arguments.get("rerun", False)
+        timeout = arguments.get("timeout", 1200)
+        
+        requested = list(dict.fromkeys(arguments.get("modules", [])))
+        known = {m['name'] for m in self.module_catalog} if self.module_catalog else None
+        
+        module_results = {}
+        to_run = []
+        for module_name in requested:
+            if known is not None and module_name not in known:
+                module_results[module_name] = {'status': 'skipped', 'reason': 'unknown module'}
+            elif module_name in self.session_modules and not rerun:
+                module_results[module_name] = {'status': 'cached', 'summary': self.session_modules[module_name]}
+            else:
+                to_run.append(module_name)
+        
+        logger.info(f"Running Pacu session: {len(to_run)} modules to run, {len(requested) - len(to_run)} skipped, dry_run={dry_run}")
+        
+        if not dry_run:
+            logger.warning(f"PACU NON-DRY-RUN MODE: Modules {to_run} will make real changes!")
+        
+        output = ''
+        usage = {}
+        if to_run:
+            session_dir = f'/tmp/pacu-{self.mission_id}'
+            Path(session_dir).mkdir(parents=True, exist_ok=True)
+            
+            cmd = [
+                'pacu',
+                '--session', self.mission_id,
+                '--profile', aws_profile
+            ]
+            
+            if regions:
+                cmd.extend(['--regions', ','.join(regions)])
+            
+            if dry_run:
+                cmd.append('--dry-run')
+            
+            # One console command per module, then leave the session
+            script = ''.join(
+                f"run {module_name}{self._format_module_args(module_args.get(module_name, {}))}\n"
+                for module_name in to_run
+            ) + 'exit\n'
+            
+            process = await self.governor.spawn(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, 'AWS_PROFILE': aws_profile},
+                cwd=session_dir
+            )
+            
+            try:
+                stdout, stderr, usage = await self.governor.communicate(
+                    process,
+                    input=script.encode(),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"Pacu session timeout after {timeout} seconds")
+                return {"success": False, "error": "timeout", "modules": requested}
+            
+            if process.returncode not in [0, 1]:  # 0 = success, 1 = module errors (non-fatal)
+                raise Exception(f"Pacu session failed: {stderr.decode()}")
+            
+            output = stdout.decode()
+            for module_name, module_output in self._split_session_output(output, to_run).items():
+                summary = self._parse_pacu_output(module_output)
+                module_results[module_name] = {'status': 'completed', 'summary': summary}
+                self.session_modules[module_name] = summary
+        
+        results = {
+            'tool': 'pacu',
+            'version': await self._get_pacu_version() if to_run else 'unknown',
+            'session': self.mission_id,
+            'dry_run': dry_run,
+            'profile': aws_profile,
+            'process_starts': 1 if to_run else 0,
+            'modules': {m: module_results[m] for m in requested},
+            'output': output,
+            'summary': {
+                'modules_run': len(to_run),
+                'errors': sum(r.get('summary', {}).get('errors', 0) for r in module_results.values()),
+                'warnings': sum(r.get('summary', {}).get('warnings', 0) for r in module_results.values()),
+                'findings': [
+                    finding
+                    for r in module_results.values()
+                    for finding in r.get('summary', {}).get('findings', [])
+                ],
+                'resource_usage': usage
+            }
+        }
+        
+        # Return MCP-compliant response with results
+        # Coordinator will handle storing to S3/DynamoDB
+        return {
+            "success": True,
+            "tool": "pacu",
+            "modules": requested,
+            "dry_run": dry_run,
+            "mission_id": self.mission_id,
+            "results": results,
+            "summary": results['summary']
+        }
+    
+    def _format_module_args(self, module_args: dict) -> str:
+        """Render module arguments as flags after `run <module>` on the Pacu console."""
+        if isinstance(module_args, str):
+            return f" {module_args}" if module_args else ''
+        
+        rendered = ' '.join(
+            f"--{key.replace('_', '-')} {','.join(value) if isinstance(value, list) else value}"
+            for key, value in module_args.items()
+        )
+        return f" {rendered}" if rendered else ''
+    
+    def _split_session_output(self, output: str, modules: list) -> dict:
+        """Attribute session output lines to modules by Pacu's [module_name] prefix."""
+        per_module = {module_name: [] for module_name in modules}
+        current = None
+        
+        for line in output.split('\n'):
+            for module_name in modules:
+                if f'[{module_name}]' in line or line.strip().startswith(f'run {module_name}'):
+                    current = module_name
+                    break
+            if current is not None:
+                per_module[current].append(line)
+        
+        return {module_name: '\n'.join(lines) for module_name, lines in per_module.items()}
+    
     async def _enum_permissions(self, arguments: dict) -> dict:
         """Safe IAM permission enumeration."""
         aws_profile = arguments.get("aws_profile", "default")
@@ -322,7 +592,10 @@ class PacuMCPServer:
         })
     
     async def _get_pacu_version(self) -> str:
-        """Get Pacu version asynchronously."""
+        """Get Pacu version asynchronously (probed once, then cached)."""
+        if self.tool_version:
+            return self.tool_version
+        
         try:
             process = await asyncio.create_subprocess_exec(
                 'pacu',
@@ -331,10 +604,47 @@ class PacuMCPServer:
                 stderr=asyncio.subprocess.PIPE
             )
             stdout, _ = await process.communicate()
-            return stdout.decode().strip()
+            self.tool_version = stdout.decode().strip()
+            return self.tool_version
         except Exception:
             return 'unknown'
     
+    def _encode_result(self, result: dict) -> str:
+        """
+        Encode a module run response in the shared normalized finding format.
+        
+        Pacu reports findings as console lines, so each becomes a finding
+        with the module as its rule and the AWS profile as its path.
+        """
+        results = result.get('results', {})
+        if 'modules' in results:
+            per_module = {
+                name: entry.get('summary', {}).get('findings', [])
+                for name, entry in results['modules'].items()
+            }
+        else:
+            per_module = {results.get('module', 'unknown'): results.get('summary', {}).get('findings', [])}
+        
+        findings = [
+            Finding(
+                tool='pacu',
+                rule=module_name,
+                severity='UNKNOWN',
+                path=f"aws:{results.get('profile', 'default')}",
+                message=line
+            )
+            for module_name, lines in per_module.items()
+            for line in lines
+        ]
+        
+        extra = {key: results[key] for key in ('version', 'process_starts') if key in results}
+        if 'modules' in results:
+            extra['module_status'] = {name: entry.get('status') for name, entry in results['modules'].items()}
+        if 'summary' in result:
+            # The finding lines are already the rows
+            extra['summary'] = {k: v for k, v in result['summary'].items() if k != 'findings'}
+        return encode_tool_result(result, findings, extra=extra)
+    
     def _parse_pacu_output(self, output: str) -> dict:
         """Parse Pacu module output for key findings."""
         summary = {
@@ -351,77 +661,11 @@ class PacuMCPServer:
         
         return summary
     
-    async def _store_results(self, results: dict, module_name: str) -> dict:
-        """Store results in S3 and DynamoDB with evidence chain."""
-        timestamp = int(time.time())
-        
-        # Compute digest
-        results_json = json.dumps(results, sort_keys=True)
-        digest = hashlib.sha256(results_json.encode()).hexdigest()
-        
-        # Write to S3
-        s3_key = f"tool-results/pacu-mcp/{self.mission_id}/{timestamp}/{module_name}-results.json"
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=s3_key,
-                Body=results_json,
-                ContentType='application/json',
-                Metadata={
-                    'tool': 'pacu-mcp',
-                    'mission-id': self.mission_id,
-                    'digest': f"sha256:{digest}",
-                    'module-name': module_name
-                }
-            )
-        )
-        
-        # Write digest file
-        digest_key = f"tool-results/pacu-mcp/{self.mission_id}/{timestamp}/digest.sha256"
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=digest_key,
-                Body=f"sha256:{digest}",
-                ContentType='text/plain'
-            )
-        )
-        
-        # Index in DynamoDB
-        findings_count = len(results.get('summary', {}).get('findings', []))
-        await loop.run_in_executor(
-            None,
-            lambda: self.dynamodb_client.put_item(
-                TableName=self.dynamodb_tool_results_table,
-                Item={
-                    'mission_id': {'S': self.mission_id},
-                    'tool_timestamp': {'S': f"pacu-mcp#{timestamp}"},
-                    'tool_name': {'S': 'pacu-mcp'},
-                    's3_uri': {'S': f"s3://{self.s3_artifacts_bucket}/{s3_key}"},
-                    'digest': {'S': f"sha256:{digest}"},
-                    'findings_count': {'N': str(findings_count)},
-                    'success': {'BOOL': True},
-                    'module_name': {'S': module_name},
-                    'ttl': {'N': str(timestamp + (7 * 24 * 60 * 60))}
-                }
-            )
-        )
-        
-        logger.info(f"Results stored: s3://{self.s3_artifacts_bucket}/{s3_key}")
-        logger.info(f"Evidence chain digest: sha256:{digest}")
-        
-        return {
-            "s3_uri": f"s3://{self.s3_artifacts_bucket}/{s3_key}",
-            "digest": f"sha256:{digest}",
-            "timestamp": timestamp
-        }
-    
     async def run(self):
         """Start MCP server with stdio transport."""
+        # Warm up while the client connects; tool calls wait for it
+        self.warmup.start()
+        
         async with stdio_server() as (read_stream, write_stream):
             logger.info("Pacu MCP Server starting with stdio transport")
             await self.server.run(
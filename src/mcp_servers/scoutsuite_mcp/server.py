@@ -6,12 +6,11 @@ Implements JSON-RPC 2.0 protocol for AWS security configuration assessment.
 import os
 import json
 import asyncio
-import hashlib
 import boto3
+import ijson
 import logging
 from pathlib import Path
-from typing import Any, Sequence
-import time
+from typing import Any, Optional, Sequence
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -22,6 +21,8 @@ from mcp.types import (
     EmbeddedResource
 )
 
+from src.shared.mcp_server import Finding, ResourceGovernor, ServerWarmup, encode_tool_result, merge_usage
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -29,10 +30,35 @@ logger = logging.getLogger(__name__)
 class ScoutSuiteMCPServer:
     """MCP-compliant server for ScoutSuite AWS security assessment."""
     
+    # ScoutSuite AWS provider services, used to partition fan-out scans
+    AWS_SERVICES = [
+        'acm', 'awslambda', 'cloudformation', 'cloudfront', 'cloudtrail', 'cloudwatch',
+        'config', 'directconnect', 'dynamodb', 'ec2', 'ecr', 'ecs', 'efs', 'elasticache',
+        'elb', 'elbv2', 'emr', 'guardduty', 'iam', 'kms', 'rds', 'redshift', 'route53',
+        's3', 'secretsmanager', 'ses', 'sns', 'sqs', 'vpc'
+    ]
+    
+    # Services without regional resources are scanned once, not per region
+    GLOBAL_SERVICES = {'cloudfront', 'iam', 'route53', 's3'}
+    
     def __init__(self):
         self.server = Server("scoutsuite-mcp")
         self.mission_id = os.environ.get('MISSION_ID', 'test-scan-123')
         
+        self.s3_artifacts_bucket = os.environ.get('S3_ARTIFACTS_BUCKET', 'test-bucket')
+        
+        region = os.environ.get('AWS_REGION', 'us-east-1')
+        self.s3_client = boto3.client('s3', region_name=region)
+        
+        # First-use work done once at process start rather than on the first scan
+        self.tool_version: Optional[str] = None
+        self.capabilities: dict = {'services': self.AWS_SERVICES, 'fan_out': True}
+        self.warmup = ServerWarmup("scoutsuite-mcp")
+        self.warmup.add_step('version', self._get_scoutsuite_version)
+        
+        # CPU, memory and file limits applied to every ScoutSuite run
+        self.governor = ResourceGovernor('scoutsuite')
+        
         # Register MCP handlers
         self._register_handlers()
         
@@ -77,6 +103,20 @@ class ScoutSuiteMCPServer:
                                 "type": "integer",
                                 "description": "Scan timeout in seconds (default: 1800 = 30 minutes)",
                                 "default": 1800
+                            },
+                            "fan_out": {
+                                "type": "boolean",
+                                "description": "Split the scan into concurrent per-service (and per-region, when regions are given) ScoutSuite runs and merge their reports",
+                                "default": False
+                            },
+                            "max_concurrency": {
+                                "type": "integer",
+                                "description": "Maximum concurrent ScoutSuite runs in fan-out mode (default: 4)",
+                                "default": 4
+                            },
+                            "partition_timeout": {
+                                "type": "integer",
+                                "description": "Timeout in seconds for each fan-out partition (default: the overall timeout)"
                             }
                         },
                         "required": []
@@ -115,6 +155,20 @@ class ScoutSuiteMCPServer:
                         },
                         "required": ["mission_id"]
                     }
+                ),
+                Tool(
+                    name="health",
+                    description="Report server readiness, cached tool version and capabilities, and warm-up timings",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "wait_seconds": {
+                                "type": "number",
+                                "description": "Wait up to this long for warm-up before reporting"
+                            }
+                        },
+                        "required": []
+                    }
                 )
             ]
         
@@ -122,11 +176,22 @@ class ScoutSuiteMCPServer:
         async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
             """Execute tool - MCP protocol requirement."""
             try:
+                if name == "health":
+                    if arguments and arguments.get("wait_seconds"):
+                        await self.warmup.wait(float(arguments["wait_seconds"]))
+                    return [TextContent(
+                        type="text",
+                        text=json.dumps(self._health(), separators=(',', ':'))
+                    )]
+                
+                # Calls arriving during warm-up wait for it rather than redo its work
+                await self.warmup.wait()
+                
                 if name == "scoutsuite_scan":
                     result = await self._execute_scoutsuite_scan(arguments)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=self._encode_result(result)
                     )]
                 else:
                     raise ValueError(f"Unknown tool: {name}")
@@ -149,11 +214,23 @@ class ScoutSuiteMCPServer:
         regions = arguments.get("regions", [])
         report_name = arguments.get("report_name", "aws-security-assessment")
         timeout = arguments.get("timeout", 1800)
+        fan_out = arguments.get("fan_out", False)
         
-        logger.info(f"Starting ScoutSuite scan: profile={aws_profile}, services={services or 'all'}")
+        logger.info(f"Starting ScoutSuite scan: profile={aws_profile}, services={services or 'all'}, fan_out={fan_out}")
         
         # Execute ScoutSuite
-        results = await self._run_scoutsuite(aws_profile, services, regions, report_name, timeout)
+        if fan_out:
+            results = await self._run_scoutsuite_fan_out(
+                aws_profile,
+                services,
+                regions,
+                report_name,
+                timeout,
+                arguments.get("max_concurrency", int(os.environ.get('SCOUTSUITE_MAX_CONCURRENCY', '4'))),
+                arguments.get("partition_timeout")
+            )
+        else:
+            results = await self._run_scoutsuite(aws_profile, services, regions, report_name, timeout)
         
         # Return MCP-compliant response with results
         # Coordinator will handle storing to S3/DynamoDB
@@ -164,7 +241,10 @@ class ScoutSuiteMCPServer:
             "report_name": report_name,
             "findings_count": results.get('findings_count', 0),
             "results": results,
-            "summary": results.get('summary', {})
+            "summary": {
+                **results.get('summary', {}),
+                "resource_usage": results.get('resource_usage', {})
+            }
         }
     
     async def _run_scoutsuite(
@@ -173,11 +253,12 @@ class ScoutSuiteMCPServer:
         services: list,
         regions: list,
         report_name: str,
-        timeout: int
+        timeout: int,
+        output_dir: Optional[str] = None
     ) -> dict:
         """Run ScoutSuite scan asynchronously."""
         try:
-            output_dir = f'/tmp/scoutsuite-{self.mission_id}'
+            output_dir = output_dir or f'/tmp/scoutsuite-{self.mission_id}'
             Path(output_dir).mkdir(parents=True, exist_ok=True)
             
             # Build command
@@ -198,35 +279,21 @@ class ScoutSuiteMCPServer:
                 cmd.extend(['--regions'] + regions)
             
             # Run ScoutSuite
-            process = await asyncio.create_subprocess_exec(
+            process = await self.governor.spawn(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 env={**os.environ, 'AWS_PROFILE': aws_profile}
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout
-            )
+            stdout, stderr, usage = await self.governor.communicate(process, timeout=timeout)
             
             if process.returncode == 0:
                 # Parse ScoutSuite results
                 results_file = Path(output_dir) / f'scoutsuite-results/scoutsuite_results_aws-{report_name}.js'
                 
-                if results_file.exists():
-                    # ScoutSuite outputs JS file, need to extract JSON
-                    content = results_file.read_text()
-                    # Extract JSON from: scoutsuite_results = {...};
-                    json_start = content.find('{')
-                    json_end = content.rfind('}') + 1
-                    if json_start > 0 and json_end > json_start:
-                        results_json = content[json_start:json_end]
-                        scout_data = json.loads(results_json)
-                    else:
-                        scout_data = {}
-                else:
-                    scout_data = {}
+                loop = asyncio.get_event_loop()
+                parsed = await loop.run_in_executor(None, self._parse_results_file, results_file)
                 
                 # Format results
                 formatted = {
@@ -234,9 +301,8 @@ class ScoutSuiteMCPServer:
                     'version': await self._get_scoutsuite_version(),
                     'profile': aws_profile,
                     'report_name': report_name,
-                    'findings_count': self._count_findings(scout_data),
-                    'summary': self._create_summary(scout_data),
-                    'raw_results': scout_data
+                    **parsed,
+                    'resource_usage': usage
                 }
                 
                 return formatted
@@ -251,8 +317,143 @@ class ScoutSuiteMCPServer:
                 'findings_count': 0
             }
     
+    def _partition_scan(self, services: list, regions: list) -> list:
+        """
+        Split a scan into (service, regions) partitions.
+        
+        Regional services get one partition per requested region; global
+        services, and every service when no regions are given, get one
+        partition covering all regions.
+        """
+        partitions = []
+        
+        for service in services or self.AWS_SERVICES:
+            if regions and service not in self.GLOBAL_SERVICES:
+                partitions.extend((service, [region]) for region in regions)
+            else:
+                partitions.append((service, regions))
+        
+        return partitions
+    
+    async def _run_scoutsuite_fan_out(
+        self,
+        aws_profile: str,
+        services: list,
+        regions: list,
+        report_name: str,
+        timeout: int,
+        max_concurrency: int = 4,
+        partition_timeout: Optional[int] = None
+    ) -> dict:
+        """
+        Run ScoutSuite as concurrent per-service/per-region partitions.
+        
+        Each partition is a separate ScoutSuite process with its own report
+        directory, bounded by max_concurrency. Partition reports are merged
+        into one result with the same summary shape as a single run; a
+        partition that fails or times out is recorded and the rest of the
+        report is still returned.
+        
+        Args:
+            aws_profile: AWS CLI profile
+            services: Services to scan (all known services when empty)
+            regions: Regions to scan (all enabled regions when empty)
+            report_name: Base report name
+            timeout: Overall deadline in seconds
+            max_concurrency: Maximum concurrent ScoutSuite processes
+            partition_timeout: Per-partition timeout (defaults to the overall timeout)
+        
+        Returns:
+            Merged ScoutSuite results with per-partition status
+        """
+        partitions = self._partition_scan(services, regions)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        
+        async def run_partition(service: str, partition_regions: list) -> dict:
+            suffix = f"{service}-{partition_regions[0]}" if len(partition_regions) == 1 else service
+            status = {'service': service, 'regions': partition_regions, 'report_name': f"{report_name}-{suffix}"}
+            
+            async with semaphore:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return {**status, 'status': 'timeout', 'duration_seconds': 0.0, 'findings_count': 0}
+                
+                started = loop.time()
+                try:
+                    result = await self._run_scoutsuite(
+                        aws_profile,
+                        [service],
+                        partition_regions,
+                        status['report_name'],
+                        min(partition_timeout or timeout, remaining),
+                        output_dir=f'/tmp/scoutsuite-{self.mission_id}/{suffix}'
+                    )
+                except Exception as e:
+                    logger.warning(f"ScoutSuite partition {suffix} failed: {e}")
+                    result = {'error': str(e)}
+                
+                return {
+                    **status,
+                    'status': 'timeout' if result.get('error') == 'timeout' else ('failed' if result.get('error') else 'completed'),
+                    'duration_seconds': round(loop.time() - started, 2),
+                    'findings_count': result.get('findings_count', 0),
+                    'result': result
+                }
+        
+        logger.info(f"ScoutSuite fan-out: {len(partitions)} partitions, concurrency={max_concurrency}")
+        outcomes = await asyncio.gather(*(run_partition(service, r) for service, r in partitions))
+        
+        # Merge completed partitions through the same accumulator as a single report
+        merged = self._new_parse_state()
+        usages = []
+        for outcome in outcomes:
+            result = outcome.pop('result', {})
+            usages.append(result.get('resource_usage', {}))
+            for service_name, service_data in result.get('raw_results', {}).get('services', {}).items():
+                if service_name not in merged['summary']['by_service']:
+                    self._add_service(merged, service_name)
+                for finding_name, finding_data in service_data.get('findings', {}).items():
+                    self._add_finding(merged, service_name, finding_name, finding_data)
+        
+        completed = sum(1 for o in outcomes if o['status'] == 'completed')
+        formatted = {
+            'tool': 'scoutsuite',
+            'version': await self._get_scoutsuite_version(),
+            'profile': aws_profile,
+            'report_name': report_name,
+            **merged,
+            'partial': completed < len(outcomes),
+            'partitions': outcomes,
+            'resource_usage': merge_usage(usages)
+        }
+        
+        if completed == 0 and outcomes:
+            formatted['error'] = 'timeout' if all(o['status'] == 'timeout' for o in outcomes) else 'all partitions failed'
+        
+        logger.info(f"ScoutSuite fan-out merged: {completed}/{len(outcomes)} partitions completed")
+        return formatted
+    
+    async def warm(self) -> dict:
+        """Run the warm-up steps (once) and return readiness status."""
+        return await self.warmup.wait()
+    
+    def _health(self) -> dict:
+        """Readiness, warm-up timings and cached capabilities for the `health` tool."""
+        return {
+            'success': True,
+            'tool': 'health',
+            **self.warmup.status(),
+            'version': self.tool_version,
+            'capabilities': self.capabilities
+        }
+    
     async def _get_scoutsuite_version(self) -> str:
-        """Get ScoutSuite version asynchronously."""
+        """Get ScoutSuite version asynchronously (probed once, then cached)."""
+        if self.tool_version:
+            return self.tool_version
+        
         try:
             process = await asyncio.create_subprocess_exec(
                 'scout',
@@ -261,120 +462,175 @@ class ScoutSuiteMCPServer:
                 stderr=asyncio.subprocess.PIPE
             )
             stdout, _ = await process.communicate()
-            return stdout.decode().strip()
+            self.tool_version = stdout.decode().strip()
+            return self.tool_version
         except Exception:
             return 'unknown'
     
-    def _count_findings(self, scout_data: dict) -> int:
-        """Count total findings from ScoutSuite results."""
-        count = 0
-        services = scout_data.get('services', {})
+    def _parse_results_file(self, results_file: Path) -> dict:
+        """
+        Stream a ScoutSuite results file into findings, count and summary.
         
-        for service_name, service_data in services.items():
-            findings = service_data.get('findings', {})
-            for finding_name, finding_data in findings.items():
-                flagged_items = finding_data.get('flagged_items', [])
-                count += len(flagged_items)
+        The report is a JS assignment wrapping a single JSON object that is
+        mostly resource inventory. It is fed to an incremental parser in
+        chunks and only each service's findings are materialized; the count
+        and summary are accumulated as findings complete.
+        """
+        parsed = self._new_parse_state()
         
-        return count
-    
-    def _create_summary(self, scout_data: dict) -> dict:
-        """Create summary from ScoutSuite results."""
-        services = scout_data.get('services', {})
-        summary = {
-            'services_scanned': len(services),
-            'by_severity': {'danger': 0, 'warning': 0, 'info': 0},
-            'by_service': {}
-        }
+        if not results_file.exists():
+            return parsed
         
-        for service_name, service_data in services.items():
-            service_findings = 0
-            findings = service_data.get('findings', {})
-            
-            for finding_name, finding_data in findings.items():
-                flagged_items = finding_data.get('flagged_items', [])
-                finding_count = len(flagged_items)
-                service_findings += finding_count
-                
-                # Count by severity
-                severity = finding_data.get('level', 'info')
-                if severity in summary['by_severity']:
-                    summary['by_severity'][severity] += finding_count
-            
-            summary['by_service'][service_name] = service_findings
+        events = ijson.sendable_list()
+        parser = ijson.parse_coro(events)
+        builder = None
+        finding_prefix = None
+        started = False
+        pending = b''
         
-        return summary
-    
-    async def _store_results(self, results: dict, report_name: str) -> dict:
-        """Store results in S3 and DynamoDB with evidence chain."""
-        timestamp = int(time.time())
+        def consume():
+            nonlocal builder, finding_prefix
+            for prefix, event, value in events:
+                if builder is not None:
+                    builder.event(event, value)
+                    if prefix == finding_prefix and event == 'end_map':
+                        _, service_name, _, finding_name = prefix.split('.', 3)
+                        self._add_finding(parsed, service_name, finding_name, builder.value)
+                        builder = None
+                elif prefix == 'services' and event == 'map_key':
+                    self._add_service(parsed, value)
+                elif event == 'start_map' and prefix.startswith('services.'):
+                    parts = prefix.split('.', 3)
+                    if len(parts) == 4 and parts[2] == 'findings':
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                        finding_prefix = prefix
+            del events[:]
         
-        # Compute digest
-        results_json = json.dumps(results, sort_keys=True)
-        digest = hashlib.sha256(results_json.encode()).hexdigest()
+        with open(results_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                # Skip the "scoutsuite_results =" assignment before the object
+                if not started:
+                    json_start = chunk.find(b'{')
+                    if json_start < 0:
+                        continue
+                    chunk = chunk[json_start:]
+                    started = True
+                
+                # Hold back one chunk so the trailing ";" can be stripped at EOF
+                if pending:
+                    parser.send(pending)
+                    consume()
+                pending = chunk
         
-        # Write to S3
-        s3_key = f"tool-results/scoutsuite-mcp/{self.mission_id}/{timestamp}/{report_name}-results.json"
+        if not started:
+            logger.warning(f"No JSON object found in ScoutSuite results: {results_file}")
+            return parsed
         
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=s3_key,
-                Body=results_json,
-                ContentType='application/json',
-                Metadata={
-                    'tool': 'scoutsuite-mcp',
-                    'mission-id': self.mission_id,
-                    'digest': f"sha256:{digest}",
-                    'report-name': report_name
-                }
-            )
-        )
-        
-        # Write digest file
-        digest_key = f"tool-results/scoutsuite-mcp/{self.mission_id}/{timestamp}/digest.sha256"
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=digest_key,
-                Body=f"sha256:{digest}",
-                ContentType='text/plain'
-            )
-        )
-        
-        # Index in DynamoDB
-        await loop.run_in_executor(
-            None,
-            lambda: self.dynamodb_client.put_item(
-                TableName=self.dynamodb_tool_results_table,
-                Item={
-                    'mission_id': {'S': self.mission_id},
-                    'tool_timestamp': {'S': f"scoutsuite-mcp#{timestamp}"},
-                    'tool_name': {'S': 'scoutsuite-mcp'},
-                    's3_uri': {'S': f"s3://{self.s3_artifacts_bucket}/{s3_key}"},
-                    'digest': {'S': f"sha256:{digest}"},
-                    'findings_count': {'N': str(results.get('findings_count', 0))},
-                    'success': {'BOOL': True},
-                    'report_name': {'S': report_name},
-                    'ttl': {'N': str(timestamp + (7 * 24 * 60 * 60))}
-                }
-            )
-        )
+        parser.send(pending.rstrip().rstrip(b';'))
+        parser.close()
+        consume()
+        
+        return parsed
+    
+    def _encode_result(self, result: dict) -> str:
+        """
+        Encode a scan response in the shared normalized finding format.
         
-        logger.info(f"Results stored: s3://{self.s3_artifacts_bucket}/{s3_key}")
-        logger.info(f"Evidence chain digest: sha256:{digest}")
+        Each ScoutSuite rule that flagged resources becomes one finding whose
+        path is the AWS service and whose snippet lists the flagged items.
+        """
+        results = result.get('results', {})
+        findings = []
+        for service_name, service_data in results.get('raw_results', {}).get('services', {}).items():
+            for finding_name, finding_data in service_data.get('findings', {}).items():
+                items = finding_data.get('items', [])
+                findings.append(Finding(
+                    tool='scoutsuite',
+                    rule=finding_name,
+                    severity=finding_data.get('level', 'info'),
+                    path=service_name,
+                    snippet='\n'.join(items) if isinstance(items, list) else str(items),
+                    message=finding_data.get('description', '')
+                ))
         
+        return encode_tool_result(result, findings, extra={
+            key: results[key]
+            for key in ('version', 'partial', 'partitions', 'error')
+            if key in results
+        })
+    
+    def _new_parse_state(self) -> dict:
         return {
-            "s3_uri": f"s3://{self.s3_artifacts_bucket}/{s3_key}",
-            "digest": f"sha256:{digest}",
-            "timestamp": timestamp
+            'findings_count': 0,
+            'summary': {
+                'services_scanned': 0,
+                'by_severity': {'danger': 0, 'warning': 0, 'info': 0},
+                'by_service': {}
+            },
+            'raw_results': {'services': {}}
         }
     
+    def _add_service(self, parsed: dict, service_name: str):
+        parsed['summary']['services_scanned'] += 1
+        parsed['summary']['by_service'][service_name] = 0
+        parsed['raw_results']['services'][service_name] = {'findings': {}}
+    
+    def _add_finding(self, parsed: dict, service_name: str, finding_name: str, finding_data: dict):
+        """Fold one finding into the running count and summary."""
+        # ScoutSuite reports flagged_items as a count; older exports list the items
+        flagged_items = finding_data.get('flagged_items', 0)
+        finding_count = flagged_items if isinstance(flagged_items, int) else len(flagged_items)
+        
+        parsed['findings_count'] += finding_count
+        parsed['summary']['by_service'][service_name] += finding_count
+        
+        # Count by severity
+        severity = finding_data.get('level', 'info')
+        if severity in parsed['summary']['by_severity']:
+            parsed['summary']['by_severity'][severity] += finding_count
+        
+        findings = parsed['raw_results']['services'][service_name]['findings']
+        existing = findings.get(finding_name)
+        if existing is None:
+            findings[finding_name] = finding_data
+            return
+        
+        # Same finding reported by another region's partition
+        existing_flagged = existing.get('flagged_items', 0)
+        if isinstance(existing_flagged, list) and isinstance(flagged_items, list):
+            existing['flagged_items'] = existing_flagged + flagged_items
+        else:
+            existing_count = existing_flagged if isinstance(existing_flagged, int) else len(existing_flagged)
+            existing['flagged_items'] = existing_count + finding_count
+        existing['items'] = existing.get('items', []) + finding_data.get('items', [])
+        if isinstance(existing.get('checked_items'), int):
+            existing['checked_items'] += finding_data.get('checked_items', 0)
+    
+    def _summarize(self, scout_data: dict) -> dict:
+        """Run already-decoded ScoutSuite results through the same accumulator."""
+        parsed = self._new_parse_state()
+        
+        for service_name, service_data in scout_data.get('services', {}).items():
+            self._add_service(parsed, service_name)
+            for finding_name, finding_data in service_data.get('findings', {}).items():
+                self._add_finding(parsed, service_name, finding_name, finding_data)
+        
+        return parsed
+    
+    def _count_findings(self, scout_data: dict) -> int:
+        """Count total findings from ScoutSuite results."""
+        return self._summarize(scout_data)['findings_count']
+    
+    def _create_summary(self, scout_data: dict) -> dict:
+        """Create summary from ScoutSuite results."""
+        return self._summarize(scout_data)['summary']
+    
     async def run(self):
         """Start MCP server with stdio transport."""
+        # Warm up while the client connects; tool calls wait for it
+        self.warmup.start()
+        
         async with stdio_server() as (read_stream, write_stream):
             logger.info("ScoutSuite MCP Server starting with stdio transport")
             await self.server.run(
@@ -5,14 +5,16 @@ Implements JSON-RPC 2.0 protocol for security scanning tool integration.
 
 import os
 import json
-import subprocess
 import hashlib
+import subprocess
 import asyncio
 import boto3
+import ijson
 import logging
+import tempfile
+import urllib.request
 from pathlib import Path
-from typing import Any, Sequence
-import time
+from typing import Any, Optional, Sequence
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -25,9 +27,15 @@ from mcp.types import (
     INTERNAL_ERROR
 )
 
+from src.shared.mcp_server import Finding, ResourceGovernor, ServerWarmup, encode_tool_result
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Configs the registry resolves per project (from the languages it detects),
+# so there is no fixed ruleset to cache; they always run live
+LIVE_CONFIGS = ('auto',)
+
 
 class SemgrepMCPServer:
     """MCP-compliant server for Semgrep security scanning."""
@@ -36,6 +44,30 @@ class SemgrepMCPServer:
         self.server = Server("semgrep-mcp")
         self.mission_id = os.environ.get('MISSION_ID', 'test-scan-123')
         
+        self.s3_artifacts_bucket = os.environ.get('S3_ARTIFACTS_BUCKET', 'test-bucket')
+        
+        region = os.environ.get('AWS_REGION', 'us-east-1')
+        self.s3_client = boto3.client('s3', region_name=region)
+        
+        # Registry rulesets the Coordinator sends (its degraded config by
+        # default), fetched at warm-up so scans resolve them locally
+        self.rules_cache_dir = Path(os.environ.get('SEMGREP_RULES_CACHE_DIR', '/tmp/semgrep-rules'))
+        self.warm_configs = [
+            c.strip() for c in os.environ.get('SEMGREP_WARM_CONFIGS', 'p/owasp-top-ten').split(',') if c.strip()
+        ]
+        self.rules_fetch_timeout = float(os.environ.get('SEMGREP_RULES_FETCH_TIMEOUT', '30'))
+        self.cached_rulesets: dict = {}
+        
+        # First-use work done once at process start rather than on the first scan
+        self.tool_version: Optional[str] = None
+        self.capabilities: dict = {}
+        self.warmup = ServerWarmup("semgrep-mcp")
+        self.warmup.add_step('version', self._get_semgrep_version)
+        self.warmup.add_step('rules', self._prefetch_rulesets)
+        
+        # CPU, memory and file limits applied to every Semgrep run
+        self.governor = ResourceGovernor('semgrep')
+        
         # Register MCP handlers
         self._register_handlers()
         
@@ -71,6 +103,20 @@ class SemgrepMCPServer:
                         },
                         "required": ["source_path"]
                     }
+                ),
+                Tool(
+                    name="health",
+                    description="Report server readiness, cached tool version and capabilities, and warm-up timings",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "wait_seconds": {
+                                "type": "number",
+                                "description": "Wait up to this long for warm-up before reporting"
+                            }
+                        },
+                        "required": []
+                    }
                 )
             ]
         
@@ -78,11 +124,22 @@ class SemgrepMCPServer:
         async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
             """Execute tool - MCP protocol requirement."""
             try:
+                if name == "health":
+                    if arguments and arguments.get("wait_seconds"):
+                        await self.warmup.wait(float(arguments["wait_seconds"]))
+                    return [TextContent(
+                        type="text",
+                        text=json.dumps(self._health(), separators=(',', ':'))
+                    )]
+                
+                # Calls arriving during warm-up wait for it rather than redo its work
+                await self.warmup.wait()
+                
                 if name == "semgrep_scan":
                     result = await self._execute_semgrep_scan(arguments)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=self._encode_result(result, arguments.get("source_path"))
                     )]
                 else:
                     raise ValueError(f"Unknown tool: {name}")
@@ -124,10 +181,8 @@ class SemgrepMCPServer:
             "findings_count": len(results.get('results', [])),
             "results": results,
             "summary": {
-                "critical": sum(1 for r in results.get('results', []) if r.get('severity') == 'CRITICAL'),
-                "high": sum(1 for r in results.get('results', []) if r.get('severity') == 'HIGH'),
-                "medium": sum(1 for r in results.get('results', []) if r.get('severity') == 'MEDIUM'),
-                "low": sum(1 for r in results.get('results', []) if r.get('severity') == 'LOW')
+                **results.get('summary', self._new_summary()),
+                "resource_usage": results.get('resource_usage', {})
             }
         }
     
@@ -173,43 +228,37 @@ class SemgrepMCPServer:
     
     async def _run_semgrep(self, source_path: Path, config: str, timeout: int) -> dict:
         """Run Semgrep scan asynchronously."""
+        # A private report per scan: concurrent scans of one mission must not share it
+        fd, report_path = tempfile.mkstemp(prefix='semgrep-report-', suffix='.json')
+        os.close(fd)
         try:
-            # Run Semgrep as subprocess asynchronously
-            process = await asyncio.create_subprocess_exec(
+            # Run Semgrep as subprocess asynchronously; the report goes to a file
+            # so it can be parsed incrementally instead of buffered from stdout
+            process = await self.governor.spawn(
                 'semgrep',
-                f'--config={config}',
+                f'--config={self._resolve_config(config)}',
                 '--json',
+                '--output', report_path,
                 str(source_path),
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout
-            )
+            stdout, stderr, usage = await self.governor.communicate(process, timeout=timeout)
             
             if process.returncode in [0, 1]:  # 0 = clean, 1 = findings
-                output = json.loads(stdout.decode())
-                
                 # Format results
                 formatted = {
                     'tool': 'semgrep',
                     'version': await self._get_semgrep_version(),
                     'config': config,
-                    'results': []
+                    'results': [],
+                    'summary': self._new_summary(),
+                    'resource_usage': usage
                 }
                 
-                for finding in output.get('results', []):
-                    formatted['results'].append({
-                        'rule_id': finding.get('check_id'),
-                        'severity': finding.get('extra', {}).get('severity', 'UNKNOWN'),
-                        'message': finding.get('extra', {}).get('message', ''),
-                        'file': finding.get('path', ''),
-                        'line_start': finding.get('start', {}).get('line', 0),
-                        'line_end': finding.get('end', {}).get('line', 0),
-                        'code_snippet': finding.get('extra', {}).get('lines', '')
-                    })
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(None, self._parse_report, report_path, formatted)
                 
                 return formatted
             else:
@@ -218,9 +267,130 @@ class SemgrepMCPServer:
         except asyncio.TimeoutError:
             logger.error(f"Semgrep timeout after {timeout} seconds")
             return {'tool': 'semgrep', 'error': 'timeout', 'results': []}
+        finally:
+            try:
+                os.unlink(report_path)
+            except OSError:
+                pass
+    
+    def _parse_report(self, report_path: str, formatted: dict):
+        """
+        Stream findings out of a Semgrep JSON report.
+        
+        Findings are decoded one at a time, reshaped into the server's result
+        format and counted into the summary, so the raw report is never held
+        in memory as a whole.
+        """
+        try:
+            with open(report_path, 'rb') as f:
+                for finding in ijson.items(f, 'results.item'):
+                    extra = finding.get('extra', {})
+                    severity = extra.get('severity', 'UNKNOWN')
+                    formatted['results'].append({
+                        'rule_id': finding.get('check_id'),
+                        'severity': severity,
+                        'message': extra.get('message', ''),
+                        'file': finding.get('path', ''),
+                        'line_start': finding.get('start', {}).get('line', 0),
+                        'line_end': finding.get('end', {}).get('line', 0),
+                        'code_snippet': extra.get('lines', '')
+                    })
+                    
+                    key = severity.lower()
+                    if key in formatted['summary']:
+                        formatted['summary'][key] += 1
+        except FileNotFoundError:
+            logger.warning(f"Semgrep report not found: {report_path}")
+        except ijson.JSONError as e:
+            logger.warning(f"Semgrep report truncated or malformed after {len(formatted['results'])} findings: {e}")
+    
+    def _encode_result(self, result: dict, source_path: str = None) -> str:
+        """Encode a scan response in the shared normalized finding format."""
+        results = result.get('results', {})
+        findings = [
+            Finding(
+                tool='semgrep',
+                rule=r.get('rule_id') or 'unknown',
+                severity=r.get('severity'),
+                path=r.get('file', ''),
+                line_start=r.get('line_start', 0),
+                line_end=r.get('line_end', 0),
+                snippet=r.get('code_snippet', ''),
+                message=r.get('message', '')
+            )
+            for r in results.get('results', [])
+        ]
+        return encode_tool_result(result, findings, root=source_path, extra={
+            'version': results.get('version'),
+            'config': results.get('config'),
+            'error': results.get('error')
+        })
+    
+    def _new_summary(self) -> dict:
+        return {"critical": 0, "high": 0, "medium": 0, "low": 0}
+    
+    async def warm(self) -> dict:
+        """Run the warm-up steps (once) and return readiness status."""
+        return await self.warmup.wait()
+    
+    def _health(self) -> dict:
+        """Readiness, warm-up timings and cached capabilities for the `health` tool."""
+        return {
+            'success': True,
+            'tool': 'health',
+            **self.warmup.status(),
+            'version': self.tool_version,
+            'capabilities': self.capabilities
+        }
+    
+    async def _prefetch_rulesets(self) -> list:
+        """Download configured registry rulesets into the local rules cache."""
+        self.rules_cache_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_event_loop()
+        
+        for config in self.warm_configs:
+            if config in LIVE_CONFIGS:
+                logger.warning(f"Semgrep config {config} is resolved per project, not caching it")
+                continue
+            target = self.rules_cache_dir / (config.replace('/', '_') + '.yml')
+            if not target.exists():
+                try:
+                    await loop.run_in_executor(None, self._download_ruleset, config, target)
+                except Exception as e:
+                    # Scans with this config fetch it live instead
+                    logger.warning(f"Could not prefetch Semgrep ruleset {config}: {e}")
+                    continue
+            self.cached_rulesets[config] = target
+        
+        self.capabilities['cached_rulesets'] = sorted(self.cached_rulesets)
+        
+        # Registry rulesets change under the same name; a digest per config
+        # lets memoized results be invalidated when the rules they ran change
+        self.capabilities['rulesets'] = {
+            config: f"sha256:{hashlib.sha256(config.encode() + path.read_bytes()).hexdigest()}"
+            for config, path in sorted(self.cached_rulesets.items())
+        }
+        return sorted(self.cached_rulesets)
+    
+    def _download_ruleset(self, config: str, target: Path):
+        """Fetch a registry ruleset, replacing the cached copy only once complete."""
+        url = f"https://semgrep.dev/c/{config}"
+        with urllib.request.urlopen(url, timeout=self.rules_fetch_timeout) as response:
+            body = response.read()
+        partial = target.with_name(target.name + '.part')
+        partial.write_bytes(body)
+        partial.replace(target)
+    
+    def _resolve_config(self, config: str) -> str:
+        """Use the warmed local copy of a registry ruleset when one exists."""
+        cached = self.cached_rulesets.get(config)
+        return str(cached) if cached and cached.exists() else config
     
     async def _get_semgrep_version(self) -> str:
-        """Get Semgrep version asynchronously."""
+        """Get Semgrep version asynchronously (probed once, then cached)."""
+        if self.tool_version:
+            return self.tool_version
+        
         try:
             process = await asyncio.create_subprocess_exec(
                 'semgrep',
@@ -229,74 +399,16 @@ class SemgrepMCPServer:
                 stderr=asyncio.subprocess.PIPE
             )
             stdout, _ = await process.communicate()
-            return stdout.decode().strip()
+            self.tool_version = stdout.decode().strip()
+            return self.tool_version
         except Exception:
             return 'unknown'
     
-    async def _store_results(self, results: dict) -> dict:
-        """Store results in S3 and DynamoDB with evidence chain."""
-        timestamp = int(time.time())
-        
-        # Compute cryptographic digest for evidence chain
-        results_json = json.dumps(results, sort_keys=True)
-        digest = hashlib.sha256(results_json.encode()).hexdigest()
-        
-        # Write to S3
-        s3_key = f"tool-results/semgrep-mcp/{self.mission_id}/{timestamp}/results.json"
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            self.s3_client.put_object,
-            self.s3_artifacts_bucket,
-            s3_key,
-            results_json,
-            'application/json',
-            {'tool': 'semgrep-mcp', 'mission-id': self.mission_id, 'digest': f"sha256:{digest}"}
-        )
-        
-        # Write digest file for evidence chain
-        digest_key = f"tool-results/semgrep-mcp/{self.mission_id}/{timestamp}/digest.sha256"
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=digest_key,
-                Body=f"sha256:{digest}",
-                ContentType='text/plain'
-            )
-        )
-        
-        # Index in DynamoDB
-        await loop.run_in_executor(
-            None,
-            lambda: self.dynamodb_client.put_item(
-                TableName=self.dynamodb_tool_results_table,
-                Item={
-                    'mission_id': {'S': self.mission_id},
-                    'tool_timestamp': {'S': f"semgrep-mcp#{timestamp}"},
-                    'tool_name': {'S': 'semgrep-mcp'},
-                    's3_uri': {'S': f"s3://{self.s3_artifacts_bucket}/{s3_key}"},
-                    'digest': {'S': f"sha256:{digest}"},
-                    'findings_count': {'N': str(len(results.get('results', [])))},
-                    'success': {'BOOL': True},
-                    'execution_duration_ms': {'N': str(results.get('scan_duration_ms', 0))},
-                    'ttl': {'N': str(timestamp + (7 * 24 * 60 * 60))}
-                }
-            )
-        )
-        
-        logger.info(f"Results stored: s3://{self.s3_artifacts_bucket}/{s3_key}")
-        logger.info(f"Evidence chain digest: sha256:{digest}")
-        
-        return {
-            "s3_uri": f"s3://{self.s3_artifacts_bucket}/{s3_key}",
-            "digest": f"sha256:{digest}",
-            "timestamp": timestamp
-        }
-    
     async def run(self):
         """Start MCP server with stdio transport."""
+        # Warm up while the client connects; tool calls wait for it
+        self.warmup.start()
+        
         async with stdio_server() as (read_stream, write_stream):
             logger.info("Semgrep MCP Server starting with stdio transport")
             await self.server.run(
@@ -8,9 +8,14 @@ import json
 import asyncio
 import hashlib
 import boto3
+import ijson
+import sys
+import shutil
 import logging
+import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Optional, Sequence
 import time
 
 from mcp.server import Server
@@ -22,17 +27,391 @@ from mcp.types import (
     EmbeddedResource
 )
 
+from src.shared.mcp_server import Finding, ResourceGovernor, ServerWarmup, encode_tool_result
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class TrivyDBCache:
+    """
+    Managed Trivy vulnerability DB cache shared by all scans in the process.
+    
+    Each downloaded DB is kept as a versioned snapshot under
+    ``<root>/snapshots/<version>/``, laid out as a regular Trivy cache dir.
+    Scans pin the active snapshot and run with ``--skip-db-update`` and
+    ``--offline-scan``; refreshes download into a staging directory and
+    are swapped in out of band, so a scan never sees a half-written DB.
+    
+    A snapshot baked into the image is stale within hours, so refreshing
+    from every mission process would download the DB in every container.
+    By default (TRIVY_DB_REFRESH=external) refreshes happen outside the
+    mission - at image build, or by ``server.py --refresh-db`` writing to a
+    shared TRIVY_CACHE_DIR - and processes pick up the snapshot CURRENT
+    names. TRIVY_DB_REFRESH=background refreshes stale snapshots in process.
+    """
+    
+    CURRENT_FILE = 'CURRENT'
+    SNAPSHOTS_DIR = 'snapshots'
+    
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        offline: Optional[bool] = None,
+        max_age_hours: Optional[int] = None,
+        refresh: Optional[str] = None
+    ):
+        self.root = Path(root or os.environ.get('TRIVY_CACHE_DIR', '/var/cache/trivy-db'))
+        if offline is None:
+            offline = os.environ.get('TRIVY_OFFLINE', 'false').lower() == 'true'
+        self.offline = offline
+        self.refresh_mode = (refresh or os.environ.get('TRIVY_DB_REFRESH', 'external')).lower()
+        self.max_age_hours = max_age_hours or int(os.environ.get('TRIVY_DB_MAX_AGE_HOURS', '24'))
+        
+        self.active_snapshot: Optional[Path] = None
+        self.metadata: dict = {}
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    @property
+    def ready(self) -> bool:
+        """Whether a DB snapshot is loaded and scans can run offline."""
+        return self.active_snapshot is not None
+    
+    @property
+    def version(self) -> str:
+        """Version label of the active snapshot (stable cache key for results)."""
+        return self.active_snapshot.name if self.active_snapshot else 'unknown'
+    
+    async def warm(self) -> bool:
+        """
+        Load the newest local snapshot, downloading one only if none exists.
+        
+        Returns:
+            True if a snapshot is active after warm-up
+        """
+        if self._refresh_lock.locked():
+            # A scan that stopped waiting for warm-up shares its download
+            async with self._refresh_lock:
+                pass
+            if self.ready:
+                return True
+        
+        snapshot = self._find_local_snapshot()
+        if snapshot:
+            self._activate(snapshot)
+        elif self.offline:
+            logger.error(f"Trivy offline mode enabled but no DB snapshot found under {self.root}")
+            return False
+        else:
+            await self.refresh()
+        
+        if self.ready:
+            logger.info(f"Trivy DB snapshot loaded: {self.version}")
+            if self.refresh_mode != 'background' and self.is_stale():
+                logger.warning(f"Trivy DB snapshot {self.version} is stale; refresh it with server.py --refresh-db")
+            self.schedule_refresh_if_stale()
+        return self.ready
+    
+    async def ensure_ready(self) -> bool:
+        """Warm the cache on first use; no-op once a snapshot is active."""
+        if self.ready:
+            self.schedule_refresh_if_stale()
+            return True
+        return await self.warm()
+    
+    def scan_args(self) -> list:
+        """Trivy CLI flags pinning scans to the active snapshot."""
+        if self.ready:
+            return [
+                '--cache-dir', str(self.active_snapshot),
+                '--skip-db-update',
+                '--offline-scan'
+            ]
+        if self.offline:
+            return ['--cache-dir', str(self.root), '--skip-db-update', '--offline-scan']
+        # Cold fallback: let trivy download into the shared root
+        return ['--cache-dir', str(self.root)]
+    
+    def is_stale(self) -> bool:
+        """Check snapshot freshness against NextUpdate / DownloadedAt metadata."""
+        if not self.ready:
+            return True
+        
+        now = datetime.now(timezone.utc)
+        next_update = self._parse_time(self.metadata.get('NextUpdate'))
+        if next_update and now >= next_update:
+            return True
+        
+        downloaded_at = self._parse_time(self.metadata.get('DownloadedAt'))
+        if downloaded_at:
+            age_hours = (now - downloaded_at).total_seconds() / 3600
+            return age_hours >= self.max_age_hours
+        
+        return next_update is None
+    
+    def schedule_refresh_if_stale(self):
+        """
+        Keep the active snapshot current without blocking scans.
+        
+        Picks up a snapshot refreshed outside the process, or with
+        TRIVY_DB_REFRESH=background starts a refresh when the snapshot is stale.
+        """
+        if self.refresh_mode != 'background':
+            self._reload_current()
+            return
+        if self.offline or not self.is_stale():
+            return
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        
+        logger.info(f"Trivy DB snapshot {self.version} is stale, refreshing in background")
+        self._refresh_task = asyncio.create_task(self.refresh())
+    
+    async def refresh(self) -> bool:
+        """Download a fresh DB into a staging dir and atomically activate it."""
+        if self.offline:
+            return False
+        
+        async with self._refresh_lock:
+            snapshots_dir = self.root / self.SNAPSHOTS_DIR
+            staging = snapshots_dir / f".staging-{os.getpid()}-{int(time.time())}"
+            
+            try:
+                snapshots_dir.mkdir(parents=True, exist_ok=True)
+                process = await asyncio.create_subprocess_exec(
+                    'trivy',
+                    'image',
+                    '--download-db-only',
+                    '--cache-dir', str(staging),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=600)
+                
+                if process.returncode != 0:
+                    raise Exception(f"Trivy DB download failed: {stderr.decode()}")
+                
+                metadata = self._read_metadata(staging)
+                snapshot = snapshots_dir / self._snapshot_name(metadata)
+                if snapshot.exists():
+                    shutil.rmtree(staging, ignore_errors=True)
+                else:
+                    staging.rename(snapshot)
+                
+                self._activate(snapshot)
+                self._prune_snapshots()
+                logger.info(f"Trivy DB snapshot refreshed: {self.version}")
+                return True
+            
+            except Exception as e:
+                logger.warning(f"Trivy DB refresh failed, keeping snapshot {self.version}: {e}")
+                shutil.rmtree(staging, ignore_errors=True)
+                return False
+    
+    def _activate(self, snapshot: Path):
+        """Point scans at a snapshot and persist the choice for other processes."""
+        self.metadata = self._read_metadata(snapshot)
+        self.active_snapshot = snapshot
+        try:
+            (self.root / self.CURRENT_FILE).write_text(snapshot.name)
+        except OSError as e:
+            logger.warning(f"Could not record current Trivy DB snapshot: {e}")
+    
+    def _reload_current(self):
+        """Activate the snapshot CURRENT names if an outside refresh changed it."""
+        try:
+            name = (self.root / self.CURRENT_FILE).read_text().strip()
+        except OSError:
+            return
+        if not name or (self.active_snapshot and name == self.active_snapshot.name):
+            return
+        candidate = self.root / self.SNAPSHOTS_DIR / name
+        if (candidate / 'db' / 'metadata.json').exists():
+            self._activate(candidate)
+            logger.info(f"Trivy DB snapshot switched to {self.version}")
+    
+    def _find_local_snapshot(self) -> Optional[Path]:
+        """Locate the snapshot recorded in CURRENT, else the newest valid one."""
+        snapshots_dir = self.root / self.SNAPSHOTS_DIR
+        current_file = self.root / self.CURRENT_FILE
+        
+        if current_file.exists():
+            candidate = snapshots_dir / current_file.read_text().strip()
+            if (candidate / 'db' / 'metadata.json').exists():
+                return candidate
+        
+        if not snapshots_dir.exists():
+            return None
+        
+        candidates = [
+            p for p in snapshots_dir.iterdir()
+            if not p.name.startswith('.') and (p / 'db' / 'metadata.json').exists()
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda p: (p / 'db' / 'metadata.json').stat().st_mtime)
+    
+    def _prune_snapshots(self, keep: int = 2):
+        """Remove old snapshots, keeping the active one and its predecessor for in-flight scans."""
+        snapshots_dir = self.root / self.SNAPSHOTS_DIR
+        snapshots = sorted(
+            (p for p in snapshots_dir.iterdir() if not p.name.startswith('.')),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for old in snapshots[keep:]:
+            if old != self.active_snapshot:
+                shutil.rmtree(old, ignore_errors=True)
+    
+    def _read_metadata(self, snapshot: Path) -> dict:
+        """Read Trivy's db/metadata.json from a snapshot."""
+        try:
+            with open(snapshot / 'db' / 'metadata.json', 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def _snapshot_name(self, metadata: dict) -> str:
+        """Derive a versioned snapshot name from DB metadata."""
+        updated_at = self._parse_time(metadata.get('UpdatedAt'))
+        stamp = updated_at.strftime('%Y%m%dT%H%M%SZ') if updated_at else str(int(time.time()))
+        return f"v{metadata.get('Version', 0)}-{stamp}"
+    
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[datetime]:
+        """Parse Trivy metadata timestamps (RFC 3339, possibly with nanoseconds)."""
+        if not value:
+            return None
+        try:
+            value = value.replace('Z', '+00:00')
+            if '.' in value:
+                head, tail = value.split('.', 1)
+                frac = ''.join(c for c in tail if c.isdigit())
+                tz = tail[len(frac):]
+                value = f"{head}.{frac[:6]}{tz}"
+            parsed = datetime.fromisoformat(value)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+
+
+class LockfileResultCache:
+    """
+    Persistent per-lockfile vulnerability cache shared across missions.
+    
+    Entries are keyed on (lockfile digest, DB snapshot version) and hold the
+    formatted vulnerabilities for every severity, so any severity filter can
+    be served from one entry. The cache directory is bounded by a byte
+    budget and evicted least-recently-used first (hits refresh mtime).
+    """
+    
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        default_root = Path(os.environ.get('TRIVY_CACHE_DIR', '/var/cache/trivy-db')) / 'lockfile-results'
+        self.root = Path(root or os.environ.get('TRIVY_RESULT_CACHE_DIR', str(default_root)))
+        self.max_bytes = max_bytes or int(os.environ.get('TRIVY_RESULT_CACHE_MAX_MB', '256')) * 1024 * 1024
+    
+    def _entry_path(self, lockfile_digest: str, db_version: str) -> Path:
+        return self.root / lockfile_digest[:2] / f"{lockfile_digest}-{db_version}.json"
+    
+    def get(self, lockfile_digest: str, db_version: str) -> Optional[list]:
+        """Return cached vulnerabilities for a lockfile, or None on miss."""
+        path = self._entry_path(lockfile_digest, db_version)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry.get('vulnerabilities', [])
+        except (OSError, ValueError):
+            return None
+    
+    def put(self, lockfile_digest: str, db_version: str, vulnerabilities: list):
+        """Store vulnerabilities for a lockfile and enforce the size budget."""
+        path = self._entry_path(lockfile_digest, db_version)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".tmp-{os.getpid()}")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'lockfile_digest': lockfile_digest,
+                    'db_version': db_version,
+                    'vulnerabilities': vulnerabilities
+                }, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write lockfile cache entry {path}: {e}")
+            return
+        
+        self._evict()
+    
+    def _evict(self):
+        """Delete least-recently-used entries until the cache fits its budget."""
+        try:
+            entries = [(p.stat(), p) for p in self.root.glob('*/*.json')]
+        except OSError:
+            return
+        
+        total = sum(st.st_size for st, _ in entries)
+        if total <= self.max_bytes:
+            return
+        
+        for st, path in sorted(entries, key=lambda e: e[0].st_mtime):
+            try:
+                path.unlink()
+                total -= st.st_size
+            except OSError:
+                continue
+            if total <= self.max_bytes:
+                break
+
+
 class TrivyMCPServer:
     """MCP-compliant server for Trivy vulnerability scanning."""
     
+    # Dependency lockfiles whose resolution dominates vuln scan time, with the
+    # manifest Trivy reads alongside each one (part of the cache key)
+    LOCKFILES = {
+        'requirements.txt': None,
+        'Pipfile.lock': 'Pipfile',
+        'poetry.lock': 'pyproject.toml',
+        'package-lock.json': 'package.json',
+        'yarn.lock': 'package.json',
+        'pnpm-lock.yaml': 'package.json',
+        'go.sum': 'go.mod',
+        'Gemfile.lock': None,
+        'Cargo.lock': None,
+        'composer.lock': None,
+        'packages.lock.json': None
+    }
+    # Lockfiles whose results Trivy reports under the manifest's Target instead
+    REPORTED_AS = {
+        'go.sum': 'go.mod'
+    }
+    ALL_SEVERITIES = 'UNKNOWN,LOW,MEDIUM,HIGH,CRITICAL'
+    
     def __init__(self):
         self.server = Server("trivy-mcp")
         self.mission_id = os.environ.get('MISSION_ID', 'test-scan-123')
         
+        self.s3_artifacts_bucket = os.environ.get('S3_ARTIFACTS_BUCKET', 'test-bucket')
+        
+        region = os.environ.get('AWS_REGION', 'us-east-1')
+        self.s3_client = boto3.client('s3', region_name=region)
+        
+        # Vulnerability DB snapshot shared by every scan in this process
+        self.db_cache = TrivyDBCache()
+        self.lockfile_cache = LockfileResultCache()
+        
+        # First-use work done once at process start rather than on the first scan
+        self.tool_version: Optional[str] = None
+        self.capabilities: dict = {}
+        self.warmup = ServerWarmup("trivy-mcp")
+        self.warmup.add_step('version', self._get_trivy_version)
+        self.warmup.add_step('vulnerability_db', self._warm_vulnerability_db)
+        
+        # CPU, memory and file limits applied to every Trivy scan
+        self.governor = ResourceGovernor('trivy')
+        
         # Register MCP handlers
         self._register_handlers()
         
@@ -95,6 +474,20 @@ class TrivyMCPServer:
                         },
                         "required": ["image_name"]
                     }
+                ),
+                Tool(
+                    name="health",
+                    description="Report server readiness, cached tool version and capabilities, and warm-up timings",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "wait_seconds": {
+                                "type": "number",
+                                "description": "Wait up to this long for warm-up before reporting"
+                            }
+                        },
+                        "required": []
+                    }
                 )
             ]
         
@@ -102,18 +495,29 @@ class TrivyMCPServer:
         async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
             """Execute tool - MCP protocol requirement."""
             try:
+                if name == "health":
+                    if arguments and arguments.get("wait_seconds"):
+                        await self.warmup.wait(float(arguments["wait_seconds"]))
+                    return [TextContent(
+                        type="text",
+                        text=json.dumps(self._health(), separators=(',', ':'))
+                    )]
+                
+                # Calls arriving during warm-up wait for it rather than redo its work
+                await self.warmup.wait()
+                
                 if name == "trivy_fs_scan":
                     result = await self._execute_fs_scan(arguments)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=self._encode_result(result, arguments.get("source_path"))
                     )]
                 
                 elif name == "trivy_image_scan":
                     result = await self._execute_image_scan(arguments)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=self._encode_result(result)
                     )]
                 else:
                     raise ValueError(f"Unknown tool: {name}")
@@ -144,6 +548,8 @@ class TrivyMCPServer:
         if not local_path.exists():
             raise FileNotFoundError(f"Source path does not exist: {source_path}")
         
+        await self.db_cache.ensure_ready()
+        
         # Execute Trivy
         results = await self._run_trivy_fs(local_path, scan_type, severity, timeout)
         
@@ -166,6 +572,8 @@ class TrivyMCPServer:
         
         logger.info(f"Starting Trivy image scan: image={image_name}, severity={severity}")
         
+        await self.db_cache.ensure_ready()
+        
         results = await self._run_trivy_image(image_name, severity)
         
         # Return MCP-compliant response with results
@@ -219,8 +627,24 @@ class TrivyMCPServer:
     
     async def _run_trivy_fs(self, source_path: Path, scan_type: str, severity: str, timeout: int) -> dict:
         """Run Trivy filesystem scan asynchronously."""
+        # A private report per scan: concurrent scans of one mission must not share it
+        fd, report_path = tempfile.mkstemp(prefix='trivy-report-', suffix='.json')
+        os.close(fd)
         try:
-            report_path = f'/tmp/trivy-report-{self.mission_id}.json'
+            # Lockfile memoization only applies to vuln scans against a pinned DB
+            memoize = scan_type == 'vuln' and self.db_cache.ready
+            lockfiles = self._find_lockfiles(source_path) if memoize else {}
+            cached_results = []
+            pending_lockfiles = {}
+            
+            for relative_path, digest in lockfiles.items():
+                vulns = self.lockfile_cache.get(digest, self.db_cache.version)
+                if vulns is None:
+                    pending_lockfiles[relative_path] = digest
+                else:
+                    cached_results.extend({**v, 'target': relative_path} for v in vulns)
+            
+            skipped_lockfiles = [p for p in lockfiles if p not in pending_lockfiles]
             
             # Build command
             cmd = [
@@ -228,55 +652,69 @@ class TrivyMCPServer:
                 'fs',
                 '--format', 'json',
                 '--output', report_path,
-                '--severity', severity
+                # Memoized scans resolve every severity so entries serve any filter
+                '--severity', self.ALL_SEVERITIES if memoize else severity
             ]
+            cmd.extend(self.db_cache.scan_args())
             
             if scan_type != "all":
                 cmd.extend(['--scanners', scan_type])
             
+            for relative_path in skipped_lockfiles:
+                cmd.extend(['--skip-files', relative_path])
+                lockfile = self._reported_lockfile(relative_path)
+                if lockfile != relative_path:
+                    cmd.extend(['--skip-files', lockfile])
+            
             cmd.append(str(source_path))
             
             # Run Trivy
-            process = await asyncio.create_subprocess_exec(
+            process = await self.governor.spawn(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout
-            )
+            stdout, stderr, usage = await self.governor.communicate(process, timeout=timeout)
             
             if process.returncode in [0, 1]:  # 0 = clean, 1 = vulns found
-                try:
-                    with open(report_path, 'r') as f:
-                        trivy_output = json.load(f)
-                except Exception:
-                    trivy_output = {}
-                
                 # Format results
                 formatted = {
                     'tool': 'trivy',
                     'version': await self._get_trivy_version(),
                     'scan_type': scan_type,
-                    'results': []
+                    'db_version': self.db_cache.version,
+                    'results': [],
+                    'resource_usage': usage
                 }
                 
                 # Parse Trivy results
-                for result in trivy_output.get('Results', []):
-                    target = result.get('Target', '')
-                    for vuln in result.get('Vulnerabilities', []):
-                        formatted['results'].append({
-                            'vulnerability_id': vuln.get('VulnerabilityID', ''),
-                            'pkg_name': vuln.get('PkgName', ''),
-                            'installed_version': vuln.get('InstalledVersion', ''),
-                            'fixed_version': vuln.get('FixedVersion', 'N/A'),
-                            'severity': vuln.get('Severity', 'UNKNOWN'),
-                            'title': vuln.get('Title', ''),
-                            'description': vuln.get('Description', ''),
-                            'target': target
-                        })
+                fresh_by_lockfile = {p: [] for p in pending_lockfiles}
+                wanted = set(severity.upper().split(',')) if memoize else None
+                loop = asyncio.get_event_loop()
+                formatted['results'] = await loop.run_in_executor(
+                    None,
+                    lambda: self._parse_report(report_path, wanted, fresh_by_lockfile)
+                )
+                
+                if memoize:
+                    for relative_path, vulns in fresh_by_lockfile.items():
+                        self.lockfile_cache.put(
+                            pending_lockfiles[relative_path],
+                            self.db_cache.version,
+                            [{k: v for k, v in entry.items() if k != 'target'} for entry in vulns]
+                        )
+                    
+                    formatted['results'].extend(r for r in cached_results if r['severity'] in wanted)
+                    formatted['lockfile_cache'] = {
+                        'lockfiles': len(lockfiles),
+                        'hits': len(skipped_lockfiles),
+                        'misses': len(pending_lockfiles)
+                    }
+                    logger.info(
+                        f"Trivy lockfile cache: {len(skipped_lockfiles)} hits, "
+                        f"{len(pending_lockfiles)} misses"
+                    )
                 
                 return formatted
             else:
@@ -285,54 +723,197 @@ class TrivyMCPServer:
         except asyncio.TimeoutError:
             logger.error(f"Trivy timeout after {timeout} seconds")
             return {'tool': 'trivy', 'error': 'timeout', 'results': []}
+        finally:
+            try:
+                os.unlink(report_path)
+            except OSError:
+                pass
+    
+    def _find_lockfiles(self, source_path: Path) -> dict:
+        """
+        Find dependency lockfiles and compute their cache digests.
+        
+        Returns:
+            Mapping of the Target Trivy reports the lockfile's results under
+            (relative to source_path; the manifest for Go) to sha256 over the
+            lockfile and its companion manifest
+        """
+        lockfiles = {}
+        
+        for root, dirs, files in os.walk(source_path):
+            dirs[:] = [d for d in dirs if d not in ('.git', 'node_modules', 'vendor')]
+            for name in files:
+                if name not in self.LOCKFILES:
+                    continue
+                
+                lockfile = Path(root) / name
+                sha256 = hashlib.sha256(name.encode() + b'\0')
+                try:
+                    sha256.update(lockfile.read_bytes())
+                    companion = self.LOCKFILES[name]
+                    if companion and (Path(root) / companion).exists():
+                        sha256.update(b'\0')
+                        sha256.update((Path(root) / companion).read_bytes())
+                except OSError:
+                    continue
+                
+                target = Path(root) / self.REPORTED_AS.get(name, name)
+                lockfiles[str(target.relative_to(source_path))] = sha256.hexdigest()
+        
+        return lockfiles
+    
+    def _reported_lockfile(self, target: str) -> str:
+        """The lockfile whose results Trivy reports under a Target."""
+        directory, _, name = target.rpartition('/')
+        for lockfile, reported in self.REPORTED_AS.items():
+            if name == reported:
+                return f"{directory}/{lockfile}" if directory else lockfile
+        return target
+    
+    def _parse_report(self, report_path: str, wanted: Optional[set] = None, by_target: Optional[dict] = None) -> list:
+        """
+        Stream vulnerabilities out of a Trivy JSON report.
+        
+        Only vulnerability objects are materialized; package inventories and
+        other report sections pass through as parser events.
+        
+        Args:
+            report_path: Trivy JSON report
+            wanted: Severities to return (all when None)
+            by_target: Targets whose vulnerabilities are also collected here,
+                regardless of severity
+        
+        Returns:
+            Formatted vulnerabilities
+        """
+        results = []
+        by_target = by_target or {}
+        target = ''
+        builder = None
+        
+        try:
+            with open(report_path, 'rb') as f:
+                for prefix, event, value in ijson.parse(f):
+                    if builder is not None:
+                        builder.event(event, value)
+                        if prefix != 'Results.item.Vulnerabilities.item' or event != 'end_map':
+                            continue
+                        
+                        entry = self._format_vulnerability(builder.value, target)
+                        builder = None
+                        if wanted is None or entry['severity'] in wanted:
+                            results.append(entry)
+                        if target in by_target:
+                            by_target[target].append(entry)
+                    elif prefix == 'Results.item.Target':
+                        target = value
+                    elif prefix == 'Results.item.Vulnerabilities.item' and event == 'start_map':
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+        except FileNotFoundError:
+            logger.warning(f"Trivy report not found: {report_path}")
+        except ijson.JSONError as e:
+            logger.warning(f"Trivy report truncated or malformed after {len(results)} vulnerabilities: {e}")
+        
+        return results
+    
+    def _format_vulnerability(self, vuln: dict, target: str) -> dict:
+        """Reshape a Trivy vulnerability into the server's result format."""
+        return {
+            'vulnerability_id': vuln.get('VulnerabilityID', ''),
+            'pkg_name': vuln.get('PkgName', ''),
+            'installed_version': vuln.get('InstalledVersion', ''),
+            'fixed_version': vuln.get('FixedVersion', 'N/A'),
+            'severity': vuln.get('Severity', 'UNKNOWN'),
+            'title': vuln.get('Title', ''),
+            'description': vuln.get('Description', ''),
+            'cvss_score': self._cvss_score(vuln),
+            'target': target
+        }
+    
+    def _cvss_score(self, vuln: dict) -> Optional[float]:
+        """Highest CVSS base score any source gives, preferring v3 over v2."""
+        sources = (vuln.get('CVSS') or {}).values()
+        for version in ('V3Score', 'V2Score'):
+            scores = [s[version] for s in sources if isinstance(s, dict) and s.get(version)]
+            if scores:
+                return max(scores)
+        return None
     
     async def _run_trivy_image(self, image_name: str, severity: str) -> dict:
         """Run Trivy image scan asynchronously."""
+        # A private report per scan: concurrent scans of one mission must not share it
+        fd, report_path = tempfile.mkstemp(prefix='trivy-image-report-', suffix='.json')
+        os.close(fd)
         try:
-            process = await asyncio.create_subprocess_exec(
+            # Image scans need registry access, but the vuln DB still comes from the snapshot
+            db_args = [arg for arg in self.db_cache.scan_args() if arg != '--offline-scan']
+            process = await self.governor.spawn(
                 'trivy',
                 'image',
                 '--format', 'json',
+                '--output', report_path,
                 '--severity', severity,
+                *db_args,
                 image_name,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await process.communicate()
+            stdout, stderr, usage = await self.governor.communicate(process)
             
             if process.returncode in [0, 1]:
-                trivy_output = json.loads(stdout.decode())
-                
+                loop = asyncio.get_event_loop()
                 formatted = {
                     'tool': 'trivy',
                     'version': await self._get_trivy_version(),
                     'image': image_name,
-                    'results': []
+                    'db_version': self.db_cache.version,
+                    'results': await loop.run_in_executor(None, self._parse_report, report_path),
+                    'resource_usage': usage
                 }
                 
-                for result in trivy_output.get('Results', []):
-                    target = result.get('Target', '')
-                    for vuln in result.get('Vulnerabilities', []):
-                        formatted['results'].append({
-                            'vulnerability_id': vuln.get('VulnerabilityID', ''),
-                            'pkg_name': vuln.get('PkgName', ''),
-                            'installed_version': vuln.get('InstalledVersion', ''),
-                            'fixed_version': vuln.get('FixedVersion', 'N/A'),
-                            'severity': vuln.get('Severity', 'UNKNOWN'),
-                            'title': vuln.get('Title', ''),
-                            'target': target
-                        })
-                
                 return formatted
             else:
                 raise Exception(f"Trivy image scan failed: {stderr.decode()}")
         except Exception as e:
             logger.error(f"Trivy image scan error: {e}")
             return {'tool': 'trivy', 'error': str(e), 'results': []}
+        finally:
+            try:
+                os.unlink(report_path)
+            except OSError:
+                pass
+    
+    async def warm(self) -> dict:
+        """Run the warm-up steps (once) and return readiness status."""
+        return await self.warmup.wait()
+    
+    def _health(self) -> dict:
+        """Readiness, warm-up timings and cached capabilities for the `health` tool."""
+        return {
+            'success': True,
+            'tool': 'health',
+            **self.warmup.status(),
+            'version': self.tool_version,
+            'capabilities': self.capabilities
+        }
+    
+    async def _warm_vulnerability_db(self) -> bool:
+        """Open the vulnerability DB snapshot before serving requests."""
+        ready = await self.db_cache.warm()
+        self.capabilities.update({
+            'db_ready': ready,
+            'db_version': self.db_cache.version,
+            'offline': self.db_cache.offline
+        })
+        return ready
     
     async def _get_trivy_version(self) -> str:
-        """Get Trivy version asynchronously."""
+        """Get Trivy version asynchronously (probed once, then cached)."""
+        if self.tool_version:
+            return self.tool_version
+        
         try:
             process = await asyncio.create_subprocess_exec(
                 'trivy',
@@ -341,91 +922,56 @@ class TrivyMCPServer:
                 stderr=asyncio.subprocess.PIPE
             )
             stdout, _ = await process.communicate()
-            return stdout.decode().strip().split('\n')[0]
+            self.tool_version = stdout.decode().strip().split('\n')[0]
+            return self.tool_version
         except Exception:
             return 'unknown'
     
-    def _create_summary(self, results: dict) -> dict:
-        """Create vulnerability summary."""
-        vulns = results.get('results', [])
-        return {
-            "total": len(vulns),
-            "critical": sum(1 for v in vulns if v.get('severity') == 'CRITICAL'),
-            "high": sum(1 for v in vulns if v.get('severity') == 'HIGH'),
-            "medium": sum(1 for v in vulns if v.get('severity') == 'MEDIUM'),
-            "low": sum(1 for v in vulns if v.get('severity') == 'LOW')
-        }
-    
-    async def _store_results(self, results: dict, scan_type: str) -> dict:
-        """Store results in S3 and DynamoDB with evidence chain."""
-        timestamp = int(time.time())
-        
-        # Compute digest
-        results_json = json.dumps(results, sort_keys=True)
-        digest = hashlib.sha256(results_json.encode()).hexdigest()
-        
-        # Write to S3
-        s3_key = f"tool-results/trivy-mcp/{self.mission_id}/{timestamp}/{scan_type}-results.json"
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=s3_key,
-                Body=results_json,
-                ContentType='application/json',
-                Metadata={
-                    'tool': 'trivy-mcp',
-                    'mission-id': self.mission_id,
-                    'digest': f"sha256:{digest}",
-                    'scan-type': scan_type
-                }
-            )
-        )
-        
-        # Write digest file
-        digest_key = f"tool-results/trivy-mcp/{self.mission_id}/{timestamp}/digest.sha256"
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.s3_artifacts_bucket,
-                Key=digest_key,
-                Body=f"sha256:{digest}",
-                ContentType='text/plain'
+    def _encode_result(self, result: dict, source_path: str = None) -> str:
+        """Encode a scan response in the shared normalized finding format."""
+        results = result.get('results', {})
+        findings = [
+            Finding(
+                tool='trivy',
+                rule=v.get('vulnerability_id') or 'unknown',
+                severity=v.get('severity'),
+                path=v.get('target', ''),
+                snippet=f"{v.get('pkg_name', '')} {v.get('installed_version', '')} -> {v.get('fixed_version', 'N/A')}",
+                message=v.get('title', '')
             )
-        )
-        
-        # Index in DynamoDB
-        await loop.run_in_executor(
-            None,
-            lambda: self.dynamodb_client.put_item(
-                TableName=self.dynamodb_tool_results_table,
-                Item={
-                    'mission_id': {'S': self.mission_id},
-                    'tool_timestamp': {'S': f"trivy-mcp#{timestamp}"},
-                    'tool_name': {'S': 'trivy-mcp'},
-                    's3_uri': {'S': f"s3://{self.s3_artifacts_bucket}/{s3_key}"},
-                    'digest': {'S': f"sha256:{digest}"},
-                    'findings_count': {'N': str(len(results.get('results', [])))},
-                    'success': {'BOOL': True},
-                    'scan_type': {'S': scan_type},
-                    'ttl': {'N': str(timestamp + (7 * 24 * 60 * 60))}
-                }
-            )
-        )
-        
-        logger.info(f"Results stored: s3://{self.s3_artifacts_bucket}/{s3_key}")
-        logger.info(f"Evidence chain digest: sha256:{digest}")
-        
-        return {
-            "s3_uri": f"s3://{self.s3_artifacts_bucket}/{s3_key}",
-            "digest": f"sha256:{digest}",
-            "timestamp": timestamp
+            for v in results.get('results', [])
+        ]
+        extra = {
+            key: results[key]
+            for key in ('version', 'db_version', 'lockfile_cache', 'error')
+            if key in results
         }
+        # Rows have no room for scores, so they travel as a table by vulnerability
+        cvss = {
+            v['vulnerability_id']: v['cvss_score']
+            for v in results.get('results', [])
+            if v.get('vulnerability_id') and v.get('cvss_score') is not None
+        }
+        if cvss:
+            extra['cvss'] = cvss
+        return encode_tool_result(result, findings, root=source_path, extra=extra)
+    
+    def _create_summary(self, results: dict) -> dict:
+        """Create vulnerability summary."""
+        summary = {"total": 0, "critical": 0, "high": 0, "medium": 0, "low": 0}
+        for vuln in results.get('results', []):
+            summary["total"] += 1
+            key = vuln.get('severity', '').lower()
+            if key in summary and key != "total":
+                summary[key] += 1
+        summary["resource_usage"] = results.get('resource_usage', {})
+        return summary
     
     async def run(self):
         """Start MCP server with stdio transport."""
+        # Warm up while the client connects; tool calls wait for it
+        self.warmup.start()
+        
         async with stdio_server() as (read_stream, write_stream):
             logger.info("Trivy MCP Server starting with stdio transport")
             await self.server.run(
@@ -441,5 +987,12 @@ async def main():
     await server.run()
 
 
+async def refresh_db() -> bool:
+    """Refresh the DB snapshot under TRIVY_CACHE_DIR for the servers using it."""
+    return await TrivyDBCache(offline=False).refresh()
+
+
 if __name__ == "__main__":
+    if '--refresh-db' in sys.argv[1:]:
+        sys.exit(0 if asyncio.run(refresh_db()) else 1)
     asyncio.run(main())
\ No newline at end of file
@@ -24,6 +24,8 @@ import re
 import boto3
 from botocore.exceptions import ClientError
 
+from src.shared.storage import put_object
+
 
 @dataclass
 class FileMetadata:
@@ -674,11 +676,12 @@ class DeepCodeResearcher:
         s3_key = f"research/{mission_id}/deep_research.json"
         
         try:
-            self.s3.put_object(
-                Bucket=self.s3_bucket,
-                Key=s3_key,
-                Body=json.dumps(artifacts, indent=2),
-                ContentType='application/json',
+            put_object(
+                self.s3,
+                self.s3_bucket,
+                s3_key,
+                json.dumps(artifacts, separators=(',', ':')),
+                content_type='application/json',
             )
             print(f"[DeepResearcher] Exported artifacts to s3://{self.s3_bucket}/{s3_key}")
             return s3_key
@@ -392,6 +392,29 @@ class CognitiveKernel:
             logger.error(f"Failed to list MCP tools: {e}", exc_info=True)
             raise
     
+    async def warm_mcp_servers(
+        self,
+        wait_seconds: Optional[float] = None,
+        server_names: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Start all MCP servers and collect their warm-up readiness.
+        
+        Args:
+            wait_seconds: How long each server may finish warming up before reporting
+            server_names: Servers to probe; all by default
+        
+        Returns:
+            Dictionary mapping server names to their `health` reports
+        """
+        if not self.mcp_registry:
+            raise RuntimeError("MCP tools not enabled. Set ENABLE_MCP_TOOLS=true")
+        
+        health = await self.mcp_registry.check_health(wait_seconds, server_names)
+        ready = [name for name, report in health.items() if report.get('ready')]
+        logger.info(f"MCP servers ready: {len(ready)}/{len(health)}")
+        return health
+    
     async def invoke_mcp_tool(
         self,
         server_name: str,
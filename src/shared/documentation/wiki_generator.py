@@ -19,6 +19,8 @@ from dataclasses import dataclass
 import boto3
 from botocore.exceptions import ClientError
 
+from src.shared.storage import put_object, read_body
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -723,10 +725,10 @@ This section provides detailed documentation for each file in the codebase, incl
     # Helper methods
     
     def _load_s3_json(self, key: str) -> Dict[str, Any]:
-        """Load JSON from S3"""
+        """Load JSON from S3, decompressing it if stored compressed"""
         try:
             response = self.s3.get_object(Bucket=self.s3_bucket, Key=key)
-            return json.loads(response['Body'].read())
+            return json.loads(read_body(response))
         except ClientError as e:
             logger.error(f"Error loading {key}: {e}")
             return {}
@@ -1186,11 +1188,12 @@ Navigate through the sections to explore detailed findings, remediation guidance
             'created_at': wiki.created_at
         }
         
-        self.s3.put_object(
-            Bucket=self.s3_bucket,
-            Key=base_key,
-            Body=json.dumps(wiki_dict, indent=2).encode('utf-8'),
-            ContentType='application/json'
+        put_object(
+            self.s3,
+            self.s3_bucket,
+            base_key,
+            json.dumps(wiki_dict, separators=(',', ':')),
+            content_type='application/json'
         )
         
         return base_key
@@ -3,5 +3,23 @@ MCP Client Module - Model Context Protocol Client Implementation
 """
 
 from .client import MCPToolClient, MCPToolRegistry
+from .scheduler import ToolDAGScheduler, ToolNode
+from .bindings import binding_for, pacu_modules_for_finding
+from .cost_model import RepoFeatures, ToolCost, ToolCostModel, host_capacity
+from .checkpoint import CheckpointLedger, invocation_digest, read_verified
 
-__all__ = ['MCPToolClient', 'MCPToolRegistry']
\ No newline at end of file
+__all__ = [
+    'MCPToolClient',
+    'MCPToolRegistry',
+    'ToolDAGScheduler',
+    'ToolNode',
+    'binding_for',
+    'pacu_modules_for_finding',
+    'RepoFeatures',
+    'ToolCost',
+    'ToolCostModel',
+    'host_capacity',
+    'CheckpointLedger',
+    'invocation_digest',
+    'read_verified'
+]
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Argument bindings between dependent MCP tools.
+
+A binding turns an upstream tool's result into the arguments of the tool
+that depends on it, so the dependent tool can start in the same plan as
+soon as its upstream finishes instead of waiting for another planning
+round. Bindings are looked up by the dependent tool's name.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.shared.mcp_server import SEVERITIES, decode_tool_result, iter_findings
+
+from .scheduler import Binding
+
+logger = logging.getLogger(__name__)
+
+# ScoutSuite findings at or above this severity get Pacu validation
+PACU_MIN_SEVERITY = 'HIGH'
+
+# Upper bound on findings driving module selection
+PACU_MAX_FINDINGS = 10
+
+
+def pacu_modules_for_finding(service: str, title: str) -> List[str]:
+    """Map an AWS service and finding title to the Pacu modules that validate it."""
+    title_lower = title.lower()
+    
+    if service == 'iam':
+        if 'privilege' in title_lower or 'escalat' in title_lower:
+            return ['iam__privesc_scan', 'iam__enum_permissions']
+        return ['iam__enum_permissions']
+    elif service == 's3':
+        if 'public' in title_lower:
+            return ['s3__bucket_finder', 's3__download_bucket']
+        return ['s3__bucket_finder']
+    elif service == 'ec2':
+        return ['ec2__enum_lateral_movement']
+    elif service == 'lambda':
+        return ['lambda__enum']
+    elif service == 'rds':
+        return ['rds__enum', 'rds__explore_snapshots']
+    else:
+        return []
+
+
+def result_document(result: Optional[Dict[str, Any]]) -> Optional[dict]:
+    """Decoded findings document of a successful MCP tool result, if any."""
+    if not result or not result.get('success'):
+        return None
+    
+    content = result.get('content') or []
+    if not content or not isinstance(content, list):
+        return None
+    
+    item = content[0]
+    try:
+        wire = item['text'] if 'text' in item else json.dumps(item, separators=(',', ':')) + '\n'
+        return decode_tool_result(wire)
+    except Exception as e:
+        logger.warning(f"Upstream result of {result.get('server')} is not a findings document: {e}")
+        return None
+
+
+def bind_pacu_to_scoutsuite(
+    invocation: Dict[str, Any],
+    upstream: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Point Pacu at the modules ScoutSuite's high-severity findings call for.
+    
+    Modules the Strategist already chose keep their place at the front; the
+    ones derived from findings follow, most severe finding first. Without
+    any module Pacu stays on its safe permission enumeration.
+    """
+    threshold = SEVERITIES.index(PACU_MIN_SEVERITY)
+    findings = []
+    for result in upstream.values():
+        document = result_document(result)
+        if document is None or document.get('tool') != 'scoutsuite':
+            continue
+        findings.extend(
+            finding for finding in iter_findings(document)
+            if SEVERITIES.index(finding.severity) >= threshold
+        )
+    
+    findings.sort(key=lambda finding: SEVERITIES.index(finding.severity), reverse=True)
+    
+    arguments = dict(invocation.get('arguments', {}))
+    modules = list(arguments.get('modules', []))
+    for finding in findings[:PACU_MAX_FINDINGS]:
+        title = f"{finding.rule} {finding.message}"
+        for module in pacu_modules_for_finding(finding.path.lower(), title):
+            if module not in modules:
+                modules.append(module)
+    
+    if not modules:
+        logger.info("No high-severity ScoutSuite findings, Pacu keeps permission enumeration")
+        return invocation
+    
+    logger.info(f"Bound {len(modules)} Pacu modules from {len(findings)} ScoutSuite findings")
+    arguments['modules'] = modules
+    arguments.setdefault('aws_profile', 'default')
+    arguments.setdefault('dry_run', True)
+    return {**invocation, 'tool_name': 'pacu_run_modules', 'arguments': arguments}
+
+
+BINDINGS: Dict[str, Binding] = {
+    'pacu-mcp': bind_pacu_to_scoutsuite
+}
+
+
+def binding_for(tool_name: str) -> Optional[Binding]:
+    """Binding for a dependent tool, by its plan name."""
+    return BINDINGS.get(tool_name)
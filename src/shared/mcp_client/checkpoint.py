@@ -0,0 +1,158 @@
+"""
+Checkpoint ledger for resuming a mission's tool plan.
+
+Each completed tool invocation already leaves a 'completed' row in the
+tool_results DynamoDB table pointing at its raw results in S3. Rows written
+by the Coordinator also carry the digest of the invocation (server, tool and
+arguments), which makes the table a checkpoint ledger keyed by
+(mission, tool, argument digest).
+
+When the Coordinator is retried, invocations with a completed row are not
+run again: their stored results are read back from S3, checked against the
+row's evidence digest and handed on as if the tool had just returned them.
+A row whose artifact is missing or does not verify is ignored and the tool
+runs normally.
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from src.shared.storage import read_body
+
+logger = logging.getLogger(__name__)
+
+# Arguments that bound a run rather than define it; a retry under a tighter
+# mission deadline still resumes the same invocation
+RUN_LIMIT_ARGUMENTS = ('timeout',)
+
+
+def invocation_digest(invocation: Dict[str, Any]) -> str:
+    """Digest identifying an invocation: server, tool and canonical arguments."""
+    arguments = {
+        name: value for name, value in invocation.get('arguments', {}).items()
+        if name not in RUN_LIMIT_ARGUMENTS
+    }
+    canonical = json.dumps(
+        {
+            'server': invocation.get('server_name'),
+            'tool': invocation.get('tool_name'),
+            'arguments': arguments
+        },
+        sort_keys=True,
+        separators=(',', ':'),
+        default=str
+    )
+    return f"sha256:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+
+def read_verified(s3_client: Any, s3_uri: str, expected: str) -> Optional[bytes]:
+    """Uncompressed body of a stored artifact if it matches its evidence digest, else None."""
+    try:
+        bucket, key = s3_uri[len('s3://'):].split('/', 1)
+        data = read_body(s3_client.get_object(Bucket=bucket, Key=key))
+    except Exception as e:
+        logger.warning(f"Artifact {s3_uri} unreadable: {e}")
+        return None
+    
+    if f"sha256:{hashlib.sha256(data).hexdigest()}" != expected:
+        logger.warning(f"Artifact {s3_uri} failed digest verification")
+        return None
+    return data
+
+
+class CheckpointLedger:
+    """Completed invocations of one mission, read from the tool_results table."""
+    
+    def __init__(
+        self,
+        mission_id: str,
+        table: str,
+        dynamodb_client: Any,
+        s3_client: Any
+    ):
+        self.mission_id = mission_id
+        self.table = table
+        self.dynamodb_client = dynamodb_client
+        self.s3_client = s3_client
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def load(self) -> int:
+        """
+        Read the mission's completed rows that carry an invocation digest.
+        
+        Returns:
+            Number of resumable invocations
+        """
+        entries: Dict[str, Dict[str, Any]] = {}
+        last_evaluated_key = None
+        
+        while True:
+            query_params = {
+                'TableName': self.table,
+                'KeyConditionExpression': 'mission_id = :mid',
+                'ExpressionAttributeValues': {':mid': {'S': self.mission_id}}
+            }
+            if last_evaluated_key:
+                query_params['ExclusiveStartKey'] = last_evaluated_key
+            
+            response = self.dynamodb_client.query(**query_params)
+            for item in response.get('Items', []):
+                if item.get('status', {}).get('S') != 'completed':
+                    continue
+                arg_digest = item.get('arg_digest', {}).get('S')
+                if not arg_digest or not item.get('s3_uri', {}).get('S'):
+                    continue
+                
+                # Keep the newest row per invocation
+                timestamp = int(item.get('timestamp', {}).get('N', '0'))
+                current = entries.get(arg_digest)
+                if current is None or timestamp >= int(current.get('timestamp', {}).get('N', '0')):
+                    entries[arg_digest] = item
+            
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                break
+        
+        with self._lock:
+            self.entries = entries
+        
+        if entries:
+            logger.info(f"Checkpoint ledger has {len(entries)} completed invocations for {self.mission_id}")
+        return len(entries)
+    
+    def resume(self, invocation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Result of an invocation that already completed, or None to run it.
+        
+        The stored artifact is read back and must match the ledger row's
+        digest; the result has the shape of a fresh MCP tool result marked
+        'resumed'.
+        """
+        arg_digest = invocation_digest(invocation)
+        with self._lock:
+            item = self.entries.get(arg_digest)
+        if item is None:
+            return None
+        
+        s3_uri = item['s3_uri']['S']
+        expected = item.get('digest', {}).get('S', '')
+        data = read_verified(self.s3_client, s3_uri, expected)
+        if data is None:
+            logger.warning(f"Checkpoint for {invocation.get('server_name')} not usable, re-running")
+            return None
+        
+        logger.info(f"Resuming {invocation.get('server_name')}:{invocation.get('tool_name')} from {s3_uri}")
+        return {
+            'server': invocation.get('server_name'),
+            'tool': invocation.get('tool_name'),
+            'success': True,
+            'content': [{'type': 'text', 'text': data.decode()}],
+            'resumed': True,
+            'arg_digest': arg_digest,
+            's3_uri': s3_uri,
+            'digest': expected
+        }
@@ -283,6 +283,43 @@ class MCPToolRegistry:
         
         return all_tools
     
+    async def check_health(
+        self,
+        wait_seconds: Optional[float] = None,
+        server_names: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Start every MCP server and query its `health` tool concurrently.
+        
+        Connecting spawns the server process, which begins warming up at
+        once, so callers can overlap this with their own setup work.
+        
+        Args:
+            wait_seconds: Let each server finish warming up for this long
+                before it reports (a report right after spawn may lack the
+                tool version and ruleset digest)
+            server_names: Servers to probe; all by default
+        
+        Returns:
+            Dictionary mapping server names to their readiness reports
+        """
+        arguments = {'wait_seconds': wait_seconds} if wait_seconds else {}
+        
+        async def probe(server_name: str) -> Dict[str, Any]:
+            try:
+                client = await self.get_client(server_name)
+                response = await client.call_tool('health', arguments)
+                if response.get('success') and response.get('content'):
+                    return response['content'][0]
+                return {'server': server_name, 'ready': False, 'error': response.get('error', 'no response')}
+            except Exception as e:
+                logger.error(f"Health check failed for {server_name}: {e}")
+                return {'server': server_name, 'ready': False, 'error': str(e)}
+        
+        names = server_names or list(self._server_configs.keys())
+        reports = await asyncio.gather(*(probe(name) for name in names))
+        return dict(zip(names, reports))
+    
     async def call_tool(
         self,
         server_name: str,
@@ -0,0 +1,275 @@
+"""
+Learned resource cost model for MCP tool invocations.
+
+Every finished scan records the tool's wall time, CPU seconds and peak RSS
+(the resource governor's usage report) together with features of the
+repository it scanned: file count, bytes, number of languages and number of
+dependency lockfiles. Observations are kept per tool in Redis, and a small
+ridge regression over log-scaled features predicts the next invocation's
+duration, average cores and memory. Tools with too few observations fall
+back to fixed priors.
+
+The Coordinator packs tools into the task's CPU and memory with these
+predictions, and the Strategist sums them along the plan's critical path
+for the mission's estimated duration.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per-tool priors: wall seconds, average cores, peak RSS MB
+DEFAULT_COSTS = {
+    'semgrep-mcp': (120.0, 2.0, 1536.0),
+    'trivy-mcp': (90.0, 1.0, 768.0),
+    'gitleaks-mcp': (45.0, 1.0, 256.0),
+    'scoutsuite-mcp': (600.0, 0.5, 512.0),
+    'pacu-mcp': (180.0, 0.25, 384.0)
+}
+FALLBACK_COST = (300.0, 1.0, 512.0)
+
+SOURCE_EXTENSIONS = {
+    '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.ts': 'typescript',
+    '.tsx': 'typescript', '.go': 'go', '.java': 'java', '.rb': 'ruby', '.php': 'php',
+    '.cs': 'csharp', '.cpp': 'cpp', '.c': 'c', '.rs': 'rust', '.swift': 'swift', '.kt': 'kotlin'
+}
+
+LOCKFILES = {
+    'requirements.txt', 'Pipfile.lock', 'poetry.lock', 'package-lock.json', 'yarn.lock',
+    'pnpm-lock.yaml', 'go.sum', 'Gemfile.lock', 'Cargo.lock', 'composer.lock', 'packages.lock.json'
+}
+
+# Rough bytes per source line when only line counts are known
+AVG_LINE_BYTES = 40
+
+# Extra memory reserved over the predicted peak
+MEMORY_HEADROOM = 1.25
+
+
+@dataclass
+class RepoFeatures:
+    """Repository features the cost of a scan depends on."""
+    files: int = 0
+    bytes: int = 0
+    languages: int = 0
+    lockfiles: int = 0
+    
+    @classmethod
+    def from_path(cls, root: str) -> 'RepoFeatures':
+        """Measure a workspace on disk."""
+        features = cls()
+        languages = set()
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != '.git']
+            for name in filenames:
+                features.files += 1
+                try:
+                    features.bytes += os.path.getsize(os.path.join(directory, name))
+                except OSError:
+                    continue
+                if name in LOCKFILES:
+                    features.lockfiles += 1
+                language = SOURCE_EXTENSIONS.get(Path(name).suffix.lower())
+                if language:
+                    languages.add(language)
+        features.languages = len(languages)
+        return features
+    
+    @classmethod
+    def from_manifest(cls, context: Dict[str, Any]) -> 'RepoFeatures':
+        """
+        Approximate features from the Archaeologist's context manifest.
+        
+        The manifest has line counts rather than bytes and package names
+        rather than lockfiles, so both are estimated.
+        """
+        return cls(
+            files=int(context.get('file_count', 0) or 0),
+            bytes=int(context.get('total_lines', 0) or 0) * AVG_LINE_BYTES,
+            languages=len(context.get('primary_languages', []) or []),
+            lockfiles=1 if context.get('dependencies') else 0
+        )
+    
+    def vector(self) -> List[float]:
+        return [
+            1.0,
+            math.log1p(self.bytes / (1024 * 1024)),
+            math.log1p(self.files),
+            float(self.languages),
+            float(self.lockfiles)
+        ]
+
+
+@dataclass
+class ToolCost:
+    """Predicted resource demand of one invocation."""
+    seconds: float
+    cpus: float
+    memory_mb: float
+    observations: int = 0
+
+
+def _ridge(rows: List[List[float]], targets: List[float], alpha: float = 1.0) -> List[float]:
+    """Ridge regression by the normal equations (intercept not penalized)."""
+    size = len(rows[0])
+    matrix = [[sum(r[i] * r[j] for r in rows) + (alpha if i == j and i > 0 else 0.0) for j in range(size)]
+              for i in range(size)]
+    vector = [sum(r[i] * t for r, t in zip(rows, targets)) for i in range(size)]
+    
+    # Gaussian elimination with partial pivoting
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(matrix[r][col]))
+        if abs(matrix[pivot][col]) < 1e-12:
+            continue
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        vector[col], vector[pivot] = vector[pivot], vector[col]
+        for row in range(col + 1, size):
+            factor = matrix[row][col] / matrix[col][col]
+            for k in range(col, size):
+                matrix[row][k] -= factor * matrix[col][k]
+            vector[row] -= factor * vector[col]
+    
+    weights = [0.0] * size
+    for row in reversed(range(size)):
+        if abs(matrix[row][row]) < 1e-12:
+            continue
+        weights[row] = (vector[row] - sum(matrix[row][k] * weights[k] for k in range(row + 1, size))) / matrix[row][row]
+    return weights
+
+
+class ToolCostModel:
+    """Per-tool cost predictions learned from recorded resource usage."""
+    
+    def __init__(self, redis_client: Any = None):
+        self.redis_client = redis_client
+        self.min_observations = int(os.environ.get('COST_MODEL_MIN_OBSERVATIONS', '5'))
+        self.max_observations = int(os.environ.get('COST_MODEL_MAX_OBSERVATIONS', '200'))
+        self._observations: Dict[str, List[Dict[str, Any]]] = {}
+    
+    def _key(self, tool: str) -> str:
+        return f"tool_costs:{tool}"
+    
+    def observations(self, tool: str) -> List[Dict[str, Any]]:
+        """Recorded observations for a tool, newest first."""
+        if tool not in self._observations:
+            observations = []
+            if self.redis_client:
+                try:
+                    raw = self.redis_client.lrange(self._key(tool), 0, self.max_observations - 1)
+                    observations = [json.loads(item) for item in raw]
+                except Exception as e:
+                    logger.warning(f"Could not load cost observations for {tool}: {e}")
+            self._observations[tool] = observations
+        return self._observations[tool]
+    
+    def record(self, tool: str, features: RepoFeatures, usage: Dict[str, Any]):
+        """Record one finished invocation's resource usage."""
+        wall = float(usage.get('wall_seconds') or 0.0)
+        if wall <= 0:
+            return
+        
+        observation = {
+            'features': asdict(features),
+            'wall_seconds': wall,
+            'cpu_seconds': float(usage.get('cpu_seconds') or 0.0),
+            'peak_rss_mb': float(usage.get('peak_rss_mb') or 0.0),
+            'timestamp': int(time.time())
+        }
+        self.observations(tool).insert(0, observation)
+        del self._observations[tool][self.max_observations:]
+        
+        if self.redis_client:
+            try:
+                self.redis_client.lpush(self._key(tool), json.dumps(observation))
+                self.redis_client.ltrim(self._key(tool), 0, self.max_observations - 1)
+            except Exception as e:
+                logger.warning(f"Could not record cost observation for {tool}: {e}")
+    
+    def predict(self, tool: str, features: RepoFeatures) -> ToolCost:
+        """Predicted wall seconds, average cores and peak memory of a run."""
+        seconds, cpus, memory_mb = DEFAULT_COSTS.get(tool, FALLBACK_COST)
+        observations = self.observations(tool)
+        if len(observations) < self.min_observations:
+            return ToolCost(seconds, cpus, memory_mb * MEMORY_HEADROOM, len(observations))
+        
+        rows = [RepoFeatures(**o['features']).vector() for o in observations]
+        x = features.vector()
+        
+        def fit(metric: str) -> float:
+            # Fitted in log space: costs grow multiplicatively with repo size
+            weights = _ridge(rows, [math.log1p(o[metric]) for o in observations])
+            return max(0.0, math.expm1(sum(w * v for w, v in zip(weights, x))))
+        
+        seconds = max(1.0, fit('wall_seconds'))
+        cpu_seconds = fit('cpu_seconds')
+        memory_mb = max(64.0, fit('peak_rss_mb'))
+        return ToolCost(
+            seconds=seconds,
+            cpus=max(0.1, cpu_seconds / seconds),
+            memory_mb=memory_mb * MEMORY_HEADROOM,
+            observations=len(observations)
+        )
+    
+    def plan_seconds(self, tools: List[Dict[str, Any]], features: RepoFeatures) -> float:
+        """Predicted duration of a tool plan: its longest dependency chain."""
+        names = {}
+        for tool in tools:
+            name = tool.get('name', '')
+            names[name if name.endswith('-mcp') else f"{name}-mcp"] = tool
+        
+        memo: Dict[str, float] = {}
+        
+        def finish(name: str, visiting: Tuple[str, ...] = ()) -> float:
+            if name not in memo:
+                dependencies = [
+                    d if d.endswith('-mcp') else f"{d}-mcp"
+                    for d in names[name].get('dependencies', [])
+                ]
+                upstream = [finish(d, visiting + (name,)) for d in dependencies if d in names and d not in visiting]
+                memo[name] = max(upstream, default=0.0) + self.predict(name, features).seconds
+            return memo[name]
+        
+        return max((finish(name) for name in names), default=0.0)
+
+
+def host_capacity() -> Tuple[float, float]:
+    """
+    CPU cores and memory (MB) available to the task's tools.
+    
+    TOOL_CPU_CAPACITY and TOOL_MEMORY_CAPACITY_MB override; otherwise the
+    cgroup v2 limits, falling back to the CPU affinity set and MemTotal.
+    """
+    cpus = float(len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1)
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()
+        if quota != 'max':
+            cpus = min(cpus, int(quota) / int(period))
+    except (OSError, ValueError):
+        pass
+    
+    memory_mb = 0.0
+    try:
+        limit = Path('/sys/fs/cgroup/memory.max').read_text().strip()
+        if limit != 'max':
+            memory_mb = int(limit) / (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    if not memory_mb:
+        try:
+            for line in Path('/proc/meminfo').read_text().splitlines():
+                if line.startswith('MemTotal:'):
+                    memory_mb = int(line.split()[1]) / 1024
+                    break
+        except (OSError, ValueError):
+            pass
+    
+    cpus = float(os.environ.get('TOOL_CPU_CAPACITY') or cpus)
+    memory_mb = float(os.environ.get('TOOL_MEMORY_CAPACITY_MB') or memory_mb or 4096.0)
+    return cpus, memory_mb
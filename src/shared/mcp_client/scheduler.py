@@ -0,0 +1,252 @@
+"""
+Dependency-aware scheduler for MCP tool invocations.
+
+A mission's tool plan is a DAG: each node is one tool invocation and may
+depend on other nodes (pacu-mcp on scoutsuite-mcp, for example). Nodes
+start as soon as all their dependencies have finished, ready nodes are
+ordered by critical path (longest estimated remaining chain first) and then
+by the Strategist's priority, and every upstream result is handed to the
+dependent node's binding so its arguments can be built from it just before
+it starts. Queue wait and run time are recorded per node.
+
+When the scheduler is given the task's CPU and memory capacity, a ready
+node is only admitted while its predicted demand fits what the running
+nodes leave free; a smaller ready node may start ahead of a larger one that
+does not fit yet. A node is always admitted when nothing else runs, so a
+demand above capacity cannot stall the plan.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Binding: (invocation, upstream results by node name) -> invocation to run
+Binding = Callable[[Dict[str, Any], Dict[str, Dict[str, Any]]], Dict[str, Any]]
+
+
+@dataclass
+class ToolNode:
+    """One tool invocation in the plan."""
+    name: str
+    invocation: Dict[str, Any]
+    priority: int = 99
+    dependencies: List[str] = field(default_factory=list)
+    estimated_seconds: float = 300.0
+    cpus: float = 0.0
+    memory_mb: float = 0.0
+    bind: Optional[Binding] = None
+    
+    # Filled in while the plan runs
+    status: str = 'pending'
+    result: Optional[Dict[str, Any]] = None
+    critical_path_seconds: float = 0.0
+    ready_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    
+    def timing(self, origin: float) -> Dict[str, Any]:
+        """Per-node timings relative to the start of the plan, in seconds."""
+        def offset(value: Optional[float]) -> Optional[float]:
+            return round(value - origin, 3) if value is not None else None
+        
+        return {
+            'status': self.status,
+            'ready_at': offset(self.ready_at),
+            'started_at': offset(self.started_at),
+            'finished_at': offset(self.finished_at),
+            'wait_seconds': round(self.started_at - self.ready_at, 3) if self.started_at and self.ready_at else None,
+            'run_seconds': round(self.finished_at - self.started_at, 3) if self.finished_at and self.started_at else None,
+            'critical_path_seconds': round(self.critical_path_seconds, 3),
+            'estimated_seconds': round(self.estimated_seconds, 3),
+            'cpus': round(self.cpus, 2),
+            'memory_mb': round(self.memory_mb, 1)
+        }
+
+
+class ToolDAGScheduler:
+    """Runs a DAG of tool invocations with bounded concurrency."""
+    
+    def __init__(
+        self,
+        invoke: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        max_concurrency: int = 5,
+        cpus: Optional[float] = None,
+        memory_mb: Optional[float] = None
+    ):
+        self.invoke = invoke
+        self.max_concurrency = max(1, max_concurrency)
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.nodes: Dict[str, ToolNode] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+    
+    def add(self, node: ToolNode) -> ToolNode:
+        """Add a node; a repeated name gets a numeric suffix."""
+        name = node.name
+        suffix = 2
+        while name in self.nodes:
+            name = f"{node.name}#{suffix}"
+            suffix += 1
+        node.name = name
+        self.nodes[name] = node
+        return node
+    
+    def _prepare(self):
+        """Drop dependencies on tools not in the plan, reject cycles, compute critical paths."""
+        for node in self.nodes.values():
+            unknown = [d for d in node.dependencies if d not in self.nodes]
+            if unknown:
+                logger.warning(f"{node.name} depends on tools not in the plan, ignoring: {unknown}")
+            node.dependencies = [d for d in node.dependencies if d in self.nodes]
+        
+        dependents = self._dependents()
+        memo: Dict[str, float] = {}
+        visiting = set()
+        
+        def critical_path(name: str) -> float:
+            if name in memo:
+                return memo[name]
+            if name in visiting:
+                raise ValueError(f"Dependency cycle in tool plan at {name}")
+            visiting.add(name)
+            downstream = max((critical_path(d) for d in dependents[name]), default=0.0)
+            visiting.discard(name)
+            memo[name] = self.nodes[name].estimated_seconds + downstream
+            return memo[name]
+        
+        for name, node in self.nodes.items():
+            node.critical_path_seconds = critical_path(name)
+    
+    def _dependents(self) -> Dict[str, List[str]]:
+        dependents: Dict[str, List[str]] = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for dependency in node.dependencies:
+                dependents[dependency].append(node.name)
+        return dependents
+    
+    async def run(self) -> List[Dict[str, Any]]:
+        """
+        Run every node and return their results in insertion order.
+        
+        A node whose dependency failed is not run; its result is a failure
+        naming the upstream tool. Each result carries the node's timings
+        under 'timing'.
+        """
+        self._prepare()
+        dependents = self._dependents()
+        order = {name: index for index, name in enumerate(self.nodes)}
+        remaining = {name: len(node.dependencies) for name, node in self.nodes.items()}
+        
+        self.started_at = time.monotonic()
+        ready: List[tuple] = []
+        
+        def make_ready(node: ToolNode):
+            node.status = 'ready'
+            node.ready_at = time.monotonic()
+            heapq.heappush(ready, (-node.critical_path_seconds, node.priority, order[node.name], node.name))
+        
+        def finish(node: ToolNode, result: Dict[str, Any]):
+            node.finished_at = time.monotonic()
+            node.result = result
+            node.status = 'succeeded' if result.get('success') else 'failed'
+            
+            for name in dependents[node.name]:
+                remaining[name] -= 1
+                if remaining[name] == 0:
+                    dependent = self.nodes[name]
+                    failed = [d for d in dependent.dependencies if self.nodes[d].status != 'succeeded']
+                    if failed:
+                        finish(dependent, {
+                            'server': dependent.invocation.get('server_name'),
+                            'tool': dependent.invocation.get('tool_name'),
+                            'success': False,
+                            'error': f"Skipped: upstream {', '.join(failed)} did not succeed"
+                        })
+                        dependent.status = 'skipped'
+                    else:
+                        make_ready(dependent)
+        
+        for name, node in self.nodes.items():
+            if remaining[name] == 0:
+                make_ready(node)
+        
+        running: Dict[asyncio.Task, ToolNode] = {}
+        while ready or running:
+            while ready and len(running) < self.max_concurrency:
+                node = self._admit(ready, list(running.values()))
+                if node is None:
+                    break
+                running[asyncio.ensure_future(self._start(node))] = node
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    logger.error(f"Tool {node.name} failed with exception: {e}")
+                    result = {
+                        'server': node.invocation.get('server_name'),
+                        'tool': node.invocation.get('tool_name'),
+                        'success': False,
+                        'error': str(e),
+                        'invocation': node.invocation
+                    }
+                finish(node, result)
+        
+        self.finished_at = time.monotonic()
+        logger.info(
+            f"Tool plan finished in {self.finished_at - self.started_at:.1f}s: "
+            + ', '.join(f"{name}={node.status}" for name, node in self.nodes.items())
+        )
+        
+        results = []
+        for node in self.nodes.values():
+            result = dict(node.result or {})
+            result['timing'] = node.timing(self.started_at)
+            results.append(result)
+        return results
+    
+    def _admit(self, ready: List[tuple], running: List[ToolNode]) -> Optional[ToolNode]:
+        """Pop the first ready node, in scheduling order, whose demand fits the free capacity."""
+        used_cpus = sum(n.cpus for n in running)
+        used_memory = sum(n.memory_mb for n in running)
+        
+        for entry in sorted(ready):
+            node = self.nodes[entry[-1]]
+            fits = (
+                (self.cpus is None or used_cpus + node.cpus <= self.cpus)
+                and (self.memory_mb is None or used_memory + node.memory_mb <= self.memory_mb)
+            )
+            if fits or not running:
+                ready.remove(entry)
+                heapq.heapify(ready)
+                return node
+        return None
+    
+    async def _start(self, node: ToolNode) -> Dict[str, Any]:
+        """Bind upstream results into the node's arguments, then invoke it."""
+        if node.bind and node.dependencies:
+            upstream = {d: self.nodes[d].result for d in node.dependencies}
+            node.invocation = node.bind(node.invocation, upstream)
+        
+        node.status = 'running'
+        node.started_at = time.monotonic()
+        logger.info(f"Starting {node.name} (critical path {node.critical_path_seconds:.0f}s, priority {node.priority})")
+        return await self.invoke(node.invocation)
+    
+    def timings(self) -> Dict[str, Any]:
+        """Plan-level timings: wall time and each node's timings."""
+        origin = self.started_at or time.monotonic()
+        return {
+            'wall_seconds': round(self.finished_at - self.started_at, 3) if self.finished_at and self.started_at else None,
+            'critical_path_seconds': round(max((n.critical_path_seconds for n in self.nodes.values()), default=0.0), 3),
+            'capacity': {'cpus': self.cpus, 'memory_mb': self.memory_mb},
+            'nodes': {name: node.timing(origin) for name, node in self.nodes.items()}
+        }
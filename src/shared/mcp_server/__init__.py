@@ -0,0 +1,46 @@
+"""
+MCP Server Support Module
+=========================
+
+Common building blocks for the MCP tool servers.
+
+Classes:
+    ServerWarmup: One-time warm-up steps with readiness and timing report
+    Finding: Normalized scanner finding
+    FindingEncoder: Compact NDJSON wire format with path and string tables
+    ResourceGovernor: Per-tool CPU, memory and file limits for scanner subprocesses
+"""
+
+from .warmup import ServerWarmup
+from .governor import ResourceGovernor, ResourceProfile, merge_usage
+from .findings import (
+    Finding,
+    FindingEncoder,
+    SEVERITIES,
+    WIRE_CONTENT_TYPE,
+    WIRE_FORMAT,
+    decode_tool_result,
+    encode_tool_result,
+    fingerprint,
+    is_wire_document,
+    iter_findings,
+    normalize_severity
+)
+
+__all__ = [
+    "ServerWarmup",
+    "ResourceGovernor",
+    "ResourceProfile",
+    "merge_usage",
+    "Finding",
+    "FindingEncoder",
+    "SEVERITIES",
+    "WIRE_CONTENT_TYPE",
+    "WIRE_FORMAT",
+    "decode_tool_result",
+    "encode_tool_result",
+    "fingerprint",
+    "is_wire_document",
+    "iter_findings",
+    "normalize_severity"
+]
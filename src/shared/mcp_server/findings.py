@@ -0,0 +1,214 @@
+"""
+Normalized finding wire format shared by the MCP tool servers.
+
+Every scanner result is reduced to the same finding schema (tool, rule,
+severity, path, line range, fingerprint, snippet) and encoded as compact
+NDJSON. The first line is a header carrying the tool's metadata plus a path
+table and a string table; every following line is one finding as a
+positional array that refers into those tables:
+
+    [rule, severity, path_index, line_start, line_end, fingerprint, snippet_index, message_index]
+
+Long file paths and repeated snippets/messages are therefore sent once per
+result instead of once per finding, over stdio, to S3 and into prompts.
+"""
+
+import os
+import json
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+WIRE_FORMAT = 'hive-findings/1'
+WIRE_CONTENT_TYPE = 'application/x-ndjson'
+
+# Severity enum, lowest first; rows carry the index
+SEVERITIES = ('UNKNOWN', 'INFO', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+
+# Tool-specific severity labels mapped onto the enum
+SEVERITY_ALIASES = {
+    'ERROR': 'HIGH',
+    'WARNING': 'MEDIUM',
+    'DANGER': 'HIGH',
+    'MODERATE': 'MEDIUM',
+    'NEGLIGIBLE': 'LOW',
+    'NOTE': 'INFO'
+}
+
+_COMPACT = (',', ':')
+
+
+def normalize_severity(value: Any) -> str:
+    """Map a tool's severity label onto the shared severity enum."""
+    label = str(value or 'UNKNOWN').upper()
+    label = SEVERITY_ALIASES.get(label, label)
+    return label if label in SEVERITIES else 'UNKNOWN'
+
+
+def fingerprint(tool: str, rule: str, path: str, snippet: str = '') -> str:
+    """
+    Stable identity of a finding across runs.
+    
+    Line numbers are left out so a finding keeps its fingerprint when
+    unrelated edits shift it up or down the file.
+    """
+    key = f"{tool}|{rule}|{path}|{snippet.strip()}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+@dataclass
+class Finding:
+    """One normalized scanner finding."""
+    tool: str
+    rule: str
+    severity: str
+    path: str
+    line_start: int = 0
+    line_end: int = 0
+    snippet: str = ''
+    message: str = ''
+    fingerprint: str = ''
+
+
+class FindingEncoder:
+    """Builds one tool result in the compact NDJSON wire format."""
+    
+    def __init__(self, tool: str, root: Optional[str] = None):
+        self.tool = tool
+        self.root = str(root) if root else None
+        self.paths: Dict[str, int] = {}
+        self.strings: Dict[str, int] = {'': 0}
+        self.rows: List[list] = []
+    
+    def relative_path(self, path: str) -> str:
+        """Path as stored on the wire: relative to the scan root when under it."""
+        path = str(path or '')
+        # Component-wise, so /tmp/m1 is not taken as the root of /tmp/m10/app.py
+        if self.root and path and os.path.isabs(path) == os.path.isabs(self.root):
+            root = os.path.normpath(self.root)
+            if os.path.commonpath([path, root]) == root:
+                return os.path.relpath(path, root)
+        return path
+    
+    def add(self, finding: Finding) -> str:
+        """Append a finding and return its fingerprint."""
+        path = self.relative_path(finding.path)
+        snippet = finding.snippet or ''
+        digest = finding.fingerprint or fingerprint(self.tool, finding.rule, path, snippet)
+        
+        self.rows.append([
+            finding.rule,
+            SEVERITIES.index(normalize_severity(finding.severity)),
+            self._intern(self.paths, path),
+            int(finding.line_start or 0),
+            int(finding.line_end or finding.line_start or 0),
+            digest,
+            self._intern(self.strings, snippet),
+            self._intern(self.strings, finding.message or '')
+        ])
+        return digest
+    
+    def encode(self, meta: Optional[dict] = None) -> str:
+        """Render the header and finding rows as NDJSON."""
+        header = {
+            **(meta or {}),
+            'format': WIRE_FORMAT,
+            'tool': self.tool,
+            'root': self.root,
+            'findings_count': (meta or {}).get('findings_count', len(self.rows)),
+            'rows': len(self.rows),
+            'paths': list(self.paths),
+            'strings': list(self.strings)
+        }
+        lines = [json.dumps(header, separators=_COMPACT, default=str)]
+        lines.extend(json.dumps(row, separators=_COMPACT) for row in self.rows)
+        return '\n'.join(lines) + '\n'
+    
+    def _intern(self, table: Dict[str, int], value: str) -> int:
+        index = table.get(value)
+        if index is None:
+            index = table[value] = len(table)
+        return index
+
+
+def encode_tool_result(
+    result: dict,
+    findings: Iterable[Finding],
+    root: Optional[str] = None,
+    extra: Optional[dict] = None
+) -> str:
+    """
+    Encode a server's tool response in the wire format.
+    
+    Args:
+        result: The server's response dict; its raw 'results' are dropped
+        findings: Normalized findings extracted from the raw results
+        root: Scan root that file paths are made relative to
+        extra: Additional header fields (tool version, delta, ...)
+    
+    Returns:
+        NDJSON document
+    """
+    encoder = FindingEncoder(result.get('tool', 'unknown'), root)
+    for finding in findings:
+        encoder.add(finding)
+    
+    meta = {k: v for k, v in result.items() if k != 'results'}
+    meta.update(extra or {})
+    return encoder.encode(meta)
+
+
+def is_wire_document(data: Any) -> bool:
+    """Whether data (text or a parsed header) is a normalized findings document."""
+    if isinstance(data, dict):
+        return data.get('format') == WIRE_FORMAT
+    if isinstance(data, bytes):
+        data = data.decode()
+    return isinstance(data, str) and data.startswith('{') and f'"format":"{WIRE_FORMAT}"' in data.split('\n', 1)[0]
+
+
+def decode_tool_result(data: Any) -> dict:
+    """
+    Parse a wire document into its header with the finding rows attached.
+    
+    Accepts the NDJSON text (str or bytes) or an already parsed header for
+    results without findings. Raises ValueError for anything else.
+    """
+    if isinstance(data, dict):
+        if not is_wire_document(data):
+            raise ValueError("Not a normalized findings document")
+        return {**data, 'findings': list(data.get('findings', []))}
+    
+    if isinstance(data, bytes):
+        data = data.decode()
+    
+    lines = [line for line in data.split('\n') if line.strip()]
+    if not lines:
+        raise ValueError("Empty findings document")
+    
+    header = json.loads(lines[0])
+    if not is_wire_document(header):
+        raise ValueError("Not a normalized findings document")
+    
+    header['findings'] = [json.loads(line) for line in lines[1:]]
+    return header
+
+
+def iter_findings(document: dict) -> Iterator[Finding]:
+    """Expand the rows of a decoded wire document into Finding objects."""
+    paths = document.get('paths', [])
+    strings = document.get('strings', [''])
+    tool = document.get('tool', 'unknown')
+    
+    for rule, severity, path, line_start, line_end, digest, snippet, message in document.get('findings', []):
+        yield Finding(
+            tool=tool,
+            rule=rule,
+            severity=SEVERITIES[severity],
+            path=paths[path],
+            line_start=line_start,
+            line_end=line_end,
+            snippet=strings[snippet],
+            message=strings[message],
+            fingerprint=digest
+        )
@@ -0,0 +1,366 @@
+"""
+Resource governance for scanner subprocesses.
+
+Scanners started by the MCP servers share the cores and memory of one task.
+Each tool gets a resource profile (CPU affinity set, nice and ionice levels,
+memory limit, open-file cap) that is applied when its subprocess starts, so
+one scanner cannot starve or OOM-kill the others.
+
+The profile is applied by a small launcher (this module run as a script)
+that sits between the server and the scanner: it applies the limits to
+itself, forks and execs the scanner, reaps it with wait4 and writes the
+scanner's CPU seconds and peak RSS to a usage file the server reads back.
+Memory is capped through a cgroup v2 child group when one can be created,
+falling back to RLIMIT_DATA. RLIMIT_AS would also count address space that
+is reserved but never touched, which Go scanners (trivy, gitleaks) and
+mmap-heavy ones reserve in bulk.
+"""
+
+import os
+import sys
+import json
+import time
+import ctypes
+import signal
+import asyncio
+import logging
+import resource
+import tempfile
+import itertools
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default profiles. cpu_slice is (offset, share) of the task's cores, applied
+# only with RESOURCE_CPU_SLICES=true; None leaves the scanner unpinned
+# (network-bound tools).
+RESOURCE_PROFILES = {
+    'semgrep': {'cpu_slice': (0.0, 0.5), 'nice': 5, 'ionice': 'best-effort:4', 'memory_mb': 4096, 'nofile': 4096},
+    'trivy': {'cpu_slice': (0.5, 0.25), 'nice': 5, 'ionice': 'best-effort:4', 'memory_mb': 2048, 'nofile': 8192},
+    'gitleaks': {'cpu_slice': (0.75, 0.25), 'nice': 10, 'ionice': 'best-effort:6', 'memory_mb': 1024, 'nofile': 4096},
+    'scoutsuite': {'cpu_slice': None, 'nice': 10, 'ionice': 'best-effort:7', 'memory_mb': 2048, 'nofile': 4096},
+    'pacu': {'cpu_slice': None, 'nice': 10, 'ionice': 'best-effort:7', 'memory_mb': 1024, 'nofile': 2048}
+}
+
+IONICE_CLASSES = {'realtime': 1, 'best-effort': 2, 'idle': 3}
+
+# ioprio_set syscall numbers (no libc wrapper exists)
+IOPRIO_SET_SYSCALL = {'x86_64': 251, 'aarch64': 30}
+
+
+def parse_cpu_list(value: str) -> List[int]:
+    """Parse a cpuset list such as '0-3,6'."""
+    cpus = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def slice_cpus(available: List[int], offset: float, share: float) -> List[int]:
+    """Contiguous slice of the available cores; at least one core."""
+    count = len(available)
+    start = min(int(count * offset), count - 1)
+    size = max(1, int(round(count * share)))
+    return available[start:start + size]
+
+
+def merge_usage(usages: List[dict]) -> dict:
+    """Combine usage reports of several runs of one tool (CPU adds, peak RSS is the max)."""
+    usages = [u for u in usages if u]
+    if not usages:
+        return {}
+    return {
+        'cpu_seconds': round(sum(u.get('cpu_seconds', 0.0) for u in usages), 3),
+        'peak_rss_mb': max(u.get('peak_rss_mb', 0.0) for u in usages),
+        'wall_seconds': round(sum(u.get('wall_seconds', 0.0) for u in usages), 3),
+        'runs': sum(u.get('runs', 1) for u in usages),
+        'oom_killed': any(u.get('oom_killed') for u in usages)
+    }
+
+
+@dataclass
+class ResourceProfile:
+    """Limits applied to one scanner subprocess."""
+    cpus: Optional[List[int]] = None
+    nice: int = 0
+    ionice: Optional[str] = None
+    memory_mb: Optional[int] = None
+    nofile: Optional[int] = None
+    cgroup: Optional[str] = None
+    
+    def apply(self):
+        """Apply the profile to the current process (inherited by children)."""
+        if self.cpus and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(0, self.cpus)
+            except OSError as e:
+                print(f"governor: could not set CPU affinity {self.cpus}: {e}", file=sys.stderr)
+        
+        if self.nice:
+            os.nice(self.nice)
+        
+        if self.ionice:
+            self._set_ionice()
+        
+        if self.nofile:
+            _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+            limit = self.nofile if hard == resource.RLIM_INFINITY else min(self.nofile, hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+        
+        if self.memory_mb:
+            if self.cgroup:
+                Path(self.cgroup, 'cgroup.procs').write_text(str(os.getpid()))
+            else:
+                limit = self.memory_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    
+    def _set_ionice(self):
+        syscall = IOPRIO_SET_SYSCALL.get(os.uname().machine)
+        if syscall is None:
+            return
+        
+        name, _, level = self.ionice.partition(':')
+        io_class = IONICE_CLASSES.get(name, 2)
+        priority = (io_class << 13) | (int(level or 4) if io_class != 3 else 0)
+        
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.syscall(syscall, 1, 0, priority) != 0:  # IOPRIO_WHO_PROCESS, self
+            print(f"governor: ioprio_set failed: errno {ctypes.get_errno()}", file=sys.stderr)
+
+
+class ResourceGovernor:
+    """
+    Starts a tool's subprocesses under its resource profile.
+    
+    Profiles default to RESOURCE_PROFILES and can be overridden per tool with
+    <TOOL>_CPUS ('0-3'), <TOOL>_NICE, <TOOL>_IONICE ('best-effort:4'),
+    <TOOL>_MEMORY_MB and <TOOL>_NOFILE. Scanners are only pinned to cores
+    when <TOOL>_CPUS is set or RESOURCE_CPU_SLICES=true enables the default
+    slices, since fixed slices idle cores whenever a tool runs alone.
+    RESOURCE_GOVERNANCE=false starts scanners directly.
+    """
+    
+    _counter = itertools.count()
+    
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.enabled = os.environ.get('RESOURCE_GOVERNANCE', 'true').lower() == 'true'
+        self.cpu_slices = os.environ.get('RESOURCE_CPU_SLICES', 'false').lower() == 'true'
+        self.cgroup_root = Path(os.environ.get('RESOURCE_CGROUP_ROOT', '/sys/fs/cgroup/hive'))
+        self.profile = self._load_profile()
+    
+    def _load_profile(self) -> ResourceProfile:
+        defaults = RESOURCE_PROFILES.get(self.tool, {})
+        prefix = self.tool.upper()
+        
+        cpus = None
+        if os.environ.get(f'{prefix}_CPUS'):
+            cpus = parse_cpu_list(os.environ[f'{prefix}_CPUS'])
+        elif self.cpu_slices and defaults.get('cpu_slice') and hasattr(os, 'sched_getaffinity'):
+            cpus = slice_cpus(sorted(os.sched_getaffinity(0)), *defaults['cpu_slice'])
+        
+        def env_int(name: str, default):
+            value = os.environ.get(f'{prefix}_{name}')
+            return int(value) if value else default
+        
+        return ResourceProfile(
+            cpus=cpus,
+            nice=env_int('NICE', defaults.get('nice', 0)),
+            ionice=os.environ.get(f'{prefix}_IONICE', defaults.get('ionice')),
+            memory_mb=env_int('MEMORY_MB', defaults.get('memory_mb')),
+            nofile=env_int('NOFILE', defaults.get('nofile'))
+        )
+    
+    def _create_cgroup(self) -> Optional[str]:
+        """Create a cgroup v2 child group with memory.max, if the hierarchy is delegated to us."""
+        if not self.profile.memory_mb or not self._cgroup_memory_available():
+            return None
+        path = self.cgroup_root / f"{self.tool}-{os.getpid()}-{next(self._counter)}"
+        try:
+            if not self.cgroup_root.exists():
+                self.cgroup_root.mkdir()
+                (self.cgroup_root / 'cgroup.subtree_control').write_text('+memory')
+            path.mkdir()
+            (path / 'memory.max').write_text(str(self.profile.memory_mb * 1024 * 1024))
+            return str(path)
+        except OSError:
+            try:
+                path.rmdir()
+            except OSError:
+                pass
+            return None
+    
+    def _cgroup_memory_available(self) -> bool:
+        try:
+            return 'memory' in (self.cgroup_root.parent / 'cgroup.controllers').read_text().split()
+        except OSError:
+            return False
+    
+    async def spawn(self, *command: str, **kwargs) -> asyncio.subprocess.Process:
+        """
+        Start a scanner under the tool's profile.
+        
+        Takes the same arguments as asyncio.create_subprocess_exec. The
+        returned process carries what `usage` needs to report on it.
+        """
+        if not self.enabled:
+            process = await asyncio.create_subprocess_exec(*command, **kwargs)
+            process.governor_usage = None
+            return process
+        
+        fd, usage_path = tempfile.mkstemp(prefix=f"{self.tool}-usage-", suffix='.json')
+        os.close(fd)
+        profile = ResourceProfile(**{**asdict(self.profile), 'cgroup': self._create_cgroup()})
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(__file__),
+                '--profile', json.dumps(asdict(profile)),
+                '--usage', usage_path,
+                '--',
+                *command,
+                **kwargs
+            )
+        except BaseException:
+            os.unlink(usage_path)
+            if profile.cgroup:
+                self._read_cgroup(profile.cgroup)
+            raise
+        process.governor_usage = (usage_path, profile.cgroup, time.monotonic())
+        return process
+    
+    async def communicate(self, process, input: Optional[bytes] = None, timeout: Optional[float] = None):
+        """
+        Wait for a spawned scanner and collect its resource usage.
+        
+        The scanner is killed if the wait times out or is cancelled, so a
+        runaway scan never outlives its budget.
+        
+        Returns:
+            (stdout, stderr, usage) tuple
+        """
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(input=input), timeout=timeout)
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            self.usage(process)
+            raise
+        return stdout, stderr, self.usage(process)
+    
+    def usage(self, process) -> dict:
+        """CPU seconds and peak RSS of a finished scanner (empty if unavailable)."""
+        state = getattr(process, 'governor_usage', None)
+        if not isinstance(state, tuple):
+            return {}
+        
+        usage_path, cgroup, started = state
+        process.governor_usage = None
+        report = {}
+        try:
+            with open(usage_path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                os.unlink(usage_path)
+            except OSError:
+                pass
+        
+        if not isinstance(report, dict):
+            report = {}
+        if cgroup:
+            report.update(self._read_cgroup(cgroup))
+        
+        if not report:
+            return {}
+        
+        report.setdefault('wall_seconds', round(time.monotonic() - started, 3))
+        report['profile'] = {
+            'cpus': self.profile.cpus,
+            'nice': self.profile.nice,
+            'memory_mb': self.profile.memory_mb,
+            'memory_limit': 'cgroup' if cgroup else 'rlimit'
+        }
+        return report
+    
+    def _read_cgroup(self, cgroup: str) -> dict:
+        stats = {}
+        try:
+            peak = Path(cgroup, 'memory.peak')
+            if peak.exists():
+                stats['cgroup_peak_mb'] = round(int(peak.read_text()) / (1024 * 1024), 1)
+            for line in Path(cgroup, 'memory.events').read_text().splitlines():
+                key, value = line.split()
+                if key == 'oom_kill' and int(value) > 0:
+                    stats['oom_killed'] = True
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                os.rmdir(cgroup)
+            except OSError:
+                pass
+        return stats
+
+
+def _launch(profile: ResourceProfile, usage_path: str, command: List[str]) -> int:
+    """Apply the profile, run the command and record its rusage."""
+    profile.apply()
+    started = time.monotonic()
+    
+    pid = os.fork()
+    if pid == 0:
+        try:
+            # Die with the launcher if the server kills it on timeout
+            libc = ctypes.CDLL(None)
+            libc.prctl(1, signal.SIGKILL)  # PR_SET_PDEATHSIG
+        except Exception:
+            pass
+        try:
+            os.execvp(command[0], command)
+        except OSError as e:
+            print(f"governor: cannot execute {command[0]}: {e}", file=sys.stderr)
+            os._exit(127)
+    
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda signum, frame: os.kill(pid, signum))
+    
+    _, status, rusage = os.wait4(pid, 0)
+    exit_code = os.waitstatus_to_exitcode(status)
+    
+    report = {
+        'cpu_user_seconds': round(rusage.ru_utime, 3),
+        'cpu_system_seconds': round(rusage.ru_stime, 3),
+        'cpu_seconds': round(rusage.ru_utime + rusage.ru_stime, 3),
+        'peak_rss_mb': round(rusage.ru_maxrss / 1024, 1),
+        'wall_seconds': round(time.monotonic() - started, 3),
+        # Only the cgroup's memory.events can tell an OOM kill from any other SIGKILL
+        'exit_code': exit_code
+    }
+    with open(usage_path, 'w') as f:
+        json.dump(report, f)
+    
+    return exit_code if exit_code >= 0 else 128 - exit_code
+
+
+def main(argv: List[str]) -> int:
+    separator = argv.index('--')
+    options, command = argv[:separator], argv[separator + 1:]
+    profile = ResourceProfile(**json.loads(options[options.index('--profile') + 1]))
+    usage_path = options[options.index('--usage') + 1]
+    return _launch(profile, usage_path, command)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
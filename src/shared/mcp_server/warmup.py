@@ -0,0 +1,94 @@
+"""
+Warm-up phase for MCP tool servers.
+
+Each server registers the expensive first-use work it would otherwise do on
+the first mission call (tool version probes, rule and DB loading, module
+catalogs). The steps run once, concurrently, as soon as the server process
+starts; tool calls wait for them for at most WARMUP_MAX_WAIT_SECONDS and the
+`health` tool reports progress.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ServerWarmup:
+    """Runs a server's warm-up steps once and reports readiness."""
+    
+    def __init__(self, server_name: str, max_wait: Optional[float] = None):
+        self.server_name = server_name
+        # Longest a tool call waits for warm-up before doing the work lazily
+        self.max_wait = max_wait if max_wait is not None else float(os.environ.get('WARMUP_MAX_WAIT_SECONDS', '60'))
+        self.state = 'pending'
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.duration_seconds: Optional[float] = None
+        self._steps: List[Tuple[str, Callable[[], Awaitable[Any]]]] = []
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def ready(self) -> bool:
+        return self.state == 'ready'
+    
+    def add_step(self, name: str, step: Callable[[], Awaitable[Any]]):
+        """Register an async warm-up step; its return value is kept in results."""
+        self._steps.append((name, step))
+    
+    def start(self) -> asyncio.Task:
+        """Start warm-up in the background if it has not started yet."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+    
+    async def wait(self, timeout: Optional[float] = None) -> dict:
+        """
+        Start warm-up if needed and wait for it to finish, for at most
+        timeout seconds (max_wait by default).
+        
+        Warm-up never blocks the server: a failed step is recorded in errors,
+        and a slow or failed step's work falls back to being done lazily on
+        first use while warm-up carries on in the background.
+        """
+        if timeout is None:
+            timeout = self.max_wait
+        try:
+            await asyncio.wait_for(asyncio.shield(self.start()), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.server_name} warm-up still running after {timeout}s, continuing")
+        return self.status()
+    
+    def status(self) -> dict:
+        return {
+            'server': self.server_name,
+            'ready': self.ready,
+            'state': self.state,
+            'duration_seconds': self.duration_seconds,
+            'steps': dict(self.timings),
+            'errors': dict(self.errors)
+        }
+    
+    async def _run(self):
+        self.state = 'warming'
+        started = time.monotonic()
+        
+        async def run_step(name: str, step: Callable[[], Awaitable[Any]]):
+            step_started = time.monotonic()
+            try:
+                self.results[name] = await step()
+            except Exception as e:
+                logger.warning(f"{self.server_name} warm-up step '{name}' failed: {e}")
+                self.errors[name] = str(e)
+            finally:
+                self.timings[name] = round(time.monotonic() - step_started, 3)
+        
+        await asyncio.gather(*(run_step(name, step) for name, step in self._steps))
+        
+        self.duration_seconds = round(time.monotonic() - started, 3)
+        self.state = 'ready'
+        logger.info(f"{self.server_name} warm-up complete in {self.duration_seconds}s: {self.timings}")
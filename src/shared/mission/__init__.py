@@ -0,0 +1,21 @@
+"""
+Mission Module
+==============
+
+Mission-wide state shared by the agents of a mission.
+
+Classes:
+    MissionDeadline: Time left for a mission and per-stage budgets
+    ToolResultFeed: Tool-result completions announced by the Coordinator
+"""
+
+from .deadline import MIN_TOOL_TIMEOUT, PIPELINE_STAGES, STAGE_MIN_SECONDS, MissionDeadline
+from .tool_feed import ToolResultFeed
+
+__all__ = [
+    "MIN_TOOL_TIMEOUT",
+    "MissionDeadline",
+    "PIPELINE_STAGES",
+    "STAGE_MIN_SECONDS",
+    "ToolResultFeed"
+]
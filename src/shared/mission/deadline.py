@@ -0,0 +1,103 @@
+"""
+Mission deadline and per-stage time budgets.
+
+The state machine stops a mission after a fixed wall-clock limit. Unpack
+fixes the mission's deadline (epoch seconds) at the start, records it on
+the mission item and passes it to every agent as MISSION_DEADLINE; the
+Strategist also writes it into the execution strategy.
+
+Each stage's budget is the time left minus what the stages after it need
+at minimum, so an agent running late squeezes itself rather than the
+agents behind it. Agents degrade instead of overrunning: smaller scanner
+rule sets and tool timeouts cut to the budget in the Coordinator, no
+Kendra enrichment, and rule-based review in the Critic.
+"""
+
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stages in pipeline order; the context stage is Archaeologist + Strategist
+PIPELINE_STAGES = ('context', 'coordinator', 'synthesizer', 'critic', 'archivist')
+
+# Minimum seconds a stage needs to produce a valid, if partial, result
+STAGE_MIN_SECONDS = {
+    'context': 120,
+    'coordinator': 300,
+    'synthesizer': 240,
+    'critic': 90,
+    'archivist': 120
+}
+
+# Shortest timeout worth handing to a tool
+MIN_TOOL_TIMEOUT = 30
+
+
+class MissionDeadline:
+    """Time left for a mission and the budget of each of its stages."""
+    
+    def __init__(self, deadline: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.deadline = deadline
+        self.clock = clock
+        # Slack kept back for task start-up and state transitions
+        self.safety_seconds = float(os.environ.get('DEADLINE_SAFETY_SECONDS', '60'))
+    
+    @classmethod
+    def from_env(cls, fallback: Optional[Any] = None) -> 'MissionDeadline':
+        """
+        Deadline from MISSION_DEADLINE, else from an artifact's 'deadline'.
+        
+        Without either the mission is unbounded and nothing degrades.
+        """
+        for value in (os.environ.get('MISSION_DEADLINE'), fallback):
+            try:
+                if value not in (None, ''):
+                    return cls(float(value))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid mission deadline: {value!r}")
+        return cls()
+    
+    @property
+    def bounded(self) -> bool:
+        return self.deadline is not None
+    
+    def remaining(self) -> float:
+        """Seconds until the deadline (infinite when unbounded)."""
+        if self.deadline is None:
+            return float('inf')
+        return max(0.0, self.deadline - self.clock() - self.safety_seconds)
+    
+    def stage_budget(self, stage: str) -> float:
+        """Seconds the stage may use while leaving the later stages their minimum."""
+        later = PIPELINE_STAGES[PIPELINE_STAGES.index(stage) + 1:]
+        return max(0.0, self.remaining() - sum(STAGE_MIN_SECONDS[s] for s in later))
+    
+    def degraded(self, stage: str, needed: Optional[float] = None) -> bool:
+        """
+        Whether the stage should fall back to its cheaper policy.
+        
+        A stage degrades once its budget drops below what the full policy
+        needs: `needed` seconds, or twice the stage's minimum by default.
+        """
+        if not self.bounded:
+            return False
+        if needed is None:
+            needed = 2 * STAGE_MIN_SECONDS[stage]
+        return self.stage_budget(stage) < needed
+    
+    def exhausted(self, stage: str) -> bool:
+        """Whether too little of the stage's budget is left to start more work."""
+        return self.bounded and self.stage_budget(stage) < MIN_TOOL_TIMEOUT
+    
+    def timeout(self, stage: str, default: float) -> int:
+        """A tool timeout cut to the stage's budget, never below MIN_TOOL_TIMEOUT."""
+        return int(max(MIN_TOOL_TIMEOUT, min(default, self.stage_budget(stage))))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'deadline': self.deadline,
+            'remaining_seconds': None if not self.bounded else round(self.remaining(), 1)
+        }
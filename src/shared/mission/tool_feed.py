@@ -0,0 +1,90 @@
+"""
+Feed of a mission's tool-result completions.
+
+The Coordinator appends an event to a Redis list as soon as a tool's row is
+written to the tool_results table, and a final 'done' event when it stops.
+The Synthesizer follows the list with a cursor instead of waiting for the
+whole plan, so findings from fast tools are proposed while slow ones still
+run. A list rather than pub/sub keeps events for a reader that starts or
+restarts late. The list outlives a Coordinator attempt, so events carry the
+attempt that wrote them (the execution id and its redrive count) and readers
+skip those of other attempts - above all an earlier attempt's 'done'.
+"""
+
+import json
+import time
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FEED_TTL_SECONDS = 86400
+
+
+class ToolResultFeed:
+    """Completed tool_results rows of one mission, in completion order."""
+    
+    def __init__(self, redis_client: Any, mission_id: str, attempt: Optional[str] = None):
+        self.redis_client = redis_client
+        self.mission_id = mission_id
+        self.attempt = attempt
+        self.key = f"mission:{mission_id}:tool_results"
+    
+    def publish(self, item: Dict[str, Any]):
+        """Announce a tool_results row (DynamoDB item format)."""
+        self._push({'item': item, 'timestamp': time.time()})
+    
+    def close(self):
+        """Announce that no more rows will be written."""
+        self._push({'done': True, 'timestamp': time.time()})
+    
+    def _push(self, event: Dict[str, Any]):
+        if not self.redis_client:
+            return
+        if self.attempt:
+            event['attempt'] = self.attempt
+        try:
+            self.redis_client.rpush(self.key, json.dumps(event, separators=(',', ':')))
+            self.redis_client.expire(self.key, FEED_TTL_SECONDS)
+        except Exception as e:
+            # Readers fall back to querying the table
+            logger.warning(f"Could not publish tool result event: {e}")
+    
+    def read(self, cursor: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Events after the cursor and the cursor to continue from."""
+        raw = self.redis_client.lrange(self.key, cursor, -1)
+        events = []
+        for entry in raw:
+            try:
+                events.append(json.loads(entry))
+            except (TypeError, ValueError):
+                logger.warning("Skipping malformed tool result event")
+        return events, cursor + len(raw)
+    
+    def follow(
+        self,
+        poll_seconds: float = 1.0,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield tool_results rows as they are announced.
+        
+        Stops after this attempt's 'done' event, or when should_stop()
+        returns True while no event is pending. Events of other attempts are
+        skipped.
+        """
+        cursor = 0
+        while True:
+            events, cursor = self.read(cursor)
+            for event in events:
+                if event.get('attempt') != self.attempt:
+                    continue
+                if event.get('done'):
+                    return
+                if event.get('item'):
+                    yield event['item']
+            if not events:
+                if should_stop and should_stop():
+                    logger.warning(f"Stopped following {self.key} before the Coordinator finished")
+                    return
+                time.sleep(poll_seconds)
@@ -0,0 +1,65 @@
+"""
+Storage Module
+==============
+
+Compressed S3 artifact storage and workspace materialization shared by
+agents and MCP servers.
+
+Classes:
+    Compressor: Streaming zstd/gzip compressor with its Content-Encoding marker
+    BlobCache: Host-level content-addressed file cache with LRU eviction
+    MissionMemo: Scan results memoized per archive sha256 across missions
+
+Functions:
+    batch_write_items: Batched DynamoDB puts with unprocessed-item retries
+"""
+
+from .codec import (
+    Compressor,
+    compress,
+    decompress,
+    default_encoding,
+    put_object,
+    read_body,
+    read_body_digest
+)
+from .batch_write import batch_write_items
+from .blob_cache import BlobCache
+from .memo import (
+    UNMEMOIZED_SCAN_TYPES,
+    MissionMemo,
+    archive_sha256,
+    invocation_ruleset_digest,
+    pipeline_version,
+    ruleset_digest
+)
+from .workspace import (
+    bundle_key,
+    manifest_key,
+    materialize_workspace,
+    release_workspace,
+    workspace_path
+)
+
+__all__ = [
+    "UNMEMOIZED_SCAN_TYPES",
+    "BlobCache",
+    "Compressor",
+    "MissionMemo",
+    "archive_sha256",
+    "batch_write_items",
+    "bundle_key",
+    "compress",
+    "decompress",
+    "default_encoding",
+    "invocation_ruleset_digest",
+    "manifest_key",
+    "materialize_workspace",
+    "pipeline_version",
+    "put_object",
+    "read_body",
+    "read_body_digest",
+    "release_workspace",
+    "ruleset_digest",
+    "workspace_path"
+]
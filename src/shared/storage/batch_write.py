@@ -0,0 +1,63 @@
+"""
+Batched DynamoDB writes.
+
+Rows stored together (a Coordinator's tool results, completed and failed)
+go out in batch_write_item calls of at most 25 items. DynamoDB may accept a
+batch only in part under throttling; the items it returns unprocessed are
+retried with exponential backoff, and whatever is still left after the last
+retry is counted rather than raised, so the caller can report it.
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# DynamoDB batch_write_item limit
+MAX_BATCH_ITEMS = 25
+
+
+def batch_write_items(
+    dynamodb_client: Any,
+    table: str,
+    items: List[Dict[str, Any]],
+    key_attributes: Sequence[str],
+    retries: int = 5
+) -> int:
+    """
+    Put items in batches, retrying unprocessed items with backoff.
+    
+    A batch may not carry two items with the same key, so items are
+    deduplicated by key first; the last item of a key wins.
+    
+    Args:
+        dynamodb_client: boto3 DynamoDB client
+        table: Table name
+        items: Items in DynamoDB attribute-value format
+        key_attributes: Names of the table's key attributes
+        retries: Retries of a batch's unprocessed items
+    
+    Returns:
+        Number of items written
+    """
+    unique = {}
+    for item in items:
+        unique[tuple(str(item[name]) for name in key_attributes)] = item
+    items = list(unique.values())
+    
+    unprocessed_total = 0
+    for i in range(0, len(items), MAX_BATCH_ITEMS):
+        requests = [{'PutRequest': {'Item': item}} for item in items[i:i + MAX_BATCH_ITEMS]]
+        for attempt in range(retries + 1):
+            response = dynamodb_client.batch_write_item(RequestItems={table: requests})
+            requests = (response.get('UnprocessedItems') or {}).get(table, [])
+            if not requests or attempt == retries:
+                break
+            logger.warning(f"Retrying {len(requests)} unprocessed items for {table} (attempt {attempt + 1})")
+            time.sleep(min(0.05 * (2 ** attempt), 2.0))
+        unprocessed_total += len(requests)
+    
+    if unprocessed_total:
+        logger.error(f"{unprocessed_total} items left unprocessed for {table}")
+    return len(items) - unprocessed_total
@@ -0,0 +1,211 @@
+"""
+Host-level content-addressed blob cache for source workspaces.
+
+Source files are stored once per host under their sha256
+(`{root}/blobs/ab/abcdef...`) and mission workspaces are built from
+hardlinks to those blobs, so a file that is unchanged between missions is
+fetched and stored only once. Blobs are read-only: every workspace linking
+a blob shares its inode.
+
+The cache is bounded by a byte budget. Eviction drops the least recently
+used blobs (mtime is bumped on every use) that no workspace links to any
+more; workspaces themselves are pruned once they are older than the
+workspace TTL. Builders hold the 'blobs' lock shared from checking which
+blobs are cached until they are linked, and eviction takes it exclusively,
+so a blob found cached is not dropped before it is linked.
+"""
+
+import os
+import time
+import uuid
+import fcntl
+import errno
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY = 0o444
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class BlobCache:
+    """Content-addressed file store with LRU eviction by byte budget."""
+    
+    def __init__(
+        self,
+        root: Union[str, Path],
+        budget_bytes: Optional[int] = None,
+        workspace_ttl_seconds: Optional[int] = None
+    ):
+        self.root = Path(root)
+        self.budget_bytes = budget_bytes if budget_bytes is not None else (
+            int(os.environ.get('WORKSPACE_CACHE_BUDGET_MB', '10240')) * 1024 * 1024
+        )
+        self.workspace_ttl_seconds = workspace_ttl_seconds if workspace_ttl_seconds is not None else (
+            int(os.environ.get('WORKSPACE_TTL_HOURS', '24')) * 3600
+        )
+        
+        self.blobs_dir = self.root / 'blobs'
+        self.tmp_dir = self.root / 'tmp'
+        self.locks_dir = self.root / 'locks'
+        self.workspaces_dir = self.root / 'workspaces'
+        for directory in (self.blobs_dir, self.tmp_dir, self.locks_dir, self.workspaces_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+    
+    @classmethod
+    def from_environment(cls) -> Optional['BlobCache']:
+        """Cache configured by WORKSPACE_CACHE_DIR; None when it is set empty."""
+        root = os.environ.get('WORKSPACE_CACHE_DIR', '/tmp/hive-cache')
+        return cls(root) if root else None
+    
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest
+    
+    def workspace_dir(self, mission_id: str) -> Path:
+        return self.workspaces_dir / mission_id
+    
+    def owns(self, path: Union[str, Path]) -> bool:
+        """Whether path is inside this cache."""
+        return self.root.resolve() in Path(path).resolve().parents
+    
+    def has(self, digest: str) -> bool:
+        """Whether a blob is cached; a hit counts as a use for LRU."""
+        path = self.blob_path(digest)
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def temp_path(self) -> Path:
+        """Scratch file path on the cache filesystem for incoming blobs."""
+        return self.tmp_dir / uuid.uuid4().hex
+    
+    def ingest(self, path: Union[str, Path], digest: Optional[str] = None) -> str:
+        """
+        Move a file into the cache under its digest and return the digest.
+        
+        The file is consumed: it becomes the blob, or is discarded if an
+        identical blob already exists.
+        """
+        digest = digest or file_sha256(path)
+        blob = self.blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        
+        if blob.exists():
+            os.unlink(path)
+            os.utime(blob)
+        else:
+            os.chmod(path, READ_ONLY)
+            os.replace(path, blob)
+        return digest
+    
+    def adopt(self, path: Union[str, Path]) -> str:
+        """Add a workspace file to the cache, turning it into a hardlink to its blob."""
+        digest = file_sha256(path)
+        blob = self.blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            os.chmod(path, READ_ONLY)
+            os.link(path, blob)
+        except FileExistsError:
+            os.utime(blob)
+            self.link(digest, path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.copy2(path, blob)
+        return digest
+    
+    def link(self, digest: str, target: Union[str, Path]):
+        """Place a blob at target as a hardlink (copy across filesystems)."""
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+        
+        try:
+            os.link(self.blob_path(digest), staging)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.copy2(self.blob_path(digest), staging)
+        os.replace(staging, target)
+    
+    @contextmanager
+    def lock(self, name: str, shared: bool = False) -> Iterator[None]:
+        """Host-wide lock shared by every process using this cache; exclusive unless shared."""
+        with open(self.locks_dir / f"{name}.lock", 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+    
+    def evict(self) -> int:
+        """
+        Prune expired workspaces, then drop unlinked blobs, least recently
+        used first, until the cache fits its byte budget.
+        
+        Returns:
+            Bytes freed from blobs
+        """
+        with self.lock('evict'):
+            self._prune_workspaces()
+            with self.lock('blobs'):
+                return self._evict_blobs()
+    
+    def _evict_blobs(self) -> int:
+        blobs = []
+        total = 0
+        for path in self.blobs_dir.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            total += stat.st_size
+            blobs.append((stat.st_mtime, stat.st_size, stat.st_nlink, path))
+        
+        freed = 0
+        for _, size, nlink, path in sorted(blobs):
+            if total - freed <= self.budget_bytes:
+                break
+            # Still linked from a live workspace
+            if nlink > 1:
+                continue
+            try:
+                path.unlink()
+                freed += size
+            except FileNotFoundError:
+                continue
+        
+        if freed:
+            logger.info(f"Evicted {freed} bytes from workspace cache ({total - freed} bytes kept)")
+        return freed
+    
+    def _prune_workspaces(self):
+        cutoff = time.time() - self.workspace_ttl_seconds
+        for marker in self.workspaces_dir.glob('*.json'):
+            try:
+                if marker.stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            
+            mission_id = marker.stem
+            with self.lock(f"workspace-{mission_id}"):
+                shutil.rmtree(self.workspace_dir(mission_id), ignore_errors=True)
+                marker.unlink(missing_ok=True)
+            logger.info(f"Pruned expired workspace {mission_id}")
@@ -0,0 +1,215 @@
+"""
+Compressed object codec for S3 artifacts.
+
+Tool results, research artifacts and wiki JSON are stored compressed with
+zstd (when the zstandard package is installed) or gzip, and marked with the
+S3 Content-Encoding header. Readers go through `read_body`, which also
+recognizes the compression from the payload's magic bytes, so objects
+written before compression was enabled keep loading. `read_body_digest`
+does the same while streaming, hashing the payload as it arrives.
+
+Evidence-chain digests are always computed over the canonical uncompressed
+bytes; compressing an artifact never changes its digest.
+"""
+
+import os
+import zlib
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - gzip is used instead
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+IDENTITY = 'identity'
+GZIP = 'gzip'
+ZSTD = 'zstd'
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Below this size the compression framing costs more than it saves
+MIN_COMPRESS_BYTES = 512
+
+# Bytes read from a streaming body at a time
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+
+def default_encoding() -> str:
+    """
+    Content encoding for new objects.
+    
+    STORAGE_COMPRESSION selects zstd, gzip or none; zstd falls back to gzip
+    when zstandard is not installed.
+    """
+    encoding = os.environ.get('STORAGE_COMPRESSION', ZSTD).lower()
+    if encoding in ('none', 'off', 'false', IDENTITY):
+        return IDENTITY
+    if encoding == ZSTD and zstandard is None:
+        return GZIP
+    return encoding if encoding in (ZSTD, GZIP) else GZIP
+
+
+class Compressor:
+    """Streaming compressor for one object."""
+    
+    def __init__(self, encoding: Optional[str] = None):
+        self.encoding = encoding or default_encoding()
+        level = int(os.environ.get('STORAGE_COMPRESSION_LEVEL', '6'))
+        
+        if self.encoding == ZSTD:
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+        elif self.encoding == GZIP:
+            # wbits 31 writes a gzip header and trailer
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+        else:
+            self._obj = None
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) if self._obj else data
+    
+    def flush(self) -> bytes:
+        return self._obj.flush() if self._obj else b''
+    
+    def put_args(self) -> Dict[str, str]:
+        """Extra put_object/create_multipart_upload arguments marking the encoding."""
+        return {'ContentEncoding': self.encoding} if self.encoding != IDENTITY else {}
+
+
+def compress(data: bytes, encoding: Optional[str] = None) -> Tuple[bytes, str]:
+    """Compress a whole payload; returns the stored bytes and their encoding."""
+    encoding = encoding or default_encoding()
+    if len(data) < MIN_COMPRESS_BYTES:
+        encoding = IDENTITY
+    
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.flush(), compressor.encoding
+
+
+def decompress(body: bytes, encoding: Optional[str] = None) -> bytes:
+    """
+    Decompress a stored payload.
+    
+    The declared encoding is used when it is one of ours; otherwise the
+    payload's magic bytes decide, and anything unrecognized is returned as is.
+    """
+    encoding = (encoding or '').lower()
+    if encoding not in (ZSTD, GZIP):
+        if body[:4] == ZSTD_MAGIC:
+            encoding = ZSTD
+        elif body[:2] == GZIP_MAGIC:
+            encoding = GZIP
+        else:
+            return body
+    
+    if encoding == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed object but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return zlib.decompress(body, 47)
+
+
+def read_body(response: Dict[str, Any]) -> bytes:
+    """Uncompressed body of an S3 get_object response."""
+    return decompress(response['Body'].read(), response.get('ContentEncoding'))
+
+
+def _decompressor(encoding: Optional[str], head: bytes) -> Any:
+    """Streaming decompressor for a payload starting with head, None for plain payloads."""
+    encoding = (encoding or '').lower()
+    if encoding not in (ZSTD, GZIP):
+        if head[:4] == ZSTD_MAGIC:
+            encoding = ZSTD
+        elif head[:2] == GZIP_MAGIC:
+            encoding = GZIP
+        else:
+            return None
+    
+    if encoding == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed object but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(47)
+
+
+def read_body_digest(response: Dict[str, Any], chunk_size: int = STREAM_CHUNK_BYTES) -> Tuple[bytes, str, int]:
+    """
+    Stream an S3 get_object body, decompressing and hashing it chunk by chunk.
+    
+    Returns:
+        The uncompressed body, its digest ("sha256:<hex>") and the number
+        of stored (possibly compressed) bytes read
+    """
+    stream = response['Body']
+    digest = hashlib.sha256()
+    body = bytearray()
+    stored = 0
+    decompressor = None
+    
+    chunk = stream.read(chunk_size)
+    if chunk:
+        decompressor = _decompressor(response.get('ContentEncoding'), chunk)
+    while chunk:
+        stored += len(chunk)
+        data = decompressor.decompress(chunk) if decompressor else chunk
+        digest.update(data)
+        body += data
+        chunk = stream.read(chunk_size)
+    
+    if decompressor is not None:
+        data = decompressor.flush()
+        digest.update(data)
+        body += data
+    
+    return bytes(body), f"sha256:{digest.hexdigest()}", stored
+
+
+def put_object(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    data: Any,
+    content_type: str = 'application/json',
+    metadata: Optional[Dict[str, str]] = None,
+    encoding: Optional[str] = None
+) -> str:
+    """
+    Compress and upload a payload.
+    
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Target bucket
+        key: Object key
+        data: Canonical payload (str or bytes)
+        content_type: Content type of the uncompressed payload
+        metadata: S3 object metadata
+        encoding: Override the default content encoding
+    
+    Returns:
+        sha256 digest of the uncompressed payload ("sha256:<hex>")
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    
+    digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+    body, encoding = compress(data, encoding)
+    
+    extra = {'ContentEncoding': encoding} if encoding != IDENTITY else {}
+    if metadata:
+        extra['Metadata'] = metadata
+    
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=body,
+        ContentType=content_type,
+        **extra
+    )
+    
+    if encoding != IDENTITY:
+        logger.debug(f"Stored {key} as {encoding}: {len(data)} -> {len(body)} bytes")
+    return digest
@@ -0,0 +1,178 @@
+"""
+Content-addressed memo of scan results across missions.
+
+Submitting the same archive again (CI re-triggers, several teams scanning
+one release) would otherwise re-run every scanner, LLM call and the wiki.
+Results are memoized under the archive's sha256, which Unpack computes and
+stores on the workspace bundle:
+
+    memo/{archive_sha256}/tools/{entry_key}.json
+        One tool invocation's stored raw results. The entry key covers the
+        archive, scan type, pipeline version, server, tool, arguments
+        (without the mission-specific workspace path), tool version and
+        ruleset digest, so a scanner or ruleset upgrade misses the memo.
+    memo/{archive_sha256}/pipeline-{pipeline_version}.json
+        Mission-level marker: 'scanned' once every planned tool of a mission
+        succeeded, 'complete' once the Archivist finished it. Unpack
+        short-circuits a new mission of the same scan type on a fresh
+        complete marker.
+
+Entries point at the original mission's artifacts; nothing is copied. AWS
+scans read live account state rather than the archive, so they are never
+memoized.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from .codec import IDENTITY, put_object, read_body
+from .workspace import bundle_key
+
+logger = logging.getLogger(__name__)
+
+# Arguments that differ between missions without changing what is scanned;
+# runs cut short by a timeout are never memoized
+MISSION_LOCAL_ARGUMENTS = ('source_path', 'timeout')
+
+# Scan types whose results depend on more than the archive
+UNMEMOIZED_SCAN_TYPES = ('aws',)
+
+
+def pipeline_version() -> str:
+    """Version of the analysis pipeline; bump PIPELINE_VERSION to invalidate every memo."""
+    return os.environ.get('PIPELINE_VERSION', '1')
+
+
+def ruleset_digest(capabilities: Dict[str, Any]) -> str:
+    """Digest of a server's reported capabilities (rulesets, vulnerability DB version, ...)."""
+    canonical = json.dumps(capabilities or {}, sort_keys=True, separators=(',', ':'), default=str)
+    return f"sha256:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+
+def invocation_ruleset_digest(capabilities: Dict[str, Any], arguments: Dict[str, Any]) -> Optional[str]:
+    """
+    Ruleset digest an invocation runs under, or None when its rules are not cached.
+    
+    Servers reporting per-config 'rulesets' (semgrep) only resolve the
+    configs they warmed locally; any other config (semgrep's 'auto') is
+    fetched live from the registry per run, so its results must not be
+    memoized.
+    """
+    rulesets = (capabilities or {}).get('rulesets')
+    if rulesets is None:
+        return ruleset_digest(capabilities)
+    return rulesets.get(arguments.get('config', 'auto'))
+
+
+def archive_sha256(s3_client: Any, bucket: str, mission_id: str) -> Optional[str]:
+    """sha256 of a mission's source archive, as recorded on its workspace bundle."""
+    try:
+        response = s3_client.head_object(Bucket=bucket, Key=bundle_key(mission_id))
+        return response.get('Metadata', {}).get('sha256')
+    except Exception as e:
+        logger.debug(f"No workspace bundle digest for {mission_id}: {e}")
+        return None
+
+
+class MissionMemo:
+    """Memoized tool results and pipeline completion for one archive."""
+
+    def __init__(
+        self,
+        s3_client: Any,
+        bucket: str,
+        archive_sha256: str,
+        version: Optional[str] = None,
+        scan_type: str = 'code'
+    ):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.archive_sha256 = archive_sha256
+        self.version = version or pipeline_version()
+        self.scan_type = scan_type
+        self.prefix = f"memo/{archive_sha256}"
+
+    def entry_key(self, invocation: Dict[str, Any], tool_version: str, rules: str) -> str:
+        """Memo key of a tool invocation under the given tool version and ruleset digest."""
+        arguments = {
+            name: value for name, value in invocation.get('arguments', {}).items()
+            if name not in MISSION_LOCAL_ARGUMENTS
+        }
+        canonical = json.dumps(
+            {
+                'archive': self.archive_sha256,
+                'scan_type': self.scan_type,
+                'pipeline': self.version,
+                'server': invocation.get('server_name'),
+                'tool': invocation.get('tool_name'),
+                'arguments': arguments,
+                'tool_version': tool_version or 'unknown',
+                'ruleset': rules
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(read_body(self.s3_client.get_object(Bucket=self.bucket, Key=key)))
+        except Exception as e:
+            # A miss is the common case
+            logger.debug(f"No memo at {key}: {e}")
+            return None
+
+    def _put(self, key: str, document: Dict[str, Any]):
+        # Small documents, kept uncompressed so Unpack can read them without the codec
+        put_object(self.s3_client, self.bucket, key, json.dumps(document, separators=(',', ':')), encoding=IDENTITY)
+
+    def get_tool(self, entry_key: str) -> Optional[Dict[str, Any]]:
+        """Memoized result entry: s3_uri, digest, findings_count and origin mission."""
+        return self._get(f"{self.prefix}/tools/{entry_key}.json")
+
+    def put_tool(self, entry_key: str, entry: Dict[str, Any]):
+        self._put(f"{self.prefix}/tools/{entry_key}.json", {**entry, 'created_at': int(time.time())})
+
+    def pipeline_key(self) -> str:
+        return f"{self.prefix}/pipeline-{self.version}.json"
+
+    def pipeline(self) -> Optional[Dict[str, Any]]:
+        """The mission-level marker, if any mission got this far."""
+        return self._get(self.pipeline_key())
+
+    def mark_scanned(self, mission_id: str, tools: Dict[str, Dict[str, str]]):
+        """Record that every planned tool of a mission succeeded on this archive."""
+        self._put(self.pipeline_key(), {
+            'status': 'scanned',
+            'archive_sha256': self.archive_sha256,
+            'scan_type': self.scan_type,
+            'pipeline_version': self.version,
+            'mission_id': mission_id,
+            'tools': tools,
+            'updated_at': int(time.time())
+        })
+
+    def mark_complete(self, mission_id: str, findings_count: int, wiki_s3_key: str = '') -> bool:
+        """
+        Mark the archive's pipeline complete after the Archivist finished.
+
+        Only a mission whose scan was memoized as 'scanned' completes the
+        memo; returns whether it did.
+        """
+        marker = self.pipeline()
+        if not marker or marker.get('mission_id') != mission_id or marker.get('scan_type') != self.scan_type:
+            return False
+
+        self._put(self.pipeline_key(), {
+            **marker,
+            'status': 'complete',
+            'findings_count': findings_count,
+            'wiki_s3_key': wiki_s3_key,
+            'updated_at': int(time.time())
+        })
+        return True
@@ -0,0 +1,329 @@
+"""
+Local workspace materialization for a mission's source code.
+
+Unpack stores the validated source archive once as a workspace bundle
+(`workspaces/{mission}/source.tar.gz`). Agents that need the code on disk
+stream that single object through tarfile's streaming gzip reader and
+extract it as it arrives, instead of issuing one GET per file under
+`unzipped/{mission}/`. When no bundle exists (missions unpacked before
+bundles, or a failed bundle read), the per-object download is used, spread
+over a bounded thread pool.
+
+With the host blob cache (see blob_cache.py) the workspace is built from
+hardlinks to cached blobs. Unpack's manifest gives every file's sha256, so
+only files missing from the cache are fetched, and the finished tree is
+shared by every agent and MCP server on the host for the mission.
+"""
+
+import os
+import json
+import time
+import shutil
+import tarfile
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set, Union
+
+from .codec import read_body
+from .blob_cache import BlobCache, file_sha256
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_NAME = 'source.tar.gz'
+MANIFEST_NAME = 'manifest.json'
+
+
+def bundle_key(mission_id: str) -> str:
+    """S3 key of a mission's workspace bundle in the artifacts bucket."""
+    return f"workspaces/{mission_id}/{BUNDLE_NAME}"
+
+
+def manifest_key(mission_id: str) -> str:
+    """S3 key of the per-file sha256 manifest written by Unpack."""
+    return f"workspaces/{mission_id}/{MANIFEST_NAME}"
+
+
+def workspace_path(mission_id: str) -> Path:
+    """Where a mission's workspace lives on this host."""
+    cache = BlobCache.from_environment()
+    return cache.workspace_dir(mission_id) if cache else Path(f"/tmp/{mission_id}")
+
+
+def release_workspace(path: Union[str, Path]):
+    """
+    Release a workspace after an agent is done with it.
+    
+    Shared cache workspaces are kept for the other agents and servers on the
+    host and pruned by the cache; private ones are removed.
+    """
+    cache = BlobCache.from_environment()
+    if cache and cache.owns(path):
+        logger.info(f"Keeping shared workspace {path}")
+        return
+    shutil.rmtree(path, ignore_errors=True)
+    logger.info(f"Cleaned up workspace at {path}")
+
+
+def materialize_workspace(
+    s3_client: Any,
+    bucket: str,
+    mission_id: str,
+    dest: Union[str, Path],
+    mode: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    cache: Optional[BlobCache] = None
+) -> Dict[str, Any]:
+    """
+    Materialize a mission's source tree under dest.
+    
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Artifacts bucket
+        mission_id: Mission whose source is materialized
+        dest: Local directory to fill
+        mode: 'auto' (bundle, falling back to objects), 'bundle' or 'objects';
+            defaults to WORKSPACE_MATERIALIZATION
+        max_workers: Thread pool size for per-object downloads; defaults to
+            WORKSPACE_DOWNLOAD_CONCURRENCY
+        cache: Blob cache to build the workspace from; defaults to the
+            host cache (WORKSPACE_CACHE_DIR, disabled when empty)
+    
+    Returns:
+        Stats: mode used, files, bytes and seconds
+    """
+    mode = (mode or os.environ.get('WORKSPACE_MATERIALIZATION', 'auto')).lower()
+    max_workers = max_workers or int(os.environ.get('WORKSPACE_DOWNLOAD_CONCURRENCY', '16'))
+    cache = cache or BlobCache.from_environment()
+    dest = Path(dest)
+    start = time.monotonic()
+    
+    if cache is None:
+        stats = _materialize(s3_client, bucket, mission_id, dest, mode, max_workers)
+    else:
+        with cache.lock(f"workspace-{mission_id}"):
+            stats = _materialize_cached(s3_client, bucket, mission_id, dest, mode, max_workers, cache)
+        cache.evict()
+    
+    stats['seconds'] = round(time.monotonic() - start, 3)
+    logger.info(
+        f"Materialized {stats['files']} files ({stats['bytes']} bytes) to {dest} "
+        f"via {stats['mode']} in {stats['seconds']}s"
+    )
+    return stats
+
+
+def _materialize(
+    s3_client: Any,
+    bucket: str,
+    mission_id: str,
+    dest: Path,
+    mode: str,
+    max_workers: int
+) -> Dict[str, Any]:
+    """Fill dest straight from the bundle or the per-object prefix."""
+    dest.mkdir(parents=True, exist_ok=True)
+    
+    if mode in ('auto', 'bundle'):
+        try:
+            return _extract_bundle(s3_client, bucket, bundle_key(mission_id), dest)
+        except Exception as e:
+            if mode == 'bundle':
+                raise
+            logger.info(f"No usable workspace bundle for {mission_id} ({e}), downloading objects")
+            shutil.rmtree(dest, ignore_errors=True)
+            dest.mkdir(parents=True, exist_ok=True)
+    
+    return _download_objects(s3_client, bucket, f"unzipped/{mission_id}/", dest, max_workers)
+
+
+def _materialize_cached(
+    s3_client: Any,
+    bucket: str,
+    mission_id: str,
+    dest: Path,
+    mode: str,
+    max_workers: int,
+    cache: BlobCache
+) -> Dict[str, Any]:
+    """Build dest from cache hardlinks, fetching only blobs the host lacks."""
+    marker = cache.workspaces_dir / f"{mission_id}.json"
+    
+    # Another agent or server on this host already built it
+    if marker.exists() and dest.is_dir():
+        built = json.loads(marker.read_text())
+        if built.get('dest') == str(dest):
+            os.utime(marker)
+            return {'mode': 'shared', 'files': built['files'], 'bytes': built['bytes']}
+    
+    shutil.rmtree(dest, ignore_errors=True)
+    dest.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=manifest_key(mission_id))
+        manifest = json.loads(read_body(response))['files']
+    except Exception as e:
+        logger.info(f"No workspace manifest for {mission_id} ({e}), filling cache from download")
+        stats = _materialize(s3_client, bucket, mission_id, dest, mode, max_workers)
+        with cache.lock('blobs', shared=True):
+            for path in dest.rglob('*'):
+                if path.is_file() and not path.is_symlink():
+                    cache.adopt(path)
+    else:
+        root = dest.resolve()
+        for relative in manifest:
+            if root not in (root / relative).resolve().parents:
+                raise ValueError(f"Unsafe path in workspace manifest: {relative}")
+        
+        # Eviction waits until every blob found cached here is linked
+        with cache.lock('blobs', shared=True):
+            # One path per blob the cache lacks; duplicates of it are linked later
+            missing: Dict[str, str] = {}
+            checked: Set[str] = set()
+            for relative, entry in manifest.items():
+                digest = entry['sha256']
+                if digest not in checked:
+                    checked.add(digest)
+                    if not cache.has(digest):
+                        missing[relative] = digest
+            
+            if missing:
+                _fetch_blobs(s3_client, bucket, mission_id, missing, mode, max_workers, cache)
+            
+            for relative, entry in manifest.items():
+                cache.link(entry['sha256'], dest / relative)
+        
+        stats = {
+            'mode': 'cache',
+            'files': len(manifest),
+            'bytes': sum(entry.get('size', 0) for entry in manifest.values()),
+            'fetched': len(missing)
+        }
+    
+    marker.write_text(json.dumps({'dest': str(dest), 'files': stats['files'], 'bytes': stats['bytes']}))
+    return stats
+
+
+def _fetch_blobs(
+    s3_client: Any,
+    bucket: str,
+    mission_id: str,
+    missing: Dict[str, str],
+    mode: str,
+    max_workers: int,
+    cache: BlobCache
+):
+    """
+    Fetch the files whose blobs the cache lacks, verifying each digest.
+    
+    Past WORKSPACE_BUNDLE_MIN_MISSES files one sequential bundle read is
+    cheaper than that many GETs; below it the objects are fetched directly.
+    """
+    threshold = int(os.environ.get('WORKSPACE_BUNDLE_MIN_MISSES', '256'))
+    
+    def ingest(temp: Path, relative: str):
+        digest = file_sha256(temp)
+        if digest != missing[relative]:
+            temp.unlink(missing_ok=True)
+            raise ValueError(f"Digest mismatch for {relative}: expected {missing[relative]}, got {digest}")
+        cache.ingest(temp, digest)
+    
+    if mode != 'objects' and len(missing) >= threshold:
+        try:
+            response = s3_client.get_object(Bucket=bucket, Key=bundle_key(mission_id))
+            pending: Set[str] = set(missing)
+            with tarfile.open(fileobj=response['Body'], mode='r|*') as tar:
+                for member in tar:
+                    relative = os.path.normpath(member.name)
+                    if relative not in pending or not member.isfile():
+                        continue
+                    temp = cache.temp_path()
+                    with tar.extractfile(member) as source, open(temp, 'wb') as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+                    ingest(temp, relative)
+                    pending.discard(relative)
+            if not pending:
+                return
+            missing = {relative: missing[relative] for relative in pending}
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.info(f"Workspace bundle unusable for {mission_id} ({e}), fetching objects")
+    
+    prefix = f"unzipped/{mission_id}/"
+    
+    def fetch(relative: str):
+        temp = cache.temp_path()
+        s3_client.download_file(bucket, f"{prefix}{relative}", str(temp))
+        ingest(temp, relative)
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for future in [executor.submit(fetch, relative) for relative in missing]:
+            future.result()
+
+
+def _extract_bundle(s3_client: Any, bucket: str, key: str, dest: Path) -> Dict[str, Any]:
+    """Stream a tar.gz bundle from S3 and extract it member by member."""
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    root = dest.resolve()
+    files = 0
+    size = 0
+    
+    # 'r|*' reads the body strictly sequentially, decompressing as it goes
+    with tarfile.open(fileobj=response['Body'], mode='r|*') as tar:
+        for member in tar:
+            target = (root / member.name).resolve()
+            if member.name.startswith('/') or (target != root and root not in target.parents):
+                raise ValueError(f"Unsafe path in workspace bundle: {member.name}")
+            if not (member.isfile() or member.isdir()):
+                logger.warning(f"Skipping non-regular bundle member: {member.name}")
+                continue
+            
+            if hasattr(tarfile, 'data_filter'):
+                tar.extract(member, root, filter='data')
+            else:
+                tar.extract(member, root, set_attrs=False)
+            
+            if member.isfile():
+                files += 1
+                size += member.size
+    
+    return {'mode': 'bundle', 'files': files, 'bytes': size}
+
+
+def _download_objects(
+    s3_client: Any,
+    bucket: str,
+    prefix: str,
+    dest: Path,
+    max_workers: int
+) -> Dict[str, Any]:
+    """Download every object under prefix through a bounded thread pool."""
+    root = dest.resolve()
+    
+    def download(key: str):
+        local_file = (root / key[len(prefix):]).resolve()
+        if root not in local_file.parents:
+            raise ValueError(f"Unsafe object key: {key}")
+        local_file.parent.mkdir(parents=True, exist_ok=True)
+        s3_client.download_file(bucket, key, str(local_file))
+    
+    files = 0
+    size = 0
+    paginator = s3_client.get_paginator('list_objects_v2')
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pending = []
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                # Skip directory markers
+                if not obj['Key'][len(prefix):] or obj['Key'].endswith('/'):
+                    continue
+                pending.append(executor.submit(download, obj['Key']))
+                files += 1
+                size += obj.get('Size', 0)
+        
+        for future in pending:
+            future.result()
+    
+    return {'mode': 'objects', 'files': files, 'bytes': size}
@@ -0,0 +1,47 @@
+"""
+Synthesis Module
+================
+
+Building blocks for turning normalized tool results into draft findings.
+
+Classes:
+    TranslationRule: How one family of a tool's findings becomes a draft finding
+    LocationIndex: Per-file interval trees over the findings of all sources
+    IntervalTree: Overlap queries over line ranges
+    Location: Lines of a file one source reported a finding on
+
+Functions:
+    partition_tool_results: Token-bounded chunks of tool results for map-reduce synthesis
+    restrict_document: A tool result restricted to some of its findings
+    estimate_tokens: Approximate prompt tokens of a value
+    translate_tool_results: Draft findings for mechanically mappable findings, without the model
+    translate_code_patterns: Draft findings for the deep researcher's security patterns
+    cluster_findings: Exact and near-duplicate clusters of findings in near-linear time
+"""
+
+from .chunking import estimate_tokens, partition_tool_results, restrict_document
+from .translator import (
+    TRANSLATION_RULES,
+    TranslationRule,
+    translate_code_patterns,
+    translate_finding,
+    translate_tool_results
+)
+from .dedup import cluster_findings
+from .correlation import IntervalTree, Location, LocationIndex, tool_source
+
+__all__ = [
+    "estimate_tokens",
+    "partition_tool_results",
+    "restrict_document",
+    "TRANSLATION_RULES",
+    "TranslationRule",
+    "translate_finding",
+    "translate_tool_results",
+    "translate_code_patterns",
+    "cluster_findings",
+    "IntervalTree",
+    "Location",
+    "LocationIndex",
+    "tool_source"
+]
@@ -0,0 +1,123 @@
+"""
+Token-bounded partitioning of tool results for map-reduce synthesis.
+
+A single synthesis prompt over every tool result hits the prompt size cap
+on large scans and the output cap on findings. Normalized findings are
+instead grouped by file (or by rule) and the groups packed into chunks that
+stay under a token budget. Each chunk is a list of self-contained wire
+documents, one per tool, carrying only that chunk's findings with their
+own path and string tables, so chunks can be synthesized independently and
+concurrently.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from src.shared.mcp_server import FindingEncoder, Finding, decode_tool_result, is_wire_document, iter_findings
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt tokens per character of compact JSON
+CHARS_PER_TOKEN = 4
+
+# Row overhead on the wire besides rule, path and strings
+ROW_OVERHEAD_CHARS = 48
+
+# Header fields rebuilt for every chunk
+TABLE_FIELDS = ('paths', 'strings', 'findings', 'rows', 'findings_count')
+
+PARTITION_KEYS = ('path', 'rule')
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate prompt tokens of a value serialized as compact JSON."""
+    text = value if isinstance(value, str) else json.dumps(value, separators=(',', ':'), default=str)
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _finding_tokens(finding: Finding) -> int:
+    chars = len(finding.rule) + len(finding.snippet) + len(finding.message) + ROW_OVERHEAD_CHARS
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def restrict_document(header: Dict[str, Any], findings: List[Finding]) -> Dict[str, Any]:
+    """A wire document restricted to some of a tool result's findings, with its own tables."""
+    meta = {k: v for k, v in header.items() if k not in TABLE_FIELDS}
+    encoder = FindingEncoder(header.get('tool', 'unknown'), header.get('root'))
+    for finding in findings:
+        encoder.add(finding)
+    document = decode_tool_result(encoder.encode({**meta, 'findings_count': len(findings)}))
+    # Provenance fields the Synthesizer attached after reading the result
+    document.update({k: v for k, v in header.items() if k.startswith('_')})
+    return document
+
+
+def partition_tool_results(
+    tool_results: List[Dict[str, Any]],
+    max_tokens: int = 20000,
+    partition_key: str = 'path'
+) -> List[List[Dict[str, Any]]]:
+    """
+    Split tool results into chunks of at most about max_tokens.
+    
+    Findings of one file (or rule) stay in one chunk unless that group alone
+    exceeds the budget. Results that are not normalized findings documents
+    are passed through whole, one chunk each.
+    
+    Args:
+        tool_results: Decoded tool results as read by the Synthesizer
+        max_tokens: Token budget of one chunk's tool results
+        partition_key: 'path' to group by file, 'rule' to group by rule
+    
+    Returns:
+        Chunks, each a list of tool result documents
+    """
+    if partition_key not in PARTITION_KEYS:
+        raise ValueError(f"partition_key must be one of {PARTITION_KEYS}")
+    
+    chunks: List[List[Dict[str, Any]]] = []
+    
+    # (header, findings, tokens) groups in the order tools and files appear
+    groups: List[Tuple[Dict[str, Any], List[Finding], int]] = []
+    for result in tool_results:
+        if not is_wire_document(result):
+            chunks.append([result])
+            continue
+        
+        header_tokens = estimate_tokens({k: v for k, v in result.items() if k not in TABLE_FIELDS})
+        by_key: Dict[str, List[Finding]] = OrderedDict()
+        for finding in iter_findings(result):
+            by_key.setdefault(getattr(finding, partition_key), []).append(finding)
+        
+        if not by_key:
+            groups.append((result, [], header_tokens))
+        for key, findings in by_key.items():
+            tokens = estimate_tokens(key)
+            group: List[Finding] = []
+            for finding in findings:
+                cost = _finding_tokens(finding)
+                # An oversized group is split across chunks
+                if group and header_tokens + tokens + cost > max_tokens:
+                    groups.append((result, group, header_tokens + tokens))
+                    group, tokens = [], estimate_tokens(key)
+                group.append(finding)
+                tokens += cost
+            groups.append((result, group, header_tokens + tokens))
+    
+    # First-fit packing in order; one document per tool within a chunk
+    current: Dict[int, Tuple[Dict[str, Any], List[Finding]]] = OrderedDict()
+    current_tokens = 0
+    for header, findings, tokens in groups:
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append([restrict_document(h, f) for h, f in current.values()])
+            current, current_tokens = OrderedDict(), 0
+        entry = current.setdefault(id(header), (header, []))
+        entry[1].extend(findings)
+        current_tokens += tokens
+    if current:
+        chunks.append([restrict_document(h, f) for h, f in current.values()])
+    
+    logger.info(f"Partitioned {len(tool_results)} tool results by {partition_key} into {len(chunks)} chunks")
+    return chunks
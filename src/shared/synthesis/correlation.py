@@ -0,0 +1,168 @@
+"""
+Location index for cross-tool correlation.
+
+Findings of different sources (semgrep, gitleaks, the deep researcher's
+patterns) that land on overlapping lines of one file usually describe one
+issue. A per-file interval tree answers "what else fires on these lines" in
+logarithmic time plus the number of hits, and a sweep over each file's
+intervals yields the groups of overlapping findings from several sources.
+Findings without lines (lockfile CVEs, cloud resources) are not indexed.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from src.shared.mcp_server import is_wire_document, iter_findings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Location:
+    """Lines of a file one source reported a finding on."""
+    source: str
+    path: str
+    line_start: int
+    line_end: int
+    rule: str
+    evidence_digest: str = ''
+    fingerprint: str = ''
+
+
+def tool_source(header: Dict[str, Any]) -> str:
+    """Tool server a decoded tool result came from, as draft findings name it."""
+    return header.get('_tool', f"{header.get('tool', 'unknown')}-mcp").split(':')[0]
+
+
+class IntervalTree:
+    """
+    Static interval tree over closed line ranges.
+    
+    Intervals are kept sorted by start as an implicit balanced tree whose
+    nodes carry the largest end below them. Additions mark the tree for a
+    rebuild on the next query.
+    """
+    
+    def __init__(self):
+        self.intervals: List[Tuple[int, int, Any]] = []
+        self.max_end: List[int] = []
+        self.dirty = False
+    
+    def __len__(self) -> int:
+        return len(self.intervals)
+    
+    def add(self, start: int, end: int, item: Any):
+        self.intervals.append((start, max(start, end), item))
+        self.dirty = True
+    
+    def overlapping(self, start: int, end: int) -> List[Any]:
+        """Items whose interval overlaps [start, end]."""
+        if self.dirty:
+            self._build()
+        hits: List[Any] = []
+        self._query(0, len(self.intervals), start, end, hits)
+        return hits
+    
+    def _build(self):
+        self.intervals.sort(key=lambda interval: (interval[0], interval[1]))
+        self.max_end = [0] * len(self.intervals)
+        self._build_node(0, len(self.intervals))
+        self.dirty = False
+    
+    def _build_node(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        self.max_end[mid] = max(self.intervals[mid][1], self._build_node(lo, mid), self._build_node(mid + 1, hi))
+        return self.max_end[mid]
+    
+    def _query(self, lo: int, hi: int, start: int, end: int, hits: List[Any]):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self.max_end[mid] < start:
+            return
+        self._query(lo, mid, start, end, hits)
+        interval_start, interval_end, item = self.intervals[mid]
+        if interval_start > end:
+            # Everything to the right starts later still
+            return
+        if interval_end >= start:
+            hits.append(item)
+        self._query(mid + 1, hi, start, end, hits)
+
+
+class LocationIndex:
+    """Per-file interval trees over the located findings of all sources."""
+    
+    def __init__(self):
+        self.files: Dict[str, IntervalTree] = {}
+    
+    def __len__(self) -> int:
+        return sum(len(tree) for tree in self.files.values())
+    
+    def add(self, location: Location):
+        if location.line_start <= 0:
+            return
+        self.files.setdefault(location.path, IntervalTree()).add(location.line_start, location.line_end, location)
+    
+    def add_tool_results(self, tool_results: List[Dict[str, Any]]):
+        """Index the findings of decoded tool results."""
+        for result in tool_results:
+            if not is_wire_document(result):
+                continue
+            source = tool_source(result)
+            for finding in iter_findings(result):
+                self.add(Location(
+                    source=source,
+                    path=finding.path,
+                    line_start=finding.line_start,
+                    line_end=finding.line_end or finding.line_start,
+                    rule=finding.rule,
+                    evidence_digest=result.get('_digest', ''),
+                    fingerprint=finding.fingerprint
+                ))
+    
+    def add_code_patterns(self, patterns: List[Dict[str, Any]], evidence_digest: str):
+        """Index the deep researcher's exported security patterns."""
+        for pattern in patterns:
+            if pattern.get('file') and pattern.get('line'):
+                self.add(Location(
+                    source='deep-researcher',
+                    path=pattern['file'],
+                    line_start=pattern['line'],
+                    line_end=pattern['line'],
+                    rule=pattern.get('type', 'unknown'),
+                    evidence_digest=evidence_digest
+                ))
+    
+    def overlapping(self, path: str, line_start: int, line_end: int) -> List[Location]:
+        """Findings of any source on lines overlapping [line_start, line_end] of a file."""
+        tree = self.files.get(path)
+        if tree is None:
+            return []
+        return tree.overlapping(line_start, max(line_start, line_end))
+    
+    def correlated_groups(self, min_sources: int = 2) -> List[List[Location]]:
+        """
+        Groups of overlapping findings reported by at least min_sources sources.
+        
+        A group is a run of transitively overlapping intervals of one file.
+        """
+        groups = []
+        for path in sorted(self.files):
+            run: List[Location] = []
+            run_end = 0
+            for location in sorted(
+                (interval[2] for interval in self.files[path].intervals),
+                key=lambda l: (l.line_start, l.line_end)
+            ):
+                if run and location.line_start > run_end:
+                    groups.append(run)
+                    run = []
+                run_end = max(run_end, location.line_end) if run else location.line_end
+                run.append(location)
+            if run:
+                groups.append(run)
+        return [g for g in groups if len({l.source for l in g}) >= min_sources]
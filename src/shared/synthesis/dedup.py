@@ -0,0 +1,174 @@
+"""
+Near-linear clustering of duplicate findings.
+
+Exact duplicates meet in a hash index on their key. Near-duplicates - the
+same issue reported by two sources under different titles - are found with
+MinHash signatures over normalized words, banded into LSH buckets so only
+findings sharing a bucket (and a file) are ever compared. Similarity is the
+estimated containment of the smaller word set in the larger, as a terse
+report (a regex pattern hit) rarely reaches a high Jaccard score against a
+verbose one. Clusters are kept in a union-find, so tens of thousands of
+findings cluster in roughly linear time instead of comparing every pair.
+"""
+
+import re
+import random
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Modulus of the MinHash permutations
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Compared against at most this many earlier findings per bucket
+MAX_BUCKET_CANDIDATES = 32
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'could', 'detected', 'for', 'found',
+    'from', 'has', 'in', 'is', 'issue', 'it', 'may', 'of', 'on', 'or', 'possible', 'potential',
+    'the', 'this', 'to', 'use', 'used', 'using', 'via', 'vulnerability', 'was', 'with'
+})
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Distinct lowercase words of a text, without stopwords and numbers, in order."""
+    words = re.findall(r'[a-z0-9]+', (text or '').lower())
+    return list(dict.fromkeys(w for w in words if len(w) > 1 and not w.isdigit() and w not in STOPWORDS))
+
+
+class MinHasher:
+    """MinHash signatures with fixed, seeded permutations."""
+    
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME)) for _ in range(num_perm)]
+    
+    def signature(self, tokens: Sequence[str]) -> Tuple[int, ...]:
+        """Signature of a token set; empty for no tokens."""
+        hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), 'big') for t in tokens]
+        if not hashes:
+            return ()
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self.permutations)
+
+
+def signature_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or not b:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def containment(jaccard: float, size_a: int, size_b: int) -> float:
+    """Share of the smaller set in the larger, from their Jaccard similarity and sizes."""
+    if not size_a or not size_b:
+        return 0.0
+    shared = jaccard * (size_a + size_b) / (1 + jaccard)
+    return min(1.0, shared / min(size_a, size_b))
+
+
+def _lines_near(a: Sequence[int], b: Sequence[int], window: int) -> bool:
+    """Whether two line sets overlap or lie within window lines; unknown lines always match."""
+    a = [n for n in a or [] if n]
+    b = [n for n in b or [] if n]
+    if not a or not b:
+        return True
+    return max(min(a), min(b)) - min(max(a), max(b)) <= window
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+    
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+    
+    def union(self, i: int, j: int):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            # The earlier finding stays the root
+            self.parent[max(i, j)] = min(i, j)
+
+
+def cluster_findings(
+    findings: Sequence[Any],
+    exact_key: Callable[[Any], str],
+    text: Callable[[Any], str],
+    scope: Callable[[Any], str],
+    lines: Optional[Callable[[Any], Sequence[int]]] = None,
+    threshold: float = 0.7,
+    num_perm: int = 32,
+    bands: int = 16,
+    line_window: int = 5
+) -> List[List[int]]:
+    """
+    Group duplicate findings.
+    
+    Args:
+        findings: Findings of any shape, read through the accessors
+        exact_key: Key of exact duplicates
+        text: Text compared for near-duplicates (title, description, snippet)
+        scope: Near-duplicates must share this (usually the file path)
+        lines: Line numbers near-duplicates must overlap or be near
+        threshold: Minimum estimated containment of near-duplicates
+        num_perm: MinHash signature length
+        bands: LSH bands; num_perm must divide evenly into them
+        line_window: Maximum line distance of near-duplicates
+    
+    Returns:
+        Clusters as lists of indices into findings, each in input order,
+        ordered by their first finding
+    """
+    if num_perm % bands:
+        raise ValueError("num_perm must be a multiple of bands")
+    rows = num_perm // bands
+    
+    clusters = _UnionFind(len(findings))
+    hasher = MinHasher(num_perm)
+    signatures: List[Tuple[int, ...]] = []
+    sizes: List[int] = []
+    exact: Dict[str, int] = {}
+    buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = {}
+    comparisons = 0
+    
+    for i, finding in enumerate(findings):
+        key = exact_key(finding)
+        if key in exact:
+            clusters.union(exact[key], i)
+            signatures.append(())
+            sizes.append(0)
+            continue
+        exact[key] = i
+        
+        tokens = normalize_tokens(text(finding))
+        signature = hasher.signature(tokens)
+        signatures.append(signature)
+        sizes.append(len(tokens))
+        if not signature:
+            continue
+        
+        where = scope(finding)
+        for band in range(bands):
+            bucket = buckets.setdefault((where, band, signature[band * rows:(band + 1) * rows]), [])
+            for j in bucket[-MAX_BUCKET_CANDIDATES:]:
+                if clusters.find(i) == clusters.find(j):
+                    continue
+                comparisons += 1
+                jaccard = signature_similarity(signature, signatures[j])
+                if containment(jaccard, sizes[i], sizes[j]) < threshold:
+                    continue
+                if lines and not _lines_near(lines(finding), lines(findings[j]), line_window):
+                    continue
+                clusters.union(i, j)
+            bucket.append(i)
+    
+    grouped: Dict[int, List[int]] = {}
+    for i in range(len(findings)):
+        grouped.setdefault(clusters.find(i), []).append(i)
+    
+    logger.info(f"Clustered {len(findings)} findings into {len(grouped)} with {comparisons} comparisons")
+    return sorted(grouped.values(), key=lambda members: members[0])
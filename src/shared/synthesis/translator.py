@@ -0,0 +1,250 @@
+"""
+Rule-based translation of well-understood scanner findings.
+
+Many findings map mechanically to a draft finding: a gitleaks AWS key, a
+trivy CVE with a CVSS score, a semgrep rule carrying its own severity.
+Per-tool tables give the title, severity and confidence for such findings
+so they skip the model. Everything else - rules without a mapping, missing
+scores or severities, and lines flagged by more than one tool, where the
+model's correlation is the point - is left in the tool results for
+synthesis.
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.shared.mcp_server import Finding, is_wire_document, iter_findings
+
+from .chunking import restrict_document
+from .correlation import LocationIndex, tool_source
+
+logger = logging.getLogger(__name__)
+
+# Draft finding severities, lowest first
+DRAFT_SEVERITIES = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+
+# CVSS base score floors of each severity, highest first
+CVSS_BANDS = ((9.0, 'CRITICAL'), (7.0, 'HIGH'), (4.0, 'MEDIUM'), (0.0, 'LOW'))
+
+
+@dataclass
+class TranslationRule:
+    """
+    How one family of a tool's findings becomes a draft finding.
+    
+    severity is a draft severity, 'tool' for the scanner's own or 'cvss'
+    for the band of the vulnerability's CVSS score. Templates may use rule,
+    name, path, line, message, snippet, package, installed, fixed and cvss.
+    """
+    pattern: str
+    title: str
+    severity: str
+    confidence: float
+    description: str = '{message}'
+    
+    def matches(self, rule: str) -> bool:
+        return re.search(self.pattern, rule, re.IGNORECASE) is not None
+
+
+TRANSLATION_RULES: Dict[str, List[TranslationRule]] = {
+    'gitleaks': [
+        TranslationRule(
+            r'^aws-(access-token|access-key|secret)',
+            'Hardcoded AWS Access Key in {path}',
+            'CRITICAL',
+            0.95,
+            'Gitleaks rule {rule} matched an AWS credential ({message}) at {path}:{line}. '
+            'Deactivate the key, rotate it and purge it from the repository history.'
+        ),
+        TranslationRule(
+            r'^private-key$',
+            'Private Key Committed in {path}',
+            'CRITICAL',
+            0.9,
+            'A private key was committed at {path}:{line}. Revoke it and purge it from the repository history.'
+        ),
+        TranslationRule(
+            r'^(github|gitlab|slack|stripe|twilio|sendgrid|npm|pypi|gcp|azure)-',
+            'Hardcoded {message} in {path}',
+            'HIGH',
+            0.9,
+            'Gitleaks rule {rule} matched a {message} at {path}:{line}. Revoke and rotate the credential.'
+        )
+        # generic-api-key and other entropy rules are too noisy to trust without review
+    ],
+    'trivy': [
+        TranslationRule(
+            r'^(CVE|GHSA)-',
+            '{rule} in {package} {installed} ({path})',
+            'cvss',
+            0.9,
+            '{message}. {package} {installed} in {path} is affected (CVSS {cvss}); upgrade to {fixed}.'
+        )
+    ],
+    'semgrep': [
+        TranslationRule(
+            r'.',
+            '{name} in {path}',
+            'tool',
+            0.8,
+            '{message}'
+        )
+    ]
+}
+
+
+# Regex hits of the deep researcher corroborate more than they establish
+RESEARCH_CONFIDENCE = 0.4
+
+
+def _rule_name(rule: str) -> str:
+    """'python.lang.security.audit.eval-detected' -> 'Eval Detected'."""
+    return re.sub(r'[-_]+', ' ', rule.rsplit('.', 1)[-1]).strip().title() or rule
+
+
+def _package(snippet: str) -> Tuple[str, str, str]:
+    """Package, installed and fixed version from a trivy snippet 'pkg 1.0 -> 1.1'."""
+    installed, _, fixed = snippet.partition(' -> ')
+    package, _, version = installed.strip().rpartition(' ')
+    if not package:
+        package, version = version, ''
+    return package, version, fixed.strip() or 'N/A'
+
+
+def _severity(rule: TranslationRule, finding: Finding, cvss: Optional[float]) -> Optional[str]:
+    """The draft severity, or None when the finding lacks what the rule needs."""
+    if rule.severity == 'cvss':
+        if cvss is None:
+            return None
+        return next(label for floor, label in CVSS_BANDS if cvss >= floor)
+    if rule.severity == 'tool':
+        if finding.severity == 'UNKNOWN':
+            return None
+        return finding.severity if finding.severity in DRAFT_SEVERITIES else 'LOW'
+    return rule.severity
+
+
+def _correlated(finding: Finding, source: str, index: LocationIndex) -> bool:
+    """Whether another tool reported a finding on the same lines of the file."""
+    if not finding.line_start:
+        return False
+    return any(
+        location.source != source
+        for location in index.overlapping(finding.path, finding.line_start, finding.line_end or finding.line_start)
+    )
+
+
+def translate_finding(finding: Finding, header: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    A draft finding for one normalized finding, if a rule maps it.
+    
+    The draft uses the same fields as the model's synthesis output.
+    """
+    for rule in TRANSLATION_RULES.get(finding.tool, []):
+        if not rule.matches(finding.rule):
+            continue
+        
+        cvss = header.get('cvss', {}).get(finding.rule)
+        severity = _severity(rule, finding, cvss)
+        if severity is None:
+            return None
+        
+        package, installed, fixed = _package(finding.snippet) if finding.tool == 'trivy' else ('', '', '')
+        fields = {
+            'rule': finding.rule,
+            'name': _rule_name(finding.rule),
+            'path': finding.path,
+            'line': finding.line_start,
+            'message': finding.message or finding.rule,
+            'snippet': finding.snippet,
+            'package': package,
+            'installed': installed,
+            'fixed': fixed,
+            'cvss': cvss
+        }
+        return {
+            'title': rule.title.format(**fields),
+            'severity': severity,
+            'description': rule.description.format(**fields),
+            'file_path': finding.path,
+            'line_numbers': sorted({n for n in (finding.line_start, finding.line_end) if n}),
+            'tool_source': tool_source(header),
+            'evidence_digest': header.get('_digest') or finding.fingerprint,
+            'confidence': rule.confidence
+        }
+    return None
+
+
+def translate_tool_results(
+    tool_results: List[Dict[str, Any]],
+    index: Optional[LocationIndex] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Translate the mechanically mappable findings of a batch of tool results.
+    
+    Args:
+        tool_results: Decoded tool results as read by the Synthesizer
+        index: Locations of every tool seen so far, already including these
+            results; defaults to an index of this batch alone
+    
+    Returns:
+        Draft findings, the tool results still needing the model (restricted
+        to their untranslated findings), and counts of findings 'translated'
+        and sent 'to_model'
+    """
+    if index is None:
+        index = LocationIndex()
+        index.add_tool_results(tool_results)
+    drafts: List[Dict[str, Any]] = []
+    remaining: List[Dict[str, Any]] = []
+    stats = {'translated': 0, 'to_model': 0}
+    
+    for result in tool_results:
+        if not is_wire_document(result):
+            remaining.append(result)
+            continue
+        
+        source = tool_source(result)
+        untranslated: List[Finding] = []
+        for finding in iter_findings(result):
+            draft = None if _correlated(finding, source, index) else translate_finding(finding, result)
+            if draft is None:
+                untranslated.append(finding)
+            else:
+                drafts.append(draft)
+                stats['translated'] += 1
+        
+        stats['to_model'] += len(untranslated)
+        if untranslated:
+            remaining.append(restrict_document(result, untranslated))
+    
+    logger.info(f"Translated {stats['translated']} findings by rule, {stats['to_model']} left for synthesis")
+    return drafts, remaining, stats
+
+
+def translate_code_patterns(patterns: List[Dict[str, Any]], evidence_digest: str) -> List[Dict[str, Any]]:
+    """
+    Draft findings for the security patterns the deep researcher exported.
+    
+    Args:
+        patterns: 'security_patterns' entries of the research artifact
+        evidence_digest: Digest of the research artifact
+    """
+    drafts = []
+    for pattern in patterns:
+        if not pattern.get('type') or not pattern.get('file'):
+            continue
+        severity = str(pattern.get('severity', '')).upper()
+        drafts.append({
+            'title': f"{_rule_name(pattern['type'])} in {pattern['file']}",
+            'severity': severity if severity in DRAFT_SEVERITIES else 'MEDIUM',
+            'description': pattern.get('description') or f"{_rule_name(pattern['type'])} pattern",
+            'file_path': pattern['file'],
+            'line_numbers': [pattern['line']] if pattern.get('line') else [],
+            'tool_source': 'deep-researcher',
+            'evidence_digest': evidence_digest,
+            'confidence': RESEARCH_CONFIDENCE
+        })
+    return drafts
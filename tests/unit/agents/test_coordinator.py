@@ -342,18 +342,27 @@ class TestCoordinatorAgent:
         """Test processing successful tool results."""
         from src.agents.coordinator.agent import CoordinatorAgent
         
+        from src.shared.mcp_server import Finding, encode_tool_result
+        
+        semgrep_wire = encode_tool_result(
+            {'success': True, 'tool': 'semgrep', 'summary': {'high': 2}},
+            [Finding('semgrep', 'sql-injection', 'ERROR', '/tmp/src/app.py', 4, 4, 'q = f"..."', 'SQLi')] * 2,
+            root='/tmp/src'
+        )
+        
         results = [
             {
                 'success': True,
                 'server': 'semgrep-mcp',
                 'tool': 'semgrep_scan',
-                'content': [{'findings_count': 10, 'storage': {'key': 's3://bucket/results'}, 'summary': 'Found 10 issues'}]
+                'content': [{'type': 'text', 'text': semgrep_wire}]
             },
             {
                 'success': True,
                 'server': 'gitleaks-mcp',
                 'tool': 'gitleaks_scan',
-                'content': [{'secrets_found': 3}]
+                # Header-only document, already parsed by the MCP client
+                'content': [{'format': 'hive-findings/1', 'tool': 'gitleaks', 'findings_count': 0, 'paths': [], 'strings': ['']}]
             }
         ]
         
@@ -364,9 +373,10 @@ class TestCoordinatorAgent:
         
         assert len(processed) == 2
         assert processed[0]['success'] == True
-        assert processed[0]['findings_count'] == 10
-        assert 'storage' in processed[0]
-        assert processed[1]['findings_count'] == 3
+        assert processed[0]['findings_count'] == 2
+        assert processed[0]['summary'] == {'high': 2}
+        assert processed[0]['raw_results'] == semgrep_wire
+        assert processed[1]['findings_count'] == 0
     
     def test_process_tool_results_failures(self, mock_environment, mock_redis):
         """Test processing failed tool results."""
@@ -585,4 +595,31 @@ class TestCoordinatorAgent:
                     with patch.object(CoordinatorAgent, 'run', new=AsyncMock(return_value=mock_result)):
                         exit_code = main()
         
-        assert exit_code == 1
\ No newline at end of file
+        assert exit_code == 1    
+    @pytest.mark.asyncio
+    async def test_store_results_reports_unprocessed_rows(self, mock_environment, mock_redis):
+        """Test persistence stats count only the rows DynamoDB accepted after retries."""
+        from src.agents.coordinator import agent as coordinator
+        
+        client = Mock()
+        client.put_object.return_value = {}
+        client.batch_write_item.side_effect = lambda RequestItems: {
+            'UnprocessedItems': {table: [r for r in rows if 'error' in r['PutRequest']['Item']]}
+            for table, rows in RequestItems.items()
+        }
+        results = [
+            {'server': 'semgrep-mcp', 'tool': 'semgrep_scan', 'success': True, 'raw_results': '{}\n', 'arg_digest': 'sha256:aa'},
+            {'server': 'gitleaks-mcp', 'tool': 'gitleaks_scan', 'success': False, 'error': 'boom', 'arg_digest': 'sha256:bb'}
+        ]
+        
+        with patch.dict('os.environ', {**mock_environment, 'REDIS_PORT': '6379', 'COORDINATOR_BATCH_WRITE_RETRIES': '1'}):
+            with patch('redis.Redis', return_value=mock_redis), patch('boto3.client', return_value=client), \
+                    patch.object(coordinator, 'Config', create=True), \
+                    patch('src.shared.storage.batch_write.time.sleep'):
+                agent = coordinator.CoordinatorAgent()
+                persistence = await agent._store_results(results)
+        
+        assert client.batch_write_item.call_count == 2
+        assert persistence['objects_written'] == 2
+        assert persistence['rows_written'] == 1
+        assert persistence['bytes_written'] > 0
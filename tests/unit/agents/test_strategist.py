@@ -724,6 +724,40 @@ class TestStrategistAgent:
         assert len(result.tools) == 0
         assert 'no critical exploitable issues' in result.reasoning.lower()
 
+    
+    def test_decide_emits_previous_mission_as_baseline(
+        self,
+        mock_redis_client,
+        mock_environment
+    ):
+        """Test the repo's latest earlier archived mission becomes the diff baseline."""
+        # Arrange
+        from src.agents.strategist import agent as strategist_agent
+        dynamodb = Mock()
+        dynamodb.query.return_value = {'Items': [
+            {'mission_id': {'S': 'mission-now'}},
+            {'mission_id': {'S': 'mission-before'}}
+        ]}
+        environment = {**mock_environment, 'REPO_NAME': 'acme-api', 'SCAN_TYPE': 'code'}
+        
+        # Act
+        with patch.dict('os.environ', environment), patch.object(strategist_agent, 'Config', create=True):
+            with patch('boto3.client', side_effect=lambda service, **kwargs: dynamodb if service == 'dynamodb' else Mock()):
+                with patch('redis.Redis', return_value=mock_redis_client):
+                    agent = strategist_agent.StrategistAgent('mission-now')
+                    result = agent._decide_strategy({'tools': []}, {})
+                    
+                    agent.repo_name = 'unknown'
+                    unnamed = agent._decide_strategy({'tools': []}, {})
+        
+        # Assert
+        assert result.baseline_mission_id == 'mission-before'
+        query = dynamodb.query.call_args.kwargs
+        assert query['IndexName'] == 'repo_name-timestamp-index'
+        assert query['ExpressionAttributeValues'] == {':repo': {'S': 'acme-api'}}
+        assert query['ScanIndexForward'] is False
+        assert unnamed.baseline_mission_id is None
+        assert dynamodb.query.call_count == 1
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -366,7 +366,86 @@ class TestSynthesizerAgent:
                         except Exception as e:
                             # Any exception related to processing is acceptable
                             assert True
+    
+    def test_incremental_correlates_across_tools(self, mock_environment):
+        """Test a later tool's finding on lines an earlier tool flagged goes to the model as correlated."""
+        from src.agents.synthesizer import agent as synthesizer
+        from src.shared.mcp_server import Finding, FindingEncoder, decode_tool_result
+        from src.shared.mission import ToolResultFeed
+        
+        def document(tool, **finding):
+            encoder = FindingEncoder(tool)
+            encoder.add(Finding(tool=tool, **finding))
+            return {**decode_tool_result(encoder.encode({})), '_tool': f"{tool}-mcp:{tool}_scan", '_digest': f"sha256:{tool}"}
+        
+        results = {
+            's3://test-bucket/gitleaks': document('gitleaks', rule='aws-access-token', severity='HIGH', path='config.py', line_start=4, line_end=4, message='AWS'),
+            's3://test-bucket/semgrep': document('semgrep', rule='python.lang.security.audit.eval-detected', severity='ERROR', path='config.py', line_start=3, line_end=5, message='eval')
+        }
+        lists = {}
+        redis_client = Mock()
+        redis_client.rpush.side_effect = lambda key, value: lists.setdefault(key, []).append(value)
+        redis_client.lrange.side_effect = lambda key, start, end: lists.get(key, [])[start:]
+        
+        with patch('boto3.client'), patch('redis.Redis', return_value=redis_client), \
+                patch.object(synthesizer, 'Config', create=True), \
+                patch.object(synthesizer, 'CognitiveKernel') as MockKernel:
+            kernel = MockKernel.return_value
+            kernel.retrieve_from_kendra.return_value = None
+            kernel.invoke_claude.return_value = Mock(content='[]')
+            agent = synthesizer.SynthesizerAgent('test-scan-123')
+            
+            feed = ToolResultFeed(redis_client, agent.mission_id)
+            for uri in results:
+                feed.publish({'s3_uri': {'S': uri}})
+            feed.close()
+            
+            with patch.object(agent, '_read_tool_result', side_effect=lambda item: results[item['s3_uri']['S']]), \
+                    patch.object(agent, '_query_tool_rows', return_value=[]), \
+                    patch.object(agent, '_research_findings', return_value=[]):
+                findings = agent._run_incremental()
+        
+        # The secret alone is translated; the overlapping semgrep finding is not
+        assert [f.tool_source for f in findings] == ['gitleaks-mcp']
+        assert agent.translation_stats == {'translated': 1, 'to_model': 1}
+        prompt = kernel.invoke_claude.call_args.kwargs['user_prompt']
+        assert 'config.py:3-5 gitleaks-mcp aws-access-token, semgrep-mcp python.lang.security.audit.eval-detected' in prompt
 
+    
+    def test_prompt_expands_finding_rows(self, mock_environment):
+        """Test the model is sent named finding fields rather than positional wire rows."""
+        from src.agents.synthesizer import agent as synthesizer
+        from src.shared.mcp_server import Finding, FindingEncoder, decode_tool_result
+        
+        encoder = FindingEncoder('semgrep')
+        encoder.add(Finding(tool='semgrep', rule='python.lang.security.audit.eval-detected', severity='ERROR',
+                            path='app.py', line_start=7, line_end=7, snippet='eval(data)', message='eval'))
+        result = {**decode_tool_result(encoder.encode({})), '_tool': 'semgrep-mcp:semgrep_scan', '_digest': 'sha256:semgrep'}
+        
+        with patch('boto3.client'), patch('redis.Redis'), \
+                patch.object(synthesizer, 'Config', create=True), \
+                patch.object(synthesizer, 'CognitiveKernel') as MockKernel:
+            kernel = MockKernel.return_value
+            kernel.invoke_claude.return_value = Mock(content='[]')
+            agent = synthesizer.SynthesizerAgent('test-scan-123')
+            agent._synthesize_chunk([result], None, [])
+        
+        prompt = kernel.invoke_claude.call_args.kwargs['user_prompt']
+        sent = json.loads(prompt.split('Tool Results:\n', 1)[1].split('\n', 1)[0])
+        assert sent[0]['_tool'] == 'semgrep-mcp:semgrep_scan'
+        assert 'paths' not in sent[0] and 'strings' not in sent[0]
+        assert sent[0]['findings'] == [{
+            'rule': 'python.lang.security.audit.eval-detected',
+            'severity': 'HIGH',
+            'path': 'app.py',
+            'line_start': 7,
+            'line_end': 7,
+            'snippet': 'eval(data)',
+            'message': 'eval',
+            'fingerprint': result['findings'][0][5]
+        }]
+        # The decoded document itself keeps its compact rows
+        assert isinstance(result['findings'][0], list)
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -8,7 +8,7 @@ Tests Pacu MCP tool implementation with MCP protocol.
 import pytest
 import json
 import asyncio
-from unittest.mock import Mock, patch, AsyncMock
+from unittest.mock import patch, AsyncMock
 from pathlib import Path
 
 
@@ -75,13 +75,12 @@ class TestPacuMCP:
             server = PacuMCPServer()
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
-                with patch.object(server, '_store_results', new=AsyncMock(return_value={'s3_uri': 's3://test', 'digest': 'sha256:abc', 'timestamp': 123456})):
-                    result = await server._run_pacu_module({
-                        'module_name': 'iam__enum_permissions',
-                        'aws_profile': 'default',
-                        'dry_run': True,
-                        'timeout': 300
-                    })
+                result = await server._run_pacu_module({
+                    'module_name': 'iam__enum_permissions',
+                    'aws_profile': 'default',
+                    'dry_run': True,
+                    'timeout': 300
+                })
         
         assert result['success'] == True
     
@@ -123,46 +122,6 @@ class TestPacuMCP:
         
         assert category == 'recon'  # Default category
     
-    @pytest.mark.asyncio
-    async def test_write_results(self, mock_environment):
-        """Test result storage."""
-        from src.mcp_servers.pacu_mcp.server import PacuMCPServer
-        
-        results = {'tool': 'pacu', 'module': 'test_module', 'summary': {'findings': []}}
-        
-        with patch.dict('os.environ', mock_environment):
-            server = PacuMCPServer()
-            
-            mock_put = Mock()
-            server.s3_client.put_object = mock_put
-            
-            mock_dynamo = Mock()
-            server.dynamodb_client.put_item = mock_dynamo
-            
-            storage_info = await server._store_results(results, 'test_module')
-        
-        assert 's3_uri' in storage_info
-        assert 'digest' in storage_info
-    
-    @pytest.mark.asyncio
-    async def test_write_error(self, mock_environment):
-        """Test error result storage."""
-        from src.mcp_servers.pacu_mcp.server import PacuMCPServer
-        
-        with patch.dict('os.environ', mock_environment):
-            server = PacuMCPServer()
-            
-            mock_dynamo = Mock()
-            server.dynamodb_client.put_item = mock_dynamo
-            
-            await server._store_results({
-                'tool': 'pacu',
-                'error': 'Test error',
-                'summary': {'findings': []}
-            }, 'test_module')
-        
-        assert mock_dynamo.called
-    
     @pytest.mark.asyncio
     async def test_list_pacu_modules(self, mock_environment):
         """Test listing Pacu modules."""
@@ -200,10 +159,9 @@ class TestPacuMCP:
             server = PacuMCPServer()
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
-                with patch.object(server, '_store_results', new=AsyncMock(return_value={'s3_uri': 's3://test', 'digest': 'sha256:abc', 'timestamp': 123456})):
-                    result = await server._enum_permissions({
-                        'aws_profile': 'default'
-                    })
+                result = await server._enum_permissions({
+                    'aws_profile': 'default'
+                })
         
         assert result['success'] == True
         assert result['dry_run'] == True  # Always dry run for enum
@@ -253,13 +211,12 @@ class TestPacuMCP:
             server = PacuMCPServer()
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
-                with patch.object(server, '_store_results', new=AsyncMock(return_value={'s3_uri': 's3://test', 'digest': 'sha256:abc', 'timestamp': 123456})):
-                    result = await server._run_pacu_module({
-                        'module_name': 'iam__enum_permissions',
-                        'aws_profile': 'default',
-                        'dry_run': True,
-                        'timeout': 300
-                    })
+                result = await server._run_pacu_module({
+                    'module_name': 'iam__enum_permissions',
+                    'aws_profile': 'default',
+                    'dry_run': True,
+                    'timeout': 300
+                })
         
         assert result['success'] == True
     
@@ -329,4 +286,69 @@ class TestPacuMCP:
             server = PacuMCPServer()
             modules = []
         
-        assert len(modules) == 0
\ No newline at end of file
+        assert len(modules) == 0
+    
+    @pytest.mark.asyncio
+    async def test_module_catalog_cached_at_warm_up(self, mock_environment):
+        """Test the module catalog is loaded once and served from cache."""
+        from src.mcp_servers.pacu_mcp.server import PacuMCPServer
+        
+        mock_process = AsyncMock()
+        mock_process.returncode = 0
+        mock_process.communicate = AsyncMock(return_value=(
+            b'iam__enum_permissions\nec2__enum\niam__privesc_scan\n',
+            b''
+        ))
+        
+        with patch.dict('os.environ', mock_environment):
+            server = PacuMCPServer()
+            
+            with patch('asyncio.create_subprocess_exec', return_value=mock_process) as mock_exec:
+                await server.warm()
+                first = await server._list_pacu_modules({'category': 'all'})
+                second = await server._list_pacu_modules({'category': 'privesc'})
+        
+        list_calls = [c for c in mock_exec.call_args_list if '--list-modules' in c.args]
+        assert len(list_calls) == 1
+        assert first['count'] == 3
+        assert [m['name'] for m in second['modules']] == ['iam__privesc_scan']
+    
+    @pytest.mark.asyncio
+    async def test_run_modules_in_one_session(self, mock_environment):
+        """Test several modules run in a single Pacu process and are not repeated."""
+        from src.mcp_servers.pacu_mcp.server import PacuMCPServer
+        
+        mock_process = AsyncMock()
+        mock_process.returncode = 0
+        mock_process.communicate = AsyncMock(return_value=(
+            b'[iam__enum_permissions] Found 12 permissions\n'
+            b'[iam__privesc_scan] Discovered escalation path via iam:PassRole\n'
+            b'[iam__privesc_scan] ERROR: access denied for lambda:CreateFunction\n',
+            b''
+        ))
+        
+        with patch.dict('os.environ', mock_environment):
+            server = PacuMCPServer()
+            server.module_catalog = [
+                {'name': 'iam__enum_permissions', 'category': 'enum'},
+                {'name': 'iam__privesc_scan', 'category': 'privesc'}
+            ]
+            
+            with patch('asyncio.create_subprocess_exec', return_value=mock_process) as mock_exec:
+                with patch.object(server, '_get_pacu_version', new=AsyncMock(return_value='1.5.0')):
+                    result = await server._run_pacu_session({
+                        'modules': ['iam__enum_permissions', 'iam__privesc_scan', 'iam__enum_permissions', 'bogus__module']
+                    })
+                    repeat = await server._run_pacu_session({'modules': ['iam__privesc_scan']})
+        
+        assert mock_exec.call_count == 1
+        script = mock_process.communicate.call_args.kwargs['input'].decode()
+        assert script == 'run iam__enum_permissions\nrun iam__privesc_scan\nexit\n'
+        
+        modules = result['results']['modules']
+        assert modules['iam__enum_permissions']['summary']['findings'] == ['[iam__enum_permissions] Found 12 permissions']
+        assert modules['iam__privesc_scan']['summary']['errors'] == 1
+        assert modules['bogus__module']['status'] == 'skipped'
+        assert result['results']['process_starts'] == 1
+        assert repeat['results']['modules']['iam__privesc_scan']['status'] == 'cached'
+        assert repeat['results']['process_starts'] == 0
@@ -8,7 +8,7 @@ Tests ScoutSuite MCP tool implementation with MCP protocol.
 import pytest
 import json
 import asyncio
-from unittest.mock import Mock, patch, AsyncMock
+from unittest.mock import patch, AsyncMock, mock_open
 from pathlib import Path
 
 
@@ -92,47 +92,6 @@ class TestScoutSuiteMCP:
         
         assert count == 3
     
-    @pytest.mark.asyncio
-    async def test_write_results(self, mock_environment):
-        """Test result storage."""
-        from src.mcp_servers.scoutsuite_mcp.server import ScoutSuiteMCPServer
-        
-        results = {'tool': 'scoutsuite', 'findings_count': 5}
-        
-        with patch.dict('os.environ', mock_environment):
-            server = ScoutSuiteMCPServer()
-            
-            mock_put = Mock()
-            server.s3_client.put_object = mock_put
-            
-            mock_dynamo = Mock()
-            server.dynamodb_client.put_item = mock_dynamo
-            
-            storage_info = await server._store_results(results, 'test-report')
-        
-        assert 's3_uri' in storage_info
-        assert 'digest' in storage_info
-    
-    @pytest.mark.asyncio
-    async def test_write_error(self, mock_environment):
-        """Test error result storage."""
-        from src.mcp_servers.scoutsuite_mcp.server import ScoutSuiteMCPServer
-        
-        with patch.dict('os.environ', mock_environment):
-            server = ScoutSuiteMCPServer()
-            
-            mock_dynamo = Mock()
-            server.dynamodb_client.put_item = mock_dynamo
-            
-            # Store error result
-            await server._store_results({
-                'tool': 'scoutsuite',
-                'error': 'Test error',
-                'findings_count': 0
-            }, 'test-report')
-        
-        assert mock_dynamo.called
-    
     @pytest.mark.asyncio
     async def test_run_scoutsuite_success(self, mock_environment):
         """Test successful ScoutSuite execution."""
@@ -155,7 +114,7 @@ class TestScoutSuiteMCP:
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
                 with patch('pathlib.Path.exists', return_value=True):
-                    with patch('pathlib.Path.read_text', return_value=js_content):
+                    with patch('builtins.open', mock_open(read_data=js_content.encode())):
                         result = await server._run_scoutsuite(
                             'default',
                             [],
@@ -186,7 +145,7 @@ class TestScoutSuiteMCP:
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
                 with patch('pathlib.Path.exists', return_value=True):
-                    with patch('pathlib.Path.read_text', return_value=js_content):
+                    with patch('builtins.open', mock_open(read_data=js_content.encode())):
                         result = await server._run_scoutsuite(
                             'default',
                             [],
@@ -213,7 +172,7 @@ class TestScoutSuiteMCP:
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
                 with patch('pathlib.Path.exists', return_value=True):
-                    with patch('pathlib.Path.read_text', return_value=js_content):
+                    with patch('builtins.open', mock_open(read_data=js_content.encode())):
                         result = await server._run_scoutsuite(
                             'default',
                             ['s3', 'ec2'],
@@ -284,7 +243,7 @@ class TestScoutSuiteMCP:
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
                 with patch('pathlib.Path.exists', return_value=True):
-                    with patch('pathlib.Path.read_text', return_value='invalid json content'):
+                    with patch('builtins.open', mock_open(read_data=b'invalid json content')):
                         # When JSON is invalid, the parsing will fail and return empty scout_data
                         result = await server._run_scoutsuite(
                             'default',
@@ -297,6 +256,82 @@ class TestScoutSuiteMCP:
                         assert result['tool'] == 'scoutsuite'
                         assert result['findings_count'] == 0
     
+    def test_parse_results_file_streams_findings(self, mock_environment, tmp_path):
+        """Test the JS results file is parsed incrementally into findings and summary."""
+        from src.mcp_servers.scoutsuite_mcp.server import ScoutSuiteMCPServer
+        
+        scout_data = {
+            'last_run': {'time': '2024-01-01'},
+            'services': {
+                'ec2': {
+                    # Large resource inventory spanning several read chunks
+                    'regions': {f'region-{i}': {'instances': 'x' * 1024} for i in range(200)},
+                    'findings': {
+                        'ec2-security-group-opens-all-ports': {'level': 'danger', 'flagged_items': 3, 'items': ['sg-1']}
+                    }
+                },
+                's3': {
+                    'findings': {
+                        's3-bucket-no-logging': {'level': 'warning', 'flagged_items': ['bucket1', 'bucket2']}
+                    }
+                },
+                'iam': {'findings': {}}
+            }
+        }
+        results_file = tmp_path / 'scoutsuite_results_aws-test.js'
+        results_file.write_text(f'scoutsuite_results =\n{json.dumps(scout_data)};\n')
+        
+        with patch.dict('os.environ', mock_environment):
+            server = ScoutSuiteMCPServer()
+            parsed = server._parse_results_file(results_file)
+        
+        assert parsed['findings_count'] == 5
+        assert parsed['summary']['services_scanned'] == 3
+        assert parsed['summary']['by_service'] == {'ec2': 3, 's3': 2, 'iam': 0}
+        assert parsed['summary']['by_severity']['danger'] == 3
+        assert 'regions' not in parsed['raw_results']['services']['ec2']
+        assert parsed['summary'] == server._create_summary(scout_data)
+    
+    @pytest.mark.asyncio
+    async def test_fan_out_merges_partitions(self, mock_environment):
+        """Test fan-out runs per service/region, merges reports and tolerates a timed-out partition."""
+        from src.mcp_servers.scoutsuite_mcp.server import ScoutSuiteMCPServer
+        
+        def partition_result(service, count):
+            return {
+                'tool': 'scoutsuite',
+                'findings_count': count,
+                'raw_results': {'services': {service: {'findings': {
+                    f'{service}-finding': {'level': 'danger', 'flagged_items': count, 'items': [f'{service}.item']}
+                }}}}
+            }
+        
+        async def fake_run(aws_profile, services, regions, report_name, timeout, output_dir=None):
+            if services == ['iam']:
+                return partition_result('iam', 1)
+            if regions == ['eu-west-1']:
+                return {'tool': 'scoutsuite', 'error': 'timeout', 'findings_count': 0}
+            return partition_result('ec2', 2)
+        
+        with patch.dict('os.environ', mock_environment):
+            server = ScoutSuiteMCPServer()
+            
+            with patch.object(server, '_run_scoutsuite', side_effect=fake_run) as mock_run:
+                with patch.object(server, '_get_scoutsuite_version', new=AsyncMock(return_value='5.12.0')):
+                    result = await server._run_scoutsuite_fan_out(
+                        'default', ['iam', 'ec2'], ['us-east-1', 'us-west-2', 'eu-west-1'], 'report', 300, 2
+                    )
+        
+        # iam is global: one partition; ec2 is split per region
+        assert mock_run.call_count == 4
+        assert result['findings_count'] == 5
+        assert result['summary']['by_service'] == {'iam': 1, 'ec2': 4}
+        assert result['summary']['by_severity']['danger'] == 5
+        assert result['raw_results']['services']['ec2']['findings']['ec2-finding']['flagged_items'] == 4
+        assert result['partial'] is True
+        assert [p['status'] for p in result['partitions']].count('timeout') == 1
+        assert 'error' not in result
+    
     def test_count_findings_multiple_services(self, mock_environment):
         """Test counting findings from multiple services."""
         from src.mcp_servers.scoutsuite_mcp.server import ScoutSuiteMCPServer
@@ -396,14 +431,13 @@ class TestScoutSuiteMCP:
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
                 with patch('pathlib.Path.exists', return_value=True):
-                    with patch('pathlib.Path.read_text', return_value=js_content):
-                        with patch.object(server, '_store_results', new=AsyncMock(return_value={'s3_uri': 's3://test', 'digest': 'sha256:abc', 'timestamp': 123456})):
-                            result = await server._execute_scoutsuite_scan({
-                                'aws_profile': 'default',
-                                'services': [],
-                                'regions': [],
-                                'timeout': 300
-                            })
+                    with patch('builtins.open', mock_open(read_data=js_content.encode())):
+                        result = await server._execute_scoutsuite_scan({
+                            'aws_profile': 'default',
+                            'services': [],
+                            'regions': [],
+                            'timeout': 300
+                        })
         
         assert result['success'] == True
     
@@ -8,7 +8,7 @@ Tests Trivy MCP tool implementation with MCP protocol.
 import pytest
 import json
 import asyncio
-from unittest.mock import Mock, patch, AsyncMock, mock_open
+from unittest.mock import patch, AsyncMock, mock_open
 from pathlib import Path
 
 
@@ -42,17 +42,12 @@ class TestTrivyMCP:
             
             with patch('asyncio.create_subprocess_exec', return_value=mock_process):
                 with patch('builtins.open', mock_open(read_data=json.dumps({'Results': []}))):
-                    with patch.object(server, '_store_results', new=AsyncMock(return_value={
-                        's3_uri': 's3://bucket/key',
-                        'digest': 'sha256:abc123',
-                        'timestamp': 12345
-                    })):
-                        result = await server._execute_fs_scan({
-                            'source_path': '/tmp/test',
-                            'scan_type': 'vuln',
-                            'severity': 'CRITICAL,HIGH',
-                            'timeout': 60
-                        })
+                    result = await server._execute_fs_scan({
+                        'source_path': '/tmp/test',
+                        'scan_type': 'vuln',
+                        'severity': 'CRITICAL,HIGH',
+                        'timeout': 60
+                    })
         
         assert result['success'] == True
         assert result['tool'] == 'trivy'
@@ -98,30 +93,6 @@ class TestTrivyMCP:
         assert len(result['results']) == 1
         assert result['results'][0]['vulnerability_id'] == 'CVE-2021-44228'
     
-    @pytest.mark.asyncio
-    async def test_s3_upload(self, mock_environment):
-        """Test result upload to S3."""
-        from src.mcp_servers.trivy_mcp.server import TrivyMCPServer
-        
-        results = {'tool': 'trivy', 'results': [{'vulnerability_id': 'CVE-2021-44228', 'severity': 'CRITICAL'}]}
-        
-        with patch.dict('os.environ', mock_environment):
-            server = TrivyMCPServer()
-            
-            # Mock S3 client
-            mock_put = Mock()
-            server.s3_client.put_object = mock_put
-            
-            # Mock DynamoDB client
-            mock_dynamo = Mock()
-            server.dynamodb_client.put_item = mock_dynamo
-            
-            storage_info = await server._store_results(results, 'fs_scan')
-        
-        assert 's3_uri' in storage_info
-        assert 'digest' in storage_info
-        assert storage_info['digest'].startswith('sha256:')
-    
     @pytest.mark.asyncio
     async def test_error_handling_invalid_path(self, mock_environment):
         """Test error handling for invalid source path."""
@@ -161,4 +132,232 @@ class TestTrivyMCP:
                         'vuln',
                         'CRITICAL',
                         300
-                    )
\ No newline at end of file
+                    )
+    
+    @pytest.mark.asyncio
+    async def test_db_cache_scan_args_pin_snapshot(self, tmp_path):
+        """Test scans run offline against the active DB snapshot."""
+        from src.mcp_servers.trivy_mcp.server import TrivyDBCache
+        
+        snapshot = tmp_path / 'snapshots' / 'v2-20240101T000000Z'
+        (snapshot / 'db').mkdir(parents=True)
+        (snapshot / 'db' / 'metadata.json').write_text(json.dumps({
+            'Version': 2,
+            'NextUpdate': '2999-01-01T00:00:00Z'
+        }))
+        
+        cache = TrivyDBCache(root=str(tmp_path), offline=True)
+        assert await cache.warm() is True
+        
+        args = cache.scan_args()
+        assert args[:2] == ['--cache-dir', str(snapshot)]
+        assert '--skip-db-update' in args
+        assert '--offline-scan' in args
+        assert cache.version == 'v2-20240101T000000Z'
+        assert (tmp_path / 'CURRENT').read_text() == snapshot.name
+        assert cache.is_stale() is False
+    
+    @pytest.mark.asyncio
+    async def test_db_cache_offline_without_snapshot(self, tmp_path):
+        """Test offline mode never downloads the DB."""
+        from src.mcp_servers.trivy_mcp.server import TrivyDBCache
+        
+        cache = TrivyDBCache(root=str(tmp_path), offline=True)
+        
+        with patch('asyncio.create_subprocess_exec') as mock_exec:
+            ready = await cache.warm()
+        
+        assert ready is False
+        mock_exec.assert_not_called()
+    
+    def test_db_cache_stale_detection(self, tmp_path):
+        """Test freshness check uses NextUpdate from DB metadata."""
+        from src.mcp_servers.trivy_mcp.server import TrivyDBCache
+        
+        snapshot = tmp_path / 'snapshots' / 'v2-old'
+        (snapshot / 'db').mkdir(parents=True)
+        (snapshot / 'db' / 'metadata.json').write_text(json.dumps({
+            'Version': 2,
+            'NextUpdate': '2020-01-01T06:00:00.123456789Z'
+        }))
+        
+        cache = TrivyDBCache(root=str(tmp_path), offline=True)
+        cache._activate(snapshot)
+        
+        assert cache.is_stale() is True
+    
+    @pytest.mark.asyncio
+    async def test_db_cache_stale_snapshot_refreshed_externally(self, tmp_path):
+        """Test a stale baked snapshot starts no download and a refreshed CURRENT is picked up."""
+        from src.mcp_servers.trivy_mcp.server import TrivyDBCache
+        
+        for name, next_update in (('image-baked', '2020-01-01T00:00:00Z'), ('v2-refreshed', '2999-01-01T00:00:00Z')):
+            (tmp_path / 'snapshots' / name / 'db').mkdir(parents=True)
+            (tmp_path / 'snapshots' / name / 'db' / 'metadata.json').write_text(json.dumps({
+                'Version': 2,
+                'NextUpdate': next_update
+            }))
+        (tmp_path / 'CURRENT').write_text('image-baked')
+        
+        cache = TrivyDBCache(root=str(tmp_path), offline=False, refresh='external')
+        with patch('asyncio.create_subprocess_exec') as mock_exec:
+            assert await cache.warm() is True
+            assert cache.is_stale() is True
+            
+            (tmp_path / 'CURRENT').write_text('v2-refreshed')
+            assert await cache.ensure_ready() is True
+        
+        mock_exec.assert_not_called()
+        assert cache.version == 'v2-refreshed'
+    
+    def _trivy_writing(self, output, process):
+        """create_subprocess_exec stand-in: trivy writes its report where --output points."""
+        async def run_trivy(*command, **kwargs):
+            report_path = command[list(command).index('--output') + 1]
+            Path(report_path).write_text(json.dumps(output))
+            return process
+        return run_trivy
+    
+    @pytest.mark.asyncio
+    async def test_lockfile_results_served_from_cache(self, mock_environment, tmp_path):
+        """Test unchanged lockfiles are skipped by trivy and served from cache."""
+        from src.mcp_servers.trivy_mcp.server import TrivyMCPServer, LockfileResultCache
+        
+        source = tmp_path / 'src'
+        source.mkdir()
+        (source / 'requirements.txt').write_text('django==1.0\n')
+        
+        trivy_output = {
+            'Results': [{
+                'Target': 'requirements.txt',
+                'Vulnerabilities': [
+                    {'VulnerabilityID': 'CVE-2023-0001', 'PkgName': 'django', 'Severity': 'HIGH'},
+                    {'VulnerabilityID': 'CVE-2023-0002', 'PkgName': 'django', 'Severity': 'LOW'}
+                ]
+            }]
+        }
+        
+        mock_process = AsyncMock()
+        mock_process.returncode = 1
+        mock_process.communicate = AsyncMock(return_value=(b'', b''))
+        
+        with patch.dict('os.environ', mock_environment):
+            server = TrivyMCPServer()
+            server.db_cache.active_snapshot = tmp_path / 'snapshots' / 'v2-test'
+            server.lockfile_cache = LockfileResultCache(root=str(tmp_path / 'cache'))
+            
+            with patch.object(server, '_get_trivy_version', new=AsyncMock(return_value='0.48.0')):
+                with patch('asyncio.create_subprocess_exec', side_effect=self._trivy_writing(trivy_output, mock_process)):
+                    first = await server._run_trivy_fs(source, 'vuln', 'HIGH,CRITICAL', 300)
+                
+                with patch('asyncio.create_subprocess_exec', side_effect=self._trivy_writing({'Results': []}, mock_process)) as mock_exec:
+                    second = await server._run_trivy_fs(source, 'vuln', 'HIGH,CRITICAL', 300)
+        
+        assert [r['vulnerability_id'] for r in first['results']] == ['CVE-2023-0001']
+        assert first['lockfile_cache']['misses'] == 1
+        assert second['lockfile_cache']['hits'] == 1
+        assert [r['vulnerability_id'] for r in second['results']] == ['CVE-2023-0001']
+        assert second['results'][0]['target'] == 'requirements.txt'
+        command = mock_exec.call_args[0]
+        assert '--skip-files' in command
+        report_path = command[command.index('--output') + 1]
+        assert server.mission_id not in report_path
+        assert not Path(report_path).exists()
+    
+    @pytest.mark.asyncio
+    async def test_go_results_cached_under_reported_target(self, mock_environment, tmp_path):
+        """Test Go results are cached under go.mod, the Target Trivy reports them under."""
+        from src.mcp_servers.trivy_mcp.server import TrivyMCPServer, LockfileResultCache
+        
+        source = tmp_path / 'src'
+        (source / 'svc').mkdir(parents=True)
+        (source / 'svc' / 'go.mod').write_text('module example.com/svc\n')
+        (source / 'svc' / 'go.sum').write_text('golang.org/x/net v0.1.0 h1:abc=\n')
+        
+        trivy_output = {
+            'Results': [{
+                'Target': 'svc/go.mod',
+                'Vulnerabilities': [
+                    {'VulnerabilityID': 'CVE-2023-0003', 'PkgName': 'golang.org/x/net', 'Severity': 'HIGH'}
+                ]
+            }]
+        }
+        
+        mock_process = AsyncMock()
+        mock_process.returncode = 1
+        mock_process.communicate = AsyncMock(return_value=(b'', b''))
+        
+        with patch.dict('os.environ', mock_environment):
+            server = TrivyMCPServer()
+            server.db_cache.active_snapshot = tmp_path / 'snapshots' / 'v2-test'
+            server.lockfile_cache = LockfileResultCache(root=str(tmp_path / 'cache'))
+            
+            with patch.object(server, '_get_trivy_version', new=AsyncMock(return_value='0.48.0')):
+                with patch('asyncio.create_subprocess_exec', side_effect=self._trivy_writing(trivy_output, mock_process)):
+                    await server._run_trivy_fs(source, 'vuln', 'HIGH,CRITICAL', 300)
+                
+                with patch('asyncio.create_subprocess_exec', side_effect=self._trivy_writing({'Results': []}, mock_process)) as mock_exec:
+                    second = await server._run_trivy_fs(source, 'vuln', 'HIGH,CRITICAL', 300)
+        
+        assert second['lockfile_cache']['hits'] == 1
+        assert [r['vulnerability_id'] for r in second['results']] == ['CVE-2023-0003']
+        assert second['results'][0]['target'] == 'svc/go.mod'
+        command = mock_exec.call_args[0]
+        assert 'svc/go.mod' in command and 'svc/go.sum' in command
+    
+    def test_lockfile_cache_evicts_by_size(self, tmp_path):
+        """Test least-recently-used entries are evicted over the byte budget."""
+        import os
+        from src.mcp_servers.trivy_mcp.server import LockfileResultCache
+        
+        cache = LockfileResultCache(root=str(tmp_path), max_bytes=400)
+        vulns = [{'vulnerability_id': f'CVE-{i}', 'severity': 'HIGH'} for i in range(3)]
+        
+        cache.put('aa' * 32, 'v2', vulns)
+        old_entry = cache._entry_path('aa' * 32, 'v2')
+        os.utime(old_entry, (0, 0))
+        cache.put('bb' * 32, 'v2', vulns)
+        
+        assert cache.get('aa' * 32, 'v2') is None
+        assert cache.get('bb' * 32, 'v2') == vulns
+    
+    def test_parse_report_streams_vulnerabilities(self, mock_environment, tmp_path):
+        """Test vulnerabilities are streamed per target and a truncated report keeps parsed ones."""
+        from src.mcp_servers.trivy_mcp.server import TrivyMCPServer
+        
+        report = json.dumps({
+            'SchemaVersion': 2,
+            'Results': [
+                {
+                    'Target': 'requirements.txt',
+                    'Packages': [{'Name': f'pkg-{i}'} for i in range(100)],
+                    'Vulnerabilities': [
+                        {'VulnerabilityID': 'CVE-2023-0001', 'Severity': 'HIGH', 'CVSS': {'nvd': {'V3Score': 7.5}}},
+                        {'VulnerabilityID': 'CVE-2023-0002', 'Severity': 'LOW'}
+                    ]
+                },
+                {
+                    'Target': 'package-lock.json',
+                    'Vulnerabilities': [{'VulnerabilityID': 'CVE-2023-0003', 'Severity': 'CRITICAL'}]
+                }
+            ]
+        })
+        report_path = tmp_path / 'report.json'
+        
+        with patch.dict('os.environ', mock_environment):
+            server = TrivyMCPServer()
+            
+            report_path.write_text(report)
+            by_target = {'requirements.txt': []}
+            results = server._parse_report(str(report_path), {'HIGH', 'CRITICAL'}, by_target)
+            
+            report_path.write_text(report[:report.index('CVE-2023-0003') - 30])
+            truncated = server._parse_report(str(report_path))
+        
+        assert [(r['target'], r['vulnerability_id']) for r in results] == [
+            ('requirements.txt', 'CVE-2023-0001'),
+            ('package-lock.json', 'CVE-2023-0003')
+        ]
+        assert [r['cvss_score'] for r in results] == [7.5, None]
+        assert len(by_target['requirements.txt']) == 2
+        assert [r['vulnerability_id'] for r in truncated] == ['CVE-2023-0001', 'CVE-2023-0002']
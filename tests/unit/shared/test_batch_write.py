@@ -0,0 +1,67 @@
+"""
+Unit Tests for Batched DynamoDB Writes
+======================================
+
+Tests deduplication by key, batching, unprocessed-item retries and counting
+what is left unwritten.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from src.shared.storage import batch_write_items
+
+KEY = ('mission_id', 'tool_timestamp')
+
+
+def _row(tool_timestamp, status='completed'):
+    return {'mission_id': {'S': 'm1'}, 'tool_timestamp': {'S': tool_timestamp}, 'status': {'S': status}}
+
+
+def _unprocessed(*rows):
+    return {'UnprocessedItems': {'table': [{'PutRequest': {'Item': row}} for row in rows]}}
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestBatchWriteItems:
+    """Test suite for batch_write_items."""
+    
+    def test_dedupes_by_key_and_batches(self):
+        """Test a repeated key keeps its last item and batches hold at most 25 items."""
+        client = Mock()
+        client.batch_write_item.return_value = {}
+        rows = [_row(f"semgrep:scan:{i}") for i in range(30)] + [_row('semgrep:scan:0', 'failed')]
+        
+        written = batch_write_items(client, 'table', rows, KEY)
+        
+        assert written == 30
+        batches = [c.kwargs['RequestItems']['table'] for c in client.batch_write_item.call_args_list]
+        assert [len(b) for b in batches] == [25, 5]
+        assert batches[0][0]['PutRequest']['Item']['status'] == {'S': 'failed'}
+    
+    def test_retries_unprocessed_with_backoff(self):
+        """Test only the unprocessed items are sent again, after a growing delay."""
+        client = Mock()
+        rows = [_row('a'), _row('b'), _row('c')]
+        client.batch_write_item.side_effect = [_unprocessed(rows[1], rows[2]), _unprocessed(rows[2]), {}]
+        
+        with patch('src.shared.storage.batch_write.time.sleep') as sleep:
+            written = batch_write_items(client, 'table', rows, KEY)
+        
+        assert written == 3
+        retried = [c.kwargs['RequestItems']['table'] for c in client.batch_write_item.call_args_list[1:]]
+        assert [[r['PutRequest']['Item']['tool_timestamp']['S'] for r in batch] for batch in retried] == [['b', 'c'], ['c']]
+        assert [c.args[0] for c in sleep.call_args_list] == [0.05, 0.1]
+    
+    def test_counts_items_left_unprocessed(self):
+        """Test items still unprocessed after the last retry are not counted as written."""
+        client = Mock()
+        rows = [_row('a'), _row('b')]
+        client.batch_write_item.return_value = _unprocessed(rows[1])
+        
+        with patch('src.shared.storage.batch_write.time.sleep') as sleep:
+            written = batch_write_items(client, 'table', rows, KEY, retries=2)
+        
+        assert written == 1
+        assert client.batch_write_item.call_count == 3
+        assert sleep.call_count == 2
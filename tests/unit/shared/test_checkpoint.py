@@ -0,0 +1,118 @@
+"""
+Unit Tests for the Checkpoint Ledger
+====================================
+
+Tests invocation digests, reading completed rows from the tool_results
+table and resuming verified results from S3.
+"""
+
+import io
+import pytest
+import hashlib
+from unittest.mock import Mock
+from src.shared.mcp_client import CheckpointLedger, invocation_digest
+from src.shared.storage import compress
+
+WIRE = '{"format":"hive-findings/1","tool":"semgrep","findings_count":0}\n' * 20
+INVOCATION = {
+    'server_name': 'semgrep-mcp',
+    'tool_name': 'semgrep_scan',
+    'arguments': {'source_path': '/tmp/m1', 'config': 'auto', 'timeout': 300}
+}
+
+
+def _row(arg_digest, s3_uri, digest, status='completed', timestamp=1):
+    return {
+        'mission_id': {'S': 'm1'},
+        'status': {'S': status},
+        'arg_digest': {'S': arg_digest},
+        's3_uri': {'S': s3_uri},
+        'digest': {'S': digest},
+        'timestamp': {'N': str(timestamp)}
+    }
+
+
+def _s3(data):
+    body, encoding = compress(data.encode())
+    s3_client = Mock()
+    s3_client.get_object.side_effect = lambda **kwargs: {'Body': io.BytesIO(body), 'ContentEncoding': encoding}
+    return s3_client
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestCheckpointLedger:
+    """Test suite for CheckpointLedger."""
+    
+    def test_invocation_digest_is_canonical(self):
+        """Test the digest ignores argument order and scheduling hints."""
+        reordered = {
+            'tool_name': 'semgrep_scan',
+            'server_name': 'semgrep-mcp',
+            'arguments': {'timeout': 300, 'config': 'auto', 'source_path': '/tmp/m1'},
+            'priority': 1,
+            'dependencies': []
+        }
+        changed = {**INVOCATION, 'arguments': {**INVOCATION['arguments'], 'config': 'p/owasp-top-ten'}}
+        cut = {**INVOCATION, 'arguments': {**INVOCATION['arguments'], 'timeout': 45}}
+        
+        assert invocation_digest(reordered) == invocation_digest(INVOCATION)
+        assert invocation_digest(changed) != invocation_digest(INVOCATION)
+        # A timeout cut for the mission deadline is the same invocation
+        assert invocation_digest(cut) == invocation_digest(INVOCATION)
+    
+    def test_load_keeps_newest_completed_rows(self):
+        """Test failed rows and rows without an invocation digest are not resumable."""
+        arg_digest = invocation_digest(INVOCATION)
+        dynamodb_client = Mock()
+        dynamodb_client.query.side_effect = [
+            {
+                'Items': [
+                    _row(arg_digest, 's3://b/old.ndjson', 'sha256:old', timestamp=1),
+                    _row('', 's3://b/server-row.json', 'sha256:x')
+                ],
+                'LastEvaluatedKey': {'mission_id': {'S': 'm1'}}
+            },
+            {
+                'Items': [
+                    _row(arg_digest, 's3://b/new.ndjson', 'sha256:new', timestamp=2),
+                    _row('sha256:other', '', '', status='failed')
+                ]
+            }
+        ]
+        ledger = CheckpointLedger('m1', 'tool-results', dynamodb_client, Mock())
+        
+        assert ledger.load() == 1
+        assert ledger.entries[arg_digest]['s3_uri']['S'] == 's3://b/new.ndjson'
+        assert dynamodb_client.query.call_args_list[1][1]['ExclusiveStartKey'] == {'mission_id': {'S': 'm1'}}
+    
+    def test_resume_verified_result(self):
+        """Test a completed invocation comes back as a resumed tool result."""
+        digest = f"sha256:{hashlib.sha256(WIRE.encode()).hexdigest()}"
+        dynamodb_client = Mock()
+        dynamodb_client.query.return_value = {
+            'Items': [_row(invocation_digest(INVOCATION), 's3://bucket/tool-results/semgrep/m1/1/results.ndjson', digest)]
+        }
+        s3_client = _s3(WIRE)
+        ledger = CheckpointLedger('m1', 'tool-results', dynamodb_client, s3_client)
+        ledger.load()
+        
+        result = ledger.resume(INVOCATION)
+        
+        s3_client.get_object.assert_called_once_with(Bucket='bucket', Key='tool-results/semgrep/m1/1/results.ndjson')
+        assert result['success'] is True
+        assert result['resumed'] is True
+        assert result['content'][0]['text'] == WIRE
+        assert result['digest'] == digest
+        assert ledger.resume({**INVOCATION, 'arguments': {}}) is None
+    
+    def test_unverified_artifact_reruns(self):
+        """Test an artifact not matching its row's digest is not resumed."""
+        dynamodb_client = Mock()
+        dynamodb_client.query.return_value = {
+            'Items': [_row(invocation_digest(INVOCATION), 's3://bucket/results.ndjson', 'sha256:' + '0' * 64)]
+        }
+        ledger = CheckpointLedger('m1', 'tool-results', dynamodb_client, _s3(WIRE))
+        ledger.load()
+        
+        assert ledger.resume(INVOCATION) is None
@@ -0,0 +1,97 @@
+"""
+Unit Tests for the Tool Cost Model
+==================================
+
+Tests repository features, prior and learned predictions, persistence of
+observations and plan duration estimates.
+"""
+
+import json
+import pytest
+from unittest.mock import Mock
+from src.shared.mcp_client import RepoFeatures, ToolCostModel, host_capacity
+
+
+def _usage(wall, cpu, rss):
+    return {'wall_seconds': wall, 'cpu_seconds': cpu, 'peak_rss_mb': rss}
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestToolCostModel:
+    """Test suite for ToolCostModel."""
+    
+    def test_repo_features_from_path(self, tmp_path):
+        """Test files, bytes, languages and lockfiles are measured from disk."""
+        (tmp_path / 'app.py').write_text('print(1)\n')
+        (tmp_path / 'web').mkdir()
+        (tmp_path / 'web' / 'index.js').write_text('let x = 1;\n')
+        (tmp_path / 'web' / 'package-lock.json').write_text('{}')
+        (tmp_path / '.git').mkdir()
+        (tmp_path / '.git' / 'HEAD').write_text('ref: refs/heads/main\n')
+        
+        features = RepoFeatures.from_path(str(tmp_path))
+        
+        assert features.files == 3
+        assert features.languages == 2
+        assert features.lockfiles == 1
+        assert features.bytes == len('print(1)\n') + len('let x = 1;\n') + 2
+    
+    def test_prior_until_enough_observations(self):
+        """Test tools without history get their prior cost."""
+        model = ToolCostModel()
+        
+        cost = model.predict('semgrep-mcp', RepoFeatures(files=10, bytes=1000))
+        
+        assert cost.observations == 0
+        assert cost.seconds == 120.0
+        assert cost.cpus == 2.0
+    
+    def test_learns_cost_from_repo_size(self):
+        """Test predictions follow recorded usage against repository size."""
+        model = ToolCostModel()
+        for files in (10, 100, 1000, 10000, 100000) * 2:
+            features = RepoFeatures(files=files, bytes=files * 4096, languages=1)
+            model.record('semgrep-mcp', features, _usage(files / 100 + 1, files / 50 + 2, 200 + files / 100))
+        
+        small = model.predict('semgrep-mcp', RepoFeatures(files=50, bytes=50 * 4096, languages=1))
+        large = model.predict('semgrep-mcp', RepoFeatures(files=50000, bytes=50000 * 4096, languages=1))
+        
+        assert large.observations == 10
+        assert large.seconds > 10 * small.seconds
+        assert large.memory_mb > small.memory_mb
+        assert 1.0 < large.cpus < 3.0
+    
+    def test_observations_persist_in_redis(self):
+        """Test observations are pushed to and loaded from Redis."""
+        redis_client = Mock()
+        redis_client.lrange.return_value = []
+        model = ToolCostModel(redis_client)
+        
+        model.record('trivy-mcp', RepoFeatures(files=5), _usage(12.5, 6.0, 300))
+        
+        key, payload = redis_client.lpush.call_args[0]
+        assert key == 'tool_costs:trivy-mcp'
+        assert json.loads(payload)['wall_seconds'] == 12.5
+        redis_client.ltrim.assert_called_once_with('tool_costs:trivy-mcp', 0, 199)
+        
+        redis_client.lrange.return_value = [payload]
+        assert ToolCostModel(redis_client).observations('trivy-mcp')[0]['cpu_seconds'] == 6.0
+    
+    def test_plan_seconds_follow_critical_path(self):
+        """Test a plan's duration is its longest dependency chain."""
+        model = ToolCostModel()
+        tools = [
+            {'name': 'scoutsuite-mcp', 'dependencies': []},
+            {'name': 'pacu', 'dependencies': ['scoutsuite-mcp']},
+            {'name': 'gitleaks-mcp'}
+        ]
+        
+        assert model.plan_seconds(tools, RepoFeatures()) == 600.0 + 180.0
+    
+    def test_host_capacity_overrides(self, monkeypatch):
+        """Test capacity environment overrides."""
+        monkeypatch.setenv('TOOL_CPU_CAPACITY', '3')
+        monkeypatch.setenv('TOOL_MEMORY_CAPACITY_MB', '6144')
+        
+        assert host_capacity() == (3.0, 6144.0)
@@ -0,0 +1,70 @@
+"""
+Unit Tests for the Mission Deadline
+===================================
+
+Tests reading the deadline, per-stage budgets, degradation and tool
+timeouts cut to the budget.
+"""
+
+import pytest
+from unittest.mock import patch
+from src.shared.mission import STAGE_MIN_SECONDS, MissionDeadline
+
+NOW = 1_000_000.0
+
+
+def _deadline(seconds_left):
+    with patch.dict('os.environ', {'DEADLINE_SAFETY_SECONDS': '0'}):
+        return MissionDeadline(NOW + seconds_left, clock=lambda: NOW)
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestMissionDeadline:
+    """Test suite for MissionDeadline."""
+    
+    def test_from_env_then_artifact(self):
+        """Test the environment wins over an artifact's deadline, and invalid values are ignored."""
+        with patch.dict('os.environ', {'MISSION_DEADLINE': '1700000000'}):
+            assert MissionDeadline.from_env(1800000000).deadline == 1700000000
+        
+        with patch.dict('os.environ', {'MISSION_DEADLINE': ''}):
+            assert MissionDeadline.from_env(1800000000).deadline == 1800000000
+            assert MissionDeadline.from_env('soon').bounded is False
+            assert MissionDeadline.from_env().bounded is False
+    
+    def test_unbounded_never_degrades(self):
+        """Test a mission without a deadline keeps the full policies and timeouts."""
+        deadline = MissionDeadline()
+        
+        assert deadline.remaining() == float('inf')
+        assert deadline.degraded('critic') is False
+        assert deadline.exhausted('coordinator') is False
+        assert deadline.timeout('coordinator', 1800) == 1800
+    
+    def test_stage_budget_reserves_later_stages(self):
+        """Test a stage's budget leaves the stages after it their minimum."""
+        deadline = _deadline(3000)
+        later = STAGE_MIN_SECONDS['synthesizer'] + STAGE_MIN_SECONDS['critic'] + STAGE_MIN_SECONDS['archivist']
+        
+        assert deadline.stage_budget('coordinator') == 3000 - later
+        assert deadline.stage_budget('archivist') == 3000
+        assert _deadline(100).stage_budget('coordinator') == 0
+    
+    def test_degrades_below_needed_time(self):
+        """Test degradation against the policy's need or twice the stage minimum."""
+        deadline = _deadline(STAGE_MIN_SECONDS['archivist'] + 150)
+        
+        # Critic budget 150s, below twice its 90s minimum
+        assert deadline.degraded('critic') is True
+        assert deadline.degraded('critic', needed=100) is False
+        assert _deadline(3000).degraded('critic') is False
+    
+    def test_timeout_cut_to_budget(self):
+        """Test tool timeouts shrink to the stage budget but not below the floor."""
+        reserved = STAGE_MIN_SECONDS['synthesizer'] + STAGE_MIN_SECONDS['critic'] + STAGE_MIN_SECONDS['archivist']
+        
+        assert _deadline(reserved + 200).timeout('coordinator', 1800) == 200
+        assert _deadline(reserved + 200).timeout('coordinator', 180) == 180
+        assert _deadline(reserved + 10).timeout('coordinator', 300) == 30
+        assert _deadline(reserved + 10).exhausted('coordinator') is True
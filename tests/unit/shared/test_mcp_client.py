@@ -401,6 +401,45 @@ class TestMCPToolRegistry:
         assert 'semgrep-mcp' in all_tools
         assert all_tools['semgrep-mcp'] == []  # Empty list for failed server
     
+    @pytest.mark.asyncio
+    async def test_check_health(self):
+        """Test check_health collects each server's readiness report."""
+        registry = MCPToolRegistry()
+        
+        async def mock_get_client(server_name, env=None):
+            if server_name == 'pacu-mcp':
+                raise Exception('Server unavailable')
+            mock_client = AsyncMock()
+            mock_client.call_tool = AsyncMock(return_value={
+                'success': True,
+                'content': [{'server': server_name, 'ready': True, 'steps': {'version': 0.1}}]
+            })
+            return mock_client
+        
+        with patch.object(registry, 'get_client', side_effect=mock_get_client):
+            health = await registry.check_health()
+        
+        assert set(health) == set(registry._server_configs)
+        assert health['semgrep-mcp']['ready'] is True
+        assert health['pacu-mcp']['ready'] is False
+        assert 'Server unavailable' in health['pacu-mcp']['error']
+    
+    @pytest.mark.asyncio
+    async def test_check_health_waits_for_warmup(self):
+        """Test a re-probe of some servers asks them to wait for their warm-up."""
+        registry = MCPToolRegistry()
+        mock_client = AsyncMock()
+        mock_client.call_tool = AsyncMock(return_value={
+            'success': True,
+            'content': [{'server': 'semgrep-mcp', 'ready': True, 'version': '1.50.0'}]
+        })
+        
+        with patch.object(registry, 'get_client', AsyncMock(return_value=mock_client)):
+            health = await registry.check_health(wait_seconds=30, server_names=['semgrep-mcp'])
+        
+        assert list(health) == ['semgrep-mcp']
+        mock_client.call_tool.assert_awaited_once_with('health', {'wait_seconds': 30})
+    
     @pytest.mark.asyncio
     async def test_call_tool(self):
         """Test calling tool through registry."""
@@ -0,0 +1,245 @@
+"""
+Unit Tests for MCP Server Support
+==================================
+
+Tests the building blocks shared by the MCP tool servers.
+"""
+
+import pytest
+import asyncio
+from src.shared.mcp_server import ServerWarmup
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestServerWarmup:
+    """Test suite for ServerWarmup."""
+    
+    @pytest.mark.asyncio
+    async def test_steps_run_once(self):
+        """Test warm-up steps run once and record results and timings."""
+        calls = []
+        
+        async def version():
+            calls.append('version')
+            return '1.2.3'
+        
+        warmup = ServerWarmup('test-mcp')
+        warmup.add_step('version', version)
+        
+        assert warmup.status()['state'] == 'pending'
+        
+        first, second = await asyncio.gather(warmup.wait(), warmup.wait())
+        await warmup.wait()
+        
+        assert calls == ['version']
+        assert warmup.ready
+        assert warmup.results['version'] == '1.2.3'
+        assert 'version' in first['steps']
+        assert first == second
+    
+    @pytest.mark.asyncio
+    async def test_failed_step_does_not_block(self):
+        """Test a failing step is reported without blocking readiness."""
+        async def broken():
+            raise RuntimeError('db unavailable')
+        
+        async def fine():
+            return True
+        
+        warmup = ServerWarmup('test-mcp')
+        warmup.add_step('db', broken)
+        warmup.add_step('version', fine)
+        
+        status = await warmup.wait()
+        
+        assert status['ready'] is True
+        assert status['errors'] == {'db': 'db unavailable'}
+        assert set(status['steps']) == {'db', 'version'}
+        assert warmup.results == {'version': True}
+    
+    @pytest.mark.asyncio
+    async def test_wait_is_bounded(self):
+        """Test a call stops waiting for a slow step after max_wait while warm-up carries on."""
+        release = asyncio.Event()
+        
+        async def slow():
+            await release.wait()
+            return True
+        
+        warmup = ServerWarmup('test-mcp', max_wait=0.01)
+        warmup.add_step('rules', slow)
+        
+        status = await warmup.wait()
+        
+        assert status['ready'] is False
+        assert status['state'] == 'warming'
+        
+        release.set()
+        assert (await warmup.wait(1.0))['ready'] is True
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestFindingWireFormat:
+    """Test suite for the normalized finding wire format."""
+    
+    def test_round_trip_dedupes_paths_and_strings(self):
+        """Test findings survive encoding with paths and snippets stored once."""
+        from src.shared.mcp_server import Finding, decode_tool_result, encode_tool_result, iter_findings
+        
+        findings = [
+            Finding('semgrep', 'sql-injection', 'ERROR', '/tmp/m1/src/app/db.py', 10, 12, 'cursor.execute(q)', 'SQLi'),
+            Finding('semgrep', 'sql-injection', 'ERROR', '/tmp/m1/src/app/db.py', 40, 40, 'cursor.execute(q)', 'SQLi'),
+            Finding('semgrep', 'weak-hash', 'WARNING', '/tmp/m1/src/app/auth.py', 7, 7, 'md5(pw)', 'Weak hash')
+        ]
+        
+        wire = encode_tool_result(
+            {'success': True, 'tool': 'semgrep', 'results': {'huge': 'raw'}, 'summary': {'high': 2}},
+            findings,
+            root='/tmp/m1'
+        )
+        header = wire.split('\n', 1)[0]
+        document = decode_tool_result(wire)
+        decoded = list(iter_findings(document))
+        
+        assert header.count('src/app/db.py') == 1
+        assert header.count('cursor.execute(q)') == 1
+        assert 'huge' not in wire
+        assert document['findings_count'] == 3
+        assert document['summary'] == {'high': 2}
+        assert decoded[0].path == 'src/app/db.py'
+        assert decoded[0].severity == 'HIGH'
+        assert decoded[2].severity == 'MEDIUM'
+        assert (decoded[1].line_start, decoded[1].line_end) == (40, 40)
+        assert decoded[0].fingerprint == decoded[1].fingerprint
+        assert decoded[0].fingerprint != decoded[2].fingerprint
+    
+    def test_relative_path_only_under_root(self):
+        """Test only paths inside the scan root are made relative to it."""
+        from src.shared.mcp_server import FindingEncoder
+        
+        encoder = FindingEncoder('semgrep', '/tmp/m1/')
+        
+        assert encoder.relative_path('/tmp/m1/src/app.py') == 'src/app.py'
+        assert encoder.relative_path('/tmp/m10/src/app.py') == '/tmp/m10/src/app.py'
+        assert encoder.relative_path('src/app.py') == 'src/app.py'
+    
+    def test_rejects_other_documents(self):
+        """Test plain JSON results are not mistaken for wire documents."""
+        from src.shared.mcp_server import decode_tool_result, is_wire_document
+        
+        assert not is_wire_document('{"results": []}')
+        with pytest.raises(ValueError):
+            decode_tool_result('{"error": "timeout", "success": false}')
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestResourceGovernor:
+    """Test suite for scanner subprocess resource governance."""
+    
+    def test_profile_from_environment(self):
+        """Test per-tool overrides and default CPU slicing."""
+        from unittest.mock import patch
+        from src.shared.mcp_server.governor import ResourceGovernor, slice_cpus
+        
+        with patch.dict('os.environ', {'SEMGREP_CPUS': '0-1,3', 'SEMGREP_NICE': '7', 'SEMGREP_MEMORY_MB': '512'}):
+            profile = ResourceGovernor('semgrep').profile
+        
+        assert profile.cpus == [0, 1, 3]
+        assert profile.nice == 7
+        assert profile.memory_mb == 512
+        assert profile.nofile == 4096
+        assert slice_cpus(list(range(8)), 0.5, 0.25) == [4, 5]
+        assert slice_cpus([0], 0.75, 0.25) == [0]
+    
+    def test_default_slices_only_when_enabled(self):
+        """Test scanners stay unpinned unless the default CPU slices are enabled."""
+        from unittest.mock import patch
+        from src.shared.mcp_server.governor import ResourceGovernor
+        
+        with patch('os.sched_getaffinity', return_value=set(range(8)), create=True):
+            with patch.dict('os.environ', {'RESOURCE_CPU_SLICES': 'false'}):
+                assert ResourceGovernor('trivy').profile.cpus is None
+            with patch.dict('os.environ', {'RESOURCE_CPU_SLICES': 'true'}):
+                assert ResourceGovernor('trivy').profile.cpus == [4, 5]
+    
+    @pytest.mark.asyncio
+    async def test_reports_rusage(self):
+        """Test a governed subprocess runs under its profile and reports CPU and peak RSS."""
+        import sys
+        from src.shared.mcp_server import ResourceGovernor
+        
+        import resource
+        
+        governor = ResourceGovernor('gitleaks')
+        process = await governor.spawn(
+            sys.executable, '-c',
+            'import os, resource; print(os.nice(0), resource.getrlimit(resource.RLIMIT_NOFILE)[0], '
+            'resource.getrlimit(resource.RLIMIT_AS)[0])',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr, usage = await governor.communicate(process, timeout=30)
+        
+        nice, nofile, address_space = stdout.decode().split()
+        assert process.returncode == 0
+        assert int(nice) >= 10
+        assert int(nofile) <= 4096
+        # Address space stays unlimited for Go scanners' reservations
+        assert int(address_space) == resource.getrlimit(resource.RLIMIT_AS)[0]
+        assert usage['exit_code'] == 0
+        assert usage['cpu_seconds'] >= 0
+        assert usage['peak_rss_mb'] > 0
+        assert usage['profile']['memory_mb'] == 1024
+    
+    @pytest.mark.asyncio
+    async def test_kills_on_timeout(self):
+        """Test a scanner exceeding its timeout is killed."""
+        import sys
+        from src.shared.mcp_server import ResourceGovernor
+        
+        governor = ResourceGovernor('trivy')
+        process = await governor.spawn(
+            sys.executable, '-c', 'import time; time.sleep(30)',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await governor.communicate(process, timeout=0.5)
+        
+        await process.wait()
+        assert process.returncode != 0
+    
+    @pytest.mark.asyncio
+    async def test_sigkill_is_not_oom_kill(self):
+        """Test a scanner killed by another SIGKILL is not reported as OOM-killed."""
+        import sys
+        from unittest.mock import patch
+        from src.shared.mcp_server import ResourceGovernor
+        
+        governor = ResourceGovernor('gitleaks')
+        with patch.object(governor, '_create_cgroup', return_value=None):
+            process = await governor.spawn(
+                sys.executable, '-c', 'import os, signal; os.kill(os.getpid(), signal.SIGKILL)',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        stdout, stderr, usage = await governor.communicate(process, timeout=30)
+        
+        assert usage['exit_code'] == -9
+        assert not usage.get('oom_killed')
+    
+    def test_merge_usage(self):
+        """Test usage from several runs adds CPU time and keeps the peak RSS."""
+        from src.shared.mcp_server import merge_usage
+        
+        merged = merge_usage([
+            {'cpu_seconds': 1.5, 'peak_rss_mb': 100.0, 'wall_seconds': 2.0},
+            {},
+            {'cpu_seconds': 0.5, 'peak_rss_mb': 300.0, 'wall_seconds': 1.0, 'oom_killed': True}
+        ])
+        
+        assert merged == {'cpu_seconds': 2.0, 'peak_rss_mb': 300.0, 'wall_seconds': 3.0, 'runs': 2, 'oom_killed': True}
@@ -0,0 +1,128 @@
+"""
+Unit Tests for the Mission Memo
+===============================
+
+Tests memo keys, tool entry round-trips, pipeline markers and reading the
+archive digest from the workspace bundle.
+"""
+
+import io
+import json
+import pytest
+from unittest.mock import Mock
+from src.shared.storage import MissionMemo, archive_sha256, invocation_ruleset_digest, ruleset_digest
+
+INVOCATION = {
+    'server_name': 'semgrep-mcp',
+    'tool_name': 'semgrep_scan',
+    'arguments': {'source_path': '/tmp/m1', 'config': 'auto', 'timeout': 300}
+}
+
+
+def _s3():
+    """In-memory S3 client serving what was put."""
+    objects = {}
+    s3_client = Mock()
+    
+    def put_object(**kwargs):
+        objects[kwargs['Key']] = kwargs['Body']
+        return {}
+    
+    def get_object(**kwargs):
+        if kwargs['Key'] not in objects:
+            raise KeyError(kwargs['Key'])
+        body = objects[kwargs['Key']]
+        return {'Body': io.BytesIO(body if isinstance(body, bytes) else body.encode())}
+    
+    s3_client.put_object.side_effect = put_object
+    s3_client.get_object.side_effect = get_object
+    return s3_client
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestMissionMemo:
+    """Test suite for MissionMemo."""
+    
+    def test_entry_key_ignores_workspace_path(self):
+        """Test the key is shared across missions but not across tool versions or rulesets."""
+        memo = MissionMemo(Mock(), 'bucket', 'abc')
+        rules = ruleset_digest({'ruleset_digest': 'sha256:1'})
+        key = memo.entry_key(INVOCATION, '1.50.0', rules)
+        
+        other_mission = {**INVOCATION, 'arguments': {**INVOCATION['arguments'], 'source_path': '/tmp/m2'}}
+        assert memo.entry_key(other_mission, '1.50.0', rules) == key
+        
+        assert memo.entry_key(INVOCATION, '1.51.0', rules) != key
+        assert memo.entry_key(INVOCATION, '1.50.0', ruleset_digest({'ruleset_digest': 'sha256:2'})) != key
+        assert MissionMemo(Mock(), 'bucket', 'def').entry_key(INVOCATION, '1.50.0', rules) != key
+        assert MissionMemo(Mock(), 'bucket', 'abc', version='2').entry_key(INVOCATION, '1.50.0', rules) != key
+        assert MissionMemo(Mock(), 'bucket', 'abc', scan_type='aws').entry_key(INVOCATION, '1.50.0', rules) != key
+    
+    def test_invocation_ruleset_is_the_config_run(self):
+        """Test an invocation is keyed on its own config's rules, and live configs are not memoized."""
+        capabilities = {'rulesets': {'p/owasp-top-ten': 'sha256:owasp', 'p/security-audit': 'sha256:audit'}}
+        degraded = {'config': 'p/owasp-top-ten'}
+        
+        assert invocation_ruleset_digest(capabilities, degraded) == 'sha256:owasp'
+        assert invocation_ruleset_digest(capabilities, INVOCATION['arguments']) is None
+        assert invocation_ruleset_digest({'db_version': '2'}, {}) == ruleset_digest({'db_version': '2'})
+    
+    def test_tool_entry_round_trip(self):
+        """Test a stored tool entry is read back and a miss returns None."""
+        memo = MissionMemo(_s3(), 'bucket', 'abc')
+        key = memo.entry_key(INVOCATION, '1.50.0', 'sha256:1')
+        
+        assert memo.get_tool(key) is None
+        
+        memo.put_tool(key, {'s3_uri': 's3://bucket/results.ndjson', 'digest': 'sha256:x', 'mission_id': 'm1'})
+        entry = memo.get_tool(key)
+        
+        assert entry['s3_uri'] == 's3://bucket/results.ndjson'
+        assert entry['mission_id'] == 'm1'
+        assert entry['created_at'] > 0
+    
+    def test_complete_only_for_scanned_mission(self):
+        """Test only the mission whose scan was memoized completes the marker."""
+        memo = MissionMemo(_s3(), 'bucket', 'abc')
+        
+        assert memo.mark_complete('m1', 3) is False
+        
+        memo.mark_scanned('m1', {'semgrep-mcp': {'version': '1.50.0', 'ruleset': 'sha256:1'}})
+        assert memo.mark_complete('m2', 3) is False
+        assert memo.pipeline()['status'] == 'scanned'
+        
+        assert memo.mark_complete('m1', 3, 'wiki/m1/index.md') is True
+        marker = memo.pipeline()
+        assert marker['status'] == 'complete'
+        assert marker['findings_count'] == 3
+        assert marker['wiki_s3_key'] == 'wiki/m1/index.md'
+        assert marker['tools']['semgrep-mcp']['version'] == '1.50.0'
+        assert marker['scan_type'] == 'code'
+    
+    def test_complete_only_for_same_scan_type(self):
+        """Test a marker scanned under one scan type is not completed under another."""
+        s3_client = _s3()
+        MissionMemo(s3_client, 'bucket', 'abc').mark_scanned('m1', {})
+        
+        assert MissionMemo(s3_client, 'bucket', 'abc', scan_type='aws').mark_complete('m1', 3) is False
+    
+    def test_markers_readable_without_codec(self):
+        """Test memo documents are plain JSON, as Unpack reads them directly."""
+        s3_client = _s3()
+        memo = MissionMemo(s3_client, 'bucket', 'abc')
+        memo.mark_scanned('m1', {})
+        
+        body = s3_client.get_object(Bucket='bucket', Key='memo/abc/pipeline-1.json')['Body'].read()
+        assert json.loads(body)['mission_id'] == 'm1'
+    
+    def test_archive_sha256_from_bundle(self):
+        """Test the archive digest comes from the workspace bundle's metadata."""
+        s3_client = Mock()
+        s3_client.head_object.return_value = {'Metadata': {'sha256': 'abc'}}
+        
+        assert archive_sha256(s3_client, 'bucket', 'm1') == 'abc'
+        s3_client.head_object.assert_called_once_with(Bucket='bucket', Key='workspaces/m1/source.tar.gz')
+        
+        s3_client.head_object.side_effect = Exception('404')
+        assert archive_sha256(s3_client, 'bucket', 'm1') is None
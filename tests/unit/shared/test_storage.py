@@ -0,0 +1,90 @@
+"""
+Unit Tests for Compressed Artifact Storage
+==========================================
+
+Tests the zstd/gzip storage codec used for S3 artifacts.
+"""
+
+import io
+import pytest
+import json
+import hashlib
+from unittest.mock import Mock
+from src.shared import storage
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestStorageCodec:
+    """Test suite for the storage codec."""
+    
+    def test_gzip_round_trip(self):
+        """Test gzip payloads round-trip with and without the encoding marker."""
+        data = json.dumps({'findings': ['x' * 50] * 100}).encode()
+        
+        body, encoding = storage.compress(data, 'gzip')
+        
+        assert encoding == 'gzip'
+        assert len(body) < len(data)
+        assert storage.decompress(body, 'gzip') == data
+        assert storage.decompress(body) == data
+    
+    def test_zstd_round_trip(self):
+        """Test zstd payloads round-trip when zstandard is installed."""
+        pytest.importorskip('zstandard')
+        data = json.dumps({'findings': ['x' * 50] * 100}).encode()
+        
+        body, encoding = storage.compress(data, 'zstd')
+        
+        assert encoding == 'zstd'
+        assert storage.decompress(body) == data
+    
+    def test_small_and_legacy_payloads(self):
+        """Test tiny payloads stay uncompressed and plain objects still read."""
+        body, encoding = storage.compress(b'{"a":1}', 'gzip')
+        
+        assert encoding == 'identity'
+        assert body == b'{"a":1}'
+        assert storage.decompress(b'{"a":1}') == b'{"a":1}'
+    
+    def test_default_encoding(self, monkeypatch):
+        """Test STORAGE_COMPRESSION selects the encoding."""
+        monkeypatch.setenv('STORAGE_COMPRESSION', 'none')
+        assert storage.default_encoding() == 'identity'
+        
+        monkeypatch.setenv('STORAGE_COMPRESSION', 'gzip')
+        assert storage.default_encoding() == 'gzip'
+    
+    def test_put_and_read_object(self, monkeypatch):
+        """Test the digest covers the uncompressed bytes and reads decompress transparently."""
+        monkeypatch.setenv('STORAGE_COMPRESSION', 'gzip')
+        s3_client = Mock()
+        data = '\n'.join(json.dumps({'row': i}) for i in range(200))
+        
+        digest = storage.put_object(s3_client, 'bucket', 'tool-results/x.ndjson', data, content_type='application/x-ndjson')
+        
+        put = s3_client.put_object.call_args.kwargs
+        assert digest == f"sha256:{hashlib.sha256(data.encode()).hexdigest()}"
+        assert put['ContentEncoding'] == 'gzip'
+        assert put['ContentType'] == 'application/x-ndjson'
+        
+        response = {'Body': Mock(read=Mock(return_value=put['Body'])), 'ContentEncoding': 'gzip'}
+        assert storage.read_body(response) == data.encode()
+    
+    @pytest.mark.parametrize('encoding', ['gzip', 'zstd', 'identity'])
+    def test_read_body_digest_streams(self, encoding):
+        """Test streamed reads decompress and hash chunk by chunk, with or without the encoding marker."""
+        if encoding == 'zstd':
+            pytest.importorskip('zstandard')
+        data = '\n'.join(json.dumps({'row': i}) for i in range(500)).encode()
+        stored, stored_encoding = storage.compress(data, encoding)
+        
+        for marker in (stored_encoding, None):
+            response = {'Body': io.BytesIO(stored), 'ContentEncoding': marker}
+            body, digest, stored_bytes = storage.read_body_digest(response, chunk_size=256)
+            
+            assert body == data
+            assert digest == f"sha256:{hashlib.sha256(data).hexdigest()}"
+            assert stored_bytes == len(stored)
+        
+        assert storage.read_body_digest({'Body': io.BytesIO(b'')}) == (b'', f"sha256:{hashlib.sha256(b'').hexdigest()}", 0)
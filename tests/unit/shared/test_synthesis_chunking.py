@@ -0,0 +1,92 @@
+"""
+Unit Tests for Synthesis Chunking
+=================================
+
+Tests partitioning tool results by file or rule into token-bounded,
+self-contained chunks for map-reduce synthesis.
+"""
+
+import pytest
+from src.shared.mcp_server import Finding, FindingEncoder, decode_tool_result, iter_findings
+from src.shared.synthesis import estimate_tokens, partition_tool_results
+
+
+def _document(tool, findings, **meta):
+    encoder = FindingEncoder(tool)
+    for rule, path, line in findings:
+        encoder.add(Finding(
+            tool=tool,
+            rule=rule,
+            severity='HIGH',
+            path=path,
+            line_start=line,
+            line_end=line,
+            snippet='x' * 200,
+            message=f"{rule} in {path}"
+        ))
+    return {**decode_tool_result(encoder.encode(meta)), '_tool': f"{tool}-mcp:scan", '_digest': 'sha256:abc'}
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestPartitionToolResults:
+    """Test suite for partition_tool_results."""
+    
+    def test_small_results_stay_in_one_chunk(self):
+        """Test results under the budget come back as a single chunk, one document per tool."""
+        semgrep = _document('semgrep', [('sqli', 'app.py', 3), ('xss', 'web.py', 9)], summary={'files': 2})
+        gitleaks = _document('gitleaks', [('aws-key', 'config.py', 1)])
+        
+        chunks = partition_tool_results([semgrep, gitleaks], max_tokens=20000)
+        
+        assert len(chunks) == 1
+        assert [d['tool'] for d in chunks[0]] == ['semgrep', 'gitleaks']
+        assert chunks[0][0]['summary'] == {'files': 2}
+        assert chunks[0][0]['_digest'] == 'sha256:abc'
+        assert list(iter_findings(chunks[0][0])) == list(iter_findings(semgrep))
+    
+    def test_files_split_across_chunks_under_budget(self):
+        """Test each chunk stays under the budget and keeps a file's findings together."""
+        findings = [('rule', f"src/f{i % 6}.py", i) for i in range(24)]
+        document = _document('semgrep', findings)
+        
+        chunks = partition_tool_results([document], max_tokens=500)
+        
+        assert len(chunks) > 1
+        files = [set(f.path for d in chunk for f in iter_findings(d)) for chunk in chunks]
+        assert sum(len(f) for f in files) == 6
+        for chunk in chunks:
+            assert estimate_tokens(chunk) <= 500 * 1.25
+            assert sum(d['findings_count'] for d in chunk) == len(chunk[0]['findings'])
+        assert sum(d['findings_count'] for chunk in chunks for d in chunk) == 24
+    
+    def test_oversized_group_is_split(self):
+        """Test a single file with more findings than fit in a chunk is split."""
+        document = _document('semgrep', [('rule', 'big.py', i) for i in range(20)])
+        
+        chunks = partition_tool_results([document], max_tokens=300)
+        
+        assert len(chunks) > 1
+        lines = [f.line_start for chunk in chunks for d in chunk for f in iter_findings(d)]
+        assert sorted(lines) == list(range(20))
+    
+    def test_partition_by_rule(self):
+        """Test grouping by rule keeps a rule's findings in one chunk."""
+        findings = [(f"rule-{i % 3}", f"src/f{i}.py", i) for i in range(12)]
+        
+        chunks = partition_tool_results([_document('semgrep', findings)], max_tokens=700, partition_key='rule')
+        
+        rules = [set(f.rule for d in chunk for f in iter_findings(d)) for chunk in chunks]
+        assert sum(len(r) for r in rules) == 3
+    
+    def test_non_wire_results_pass_through(self):
+        """Test results that are not findings documents are chunks of their own."""
+        legacy = {'tool': 'pacu', 'results': [{'module': 'iam__enum'}]}
+        
+        chunks = partition_tool_results([legacy, _document('semgrep', [])])
+        
+        assert chunks[0] == [legacy]
+        assert chunks[1][0]['findings_count'] == 0
+        
+        with pytest.raises(ValueError):
+            partition_tool_results([legacy], partition_key='severity')
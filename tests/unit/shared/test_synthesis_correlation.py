@@ -0,0 +1,82 @@
+"""
+Unit Tests for Location Correlation
+===================================
+
+Tests overlap queries on the interval tree and correlated groups across
+tool results and the deep researcher's patterns.
+"""
+
+import random
+import pytest
+from src.shared.mcp_server import Finding, FindingEncoder, decode_tool_result
+from src.shared.synthesis import IntervalTree, Location, LocationIndex
+
+
+def _document(tool, findings):
+    encoder = FindingEncoder(tool)
+    for rule, path, start, end in findings:
+        encoder.add(Finding(tool=tool, rule=rule, severity='HIGH', path=path, line_start=start, line_end=end))
+    return {**decode_tool_result(encoder.encode()), '_tool': f"{tool}-mcp:{tool}_scan", '_digest': f"sha256:{tool}"}
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestLocationIndex:
+    """Test suite for IntervalTree and LocationIndex."""
+    
+    def test_interval_tree_matches_brute_force(self):
+        """Test overlap queries return exactly the overlapping intervals, also after more additions."""
+        rng = random.Random(7)
+        tree = IntervalTree()
+        intervals = []
+        for i in range(500):
+            start = rng.randrange(1, 2000)
+            intervals.append((start, start + rng.randrange(0, 30), i))
+            tree.add(*intervals[-1])
+        
+        for _ in range(200):
+            lo = rng.randrange(1, 2000)
+            hi = lo + rng.randrange(0, 20)
+            expected = sorted(i for s, e, i in intervals if s <= hi and e >= lo)
+            assert sorted(tree.overlapping(lo, hi)) == expected
+        
+        tree.add(5000, 5010, 'late')
+        assert tree.overlapping(5005, 5005) == ['late']
+    
+    def test_tool_results_and_patterns_indexed(self):
+        """Test findings of all sources are queryable by file and lines; findings without lines are not."""
+        index = LocationIndex()
+        index.add_tool_results([
+            _document('semgrep', [('sqli', 'app.py', 40, 42), ('xss', 'web.py', 7, 7)]),
+            _document('trivy', [('CVE-2021-44228', 'pom.xml', 0, 0)]),
+            {'tool': 'pacu', 'results': []}
+        ])
+        index.add_code_patterns([{'type': 'sql_injection', 'file': 'app.py', 'line': 41}, {'type': 'eval', 'file': 'x.py'}], 'sha256:research')
+        
+        hits = index.overlapping('app.py', 41, 41)
+        
+        assert len(index) == 3
+        assert sorted((l.source, l.rule) for l in hits) == [('deep-researcher', 'sql_injection'), ('semgrep-mcp', 'sqli')]
+        assert index.overlapping('pom.xml', 1, 100) == []
+        assert index.overlapping('missing.py', 1, 100) == []
+    
+    def test_correlated_groups_need_several_sources(self):
+        """Test transitively overlapping findings group, and single-source runs are dropped."""
+        index = LocationIndex()
+        for source, path, start, end in [
+            ('semgrep-mcp', 'app.py', 10, 12),
+            ('gitleaks-mcp', 'app.py', 12, 12),
+            ('deep-researcher', 'app.py', 13, 14),
+            ('semgrep-mcp', 'app.py', 30, 31),
+            ('semgrep-mcp', 'app.py', 31, 33),
+            ('gitleaks-mcp', 'db.py', 5, 5),
+            ('semgrep-mcp', 'db.py', 6, 6)
+        ]:
+            index.add(Location(source=source, path=path, line_start=start, line_end=end, rule=f"{source}-rule"))
+        
+        groups = index.correlated_groups()
+        
+        assert [[(l.source, l.line_start) for l in g] for g in groups] == [
+            [('semgrep-mcp', 10), ('gitleaks-mcp', 12)]
+        ]
+        assert len(index.correlated_groups(min_sources=1)) == 5
@@ -0,0 +1,82 @@
+"""
+Unit Tests for Finding Deduplication
+====================================
+
+Tests exact and near-duplicate clustering with the hash index and MinHash
+LSH, scoped to a file and nearby lines.
+"""
+
+import pytest
+from types import SimpleNamespace
+from src.shared.synthesis import cluster_findings
+from src.shared.synthesis.dedup import normalize_tokens
+
+
+def _finding(title, description, file_path='app.py', lines=(10,)):
+    return SimpleNamespace(title=title, description=description, file_path=file_path, line_numbers=list(lines))
+
+
+def _cluster(findings, **kwargs):
+    return cluster_findings(
+        findings,
+        exact_key=lambda f: f"{f.file_path}:{f.title}",
+        text=lambda f: f"{f.title} {f.description}",
+        scope=lambda f: f.file_path,
+        lines=lambda f: f.line_numbers,
+        **kwargs
+    )
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestClusterFindings:
+    """Test suite for cluster_findings."""
+    
+    def test_exact_duplicates_share_key(self):
+        """Test findings with the same file and title cluster regardless of text."""
+        findings = [
+            _finding('SQL Injection', 'first report'),
+            _finding('XSS in template', 'unrelated'),
+            _finding('SQL Injection', 'second report', lines=(90,))
+        ]
+        
+        assert _cluster(findings) == [[0, 2], [1]]
+    
+    def test_near_duplicates_across_sources(self):
+        """Test the same issue under another title merges, but not in another file or far away."""
+        semgrep = _finding('Formatted Sql Query in app.py', 'Detected possible formatted SQL query. Use parameterized queries instead.')
+        research = _finding('Sql Injection in app.py', 'Potential sql injection detected', lines=(11,))
+        elsewhere = _finding('Sql Injection in app.py', 'Potential sql injection detected', file_path='db.py')
+        far = _finding('Sql Injection in app.py pattern', 'Potential sql injection detected', lines=(400,))
+        
+        assert _cluster([semgrep, research, elsewhere, far]) == [[0, 1], [2], [3]]
+    
+    def test_distinct_issues_kept_apart(self):
+        """Test different issues on nearby lines of one file stay separate."""
+        findings = [
+            _finding('SQL Injection in login', 'query built from request parameters'),
+            _finding('Command Injection in login', 'os.system called with request data', lines=(12,)),
+            _finding('', '')
+        ]
+        
+        assert _cluster(findings) == [[0], [1], [2]]
+    
+    def test_scales_near_linearly(self):
+        """Test thousands of distinct findings cluster without pairwise comparison."""
+        findings = [
+            _finding(f"Issue {i} token{i} alpha{i}", f"detail{i} beta{i} gamma{i}", file_path=f"f{i % 50}.py")
+            for i in range(3000)
+        ]
+        findings += [_finding(f.title + ' again', f.description, file_path=f.file_path) for f in findings[:300]]
+        
+        clusters = _cluster(findings)
+        
+        assert len(clusters) == 3000
+        assert all(len(c) == 2 for c in clusters[:300])
+    
+    def test_normalize_tokens(self):
+        """Test stopwords, numbers and repeats are dropped."""
+        assert normalize_tokens('Potential SQL injection in the SQL query on line 42') == ['sql', 'injection', 'query', 'line']
+        
+        with pytest.raises(ValueError):
+            _cluster([], num_perm=30, bands=8)
@@ -0,0 +1,121 @@
+"""
+Unit Tests for Rule-Based Translation
+=====================================
+
+Tests mapping gitleaks, trivy and semgrep findings and the deep
+researcher's patterns to draft findings by rule, and leaving ambiguous or
+correlated findings for the model.
+"""
+
+import pytest
+from src.shared.mcp_server import Finding, FindingEncoder, decode_tool_result, iter_findings
+from src.shared.synthesis import translate_code_patterns, translate_tool_results
+
+
+def _document(tool, findings, **meta):
+    encoder = FindingEncoder(tool)
+    for finding in findings:
+        encoder.add(Finding(tool=tool, **finding))
+    return {**decode_tool_result(encoder.encode(meta)), '_tool': f"{tool}-mcp:{tool}_scan", '_digest': f"sha256:{tool}"}
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestTranslateToolResults:
+    """Test suite for translate_tool_results."""
+    
+    def test_gitleaks_aws_key_translated(self):
+        """Test an AWS key maps to a critical finding while a generic key goes to the model."""
+        gitleaks = _document('gitleaks', [
+            {'rule': 'aws-access-token', 'severity': 'HIGH', 'path': 'config.py', 'line_start': 4, 'line_end': 4, 'snippet': 'AKIA...', 'message': 'AWS'},
+            {'rule': 'generic-api-key', 'severity': 'HIGH', 'path': 'settings.py', 'line_start': 9, 'line_end': 9, 'snippet': 'key=...', 'message': 'Generic API Key'}
+        ])
+        
+        drafts, remaining, stats = translate_tool_results([gitleaks])
+        
+        assert drafts == [{
+            'title': 'Hardcoded AWS Access Key in config.py',
+            'severity': 'CRITICAL',
+            'description': drafts[0]['description'],
+            'file_path': 'config.py',
+            'line_numbers': [4],
+            'tool_source': 'gitleaks-mcp',
+            'evidence_digest': 'sha256:gitleaks',
+            'confidence': 0.95
+        }]
+        assert [f.rule for f in iter_findings(remaining[0])] == ['generic-api-key']
+        assert remaining[0]['_digest'] == 'sha256:gitleaks'
+        assert stats == {'translated': 1, 'to_model': 1}
+    
+    def test_trivy_severity_from_cvss(self):
+        """Test a CVE with a CVSS score is banded by score; one without a score goes to the model."""
+        trivy = _document('trivy', [
+            {'rule': 'CVE-2021-44228', 'severity': 'HIGH', 'path': 'pom.xml', 'snippet': 'log4j-core 2.14.1 -> 2.17.1', 'message': 'Log4Shell'},
+            {'rule': 'CVE-2023-0002', 'severity': 'LOW', 'path': 'pom.xml', 'snippet': 'commons-text 1.9 -> 1.10.0', 'message': 'Text4Shell'}
+        ], cvss={'CVE-2021-44228': 10.0})
+        
+        drafts, remaining, stats = translate_tool_results([trivy])
+        
+        assert drafts[0]['title'] == 'CVE-2021-44228 in log4j-core 2.14.1 (pom.xml)'
+        assert drafts[0]['severity'] == 'CRITICAL'
+        assert '2.17.1' in drafts[0]['description']
+        assert [f.rule for f in iter_findings(remaining[0])] == ['CVE-2023-0002']
+        assert stats == {'translated': 1, 'to_model': 1}
+    
+    def test_semgrep_needs_severity(self):
+        """Test semgrep findings keep their own severity and unknown severities go to the model."""
+        semgrep = _document('semgrep', [
+            {'rule': 'python.lang.security.audit.eval-detected', 'severity': 'ERROR', 'path': 'app.py', 'line_start': 3, 'line_end': 5, 'message': 'eval of input'},
+            {'rule': 'custom.rule', 'severity': None, 'path': 'app.py', 'line_start': 7, 'line_end': 7, 'message': 'custom'}
+        ])
+        
+        drafts, remaining, stats = translate_tool_results([semgrep])
+        
+        assert (drafts[0]['title'], drafts[0]['severity'], drafts[0]['line_numbers']) == ('Eval Detected in app.py', 'HIGH', [3, 5])
+        assert remaining[0]['findings_count'] == 1
+        assert stats == {'translated': 1, 'to_model': 1}
+    
+    def test_correlated_and_unmapped_results_left_for_model(self):
+        """Test lines flagged by several tools, unmapped tools and legacy results skip translation."""
+        gitleaks = _document('gitleaks', [{'rule': 'aws-access-token', 'severity': 'HIGH', 'path': 'config.py', 'line_start': 4, 'line_end': 4, 'message': 'AWS'}])
+        semgrep = _document('semgrep', [
+            {'rule': 'hardcoded-secret', 'severity': 'ERROR', 'path': 'config.py', 'line_start': 3, 'line_end': 5, 'message': 'secret'},
+            {'rule': 'debug-enabled', 'severity': 'WARNING', 'path': 'config.py', 'line_start': 40, 'line_end': 40, 'message': 'debug'}
+        ])
+        pacu = _document('pacu', [{'rule': 'iam__enum_permissions', 'severity': 'UNKNOWN', 'path': 'aws:default', 'message': 'Found admin'}])
+        legacy = {'tool': 'scoutsuite', 'results': []}
+        
+        drafts, remaining, stats = translate_tool_results([gitleaks, semgrep, pacu, legacy])
+        
+        assert [d['title'] for d in drafts] == ['Debug Enabled in config.py']
+        assert [r['tool'] for r in remaining] == ['gitleaks', 'semgrep', 'pacu', 'scoutsuite']
+        assert [f.rule for f in iter_findings(remaining[1])] == ['hardcoded-secret']
+        assert stats == {'translated': 1, 'to_model': 3}
+    
+    def test_fully_translated_result_dropped(self):
+        """Test a result whose findings were all translated is not sent to the model."""
+        gitleaks = _document('gitleaks', [{'rule': 'private-key', 'severity': 'HIGH', 'path': 'id_rsa', 'line_start': 1, 'message': 'Private Key'}])
+        
+        drafts, remaining, stats = translate_tool_results([gitleaks])
+        
+        assert drafts[0]['title'] == 'Private Key Committed in id_rsa'
+        assert remaining == []
+        assert stats == {'translated': 1, 'to_model': 0}
+    
+    def test_code_patterns_translated(self):
+        """Test deep research patterns become low-confidence drafts citing the research artifact."""
+        patterns = [
+            {'type': 'sql_injection', 'file': 'db.py', 'line': 12, 'snippet': 'cursor.execute(q + x)', 'severity': 'high', 'description': 'Potential sql injection detected'},
+            {'type': 'path_traversal', 'file': 'io.py', 'line': 0, 'severity': 'unknown'},
+            {'type': 'sql_injection'}
+        ]
+        
+        drafts = translate_code_patterns(patterns, 'sha256:research')
+        
+        assert [(d['title'], d['severity'], d['line_numbers']) for d in drafts] == [
+            ('Sql Injection in db.py', 'HIGH', [12]),
+            ('Path Traversal in io.py', 'MEDIUM', [])
+        ]
+        assert {d['tool_source'] for d in drafts} == {'deep-researcher'}
+        assert drafts[0]['evidence_digest'] == 'sha256:research'
+        assert drafts[0]['confidence'] < 0.5
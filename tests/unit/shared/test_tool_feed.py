@@ -0,0 +1,97 @@
+"""
+Unit Tests for the Tool Result Feed
+===================================
+
+Tests announcing tool_results rows, following them with a cursor and
+stopping at the Coordinator's 'done' event.
+"""
+
+import pytest
+from unittest.mock import Mock
+from src.shared.mission import ToolResultFeed
+
+
+def _redis():
+    """Redis mock backed by in-memory lists."""
+    lists = {}
+    client = Mock()
+    client.rpush.side_effect = lambda key, value: lists.setdefault(key, []).append(value)
+    client.lrange.side_effect = lambda key, start, end: lists.get(key, [])[start:]
+    return client
+
+
+def _row(tool, s3_uri):
+    return {'tool_name': {'S': tool}, 's3_uri': {'S': s3_uri}, 'status': {'S': 'completed'}}
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestToolResultFeed:
+    """Test suite for ToolResultFeed."""
+    
+    def test_follow_yields_rows_until_done(self):
+        """Test rows come back in completion order and 'done' ends the feed."""
+        redis_client = _redis()
+        feed = ToolResultFeed(redis_client, 'm1')
+        feed.publish(_row('gitleaks-mcp:gitleaks_scan', 's3://b/gitleaks'))
+        feed.publish(_row('semgrep-mcp:semgrep_scan', 's3://b/semgrep'))
+        feed.close()
+        feed.publish(_row('trivy-mcp:trivy_fs_scan', 's3://b/trivy'))
+        
+        rows = list(feed.follow(poll_seconds=0))
+        
+        assert [r['s3_uri']['S'] for r in rows] == ['s3://b/gitleaks', 's3://b/semgrep']
+        redis_client.expire.assert_called_with('mission:m1:tool_results', 86400)
+    
+    def test_follow_skips_earlier_attempts(self):
+        """Test a re-run's reader ignores the previous attempt's rows and 'done'."""
+        redis_client = _redis()
+        earlier = ToolResultFeed(redis_client, 'm1', attempt='exec-1')
+        earlier.publish(_row('gitleaks-mcp:gitleaks_scan', 's3://b/old'))
+        earlier.close()
+        
+        feed = ToolResultFeed(redis_client, 'm1', attempt='exec-2')
+        feed.publish(_row('semgrep-mcp:semgrep_scan', 's3://b/new'))
+        feed.close()
+        
+        rows = list(feed.follow(poll_seconds=0))
+        
+        assert [r['s3_uri']['S'] for r in rows] == ['s3://b/new']
+    
+    def test_read_continues_from_cursor(self):
+        """Test a reader only sees events after its cursor."""
+        feed = ToolResultFeed(_redis(), 'm1')
+        feed.publish(_row('gitleaks-mcp:gitleaks_scan', 's3://b/gitleaks'))
+        
+        events, cursor = feed.read()
+        assert len(events) == 1 and cursor == 1
+        
+        feed.publish(_row('semgrep-mcp:semgrep_scan', 's3://b/semgrep'))
+        events, cursor = feed.read(cursor)
+        assert [e['item']['s3_uri']['S'] for e in events] == ['s3://b/semgrep']
+        assert cursor == 2
+    
+    def test_follow_stops_when_told(self):
+        """Test following ends without 'done' once should_stop says so."""
+        feed = ToolResultFeed(_redis(), 'm1')
+        feed.publish(_row('gitleaks-mcp:gitleaks_scan', 's3://b/gitleaks'))
+        checks = []
+        
+        def should_stop():
+            checks.append(1)
+            return len(checks) > 2
+        
+        rows = list(feed.follow(poll_seconds=0, should_stop=should_stop))
+        
+        assert len(rows) == 1
+        assert len(checks) == 3
+    
+    def test_publish_without_redis_is_noop(self):
+        """Test the Coordinator runs on without Redis."""
+        feed = ToolResultFeed(None, 'm1')
+        feed.publish(_row('gitleaks-mcp:gitleaks_scan', 's3://b/gitleaks'))
+        feed.close()
+        
+        failing = Mock()
+        failing.rpush.side_effect = ConnectionError('down')
+        ToolResultFeed(failing, 'm1').publish(_row('semgrep-mcp:semgrep_scan', 's3://b/semgrep'))
@@ -0,0 +1,189 @@
+"""
+Unit Tests for the Tool DAG Scheduler
+=====================================
+
+Tests dependency ordering, critical-path scheduling, skipping dependents of
+failed tools, binding upstream results into arguments, and timings.
+"""
+
+import pytest
+import asyncio
+from src.shared.mcp_client import ToolDAGScheduler, ToolNode, binding_for
+from src.shared.mcp_server import Finding, encode_tool_result
+
+
+def _invocation(server, tool='scan'):
+    return {'server_name': server, 'tool_name': tool, 'arguments': {}}
+
+
+def _recorder(order, delays=None, failing=()):
+    async def invoke(invocation):
+        server = invocation['server_name']
+        order.append(server)
+        await asyncio.sleep((delays or {}).get(server, 0))
+        return {'server': server, 'tool': invocation['tool_name'], 'success': server not in failing}
+    return invoke
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestToolDAGScheduler:
+    """Test suite for ToolDAGScheduler."""
+    
+    @pytest.mark.asyncio
+    async def test_dependencies_run_after_upstream(self):
+        """Test a dependent tool starts only after its upstream finishes."""
+        order = []
+        scheduler = ToolDAGScheduler(_recorder(order, delays={'scoutsuite-mcp': 0.02}), max_concurrency=4)
+        scheduler.add(ToolNode('pacu-mcp', _invocation('pacu-mcp'), priority=1, dependencies=['scoutsuite-mcp']))
+        scheduler.add(ToolNode('scoutsuite-mcp', _invocation('scoutsuite-mcp'), priority=2))
+        
+        results = await scheduler.run()
+        
+        assert order == ['scoutsuite-mcp', 'pacu-mcp']
+        # Results keep plan order
+        assert [r['server'] for r in results] == ['pacu-mcp', 'scoutsuite-mcp']
+        assert results[0]['timing']['started_at'] >= results[1]['timing']['finished_at']
+    
+    @pytest.mark.asyncio
+    async def test_critical_path_then_priority(self):
+        """Test ready tools start longest remaining chain first, then by priority."""
+        order = []
+        scheduler = ToolDAGScheduler(_recorder(order), max_concurrency=1)
+        scheduler.add(ToolNode('semgrep-mcp', _invocation('semgrep-mcp'), priority=1, estimated_seconds=300))
+        scheduler.add(ToolNode('gitleaks-mcp', _invocation('gitleaks-mcp'), priority=2, estimated_seconds=300))
+        scheduler.add(ToolNode('scoutsuite-mcp', _invocation('scoutsuite-mcp'), priority=3, estimated_seconds=300))
+        scheduler.add(ToolNode('pacu-mcp', _invocation('pacu-mcp'), priority=3, estimated_seconds=300,
+                               dependencies=['scoutsuite-mcp']))
+        
+        await scheduler.run()
+        
+        assert order[0] == 'scoutsuite-mcp'
+        assert order.index('semgrep-mcp') < order.index('gitleaks-mcp')
+    
+    @pytest.mark.asyncio
+    async def test_failed_upstream_skips_dependents(self):
+        """Test dependents of a failed tool are skipped, not invoked."""
+        order = []
+        scheduler = ToolDAGScheduler(_recorder(order, failing={'scoutsuite-mcp'}))
+        scheduler.add(ToolNode('scoutsuite-mcp', _invocation('scoutsuite-mcp')))
+        scheduler.add(ToolNode('pacu-mcp', _invocation('pacu-mcp'), dependencies=['scoutsuite-mcp']))
+        
+        results = await scheduler.run()
+        
+        assert order == ['scoutsuite-mcp']
+        assert results[1]['success'] is False
+        assert 'scoutsuite-mcp' in results[1]['error']
+        assert results[1]['timing']['status'] == 'skipped'
+    
+    @pytest.mark.asyncio
+    async def test_exception_becomes_failure(self):
+        """Test an invocation raising is reported as a failed result."""
+        async def invoke(invocation):
+            raise RuntimeError("server crashed")
+        
+        scheduler = ToolDAGScheduler(invoke)
+        scheduler.add(ToolNode('semgrep-mcp', _invocation('semgrep-mcp')))
+        
+        results = await scheduler.run()
+        
+        assert results[0]['success'] is False
+        assert results[0]['error'] == 'server crashed'
+    
+    @pytest.mark.asyncio
+    async def test_cycle_rejected_and_unknown_dependency_dropped(self):
+        """Test cycles raise while dependencies outside the plan are ignored."""
+        scheduler = ToolDAGScheduler(_recorder([]))
+        scheduler.add(ToolNode('a', _invocation('a'), dependencies=['b']))
+        scheduler.add(ToolNode('b', _invocation('b'), dependencies=['a']))
+        with pytest.raises(ValueError):
+            await scheduler.run()
+        
+        order = []
+        scheduler = ToolDAGScheduler(_recorder(order))
+        scheduler.add(ToolNode('pacu-mcp', _invocation('pacu-mcp'), dependencies=['scoutsuite-mcp']))
+        results = await scheduler.run()
+        
+        assert order == ['pacu-mcp']
+        assert results[0]['success'] is True
+    
+    @pytest.mark.asyncio
+    async def test_scoutsuite_findings_bound_into_pacu(self):
+        """Test Pacu's modules come from ScoutSuite's high-severity findings in the same plan."""
+        wire = encode_tool_result({'success': True, 'tool': 'scoutsuite'}, [
+            Finding(tool='scoutsuite', rule='iam-privilege-escalation', severity='danger',
+                    path='iam', message='Privilege escalation via PassRole'),
+            Finding(tool='scoutsuite', rule='s3-bucket-logging', severity='warning',
+                    path='s3', message='Bucket logging disabled')
+        ])
+        invoked = {}
+        
+        async def invoke(invocation):
+            invoked[invocation['server_name']] = invocation
+            if invocation['server_name'] == 'scoutsuite-mcp':
+                return {'server': 'scoutsuite-mcp', 'success': True, 'content': [{'type': 'text', 'text': wire}]}
+            return {'server': 'pacu-mcp', 'success': True}
+        
+        scheduler = ToolDAGScheduler(invoke)
+        scheduler.add(ToolNode('scoutsuite-mcp', _invocation('scoutsuite-mcp', 'scoutsuite_scan')))
+        scheduler.add(ToolNode('pacu-mcp', _invocation('pacu-mcp', 'pacu_enum_permissions'),
+                               dependencies=['scoutsuite-mcp'], bind=binding_for('pacu-mcp')))
+        
+        await scheduler.run()
+        
+        pacu = invoked['pacu-mcp']
+        assert pacu['tool_name'] == 'pacu_run_modules'
+        # The MEDIUM s3 finding stays below the threshold
+        assert pacu['arguments']['modules'] == ['iam__privesc_scan', 'iam__enum_permissions']
+        assert pacu['arguments']['dry_run'] is True
+    
+    @pytest.mark.asyncio
+    async def test_timings_recorded(self):
+        """Test plan-level and per-node timings."""
+        scheduler = ToolDAGScheduler(_recorder([], delays={'semgrep-mcp': 0.01}))
+        scheduler.add(ToolNode('semgrep-mcp', _invocation('semgrep-mcp'), estimated_seconds=120))
+        
+        await scheduler.run()
+        timings = scheduler.timings()
+        
+        assert timings['critical_path_seconds'] == 120
+        assert timings['wall_seconds'] >= 0.01
+        assert timings['nodes']['semgrep-mcp']['run_seconds'] >= 0.01
+        assert timings['nodes']['semgrep-mcp']['status'] == 'succeeded'
+    
+    @pytest.mark.asyncio
+    async def test_packs_by_resource_demand(self):
+        """Test tools are admitted while their demand fits, letting a smaller tool backfill."""
+        active = []
+        peak = []
+        
+        async def invoke(invocation):
+            active.append(invocation['server_name'])
+            peak.append(list(active))
+            await asyncio.sleep(0.01)
+            active.remove(invocation['server_name'])
+            return {'server': invocation['server_name'], 'success': True}
+        
+        scheduler = ToolDAGScheduler(invoke, max_concurrency=5, cpus=4, memory_mb=4096)
+        scheduler.add(ToolNode('semgrep-mcp', _invocation('semgrep-mcp'), estimated_seconds=300, cpus=3, memory_mb=2048))
+        scheduler.add(ToolNode('trivy-mcp', _invocation('trivy-mcp'), estimated_seconds=200, cpus=2, memory_mb=1024))
+        scheduler.add(ToolNode('gitleaks-mcp', _invocation('gitleaks-mcp'), estimated_seconds=100, cpus=1, memory_mb=512))
+        
+        await scheduler.run()
+        
+        # trivy does not fit beside semgrep, gitleaks does
+        assert peak[1] == ['semgrep-mcp', 'gitleaks-mcp']
+        assert all('trivy-mcp' not in p or 'semgrep-mcp' not in p for p in peak)
+        assert scheduler.timings()['nodes']['semgrep-mcp']['cpus'] == 3
+    
+    @pytest.mark.asyncio
+    async def test_oversized_tool_runs_alone(self):
+        """Test a demand above capacity still runs once nothing else does."""
+        order = []
+        scheduler = ToolDAGScheduler(_recorder(order), cpus=1, memory_mb=512)
+        scheduler.add(ToolNode('semgrep-mcp', _invocation('semgrep-mcp'), cpus=4, memory_mb=8192))
+        
+        results = await scheduler.run()
+        
+        assert order == ['semgrep-mcp']
+        assert results[0]['success'] is True
@@ -0,0 +1,180 @@
+"""
+Unit Tests for Workspace Materialization
+========================================
+
+Tests extracting a mission's source tree from its workspace bundle or
+from per-object downloads, and building it from the host blob cache.
+"""
+
+import io
+import pytest
+import tarfile
+import json
+import hashlib
+from unittest.mock import Mock
+from src.shared.storage import BlobCache, bundle_key, manifest_key, materialize_workspace
+
+
+def _bundle(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.shared
+@pytest.mark.unit
+class TestWorkspaceMaterialization:
+    """Test suite for workspace materialization."""
+    
+    def test_extracts_bundle(self, tmp_path, monkeypatch):
+        """Test the bundle is streamed and extracted with a single GET."""
+        monkeypatch.setenv('WORKSPACE_CACHE_DIR', '')
+        s3_client = Mock()
+        s3_client.get_object.return_value = {'Body': _bundle({'app.py': b'print(1)\n', 'lib/util.py': b'x = 1\n'})}
+        
+        stats = materialize_workspace(s3_client, 'bucket', 'm1', tmp_path / 'ws', mode='auto')
+        
+        s3_client.get_object.assert_called_once_with(Bucket='bucket', Key=bundle_key('m1'))
+        s3_client.download_file.assert_not_called()
+        assert (tmp_path / 'ws' / 'lib' / 'util.py').read_bytes() == b'x = 1\n'
+        assert stats['mode'] == 'bundle'
+        assert stats['files'] == 2
+    
+    def test_rejects_unsafe_bundle(self, tmp_path, monkeypatch):
+        """Test a bundle member escaping the workspace fails in bundle mode."""
+        monkeypatch.setenv('WORKSPACE_CACHE_DIR', '')
+        s3_client = Mock()
+        s3_client.get_object.return_value = {'Body': _bundle({'../escape.py': b'x'})}
+        
+        with pytest.raises(ValueError):
+            materialize_workspace(s3_client, 'bucket', 'm1', tmp_path / 'ws', mode='bundle')
+        
+        assert not (tmp_path / 'escape.py').exists()
+    
+    def test_falls_back_to_objects(self, tmp_path, monkeypatch):
+        """Test missing bundles fall back to pooled per-object downloads."""
+        monkeypatch.setenv('WORKSPACE_CACHE_DIR', '')
+        s3_client = Mock()
+        s3_client.get_object.side_effect = Exception('NoSuchKey')
+        s3_client.get_paginator.return_value.paginate.return_value = [{
+            'Contents': [
+                {'Key': 'unzipped/m1/', 'Size': 0},
+                {'Key': 'unzipped/m1/app.py', 'Size': 9},
+                {'Key': 'unzipped/m1/lib/util.py', 'Size': 6}
+            ]
+        }]
+        s3_client.download_file.side_effect = lambda bucket, key, path: open(path, 'w').write(key)
+        
+        stats = materialize_workspace(s3_client, 'bucket', 'm1', tmp_path / 'ws', max_workers=4)
+        
+        assert stats == {'mode': 'objects', 'files': 2, 'bytes': 15, 'seconds': stats['seconds']}
+        assert (tmp_path / 'ws' / 'lib' / 'util.py').read_text() == 'unzipped/m1/lib/util.py'
+    
+    def _manifest_client(self, mission_id, files):
+        """S3 mock serving a manifest and per-object downloads for files."""
+        manifest = {'files': {
+            name: {'sha256': hashlib.sha256(content).hexdigest(), 'size': len(content)}
+            for name, content in files.items()
+        }}
+        s3_client = Mock()
+        
+        def get_object(Bucket, Key):
+            if Key == manifest_key(mission_id):
+                return {'Body': io.BytesIO(json.dumps(manifest).encode())}
+            raise Exception('NoSuchKey')
+        
+        def download_file(bucket, key, path):
+            with open(path, 'wb') as f:
+                f.write(files[key[len(f"unzipped/{mission_id}/"):]])
+        
+        s3_client.get_object.side_effect = get_object
+        s3_client.download_file.side_effect = download_file
+        return s3_client
+    
+    def test_cache_fetches_only_new_files(self, tmp_path):
+        """Test a second mission fetches only files the host cache lacks and hardlinks the rest."""
+        import os
+        
+        cache = BlobCache(tmp_path / 'cache', budget_bytes=1 << 20)
+        first = self._manifest_client('m1', {'app.py': b'print(1)\n', 'lib/util.py': b'x = 1\n'})
+        stats = materialize_workspace(first, 'bucket', 'm1', cache.workspace_dir('m1'), cache=cache)
+        
+        assert stats['mode'] == 'cache'
+        assert stats['fetched'] == 2
+        
+        second = self._manifest_client('m2', {'app.py': b'print(2)\n', 'lib/util.py': b'x = 1\n'})
+        stats = materialize_workspace(second, 'bucket', 'm2', cache.workspace_dir('m2'), cache=cache)
+        
+        assert stats['fetched'] == 1
+        assert [c.args[1] for c in second.download_file.call_args_list] == ['unzipped/m2/app.py']
+        util_1 = cache.workspace_dir('m1') / 'lib' / 'util.py'
+        util_2 = cache.workspace_dir('m2') / 'lib' / 'util.py'
+        assert os.stat(util_1).st_ino == os.stat(util_2).st_ino
+        assert (cache.workspace_dir('m2') / 'app.py').read_bytes() == b'print(2)\n'
+    
+    def test_cache_shares_built_workspace(self, tmp_path):
+        """Test a workspace already built on the host is reused without S3 calls."""
+        cache = BlobCache(tmp_path / 'cache', budget_bytes=1 << 20)
+        s3_client = self._manifest_client('m1', {'app.py': b'print(1)\n'})
+        materialize_workspace(s3_client, 'bucket', 'm1', cache.workspace_dir('m1'), cache=cache)
+        
+        other = Mock()
+        stats = materialize_workspace(other, 'bucket', 'm1', cache.workspace_dir('m1'), cache=cache)
+        
+        assert stats['mode'] == 'shared'
+        assert stats['files'] == 1
+        other.get_object.assert_not_called()
+    
+    def test_cache_rejects_digest_mismatch(self, tmp_path):
+        """Test fetched files must match the manifest digest."""
+        cache = BlobCache(tmp_path / 'cache', budget_bytes=1 << 20)
+        s3_client = self._manifest_client('m1', {'app.py': b'print(1)\n'})
+        s3_client.download_file.side_effect = lambda bucket, key, path: open(path, 'wb').write(b'tampered')
+        
+        with pytest.raises(ValueError):
+            materialize_workspace(s3_client, 'bucket', 'm1', cache.workspace_dir('m1'), cache=cache)
+    
+    def test_cache_evicts_unlinked_lru(self, tmp_path):
+        """Test eviction drops least recently used blobs no workspace links to."""
+        import os
+        
+        cache = BlobCache(tmp_path / 'cache', budget_bytes=10)
+        digests = []
+        for i, content in enumerate([b'a' * 8, b'b' * 8, b'c' * 8]):
+            temp = cache.temp_path()
+            temp.write_bytes(content)
+            digests.append(cache.ingest(temp))
+            os.utime(cache.blob_path(digests[-1]), (i, i))
+        cache.link(digests[0], tmp_path / 'pinned.txt')
+        
+        cache.evict()
+        
+        assert cache.blob_path(digests[0]).exists()
+        assert not cache.blob_path(digests[1]).exists()
+        assert not cache.blob_path(digests[2]).exists()
+    
+    def test_evict_waits_for_builders(self, tmp_path):
+        """Test eviction does not drop blobs while a builder holds them to link."""
+        import threading
+        
+        cache = BlobCache(tmp_path / 'cache', budget_bytes=0)
+        temp = cache.temp_path()
+        temp.write_bytes(b'a' * 8)
+        digest = cache.ingest(temp)
+        
+        with cache.lock('blobs', shared=True):
+            assert cache.has(digest)
+            evictor = threading.Thread(target=cache.evict)
+            evictor.start()
+            evictor.join(0.2)
+            assert evictor.is_alive()
+            cache.link(digest, tmp_path / 'app.py')
+        evictor.join(5)
+        
+        assert (tmp_path / 'app.py').read_bytes() == b'a' * 8
+        assert cache.blob_path(digest).exists()